@@ -3,14 +3,53 @@ Agents for Terraform Generation
 
 This package contains AI agents responsible for creating and validating
 Terraform configurations.
+
+Exports are imported on first access, so importing one agent or helper does not load
+Semantic Kernel and the rest of the package up front.
 """
 
-from .terraform_creation_agent import TerraformCreationAgent
-from .terraform_validation_agent import TerraformValidationAgent
-from .user_agent import UserAgent
+from importlib import import_module
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    from .candidate_panel import CandidatePanel
+    from .custom_agent_base import ServiceRegistry, Services, get_service_registry, kernel_tool_schemas
+    from .history_reducer import ReductionReport, TokenBudgetReducer, TokenCounter
+    from .response_cache import CacheMode, ResponseCache, ResponseCacheMissError
+    from .review_panel import ReviewPanel
+    from .terraform_creation_agent import TerraformCreationAgent
+    from .terraform_validation_agent import TerraformValidationAgent
+    from .user_agent import UserAgent
+
+# Export name -> submodule that defines it.
+_EXPORTS = {
+    "CandidatePanel": "candidate_panel",
+    "ServiceRegistry": "custom_agent_base",
+    "Services": "custom_agent_base",
+    "get_service_registry": "custom_agent_base",
+    "kernel_tool_schemas": "custom_agent_base",
+    "ReductionReport": "history_reducer",
+    "TokenBudgetReducer": "history_reducer",
+    "TokenCounter": "history_reducer",
+    "CacheMode": "response_cache",
+    "ResponseCache": "response_cache",
+    "ResponseCacheMissError": "response_cache",
+    "ReviewPanel": "review_panel",
+    "TerraformCreationAgent": "terraform_creation_agent",
+    "TerraformValidationAgent": "terraform_validation_agent",
+    "UserAgent": "user_agent",
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name: str) -> Any:
+    if name not in _EXPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(import_module(f".{_EXPORTS[name]}", __name__), name)
+    globals()[name] = value
+    return value
+
 
-__all__ = [
-    "TerraformCreationAgent",
-    "TerraformValidationAgent",
-    "UserAgent",
-] 
\ No newline at end of file
+def __dir__() -> list[str]:
+    return sorted(set(globals()) | set(__all__))
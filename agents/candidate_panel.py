@@ -0,0 +1,260 @@
+# Copyright (c) Microsoft. All rights reserved.
+
+import asyncio
+import logging
+import os
+import sys
+from collections.abc import AsyncIterable, Awaitable, Callable
+from typing import TYPE_CHECKING, Any
+
+if sys.version_info >= (3, 12):
+    from typing import override  # pragma: no cover
+else:
+    from typing_extensions import override  # pragma: no cover
+
+from opentelemetry import trace
+from pydantic import Field
+from semantic_kernel.agents import Agent, AgentResponseItem, ChatCompletionAgent, ChatHistoryAgentThread
+from semantic_kernel.connectors.ai.completion_usage import CompletionUsage
+from semantic_kernel.connectors.ai.prompt_execution_settings import PromptExecutionSettings
+from semantic_kernel.contents import ChatMessageContent, StreamingChatMessageContent, StreamingTextContent
+from semantic_kernel.contents.utils.author_role import AuthorRole
+from semantic_kernel.functions import KernelArguments
+
+from .instrumentation import trace_turn
+from .review_panel import _invoke_on_snapshot
+from .terraform_creation_agent import TerraformCreationAgent
+from plugins.candidate_scoring import CandidateScore, ScoreWeights, score_workspace
+from plugins.file_cache import FileCache
+from plugins.registry import get_plugin_registry
+
+if TYPE_CHECKING:
+    from semantic_kernel.agents import AgentThread
+    from semantic_kernel.kernel import Kernel
+
+logger = logging.getLogger(__name__)
+
+DESCRIPTION = """Select me to create or update Terraform configurations."""
+
+# Sampling temperatures given to the candidates in turn.
+DEFAULT_TEMPERATURES = (0.2, 0.6, 1.0)
+
+# The directory under a workspace that holds the candidates' workspaces.
+CANDIDATES_DIR = ".candidates"
+
+
+class CandidatePanel(ChatCompletionAgent):
+    """Generates several candidate configurations concurrently and keeps the best one.
+
+    In a group chat the panel takes the place of the creation agent, under its name. On
+    its turn each candidate agent answers the same snapshot of the conversation with its
+    own temperature and seed, in a workspace of its own under ``.candidates/`` that starts
+    as a copy of the chat's workspace. The candidates are scored with local checks only
+    (see ``score_workspace``); the files of the best one are copied to the chat's
+    workspace and its reply is posted, so the chat continues as if only it had run. The
+    scores of the latest turn are kept in ``last_scores``.
+    """
+
+    base_path: str = "terraform"
+    candidates: list[Agent] = Field(default_factory=list)
+    temperatures: tuple[float, ...] = DEFAULT_TEMPERATURES
+    weights: ScoreWeights = Field(default_factory=ScoreWeights)
+    concurrency: int | None = None
+    last_scores: list[CandidateScore] = Field(default_factory=list, exclude=True)
+
+    def __init__(
+        self,
+        base_path: str = "terraform",
+        count: int = 3,
+        agent_factory: Callable[[str], Agent] | None = None,
+        name: str = "TerraformCreationAgent",
+        weights: ScoreWeights | None = None,
+        concurrency: int | None = None,
+        temperatures: tuple[float, ...] = DEFAULT_TEMPERATURES,
+    ):
+        """Initialize the candidate panel.
+
+        Args:
+            base_path: The workspace of the chat.
+            count: The number of candidates generated on each turn.
+            agent_factory: Creates the agent of one candidate, bound to the workspace it is
+                given. Defaults to a ``TerraformCreationAgent``.
+            name: The name the best candidate's reply is posted under.
+            weights: How much each local check counts towards a candidate's score.
+            concurrency: The most candidates generated at once; all of them by default.
+            temperatures: The sampling temperatures given to the candidates in turn.
+        """
+        if count < 1:
+            raise ValueError("A candidate panel needs at least one candidate.")
+        if concurrency is not None and concurrency < 1:
+            raise ValueError("concurrency must be at least 1.")
+        agent_factory = agent_factory or (lambda path: TerraformCreationAgent(base_path=path))
+        super().__init__(name=name, description=DESCRIPTION.strip())
+        self.base_path = base_path
+        self.candidates = [agent_factory(candidate_workspace(base_path, index)) for index in range(count)]
+        for index in range(count):
+            registry = get_plugin_registry(candidate_workspace(base_path, index))
+            if "snippet_library" in registry.factories:
+                # The best candidate's files are copied to the chat's workspace, so the module
+                # sources the candidates are given must resolve from both.
+                registry.instance("snippet_library").absolute_sources = True
+        self.temperatures = tuple(temperatures)
+        self.weights = weights or ScoreWeights()
+        self.concurrency = concurrency
+
+    @override
+    async def invoke(
+        self,
+        *,
+        messages: str | ChatMessageContent | list[str | ChatMessageContent] | None = None,
+        thread: "AgentThread | None" = None,
+        on_intermediate_message: Callable[[ChatMessageContent], Awaitable[None]] | None = None,
+        arguments: KernelArguments | None = None,
+        kernel: "Kernel | None" = None,
+        **kwargs: Any,
+    ) -> AsyncIterable[AgentResponseItem[ChatMessageContent]]:
+        async def generate() -> AsyncIterable[AgentResponseItem[ChatMessageContent]]:
+            chat_thread, message = await self._generate(messages, thread, arguments)
+            yield AgentResponseItem(message=message, thread=chat_thread)
+
+        async for response in trace_turn(self.name, generate(), streaming=False):
+            yield response
+
+    @override
+    async def invoke_stream(
+        self,
+        *,
+        messages: str | ChatMessageContent | list[str | ChatMessageContent] | None = None,
+        thread: "AgentThread | None" = None,
+        on_intermediate_message: Callable[[ChatMessageContent], Awaitable[None]] | None = None,
+        arguments: KernelArguments | None = None,
+        kernel: "Kernel | None" = None,
+        **kwargs: Any,
+    ) -> AsyncIterable[AgentResponseItem[StreamingChatMessageContent]]:
+        # Only the best candidate's reply is kept, and which one that is is known once all
+        # of them have finished, so the reply is sent as one chunk.
+        async def generate() -> AsyncIterable[AgentResponseItem[StreamingChatMessageContent]]:
+            chat_thread, message = await self._generate(messages, thread, arguments)
+            chunk = StreamingChatMessageContent(
+                role=AuthorRole.ASSISTANT,
+                choice_index=0,
+                name=self.name,
+                items=[StreamingTextContent(choice_index=0, text=message.content)],
+                metadata=message.metadata,
+            )
+            yield AgentResponseItem(message=chunk, thread=chat_thread)
+
+        async for response in trace_turn(self.name, generate(), streaming=True):
+            yield response
+
+    def candidate_arguments(self, index: int, arguments: KernelArguments | None = None) -> KernelArguments:
+        """The arguments candidate ``index`` is invoked with: its temperature and seed."""
+        settings = PromptExecutionSettings(
+            extension_data={"temperature": self.temperatures[index % len(self.temperatures)], "seed": index + 1}
+        )
+        return KernelArguments(settings=settings, **(arguments or {}))
+
+    async def _generate(
+        self,
+        messages: str | ChatMessageContent | list[str | ChatMessageContent] | None,
+        thread: "AgentThread | None",
+        arguments: KernelArguments | None,
+    ) -> tuple[ChatHistoryAgentThread, ChatMessageContent]:
+        chat_thread = await self._ensure_thread_exists_with_messages(
+            messages=messages,
+            thread=thread,
+            construct_thread=lambda: ChatHistoryAgentThread(),
+            expected_type=ChatHistoryAgentThread,
+        )
+        snapshot = [message async for message in chat_thread.get_messages()]
+        task = next((m.content for m in snapshot if m.role == AuthorRole.USER and m.content), "")
+        workspace = _file_cache(self.base_path)
+        semaphore = asyncio.Semaphore(self.concurrency or len(self.candidates))
+
+        async def run(index: int) -> tuple[list[str], CompletionUsage]:
+            async with semaphore:
+                _mirror(workspace, _file_cache(candidate_workspace(self.base_path, index)))
+                return await _invoke_on_snapshot(
+                    self.candidates[index], snapshot, self.candidate_arguments(index, arguments)
+                )
+
+        outcomes = await asyncio.gather(*(run(index) for index in range(len(self.candidates))), return_exceptions=True)
+        scores = await asyncio.gather(*(self._score(index, task, outcome) for index, outcome in enumerate(outcomes)))
+        eligible = [score for score in scores if score.error is None]
+        if not eligible:
+            raise next(outcome for outcome in outcomes if isinstance(outcome, BaseException))
+        # Ties go to the earlier candidate, which has the lower temperature.
+        best = max(eligible, key=lambda score: (score.total, -score.index))
+        self.last_scores = scores
+        _mirror(_file_cache(candidate_workspace(self.base_path, best.index)), workspace)
+
+        summary = ", ".join(f"#{score.index}: {_format_score(score)}" for score in scores)
+        logger.info(f"[{self.name}] Kept candidate #{best.index} of {len(scores)} ({summary}).")
+        span = trace.get_current_span()
+        span.set_attribute("agent.candidates.best", best.index)
+        span.set_attribute("agent.candidates.scores", [score.total for score in scores])
+
+        prompt_tokens = completion_tokens = 0
+        for outcome in outcomes:
+            if not isinstance(outcome, BaseException):
+                prompt_tokens += outcome[1].prompt_tokens or 0
+                completion_tokens += outcome[1].completion_tokens or 0
+        replies, _ = outcomes[best.index]
+        message = ChatMessageContent(
+            role=AuthorRole.ASSISTANT,
+            name=self.name,
+            content="\n\n".join(reply for reply in replies if reply.strip()) or "Updated the configuration.",
+            # Every candidate's tokens were paid for, not only the best one's.
+            metadata={"usage": CompletionUsage(prompt_tokens=prompt_tokens, completion_tokens=completion_tokens)},
+        )
+        await chat_thread.on_new_message(message)
+        return chat_thread, message
+
+    async def _score(
+        self, index: int, task: str, outcome: tuple[list[str], CompletionUsage] | BaseException
+    ) -> CandidateScore:
+        if isinstance(outcome, BaseException):
+            logger.warning(f"[{self.name}] Candidate #{index} failed: {outcome}")
+            return CandidateScore(index=index, error=str(outcome) or type(outcome).__name__)
+        execution_plugin = get_plugin_registry(candidate_workspace(self.base_path, index)).instance(
+            "terraform_execution"
+        )
+        return await score_workspace(execution_plugin, task, self.weights, index=index)
+
+
+def candidate_workspace(base_path: str, index: int) -> str:
+    """The workspace candidate ``index`` of a ``CandidatePanel`` on ``base_path`` writes to."""
+    return os.path.join(base_path, CANDIDATES_DIR, str(index))
+
+
+def _file_cache(base_path: str) -> FileCache:
+    # The file plugin's own cache, so its agents see every file copied in or out.
+    os.makedirs(base_path, exist_ok=True)
+    return get_plugin_registry(base_path).instance("terraform_file").cache
+
+
+def _mirror(source: FileCache, destination: FileCache) -> None:
+    """Make the Terraform files of ``destination`` identical to those of ``source``.
+
+    Files whose content is already the same are left alone, so their timestamps, and
+    the caches keyed on them, stay valid.
+    """
+    files = {filename: source.read(filename) for filename in source.list()}
+    for filename in destination.list():
+        if filename not in files:
+            os.unlink(destination.path(filename))
+            destination.invalidate(filename)
+    existing = set(destination.list())
+    changed = {
+        filename: content
+        for filename, content in files.items()
+        if filename not in existing or destination.read(filename) != content
+    }
+    if changed:
+        destination.write_many(changed)
+
+
+def _format_score(score: CandidateScore) -> str:
+    if score.error is not None:
+        return "failed"
+    return f"{score.total:.2f}"
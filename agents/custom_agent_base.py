@@ -1,10 +1,11 @@
 # Copyright (c) Microsoft. All rights reserved.
 
+import logging
 import sys
 from abc import ABC
 from collections.abc import AsyncIterable, Awaitable, Callable
 from enum import Enum
-from typing import TYPE_CHECKING, Any, Literal
+from typing import TYPE_CHECKING, Any, ClassVar, Literal
 
 from semantic_kernel.connectors.ai.chat_completion_client_base import ChatCompletionClientBase
 from semantic_kernel.contents.utils.author_role import AuthorRole
@@ -14,13 +15,29 @@ if sys.version_info >= (3, 12):
 else:
     from typing_extensions import override  # pragma: no cover
 
-from semantic_kernel.agents import ChatCompletionAgent
-from semantic_kernel.contents import ChatMessageContent
+from opentelemetry import trace
+from pydantic import Field
+from semantic_kernel.agents import AgentResponseItem, ChatCompletionAgent, ChatHistoryAgentThread
+from semantic_kernel.contents import ChatHistory, ChatMessageContent, FunctionCallContent, StreamingChatMessageContent
+from semantic_kernel.filters import FilterTypes
 from semantic_kernel.functions import KernelArguments
 from semantic_kernel.kernel import Kernel
 
+from .history_reducer import TokenBudgetReducer, TokenCounter
+from .instrumentation import instrumented, tool_invocation_filter, trace_turn
+from .response_cache import CacheMode, ResponseCache, ResponseCacheMissError
+from .response_cache import make_key as make_response_cache_key
+
 if TYPE_CHECKING:
-    from semantic_kernel.agents import AgentResponseItem, AgentThread
+    import httpx
+
+    from semantic_kernel.agents import AgentThread
+
+logger = logging.getLogger(__name__)
+tracer = trace.get_tracer(__name__)
+
+# Metadata flag marking cached messages that were intermediate (tool call/result) messages.
+_INTERMEDIATE = "response_cache.intermediate"
 
 
 class Services(str, Enum):
@@ -34,11 +51,186 @@ class Services(str, Enum):
     AZURE_OPENAI = "azure_openai"
 
 
+class ServiceRegistry:
+    """Builds each configured chat completion service once and shares it across agents.
+
+    All services created by a registry send their requests through a single keep-alive
+    ``httpx.AsyncClient``, so concurrent agents and chats reuse pooled connections instead
+    of each opening their own. Nothing touches the network until a service is requested.
+    """
+
+    def __init__(
+        self,
+        max_connections: int = 64,
+        max_keepalive_connections: int = 16,
+        keepalive_expiry: float = 60.0,
+    ):
+        self.max_connections = max_connections
+        self.max_keepalive_connections = max_keepalive_connections
+        self.keepalive_expiry = keepalive_expiry
+        self._http_client: "httpx.AsyncClient | None" = None
+        self._services: dict[tuple, ChatCompletionClientBase] = {}
+        self._default: tuple[Services, dict[str, Any]] | None = None
+
+    @property
+    def http_client(self) -> "httpx.AsyncClient":
+        """The pooled HTTP client shared by every service in this registry."""
+        if self._http_client is None or self._http_client.is_closed:
+            import httpx
+
+            self._http_client = httpx.AsyncClient(
+                limits=httpx.Limits(
+                    max_connections=self.max_connections,
+                    max_keepalive_connections=self.max_keepalive_connections,
+                    keepalive_expiry=self.keepalive_expiry,
+                ),
+                timeout=httpx.Timeout(600.0, connect=10.0),
+            )
+        return self._http_client
+
+    def get(
+        self,
+        service: Services = Services.OPENAI,
+        instruction_role: Literal["system", "developer"] = "system",
+        **settings: Any,
+    ) -> ChatCompletionClientBase:
+        """Return the shared instance of a service, creating it on first use.
+
+        Args:
+            service (Services): The AI service to use.
+            instruction_role (str): The role of the instruction in the chat completion request.
+            **settings: Overrides for the service settings otherwise read from the environment,
+                e.g. ``service_id``, ``api_key``, ``ai_model_id`` (OpenAI) or ``deployment_name``
+                and ``endpoint`` (Azure OpenAI).
+
+        Returns:
+            ChatCompletionClientBase: The AI service instance.
+        """
+        key = (service, instruction_role, tuple(sorted(settings.items())))
+        if key not in self._services:
+            self._services[key] = self._build(service, instruction_role, settings)
+        return self._services[key]
+
+    def configure_default(self, service: Services, **settings: Any) -> None:
+        """Choose the service that agents created without one use.
+
+        Nothing is built here: the service, and the connector it needs, are created when the
+        first such agent is invoked.
+
+        Args:
+            service (Services): The AI service to use.
+            **settings: Overrides for the service settings, as for ``get``.
+        """
+        self._default = (service, settings)
+
+    def get_default(
+        self, fallback: Services = Services.OPENAI, instruction_role: Literal["system", "developer"] = "system"
+    ) -> ChatCompletionClientBase:
+        """Return the configured default service, or ``fallback`` if none was configured."""
+        service, settings = self._default or (fallback, {})
+        return self.get(service, instruction_role, **settings)
+
+    def _build(
+        self, service: Services, instruction_role: str, settings: dict[str, Any]
+    ) -> ChatCompletionClientBase:
+        match service:
+            case Services.AZURE_OPENAI:
+                from openai import AsyncAzureOpenAI
+                from semantic_kernel.connectors.ai.open_ai import AzureChatCompletion, AzureOpenAISettings
+
+                azure_settings = AzureOpenAISettings(
+                    api_key=settings.get("api_key"),
+                    endpoint=settings.get("endpoint"),
+                    api_version=settings.get("api_version"),
+                )
+                if azure_settings.api_key is None or azure_settings.endpoint is None:
+                    # Token-based auth is negotiated by the connector itself.
+                    return instrumented(AzureChatCompletion)(instruction_role=instruction_role, **settings)
+                client = AsyncAzureOpenAI(
+                    azure_endpoint=str(azure_settings.endpoint),
+                    api_key=azure_settings.api_key.get_secret_value(),
+                    api_version=azure_settings.api_version,
+                    http_client=self.http_client,
+                )
+                return instrumented(AzureChatCompletion)(
+                    instruction_role=instruction_role, async_client=client, **settings
+                )
+            case Services.OPENAI:
+                from openai import AsyncOpenAI
+                from semantic_kernel.connectors.ai.open_ai import OpenAIChatCompletion, OpenAISettings
+
+                openai_settings = OpenAISettings(api_key=settings.get("api_key"), org_id=settings.get("org_id"))
+                if openai_settings.api_key is None:
+                    return instrumented(OpenAIChatCompletion)(instruction_role=instruction_role, **settings)
+                client = AsyncOpenAI(
+                    api_key=openai_settings.api_key.get_secret_value(),
+                    organization=openai_settings.org_id,
+                    http_client=self.http_client,
+                )
+                return instrumented(OpenAIChatCompletion)(
+                    instruction_role=instruction_role, async_client=client, **settings
+                )
+            case _:
+                raise ValueError(
+                    f"Unsupported service: {service}. Supported services are: {', '.join([s.value for s in Services])}"
+                )
+
+    async def close(self) -> None:
+        """Close the shared HTTP connection pool and forget the built services."""
+        self._services.clear()
+        if self._http_client is not None:
+            await self._http_client.aclose()
+            self._http_client = None
+
+
+_service_registry: ServiceRegistry | None = None
+
+
+def get_service_registry() -> ServiceRegistry:
+    """Return the process-wide service registry."""
+    global _service_registry
+    if _service_registry is None:
+        _service_registry = ServiceRegistry()
+    return _service_registry
+
+
+def kernel_tool_schemas(kernel: Kernel) -> list[dict[str, Any]]:
+    """The function definitions a request made with ``kernel`` advertises to the model."""
+    from semantic_kernel.connectors.ai.function_calling_utils import kernel_function_metadata_to_function_call_format
+
+    return [
+        kernel_function_metadata_to_function_call_format(metadata)
+        for metadata in kernel.get_full_list_of_function_metadata()
+    ]
+
+
 class CustomAgentBase(ChatCompletionAgent, ABC):
+    # The service resolved from the shared registry when the agent was constructed
+    # without one, no chat completion service is registered on its kernel and the
+    # registry has no configured default.
+    default_service: ClassVar[Services] = Services.OPENAI
+
+    # Opt-in cache of model responses; set it on an agent to serve repeated requests locally.
+    response_cache: ResponseCache | None = Field(default=None, exclude=True)
+    # Opt-in token budget for the history sent to the model on each turn.
+    history_reducer: TokenBudgetReducer | None = Field(default=None, exclude=True)
+
+    def model_post_init(self, __context: Any) -> None:
+        super().model_post_init(__context)
+        self.kernel.add_filter(FilterTypes.FUNCTION_INVOCATION, tool_invocation_filter)
+
+    def tool_schemas(self) -> list[dict[str, Any]]:
+        """The function definitions sent with each of this agent's model requests."""
+        return kernel_tool_schemas(self.kernel)
+
+    def tool_schema_tokens(self, counter: TokenCounter | None = None) -> int:
+        """Tokens the function definitions add to each of this agent's model requests."""
+        return (counter or TokenCounter()).count_tools(self.tool_schemas())
+
     def _create_ai_service(
         self, service: Services = Services.OPENAI, instruction_role: Literal["system", "developer"] = "system"
     ) -> ChatCompletionClientBase:
-        """Create an AI service for the agent.
+        """Get the shared AI service for the agent from the process-wide registry.
 
         Note: if using Azure OpenAI, ensure the following environment variables are present in your .env file:
         - AZURE_OPENAI_CHAT_DEPLOYMENT_NAME
@@ -51,27 +243,21 @@ class CustomAgentBase(ChatCompletionAgent, ABC):
         - OPENAI_CHAT_MODEL_ID
 
         Args:
-            service (Services): The AI service to use.
+            service (Services): The AI service to use when the registry has no configured default.
             instruction_role (str): The role of the instruction in the chat completion request.
                 Can be either "system" or "developer". Defaults to "system".
 
         Returns:
             ChatCompletionClientBase: The AI service instance.
         """
+        return get_service_registry().get_default(service, instruction_role)
 
-        match service:
-            case Services.AZURE_OPENAI:
-                from semantic_kernel.connectors.ai.open_ai import AzureChatCompletion
-
-                return AzureChatCompletion(instruction_role=instruction_role)
-            case Services.OPENAI:
-                from semantic_kernel.connectors.ai.open_ai import OpenAIChatCompletion
-
-                return OpenAIChatCompletion(instruction_role=instruction_role)
-            case _:
-                raise ValueError(
-                    f"Unsupported service: {service}. Supported services are: {', '.join([s.value for s in Services])}"
-                )
+    def _ensure_service(self, kernel: "Kernel | None") -> None:
+        """Attach the shared default service on first invocation if none is configured."""
+        if kernel is not None or self.service is not None:
+            return
+        if not self.kernel.get_services_by_type(ChatCompletionClientBase):
+            self.kernel.add_service(self._create_ai_service(self.default_service))
 
     @override
     async def invoke(
@@ -85,24 +271,179 @@ class CustomAgentBase(ChatCompletionAgent, ABC):
         additional_user_message: str | None = None,
         **kwargs: Any,
     ) -> AsyncIterable["AgentResponseItem[ChatMessageContent]"]:
-        normalized_messages = self._normalize_messages(messages)
+        self._ensure_service(kernel)
+        messages_to_pass = self._prepare_messages(messages, additional_user_message)
 
-        if additional_user_message:
-            normalized_messages.append(ChatMessageContent(role=AuthorRole.USER, content=additional_user_message))
+        if self.response_cache is not None:
+            responses = self._invoke_with_cache(
+                messages_to_pass, thread, on_intermediate_message, arguments, kernel, **kwargs
+            )
+        else:
+            responses = super().invoke(
+                messages=messages_to_pass,  # type: ignore
+                thread=thread,
+                on_intermediate_message=on_intermediate_message,
+                arguments=arguments,
+                kernel=kernel,
+                **kwargs,
+            )
+        async for response in trace_turn(self.name, responses, streaming=False):
+            yield response
 
-        # Filter out empty or function-only messages to avoid polluting context
-        messages_to_pass = [m for m in normalized_messages if m.content]
+    @override
+    async def invoke_stream(
+        self,
+        *,
+        messages: str | ChatMessageContent | list[str | ChatMessageContent] | None = None,
+        thread: "AgentThread | None" = None,
+        on_intermediate_message: Callable[[ChatMessageContent], Awaitable[None]] | None = None,
+        arguments: KernelArguments | None = None,
+        kernel: "Kernel | None" = None,
+        additional_user_message: str | None = None,
+        **kwargs: Any,
+    ) -> AsyncIterable["AgentResponseItem[StreamingChatMessageContent]"]:
+        self._ensure_service(kernel)
+        messages_to_pass = self._prepare_messages(messages, additional_user_message)
 
-        async for response in super().invoke(
+        responses = super().invoke_stream(
             messages=messages_to_pass,  # type: ignore
             thread=thread,
             on_intermediate_message=on_intermediate_message,
             arguments=arguments,
             kernel=kernel,
             **kwargs,
-        ):
+        )
+        async for response in trace_turn(self.name, responses, streaming=True):
             yield response
 
+    @override
+    async def _prepare_agent_chat_history(
+        self, history: ChatHistory, kernel: "Kernel", arguments: KernelArguments
+    ) -> ChatHistory:
+        if self.history_reducer is not None:
+            history = ChatHistory(messages=self.history_reducer.reduce(history.messages))
+            report = self.history_reducer.last_report
+            logger.info(
+                f"[{self.name}] History reduced from {report.original_tokens} to {report.reduced_tokens} tokens "
+                f"({report.saved_tokens} saved, {report.summarized_messages} messages summarized)."
+            )
+            span = trace.get_current_span()
+            span.set_attribute("agent.history.original_tokens", report.original_tokens)
+            span.set_attribute("agent.history.reduced_tokens", report.reduced_tokens)
+            span.set_attribute("agent.history.saved_tokens", report.saved_tokens)
+        return await super()._prepare_agent_chat_history(history, kernel, arguments)
+
+    def _prepare_messages(
+        self,
+        messages: str | ChatMessageContent | list[str | ChatMessageContent] | None,
+        additional_user_message: str | None,
+    ) -> list[ChatMessageContent]:
+        normalized_messages = self._normalize_messages(messages)
+
+        if additional_user_message:
+            normalized_messages.append(ChatMessageContent(role=AuthorRole.USER, content=additional_user_message))
+
+        # Filter out empty or function-only messages to avoid polluting context
+        return [m for m in normalized_messages if m.content]
+
+    async def _invoke_with_cache(
+        self,
+        messages: list[ChatMessageContent],
+        thread: "AgentThread | None",
+        on_intermediate_message: Callable[[ChatMessageContent], Awaitable[None]] | None,
+        arguments: KernelArguments | None,
+        kernel: "Kernel | None",
+        **kwargs: Any,
+    ) -> AsyncIterable["AgentResponseItem[ChatMessageContent]"]:
+        cache = self.response_cache
+        history = [m async for m in thread.get_messages()] if thread is not None else []
+        key = await self._response_cache_key(history + messages, arguments, kernel)
+
+        with tracer.start_as_current_span(f"agent_response_cache {self.name}") as span:
+            cached = cache.get(key)
+            span.set_attribute("agent.response_cache.hit", cached is not None)
+            span.set_attribute("agent.response_cache.mode", cache.mode.value)
+
+            if cached is None:
+                if cache.mode == CacheMode.REPLAY:
+                    raise ResponseCacheMissError(f"No recorded response for {self.name} (key {key[:12]}).")
+
+                produced: list[ChatMessageContent] = []
+
+                async def record(message: ChatMessageContent) -> None:
+                    recorded = message.model_copy(deep=True)
+                    recorded.metadata[_INTERMEDIATE] = True
+                    produced.append(recorded)
+                    if on_intermediate_message:
+                        await on_intermediate_message(message)
+
+                async for response in super().invoke(
+                    messages=messages,  # type: ignore
+                    thread=thread,
+                    on_intermediate_message=record,
+                    arguments=arguments,
+                    kernel=kernel,
+                    **kwargs,
+                ):
+                    produced.append(response.message)
+                    yield response
+                cache.put(key, produced)
+                return
+
+            # Cache hit: rebuild the thread as the original invocation left it, without
+            # calling the model.
+            thread = await self._ensure_thread_exists_with_messages(
+                messages=messages,
+                thread=thread,
+                construct_thread=lambda: ChatHistoryAgentThread(),
+                expected_type=ChatHistoryAgentThread,
+            )
+            for message in cached:
+                await self._replay_function_calls(message, kernel or self.kernel)
+                await thread.on_new_message(message)
+                if message.metadata.pop(_INTERMEDIATE, False):
+                    if on_intermediate_message:
+                        await on_intermediate_message(message)
+                else:
+                    yield AgentResponseItem(message=message, thread=thread)
+
+    async def _response_cache_key(
+        self, history: list[ChatMessageContent], arguments: KernelArguments | None, kernel: "Kernel | None"
+    ) -> str:
+        kernel = kernel or self.kernel
+        service, settings = await self._get_chat_completion_service_and_settings(
+            kernel=kernel, arguments=self._merge_arguments(arguments or KernelArguments())
+        )
+        tool_schema = sorted(
+            (
+                {
+                    "name": f.fully_qualified_name,
+                    "description": f.description,
+                    "parameters": [p.schema_data for p in f.parameters],
+                }
+                for f in kernel.get_full_list_of_function_metadata()
+            ),
+            key=lambda f: f["name"],
+        )
+        model_settings = {
+            "model": service.ai_model_id,
+            **settings.model_dump(exclude_none=True, exclude={"function_choice_behavior", "service_id"}),
+        }
+        return make_response_cache_key(self.name, self.instructions, history, tool_schema, model_settings)
+
+    async def _replay_function_calls(self, message: ChatMessageContent, kernel: Kernel) -> None:
+        """Re-run recorded calls to side-effecting plugins, e.g. to rewrite the files a cached turn created."""
+        for item in message.items:
+            if isinstance(item, FunctionCallContent) and item.plugin_name in self.response_cache.replay_plugins:
+                try:
+                    await kernel.invoke(
+                        plugin_name=item.plugin_name,
+                        function_name=item.function_name,
+                        arguments=KernelArguments(**item.to_kernel_arguments()),
+                    )
+                except Exception:
+                    logger.exception(f"Failed to replay cached call to {item.name}")
+
     def _normalize_messages(
         self, messages: str | ChatMessageContent | list[str | ChatMessageContent] | None
     ) -> list[ChatMessageContent]:
@@ -0,0 +1,310 @@
+# Copyright (c) Microsoft. All rights reserved.
+
+import json
+import logging
+import re
+from dataclasses import dataclass
+
+from semantic_kernel.contents import (
+    AuthorRole,
+    ChatMessageContent,
+    FunctionCallContent,
+    FunctionResultContent,
+    TextContent,
+)
+
+logger = logging.getLogger(__name__)
+
+# Message framing overhead per message in the chat completions wire format.
+_TOKENS_PER_MESSAGE = 4
+
+# Tokens reserved for the summary message when deciding how much history to summarize.
+_SUMMARY_ALLOWANCE = 512
+
+_CODE_BLOCK = re.compile(r"```[^\n]*\n.*?```", re.S)
+
+# Functions whose output is only meaningful until they are called again.
+STALE_RESULT_FUNCTIONS = frozenset({
+    "terraform_execution-check",
+    "terraform_execution-validate",
+    "terraform_execution-fmt",
+    "terraform_execution-fmt_check",
+    "terraform_execution-init",
+    "terraform_file-read_file",
+    "terraform_file-read_files",
+    "terraform_file-read_lines",
+    "terraform_file-list_files",
+})
+
+# Functions whose arguments hold the complete content of the files they write.
+FULL_WRITE_FUNCTIONS = frozenset({"create_file", "write_files"})
+
+SUPERSEDED_FILE = "[superseded by a later revision of this file]"
+SUPERSEDED_CODE = "[code omitted: superseded by a later revision]"
+STALE_OUTPUT = "[output omitted: superseded by a later call]"
+
+
+class TokenCounter:
+    """Counts tokens with the model's tokenizer.
+
+    ``tiktoken`` is used when it is installed; otherwise the count falls back to an
+    estimate of four characters per token.
+    """
+
+    def __init__(self, model: str | None = None):
+        self.model = model
+        self._encoding = None
+        try:
+            import tiktoken
+
+            try:
+                self._encoding = tiktoken.encoding_for_model(model) if model else tiktoken.get_encoding("o200k_base")
+            except KeyError:
+                self._encoding = tiktoken.get_encoding("o200k_base")
+        except ImportError:
+            logger.debug("tiktoken is not installed; estimating token counts from character length.")
+
+    @property
+    def is_exact(self) -> bool:
+        return self._encoding is not None
+
+    def count_text(self, text: str | None) -> int:
+        if not text:
+            return 0
+        if self._encoding is not None:
+            return len(self._encoding.encode(text, disallowed_special=()))
+        return (len(text) + 3) // 4
+
+    def count_message(self, message: ChatMessageContent) -> int:
+        tokens = _TOKENS_PER_MESSAGE + self.count_text(message.name)
+        for item in message.items:
+            if isinstance(item, TextContent):
+                tokens += self.count_text(item.text)
+            elif isinstance(item, FunctionCallContent):
+                arguments = item.arguments if isinstance(item.arguments, str) else str(item.arguments or "")
+                tokens += self.count_text(item.name) + self.count_text(arguments)
+            elif isinstance(item, FunctionResultContent):
+                tokens += self.count_text(str(item.result))
+        return tokens
+
+    def count(self, messages: list[ChatMessageContent]) -> int:
+        return sum(self.count_message(m) for m in messages)
+
+    def count_tools(self, tools: list[dict]) -> int:
+        """Tokens of function definitions, serialized compactly as they are sent."""
+        return self.count_text(json.dumps(tools, separators=(",", ":"))) if tools else 0
+
+
+@dataclass
+class ReductionReport:
+    original_tokens: int
+    reduced_tokens: int
+    original_messages: int
+    reduced_messages: int
+    summarized_messages: int = 0
+
+    @property
+    def saved_tokens(self) -> int:
+        return self.original_tokens - self.reduced_tokens
+
+
+class TokenBudgetReducer:
+    """Keeps the history sent to an agent within a token budget.
+
+    Reduction is applied in increasing order of information loss, stopping as soon as
+    the history fits:
+
+    1. Earlier revisions of a file written in full, by ``create_file`` or ``write_files``,
+       are replaced with a marker, as are fenced code blocks in an assistant message when
+       a later message from the same agent has one. A reviewer quoting a snippet does not
+       supersede the code the creation agent wrote, or the other way round.
+    2. Results of validate/fmt/read/list calls that were later called again are dropped.
+    3. Older turns are collapsed into a single extractive summary; the task (first user
+       message) and the most recent ``keep_recent`` messages are always kept verbatim.
+
+    Steps 1 and 2 always run, since superseded content never helps the model.
+
+    Args:
+        max_tokens: Token budget for the history, excluding the agent's instructions.
+        keep_recent: Number of trailing messages that are never summarized.
+        counter: The token counter. Defaults to one for the ``o200k_base`` encoding.
+    """
+
+    def __init__(self, max_tokens: int = 16000, keep_recent: int = 6, counter: TokenCounter | None = None):
+        self.max_tokens = max_tokens
+        self.keep_recent = keep_recent
+        self.counter = counter or TokenCounter()
+        self.last_report: ReductionReport | None = None
+        self.total_saved_tokens = 0
+
+    def reduce(self, messages: list[ChatMessageContent]) -> list[ChatMessageContent]:
+        """Return a reduced copy of ``messages``; the input messages are not modified."""
+        original_tokens = self.counter.count(messages)
+        reduced = self._drop_superseded(messages)
+        summarized = 0
+        if self.counter.count(reduced) > self.max_tokens:
+            reduced, summarized = self._summarize(reduced)
+
+        report = ReductionReport(
+            original_tokens=original_tokens,
+            reduced_tokens=self.counter.count(reduced),
+            original_messages=len(messages),
+            reduced_messages=len(reduced),
+            summarized_messages=summarized,
+        )
+        self.last_report = report
+        self.total_saved_tokens += report.saved_tokens
+        if report.reduced_tokens > self.max_tokens:
+            logger.warning(
+                f"History is {report.reduced_tokens} tokens after reduction, over the budget of {self.max_tokens}."
+            )
+        return reduced
+
+    def _drop_superseded(self, messages: list[ChatMessageContent]) -> list[ChatMessageContent]:
+        # filename -> (message, item) position of the latest full write of the file
+        latest_write: dict[str, tuple[int, int]] = {}
+        latest_result: dict[str, int] = {}
+        call_files: dict[str | None, str | None] = {}
+        # agent name -> latest assistant message with a fenced code block
+        latest_code_message: dict[str | None, int] = {}
+        for index, message in enumerate(messages):
+            for position, item in enumerate(message.items):
+                if isinstance(item, FunctionCallContent):
+                    call_files[item.id] = _filename(item)
+                    for filename in _written_files(item):
+                        latest_write[filename] = (index, position)
+                elif isinstance(item, FunctionResultContent) and item.name in STALE_RESULT_FUNCTIONS:
+                    latest_result[_result_key(item, call_files)] = index
+            if message.role == AuthorRole.ASSISTANT and message.content and _CODE_BLOCK.search(message.content):
+                latest_code_message[message.name] = index
+
+        reduced: list[ChatMessageContent] = []
+        for index, message in enumerate(messages):
+            copy: ChatMessageContent | None = None
+            for position, item in enumerate(message.items):
+                replacement = None
+                if isinstance(item, FunctionCallContent) and item.function_name in FULL_WRITE_FUNCTIONS:
+                    written = _written_files(item)
+                    superseded = {f for f in written if latest_write[f] > (index, position)}
+                    if superseded and item.function_name == "create_file":
+                        (filename,) = written
+                        replacement = item.model_copy(
+                            update={"arguments": {"filename": filename, "content": SUPERSEDED_FILE}}
+                        )
+                    elif superseded:
+                        files = {f: SUPERSEDED_FILE if f in superseded else c for f, c in written.items()}
+                        replacement = item.model_copy(update={"arguments": {"files": files}})
+                elif isinstance(item, FunctionResultContent) and item.name in STALE_RESULT_FUNCTIONS:
+                    if latest_result.get(_result_key(item, call_files), index) > index:
+                        replacement = item.model_copy(update={"result": STALE_OUTPUT})
+                elif (
+                    isinstance(item, TextContent)
+                    and message.role == AuthorRole.ASSISTANT
+                    and index < latest_code_message[message.name]
+                    and item.text
+                    and _CODE_BLOCK.search(item.text)
+                ):
+                    replacement = item.model_copy(update={"text": _CODE_BLOCK.sub(SUPERSEDED_CODE, item.text)})
+                if replacement is not None:
+                    if copy is None:
+                        copy = message.model_copy(update={"items": list(message.items)})
+                    copy.items[position] = replacement
+            reduced.append(copy or message)
+        return reduced
+
+    def _summarize(self, messages: list[ChatMessageContent]) -> tuple[list[ChatMessageContent], int]:
+        head_end = next((i + 1 for i, m in enumerate(messages) if m.role == AuthorRole.USER), 0)
+        tail_start = max(head_end, len(messages) - self.keep_recent)
+        # Never start the kept tail on a tool result whose function call would be summarized away.
+        while tail_start < len(messages) and _is_tool_message(messages[tail_start]):
+            tail_start += 1
+        head, middle, tail = messages[:head_end], messages[head_end:tail_start], messages[tail_start:]
+        if not middle:
+            return messages, 0
+
+        # Summarize as few of the oldest middle messages as needed to fit the budget.
+        budget = self.max_tokens - self.counter.count(head) - self.counter.count(tail)
+        kept: list[ChatMessageContent] = []
+        while middle:
+            candidate = middle[-1:] + kept
+            if self.counter.count(candidate) + _SUMMARY_ALLOWANCE > budget:
+                break
+            kept = candidate
+            middle = middle[:-1]
+        while kept and _is_tool_message(kept[0]):
+            middle.append(kept.pop(0))
+        if not middle:
+            return messages, 0
+
+        # The summary itself is capped: the most recent summarized messages are described first.
+        lines: list[str] = []
+        used = 0
+        for message in reversed(middle):
+            line = _summarize_message(message)
+            used += self.counter.count_text(line)
+            if used > _SUMMARY_ALLOWANCE:
+                break
+            lines.append(line)
+        lines.reverse()
+        if len(lines) < len(middle):
+            lines.insert(0, f"- ({len(middle) - len(lines)} earlier messages omitted)")
+
+        summary = ChatMessageContent(
+            role=AuthorRole.ASSISTANT,
+            name="HistorySummary",
+            content="Summary of earlier turns:\n" + "\n".join(lines),
+        )
+        return head + [summary] + kept + tail, len(middle)
+
+
+def _filename(item: FunctionCallContent) -> str | None:
+    try:
+        arguments = item.to_kernel_arguments()
+    except Exception:
+        return None
+    filenames = arguments.get("filenames")
+    if filenames:
+        return ",".join(sorted(map(str, filenames)))
+    return arguments.get("filename")
+
+
+def _written_files(item: FunctionCallContent) -> dict[str, str]:
+    """The files a ``create_file`` or ``write_files`` call writes in full, with their content."""
+    if item.function_name not in FULL_WRITE_FUNCTIONS:
+        return {}
+    try:
+        arguments = item.to_kernel_arguments()
+    except Exception:
+        return {}
+    if item.function_name == "create_file":
+        filename = arguments.get("filename")
+        return {str(filename): str(arguments.get("content", ""))} if filename else {}
+    files = arguments.get("files")
+    if isinstance(files, str):
+        try:
+            files = json.loads(files)
+        except ValueError:
+            return {}
+    if not isinstance(files, dict):
+        return {}
+    return {str(filename): str(content) for filename, content in files.items()}
+
+
+def _result_key(item: FunctionResultContent, call_files: dict[str | None, str | None]) -> str:
+    # read_file(s) results are only superseded by a later read of the same file(s).
+    return f"{item.name}:{call_files.get(item.id) or ''}"
+
+
+def _is_tool_message(message: ChatMessageContent) -> bool:
+    return message.role == AuthorRole.TOOL or any(isinstance(i, FunctionResultContent) for i in message.items)
+
+
+def _summarize_message(message: ChatMessageContent, limit: int = 160) -> str:
+    author = message.name or message.role.value
+    calls = [i.name for i in message.items if isinstance(i, FunctionCallContent)]
+    if calls:
+        return f"- {author} called {', '.join(calls)}"
+    if _is_tool_message(message):
+        return f"- {author}: tool output omitted"
+    text = _CODE_BLOCK.sub("[code]", message.content or "").strip().replace("\n", " ")
+    return f"- {author}: {text[:limit]}{'...' if len(text) > limit else ''}"
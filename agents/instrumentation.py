@@ -0,0 +1,197 @@
+# Copyright (c) Microsoft. All rights reserved.
+
+import json
+import time
+from collections.abc import AsyncIterable, AsyncIterator, Awaitable, Callable
+from functools import cache, lru_cache
+from typing import Any, TypeVar
+
+from opentelemetry import context, metrics, trace
+from opentelemetry.trace import Span, Status, StatusCode
+from semantic_kernel.connectors.ai.chat_completion_client_base import ChatCompletionClientBase
+from semantic_kernel.filters import FunctionInvocationContext
+
+from .history_reducer import TokenCounter
+
+tracer = trace.get_tracer(__name__)
+meter = metrics.get_meter(__name__)
+
+turn_duration = meter.create_histogram(
+    "agent.turn.duration", unit="s", description="Duration of an agent turn, including tool calls."
+)
+llm_duration = meter.create_histogram("llm.request.duration", unit="s", description="Duration of a model request.")
+llm_time_to_first_token = meter.create_histogram(
+    "llm.time_to_first_token", unit="s", description="Time until the first streamed chunk of a model response."
+)
+llm_tokens = meter.create_counter("llm.tokens", unit="{token}", description="Prompt and completion tokens used.")
+tool_duration = meter.create_histogram("tool.duration", unit="s", description="Duration of a kernel function call.")
+llm_tool_schema_tokens = meter.create_histogram(
+    "llm.request.tool_schema_tokens",
+    unit="{token}",
+    description="Tokens of the function definitions sent with a model request.",
+)
+
+T = TypeVar("T")
+
+
+async def in_span(span: Span, items: AsyncIterable[T]) -> AsyncIterator[T]:
+    """Iterate ``items`` with ``span`` as the current span while each item is produced.
+
+    The span is only attached around each step, never across a ``yield``, so it does not
+    leak into the consumer's context while the generator is suspended.
+    """
+    iterator = aiter(items)
+    while True:
+        token = context.attach(trace.set_span_in_context(span))
+        try:
+            item = await anext(iterator)
+        except StopAsyncIteration:
+            return
+        finally:
+            context.detach(token)
+        yield item
+
+
+async def trace_turn(agent_name: str, responses: AsyncIterable[T], streaming: bool) -> AsyncIterator[T]:
+    """Wrap one agent turn in an ``agent_turn`` span and record its duration."""
+    attributes = {"agent.name": agent_name, "agent.turn.streaming": streaming}
+    span = tracer.start_span(f"agent_turn {agent_name}", attributes=attributes)
+    start = time.perf_counter()
+    count = 0
+    try:
+        async for response in in_span(span, responses):
+            if count == 0:
+                span.set_attribute("agent.turn.time_to_first_response", time.perf_counter() - start)
+            count += 1
+            yield response
+    except Exception as e:
+        span.record_exception(e)
+        span.set_status(Status(StatusCode.ERROR, str(e)))
+        raise
+    finally:
+        span.set_attribute("agent.turn.responses", count)
+        turn_duration.record(time.perf_counter() - start, attributes)
+        span.end()
+
+
+async def tool_invocation_filter(
+    context: FunctionInvocationContext, next: Callable[[FunctionInvocationContext], Awaitable[None]]
+) -> None:
+    """Annotate Semantic Kernel's ``execute_tool`` span and record the call's duration."""
+    span = trace.get_current_span()
+    name = context.function.fully_qualified_name
+    filename = context.arguments.get("filename") if context.arguments else None
+    if filename:
+        span.set_attribute("tool.arguments.filename", str(filename))
+    start = time.perf_counter()
+    outcome = "error"
+    try:
+        await next(context)
+        outcome = "ok"
+        value = context.result.value if context.result is not None else None
+        span.set_attribute("tool.result.length", len(str(value)) if value is not None else 0)
+    finally:
+        tool_duration.record(time.perf_counter() - start, {"tool.name": name, "tool.outcome": outcome})
+
+
+class InstrumentedChatCompletionMixin:
+    """Adds an ``llm_request`` span and token/latency metrics to every model request.
+
+    Mixed in ahead of a Semantic Kernel chat completion service, it wraps the per-request
+    methods, so each round trip of an auto function-calling loop is measured separately.
+    """
+
+    async def _inner_get_chat_message_contents(self, chat_history: Any, settings: Any) -> list:
+        span = tracer.start_span(
+            f"llm_request {self.ai_model_id}", attributes=self._request_attributes(False, settings)
+        )
+        start = time.perf_counter()
+        try:
+            with trace.use_span(span, end_on_exit=False):
+                messages = await super()._inner_get_chat_message_contents(chat_history, settings)
+            self._record(span, time.perf_counter() - start, None, messages)
+            return messages
+        except Exception as e:
+            self._record(span, time.perf_counter() - start, None, [], e)
+            raise
+        finally:
+            span.end()
+
+    async def _inner_get_streaming_chat_message_contents(
+        self, chat_history: Any, settings: Any, function_invoke_attempt: int = 0
+    ) -> AsyncIterator[list]:
+        span = tracer.start_span(
+            f"llm_request {self.ai_model_id}", attributes=self._request_attributes(True, settings)
+        )
+        start = time.perf_counter()
+        first_chunk: float | None = None
+        last: list = []
+        error: Exception | None = None
+        try:
+            async for chunks in in_span(
+                span, super()._inner_get_streaming_chat_message_contents(chat_history, settings, function_invoke_attempt)
+            ):
+                if first_chunk is None:
+                    first_chunk = time.perf_counter() - start
+                if any(chunk.metadata.get("usage") for chunk in chunks):
+                    last = chunks
+                yield chunks
+        except Exception as e:
+            error = e
+            raise
+        finally:
+            self._record(span, time.perf_counter() - start, first_chunk, last, error)
+            span.end()
+
+    def _request_attributes(self, streaming: bool, settings: Any) -> dict[str, Any]:
+        tools = getattr(settings, "tools", None) or []
+        schema_tokens = _tool_schema_tokens(self.ai_model_id, json.dumps(tools, separators=(",", ":")))
+        llm_tool_schema_tokens.record(schema_tokens, {"gen_ai.request.model": self.ai_model_id})
+        return {
+            "gen_ai.request.model": self.ai_model_id,
+            "llm.streaming": streaming,
+            "llm.request.tools": len(tools),
+            "llm.request.tool_schema_tokens": schema_tokens,
+        }
+
+    def _record(
+        self,
+        span: Span,
+        duration: float,
+        time_to_first_token: float | None,
+        messages: list,
+        error: Exception | None = None,
+    ) -> None:
+        attributes = {"gen_ai.request.model": self.ai_model_id}
+        llm_duration.record(duration, attributes)
+        if time_to_first_token is not None:
+            span.set_attribute("llm.time_to_first_token", time_to_first_token)
+            llm_time_to_first_token.record(time_to_first_token, attributes)
+        usage = next((m.metadata["usage"] for m in messages if m.metadata.get("usage")), None)
+        if usage is not None:
+            prompt = getattr(usage, "prompt_tokens", None) or 0
+            completion = getattr(usage, "completion_tokens", None) or 0
+            span.set_attribute("gen_ai.usage.input_tokens", prompt)
+            span.set_attribute("gen_ai.usage.output_tokens", completion)
+            llm_tokens.add(prompt, {**attributes, "gen_ai.token.type": "input"})
+            llm_tokens.add(completion, {**attributes, "gen_ai.token.type": "output"})
+        if error is not None:
+            span.record_exception(error)
+            span.set_status(Status(StatusCode.ERROR, str(error)))
+
+
+@lru_cache(maxsize=64)
+def _tool_schema_tokens(model: str | None, tools: str) -> int:
+    # An agent sends the same definitions with every request, so each set is counted once.
+    return _token_counter(model).count_text(tools) if tools != "[]" else 0
+
+
+@cache
+def _token_counter(model: str | None) -> TokenCounter:
+    return TokenCounter(model)
+
+
+@cache
+def instrumented(service_class: type[ChatCompletionClientBase]) -> type[ChatCompletionClientBase]:
+    """Return a subclass of ``service_class`` with ``InstrumentedChatCompletionMixin`` applied."""
+    return type(f"Instrumented{service_class.__name__}", (InstrumentedChatCompletionMixin, service_class), {})
@@ -0,0 +1,227 @@
+# Copyright (c) Microsoft. All rights reserved.
+
+import hashlib
+import json
+import os
+import sqlite3
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from enum import Enum
+
+from opentelemetry import metrics
+from semantic_kernel.contents import ChatMessageContent, FunctionCallContent, FunctionResultContent
+
+from plugins.registry import PLUGIN_FACTORIES
+
+meter = metrics.get_meter(__name__)
+cache_lookups = meter.create_counter(
+    "agent.response_cache.lookups", description="Model response cache lookups, by outcome (hit or miss)."
+)
+
+
+class CacheMode(str, Enum):
+    """How the response cache interacts with the model.
+
+    READ_WRITE serves hits from the cache and stores every new response.
+    REPLAY only serves recorded responses and fails on a miss, which makes reruns
+    fully deterministic and guarantees no model call is made.
+    """
+
+    READ_WRITE = "read_write"
+    REPLAY = "replay"
+
+
+class ResponseCacheMissError(Exception):
+    """Raised in replay mode when no recorded response matches the request."""
+
+
+@dataclass
+class ResponseCacheStats:
+    hits: int = 0
+    misses: int = 0
+    memory_hits: int = 0
+    disk_hits: int = 0
+    expired: int = 0
+    evictions: int = 0
+
+
+def _normalize_message(message: ChatMessageContent) -> dict:
+    # Call ids are generated per request, so they are left out of the key.
+    items = []
+    for item in message.items:
+        if isinstance(item, FunctionCallContent):
+            items.append({"call": item.name, "arguments": item.arguments})
+        elif isinstance(item, FunctionResultContent):
+            items.append({"result": item.name, "value": str(item.result)})
+    return {
+        "role": str(message.role.value if hasattr(message.role, "value") else message.role),
+        "name": message.name,
+        "content": message.content,
+        "items": items,
+    }
+
+
+def make_key(
+    agent_name: str,
+    instructions: str | None,
+    history: list[ChatMessageContent],
+    tool_schema: list[dict],
+    model_settings: dict,
+) -> str:
+    """Build the cache key for one agent invocation."""
+    payload = {
+        "agent": agent_name,
+        "instructions": instructions,
+        "history": [_normalize_message(m) for m in history],
+        "tools": tool_schema,
+        "settings": model_settings,
+    }
+    return hashlib.sha256(json.dumps(payload, sort_keys=True, default=str).encode()).hexdigest()
+
+
+class ResponseCache:
+    """A two-tier cache of agent responses: an in-memory LRU in front of an optional SQLite file.
+
+    Each entry holds every message an invocation produced, including intermediate
+    function-call and function-result messages, so a hit can rebuild the thread exactly
+    as the original call left it.
+
+    Args:
+        max_entries: Maximum number of entries kept in memory.
+        path: Path of the SQLite database for the persistent tier. Memory only when omitted.
+        ttl: Seconds after which an entry is considered stale. Never expires when omitted.
+        max_disk_bytes: Upper bound on the size of stored payloads in the SQLite tier; the
+            least recently used entries are evicted beyond it.
+        mode: See ``CacheMode``.
+        replay_plugins: Plugins whose recorded function calls are re-executed on a hit, so
+            side effects such as written files are restored without asking the model again.
+            Names are those of ``PLUGIN_FACTORIES``, under which agents register their plugins.
+
+    Raises:
+        ValueError: If ``replay_plugins`` names a plugin that is not registered, whose calls
+            could never be matched and replayed.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 512,
+        path: str | None = None,
+        ttl: float | None = None,
+        max_disk_bytes: int | None = 256 * 1024 * 1024,
+        mode: CacheMode = CacheMode.READ_WRITE,
+        replay_plugins: frozenset[str] = frozenset({"terraform_file"}),
+    ):
+        self.max_entries = max_entries
+        self.path = path
+        self.ttl = ttl
+        self.max_disk_bytes = max_disk_bytes
+        self.mode = CacheMode(mode)
+        unknown = set(replay_plugins) - PLUGIN_FACTORIES.keys()
+        if unknown:
+            raise ValueError(
+                f"Unknown replay plugin(s) {', '.join(sorted(unknown))}. "
+                f"Known plugins: {', '.join(sorted(PLUGIN_FACTORIES))}."
+            )
+        self.replay_plugins = replay_plugins
+        self.stats = ResponseCacheStats()
+        self._entries: OrderedDict[str, tuple[float, list[ChatMessageContent]]] = OrderedDict()
+        self._db: sqlite3.Connection | None = None
+        if path:
+            directory = os.path.dirname(path)
+            if directory and not os.path.exists(directory):
+                os.makedirs(directory)
+            self._db = sqlite3.connect(path, check_same_thread=False)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS responses ("
+                "key TEXT PRIMARY KEY, payload TEXT NOT NULL, size INTEGER NOT NULL, "
+                "created REAL NOT NULL, accessed REAL NOT NULL)"
+            )
+            self._db.commit()
+
+    def _is_expired(self, created: float) -> bool:
+        return self.ttl is not None and time.time() - created > self.ttl
+
+    def get(self, key: str) -> list[ChatMessageContent] | None:
+        entry = self._entries.get(key)
+        if entry is not None and self._is_expired(entry[0]):
+            del self._entries[key]
+            self.stats.expired += 1
+            entry = None
+        if entry is not None:
+            self._entries.move_to_end(key)
+            self.stats.memory_hits += 1
+        else:
+            entry = self._read_disk(key)
+            if entry is not None:
+                self._remember(key, entry)
+                self.stats.disk_hits += 1
+
+        if entry is None:
+            self.stats.misses += 1
+            cache_lookups.add(1, {"cache.outcome": "miss"})
+            return None
+        self.stats.hits += 1
+        cache_lookups.add(1, {"cache.outcome": "hit"})
+        return [message.model_copy(deep=True) for message in entry[1]]
+
+    def put(self, key: str, messages: list[ChatMessageContent]) -> None:
+        if self.mode == CacheMode.REPLAY:
+            return
+        entry = (time.time(), [message.model_copy(deep=True) for message in messages])
+        self._remember(key, entry)
+        self._write_disk(key, entry)
+
+    def close(self) -> None:
+        if self._db is not None:
+            self._db.close()
+            self._db = None
+
+    def _remember(self, key: str, entry: tuple[float, list[ChatMessageContent]]) -> None:
+        if self.max_entries <= 0:
+            return
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.stats.evictions += 1
+
+    def _read_disk(self, key: str) -> tuple[float, list[ChatMessageContent]] | None:
+        if self._db is None:
+            return None
+        row = self._db.execute("SELECT payload, created FROM responses WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            return None
+        payload, created = row
+        if self._is_expired(created):
+            self._db.execute("DELETE FROM responses WHERE key = ?", (key,))
+            self._db.commit()
+            self.stats.expired += 1
+            return None
+        self._db.execute("UPDATE responses SET accessed = ? WHERE key = ?", (time.time(), key))
+        self._db.commit()
+        messages = [ChatMessageContent.model_validate_json(m) for m in json.loads(payload)]
+        return created, messages
+
+    def _write_disk(self, key: str, entry: tuple[float, list[ChatMessageContent]]) -> None:
+        if self._db is None:
+            return
+        created, messages = entry
+        payload = json.dumps([m.model_dump_json() for m in messages])
+        self._db.execute(
+            "INSERT OR REPLACE INTO responses (key, payload, size, created, accessed) VALUES (?, ?, ?, ?, ?)",
+            (key, payload, len(payload), created, created),
+        )
+        if self.ttl is not None:
+            self._db.execute("DELETE FROM responses WHERE created < ?", (time.time() - self.ttl,))
+        if self.max_disk_bytes is not None:
+            total = self._db.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+            while total > self.max_disk_bytes:
+                row = self._db.execute("SELECT key, size FROM responses ORDER BY accessed LIMIT 1").fetchone()
+                if row is None or row[0] == key:
+                    break
+                self._db.execute("DELETE FROM responses WHERE key = ?", (row[0],))
+                total -= row[1]
+                self.stats.evictions += 1
+        self._db.commit()
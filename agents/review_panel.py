@@ -0,0 +1,177 @@
+# Copyright (c) Microsoft. All rights reserved.
+
+import asyncio
+import sys
+from collections.abc import AsyncIterable, Awaitable, Callable
+from typing import TYPE_CHECKING, Any
+
+if sys.version_info >= (3, 12):
+    from typing import override  # pragma: no cover
+else:
+    from typing_extensions import override  # pragma: no cover
+
+from pydantic import Field
+from semantic_kernel.agents import Agent, AgentResponseItem, ChatCompletionAgent, ChatHistoryAgentThread
+from semantic_kernel.connectors.ai.completion_usage import CompletionUsage
+from semantic_kernel.contents import ChatMessageContent, StreamingChatMessageContent, StreamingTextContent
+from semantic_kernel.contents.utils.author_role import AuthorRole
+from semantic_kernel.functions import KernelArguments
+
+from plugins.concurrency import Access, function_access
+
+from .instrumentation import trace_turn
+
+if TYPE_CHECKING:
+    from semantic_kernel.agents import AgentThread
+    from semantic_kernel.kernel import Kernel
+
+DESCRIPTION = """Select me to have the Terraform configuration reviewed."""
+
+
+class ReviewPanel(ChatCompletionAgent):
+    """Runs several read-only reviewer agents concurrently and merges their findings.
+
+    In a group chat the panel takes the place of its reviewers. On its turn every reviewer
+    answers the same snapshot of the conversation at the same time, on a thread of its
+    own, and the panel replies with one message that gathers each reviewer's findings
+    under its name. A review round therefore takes as long as the slowest reviewer rather
+    than all of them in turn, and the reviewers' tool calls stay out of the shared history.
+
+    The reviewers must not depend on each other's output, and may only read the
+    workspace: their tool calls run concurrently on the same snapshot, so a reviewer
+    with a ``WRITE`` function is rejected.
+    """
+
+    reviewers: list[Agent] = Field(default_factory=list)
+
+    def __init__(self, reviewers: list[Agent], name: str = "ReviewPanel", description: str = DESCRIPTION):
+        """Initialize the review panel.
+
+        Args:
+            reviewers: The agents to run on each turn, in the order their findings are listed.
+            name: The name the panel's consolidated message is posted under.
+            description: The description of the panel.
+
+        Raises:
+            ValueError: If there are no reviewers, or a reviewer can call a function that
+                writes to the workspace.
+        """
+        if not reviewers:
+            raise ValueError("A review panel needs at least one reviewer.")
+        writers = [
+            f"{reviewer.name} ({function.fully_qualified_name})"
+            for reviewer in reviewers
+            for plugin in reviewer.kernel.plugins.values()
+            for function in plugin.functions.values()
+            if function_access(function) == Access.WRITE
+        ]
+        if writers:
+            raise ValueError(f"Reviewers may only read the workspace; these can write to it: {', '.join(writers)}.")
+        super().__init__(name=name, description=description.strip())
+        self.reviewers = list(reviewers)
+
+    @override
+    async def invoke(
+        self,
+        *,
+        messages: str | ChatMessageContent | list[str | ChatMessageContent] | None = None,
+        thread: "AgentThread | None" = None,
+        on_intermediate_message: Callable[[ChatMessageContent], Awaitable[None]] | None = None,
+        arguments: KernelArguments | None = None,
+        kernel: "Kernel | None" = None,
+        **kwargs: Any,
+    ) -> AsyncIterable[AgentResponseItem[ChatMessageContent]]:
+        async def review() -> AsyncIterable[AgentResponseItem[ChatMessageContent]]:
+            chat_thread, message = await self._review(messages, thread, arguments)
+            yield AgentResponseItem(message=message, thread=chat_thread)
+
+        async for response in trace_turn(self.name, review(), streaming=False):
+            yield response
+
+    @override
+    async def invoke_stream(
+        self,
+        *,
+        messages: str | ChatMessageContent | list[str | ChatMessageContent] | None = None,
+        thread: "AgentThread | None" = None,
+        on_intermediate_message: Callable[[ChatMessageContent], Awaitable[None]] | None = None,
+        arguments: KernelArguments | None = None,
+        kernel: "Kernel | None" = None,
+        **kwargs: Any,
+    ) -> AsyncIterable[AgentResponseItem[StreamingChatMessageContent]]:
+        # The reviewers answer side by side, so their replies are not streamed; the merged
+        # message is sent as one chunk once every reviewer has finished.
+        async def review() -> AsyncIterable[AgentResponseItem[StreamingChatMessageContent]]:
+            chat_thread, message = await self._review(messages, thread, arguments)
+            chunk = StreamingChatMessageContent(
+                role=AuthorRole.ASSISTANT,
+                choice_index=0,
+                name=self.name,
+                items=[StreamingTextContent(choice_index=0, text=message.content)],
+                metadata=message.metadata,
+            )
+            yield AgentResponseItem(message=chunk, thread=chat_thread)
+
+        async for response in trace_turn(self.name, review(), streaming=True):
+            yield response
+
+    async def _review(
+        self,
+        messages: str | ChatMessageContent | list[str | ChatMessageContent] | None,
+        thread: "AgentThread | None",
+        arguments: KernelArguments | None,
+    ) -> tuple[ChatHistoryAgentThread, ChatMessageContent]:
+        chat_thread = await self._ensure_thread_exists_with_messages(
+            messages=messages,
+            thread=thread,
+            construct_thread=lambda: ChatHistoryAgentThread(),
+            expected_type=ChatHistoryAgentThread,
+        )
+        snapshot = [message async for message in chat_thread.get_messages()]
+        outcomes = await asyncio.gather(
+            *(_invoke_on_snapshot(reviewer, snapshot, arguments) for reviewer in self.reviewers),
+            return_exceptions=True,
+        )
+        for outcome in outcomes:
+            if isinstance(outcome, BaseException):
+                raise outcome
+
+        sections = []
+        prompt_tokens = completion_tokens = 0
+        for reviewer, (replies, usage) in zip(self.reviewers, outcomes):
+            findings = "\n\n".join(reply for reply in replies if reply.strip()) or "No findings."
+            sections.append(f"### {reviewer.name}\n{findings}")
+            prompt_tokens += usage.prompt_tokens or 0
+            completion_tokens += usage.completion_tokens or 0
+        message = ChatMessageContent(
+            role=AuthorRole.ASSISTANT,
+            name=self.name,
+            content=f"Findings of {len(self.reviewers)} reviewers:\n\n" + "\n\n".join(sections),
+            metadata={"usage": CompletionUsage(prompt_tokens=prompt_tokens, completion_tokens=completion_tokens)},
+        )
+        await chat_thread.on_new_message(message)
+        return chat_thread, message
+
+
+async def _invoke_on_snapshot(
+    agent: Agent, snapshot: list[ChatMessageContent], arguments: KernelArguments | None
+) -> tuple[list[str], CompletionUsage]:
+    """Run ``agent`` on a thread of its own; return its replies and the tokens it used."""
+    usage = CompletionUsage(prompt_tokens=0, completion_tokens=0)
+
+    def add_usage(message: ChatMessageContent) -> None:
+        reported = message.metadata.get("usage") if message.metadata else None
+        if reported is not None:
+            usage.prompt_tokens += getattr(reported, "prompt_tokens", None) or 0
+            usage.completion_tokens += getattr(reported, "completion_tokens", None) or 0
+
+    async def on_intermediate_message(message: ChatMessageContent) -> None:
+        add_usage(message)
+
+    replies: list[str] = []
+    async for response in agent.invoke(
+        messages=list(snapshot), on_intermediate_message=on_intermediate_message, arguments=arguments
+    ):
+        add_usage(response.message)
+        replies.append(response.message.content)
+    return replies, usage
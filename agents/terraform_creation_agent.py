@@ -7,13 +7,13 @@ else:
     from typing_extensions import override  # pragma: no cover
 
 from semantic_kernel.agents import Agent
-from semantic_kernel.contents import ChatMessageContent
+from semantic_kernel.connectors.ai.chat_completion_client_base import ChatCompletionClientBase
+from semantic_kernel.contents import ChatMessageContent, StreamingChatMessageContent
 from semantic_kernel.contents.utils.author_role import AuthorRole
 from semantic_kernel.functions import KernelArguments
 
-from .custom_agent_base import CustomAgentBase, Services
-from ..plugins.terraform_file_plugin import TerraformFilePlugin
-from ..plugins.terraform_execution_plugin import TerraformExecutionPlugin
+from .custom_agent_base import CustomAgentBase
+from plugins.registry import get_plugin_registry
 
 if TYPE_CHECKING:
     from semantic_kernel.agents import AgentResponseItem, AgentThread
@@ -31,8 +31,29 @@ You have access to the following Terraform plugin functions:
 - terraform_file.create_file: Create a new Terraform file
 - terraform_file.read_file: Read an existing Terraform file
 - terraform_file.list_files: List all Terraform files
+- terraform_file.read_files: Read several files (or all of them) in one call
+- terraform_file.write_files: Create or overwrite several files at once; all are written or none
+- terraform_file.read_lines: Read numbered lines of a file together with its version hash
+- terraform_file.replace_in_file: Replace a unique snippet of text in an existing file
+- terraform_file.apply_patch: Apply a unified diff to an existing file
+- terraform_execution.init: Initialize before the first validate and after adding a provider or module
+- terraform_execution.check: Quickly check syntax and references without running terraform
 - terraform_execution.validate: Validate Terraform configuration
-- terraform_execution.fmt: Format Terraform files
+- terraform_execution.fmt_check: List the files that are not formatted, without changing them
+- terraform_execution.fmt: Rewrite Terraform files in the canonical format
+- snippet_library.search_snippets: Search the library of approved modules and snippets
+- snippet_library.read_snippet: Read a file of the snippet library
+
+Before writing common infrastructure such as a VPC, security groups, a load balancer or an
+auto scaling group, search the snippet library. Reference a matching module with a module block
+and the source it reports, or adapt a matching snippet, instead of writing it from scratch.
+
+To look at the workspace, call read_files once rather than read_file for each file. When
+creating several new files, write them together with write_files.
+
+Use create_file only for new files. To change an existing file, read the lines you need with
+read_lines and edit them with replace_in_file or apply_patch, passing the version hash you read
+as base_version. If an edit is rejected, read the file again and retry against its current content.
 
 Always ensure your configurations are:
 - Well-documented
@@ -43,15 +64,38 @@ Always ensure your configurations are:
 
 DESCRIPTION = """Select me to create or update Terraform configurations."""
 
+# The functions this agent may call; only their schemas are sent with its requests.
+TOOLS = {
+    "terraform_file": [
+        "create_file",
+        "read_file",
+        "list_files",
+        "read_files",
+        "write_files",
+        "read_lines",
+        "replace_in_file",
+        "apply_patch",
+    ],
+    "terraform_execution": ["init", "check", "validate", "fmt_check", "fmt"],
+    "snippet_library": ["search_snippets", "read_snippet"],
+}
+
 
 class TerraformCreationAgent(CustomAgentBase):
     """Agent responsible for creating Terraform configurations."""
 
-    def __init__(self):
-        """Initialize the Terraform creation agent."""
+    def __init__(self, base_path: str = "terraform", service: ChatCompletionClientBase | None = None):
+        """Initialize the Terraform creation agent.
+
+        Args:
+            base_path: The workspace directory the agent's Terraform plugins operate on. The
+                plugins are shared with the other agents working on it.
+            service: The chat completion service to use. When omitted, the shared service
+                from the registry is attached on first invocation.
+        """
         super().__init__(
-            service=self._create_ai_service(Services.OPENAI),
-            plugins=[TerraformFilePlugin(), TerraformExecutionPlugin()],
+            service=service,
+            plugins=get_plugin_registry(base_path).plugins(TOOLS),
             name="TerraformCreationAgent",
             instructions=INSTRUCTION.strip(),
             description=DESCRIPTION.strip(),
@@ -90,4 +134,26 @@ class TerraformCreationAgent(CustomAgentBase):
             additional_user_message="Now create or update Terraform configurations based on the requirements.",
             **kwargs,
         ):
-            yield response 
\ No newline at end of file
+            yield response 
+
+    @override
+    async def invoke_stream(
+        self,
+        *,
+        messages: str | ChatMessageContent | list[str | ChatMessageContent] | None = None,
+        thread: "AgentThread | None" = None,
+        on_intermediate_message: Callable[[ChatMessageContent], Awaitable[None]] | None = None,
+        arguments: KernelArguments | None = None,
+        kernel: "Kernel | None" = None,
+        **kwargs: Any,
+    ) -> AsyncIterable["AgentResponseItem[StreamingChatMessageContent]"]:
+        async for response in super().invoke_stream(
+            messages=messages,
+            thread=thread,
+            on_intermediate_message=on_intermediate_message,
+            arguments=arguments,
+            kernel=kernel,
+            additional_user_message="Now create or update Terraform configurations based on the requirements.",
+            **kwargs,
+        ):
+            yield response
@@ -6,12 +6,12 @@ if sys.version_info >= (3, 12):
 else:
     from typing_extensions import override  # pragma: no cover
 
-from semantic_kernel.contents import ChatMessageContent
+from semantic_kernel.connectors.ai.chat_completion_client_base import ChatCompletionClientBase
+from semantic_kernel.contents import ChatMessageContent, StreamingChatMessageContent
 from semantic_kernel.functions import KernelArguments
 
-from .custom_agent_base import CustomAgentBase, Services
-from ..plugins.terraform_file_plugin import TerraformFilePlugin
-from ..plugins.terraform_execution_plugin import TerraformExecutionPlugin
+from .custom_agent_base import CustomAgentBase
+from plugins.registry import get_plugin_registry
 
 if TYPE_CHECKING:
     from semantic_kernel.agents import AgentResponseItem, AgentThread
@@ -27,8 +27,11 @@ Your tasks include:
 
 You have access to the following Terraform plugin functions:
 - terraform_file.read_file: Read an existing Terraform file
+- terraform_file.list_files: List all Terraform files
+- terraform_file.read_files: Read several files (or all of them) in one call
+- terraform_execution.check: Quickly check syntax and references without running terraform
 - terraform_execution.validate: Validate Terraform configuration
-- terraform_execution.fmt: Format Terraform files
+- terraform_execution.fmt_check: List the files that are not formatted, without changing them
 
 Always ensure configurations are:
 - Syntactically correct
@@ -39,12 +42,19 @@ Always ensure configurations are:
 
 DESCRIPTION = """Select me to validate Terraform configurations."""
 
+# The functions this agent may call; all of them only read the workspace, so it can review
+# alongside other agents. The creation agent and the checks of the strategies run init.
+TOOLS = {
+    "terraform_file": ["read_file", "list_files", "read_files"],
+    "terraform_execution": ["check", "validate", "fmt_check"],
+}
+
 
 class TerraformValidationAgent(CustomAgentBase):
-    def __init__(self):
+    def __init__(self, base_path: str = "terraform", service: ChatCompletionClientBase | None = None):
         super().__init__(
-            service=self._create_ai_service(Services.OPENAI),
-            plugins=[TerraformFilePlugin(), TerraformExecutionPlugin()],
+            service=service,
+            plugins=get_plugin_registry(base_path).plugins(TOOLS),
             name="TerraformValidationAgent",
             instructions=INSTRUCTION.strip(),
             description=DESCRIPTION.strip(),
@@ -70,4 +80,26 @@ class TerraformValidationAgent(CustomAgentBase):
             additional_user_message="Now validate the Terraform configurations.",
             **kwargs,
         ):
-            yield response 
\ No newline at end of file
+            yield response 
+
+    @override
+    async def invoke_stream(
+        self,
+        *,
+        messages: str | ChatMessageContent | list[str | ChatMessageContent] | None = None,
+        thread: "AgentThread | None" = None,
+        on_intermediate_message: Callable[[ChatMessageContent], Awaitable[None]] | None = None,
+        arguments: KernelArguments | None = None,
+        kernel: "Kernel | None" = None,
+        **kwargs: Any,
+    ) -> AsyncIterable["AgentResponseItem[StreamingChatMessageContent]"]:
+        async for response in super().invoke_stream(
+            messages=messages,
+            thread=thread,
+            on_intermediate_message=on_intermediate_message,
+            arguments=arguments,
+            kernel=kernel,
+            additional_user_message="Now validate the Terraform configurations.",
+            **kwargs,
+        ):
+            yield response
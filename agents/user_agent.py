@@ -6,11 +6,12 @@ if sys.version_info >= (3, 12):
 else:
     from typing_extensions import override  # pragma: no cover
 
-from semantic_kernel.contents import ChatMessageContent
+from semantic_kernel.connectors.ai.chat_completion_client_base import ChatCompletionClientBase
+from semantic_kernel.contents import ChatMessageContent, StreamingChatMessageContent
 from semantic_kernel.functions import KernelArguments
 
-from .custom_agent_base import CustomAgentBase, Services
-from ..plugins.user_plugin import UserPlugin
+from .custom_agent_base import CustomAgentBase
+from plugins.registry import get_plugin_registry
 
 if TYPE_CHECKING:
     from semantic_kernel.agents import AgentResponseItem, AgentThread
@@ -36,12 +37,25 @@ Always ensure:
 
 DESCRIPTION = """Select me to interact with the user and gather feedback."""
 
+# The functions this agent may call.
+TOOLS = {"user": ["request_user_feedback"]}
+
 
 class UserAgent(CustomAgentBase):
-    def __init__(self):
+    """Agent that gathers the user's feedback on the configuration."""
+
+    def __init__(self, base_path: str = "terraform", service: ChatCompletionClientBase | None = None):
+        """Initialize the user agent.
+
+        Args:
+            base_path: The workspace the agent reviews. Each workspace has its own user
+                plugin, and so its own feedback channel.
+            service: The chat completion service to use. When omitted, the shared service
+                from the registry is attached on first invocation.
+        """
         super().__init__(
-            service=self._create_ai_service(Services.OPENAI),
-            plugins=[UserPlugin()],
+            service=service,
+            plugins=get_plugin_registry(base_path).plugins(TOOLS),
             name="UserAgent",
             instructions=INSTRUCTION.strip(),
             description=DESCRIPTION.strip(),
@@ -67,4 +81,26 @@ class UserAgent(CustomAgentBase):
             additional_user_message="Now interact with the user and gather feedback.",
             **kwargs,
         ):
-            yield response 
\ No newline at end of file
+            yield response 
+
+    @override
+    async def invoke_stream(
+        self,
+        *,
+        messages: str | ChatMessageContent | list[str | ChatMessageContent] | None = None,
+        thread: "AgentThread | None" = None,
+        on_intermediate_message: Callable[[ChatMessageContent], Awaitable[None]] | None = None,
+        arguments: KernelArguments | None = None,
+        kernel: "Kernel | None" = None,
+        **kwargs: Any,
+    ) -> AsyncIterable["AgentResponseItem[StreamingChatMessageContent]"]:
+        async for response in super().invoke_stream(
+            messages=messages,
+            thread=thread,
+            on_intermediate_message=on_intermediate_message,
+            arguments=arguments,
+            kernel=kernel,
+            additional_user_message="Now interact with the user and gather feedback.",
+            **kwargs,
+        ):
+            yield response
@@ -0,0 +1,837 @@
+"""Offline benchmarks for the agent orchestration.
+
+Every model call is answered by ``ScriptedChatCompletion``, so the numbers measure the
+group chat, the strategies and the plugins rather than a model. Results are written as
+JSON and can be compared with a previous run to catch regressions::
+
+    python benchmark.py --output bench.json
+    python benchmark.py --compare bench.json
+"""
+
+import argparse
+import asyncio
+import gc
+import json
+import logging
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+from collections import defaultdict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, ClassVar
+
+from pydantic import Field
+from semantic_kernel.agents import AgentGroupChat
+from semantic_kernel.connectors.ai.chat_completion_client_base import ChatCompletionClientBase
+from semantic_kernel.connectors.ai.completion_usage import CompletionUsage
+from semantic_kernel.contents import (
+    AuthorRole,
+    ChatMessageContent,
+    FunctionCallContent,
+    FunctionResultContent,
+    StreamingChatMessageContent,
+    StreamingTextContent,
+)
+from semantic_kernel.kernel import Kernel
+
+from agents import CandidatePanel, ReviewPanel, TerraformCreationAgent, TerraformValidationAgent, UserAgent
+from main import REVIEW_PANEL_NAME, RunOptions, create_selection_strategy, create_termination_strategy, run_task
+from plugins import (
+    CommandResult,
+    SnippetIndex,
+    TerraformExecutionPlugin,
+    TerraformFilePlugin,
+    concurrent_plugin,
+    format_validation,
+    parse_validate,
+)
+
+# A tool call: fully qualified function name ("plugin-function") and its arguments.
+ToolCall = tuple[str, dict[str, Any]]
+
+# Metrics where a larger value is better; every other numeric metric is compared as lower-is-better.
+HIGHER_IS_BETTER = ("_per_second", "_per_minute", "efficiency")
+
+
+class ScriptedChatCompletion(ChatCompletionClientBase):
+    """A chat completion service that answers from a script instead of a model.
+
+    On each request it first returns the tool calls that ``script`` gives for the current
+    turn; once their results are in the history it returns ``reply``. Each request waits
+    ``latency`` seconds, and streamed replies are split into words.
+    """
+
+    SUPPORTS_FUNCTION_CALLING: ClassVar[bool] = True
+
+    latency: float = 0.0
+    reply: str = "Done."
+    script: Callable[[int], list[ToolCall]] | None = Field(default=None, exclude=True)
+    requests: int = 0
+    turns: int = 0
+
+    def _next_message(self, chat_history: Any) -> ChatMessageContent:
+        self.requests += 1
+        last = chat_history.messages[-1] if chat_history.messages else None
+        answering_tools = last is not None and any(isinstance(i, FunctionResultContent) for i in last.items)
+        calls = [] if answering_tools or self.script is None else self.script(self.turns)
+        usage = CompletionUsage(prompt_tokens=sum(len(str(m.content or "")) for m in chat_history.messages) // 4)
+        if calls:
+            items = [
+                FunctionCallContent(id=f"call_{self.requests}_{i}", name=name, arguments=json.dumps(arguments))
+                for i, (name, arguments) in enumerate(calls)
+            ]
+            return ChatMessageContent(
+                role=AuthorRole.ASSISTANT, items=items, ai_model_id=self.ai_model_id, metadata={"usage": usage}
+            )
+        self.turns += 1
+        usage.completion_tokens = len(self.reply) // 4
+        return ChatMessageContent(
+            role=AuthorRole.ASSISTANT, content=self.reply, ai_model_id=self.ai_model_id, metadata={"usage": usage}
+        )
+
+    async def _inner_get_chat_message_contents(self, chat_history: Any, settings: Any) -> list[ChatMessageContent]:
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        return [self._next_message(chat_history)]
+
+    async def _inner_get_streaming_chat_message_contents(
+        self, chat_history: Any, settings: Any, function_invoke_attempt: int = 0
+    ):
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        message = self._next_message(chat_history)
+        if message.content:
+            items = [StreamingTextContent(choice_index=0, text=f"{word} ") for word in message.content.split()]
+        else:
+            items = [item for item in message.items]
+        for item in items:
+            yield [
+                StreamingChatMessageContent(
+                    role=AuthorRole.ASSISTANT,
+                    choice_index=0,
+                    items=[item],
+                    ai_model_id=self.ai_model_id,
+                    function_invoke_attempt=function_invoke_attempt,
+                )
+            ]
+
+
+def creation_script(turn: int) -> list[ToolCall]:
+    """Write a slightly different configuration every turn, so the chat never converges."""
+    content = (
+        'variable "name" {\n  type    = string\n  default = "bench"\n}\n\n'
+        f'resource "null_resource" "turn_{turn}" {{\n  triggers = {{\n    name = var.name\n  }}\n}}\n'
+    )
+    return [("terraform_file-create_file", {"filename": "main.tf", "content": content})]
+
+
+BROKEN_CONFIGURATION = 'resource "null_resource" "app" {\n  triggers = {\n    name =\n  }\n}\n'
+VALID_CONFIGURATION = 'resource "null_resource" "app" {\n  triggers = {\n    name = "bench"\n  }\n}\n'
+
+
+def repair_script(broken_turns: int) -> Callable[[int], list[ToolCall]]:
+    """A creation script whose first ``broken_turns`` configurations fail the local checks."""
+
+    def script(turn: int) -> list[ToolCall]:
+        content = BROKEN_CONFIGURATION if turn < broken_turns else VALID_CONFIGURATION
+        return [("terraform_file-create_file", {"filename": "main.tf", "content": content})]
+
+    return script
+
+
+def validation_script(turn: int) -> list[ToolCall]:
+    return [("terraform_execution-check", {}), ("terraform_file-list_files", {})]
+
+
+def create_agents(
+    workspace: str, latency: float, review: str = "sequential"
+) -> tuple[list, list[ScriptedChatCompletion]]:
+    services = [
+        ScriptedChatCompletion(ai_model_id="scripted", latency=latency, script=creation_script, reply="Created."),
+        ScriptedChatCompletion(ai_model_id="scripted", latency=latency, reply="Looks good, please continue."),
+        ScriptedChatCompletion(ai_model_id="scripted", latency=latency, script=validation_script, reply="Valid."),
+    ]
+    agents = [
+        TerraformCreationAgent(base_path=workspace, service=services[0]),
+        UserAgent(base_path=workspace, service=services[1]),
+        TerraformValidationAgent(base_path=workspace, service=services[2]),
+    ]
+    if review == "fan-out":
+        agents = [agents[0], ReviewPanel(agents[1:], name=REVIEW_PANEL_NAME)]
+    return agents, services
+
+
+async def run_chat(
+    workspace: str,
+    turns: int,
+    latency: float,
+    selection: str,
+    on_turn: Callable[[int], None] | None = None,
+    review: str = "sequential",
+) -> tuple[int, int]:
+    """Run one scripted group chat for at most ``turns`` turns.
+
+    Returns:
+        The number of turns taken and of model requests made.
+    """
+    agents, services = create_agents(workspace, latency, review)
+    options = RunOptions(selection=selection, termination="convergence", max_turns=turns, review=review)
+
+    async def post_validation_errors(errors: str) -> None:
+        await group_chat.add_chat_message(
+            ChatMessageContent(role=AuthorRole.USER, name="TerraformValidator", content=errors)
+        )
+
+    group_chat = AgentGroupChat(
+        agents=agents,
+        termination_strategy=create_termination_strategy(options, workspace, agents),
+        selection_strategy=create_selection_strategy(options, workspace, post_validation_errors),
+    )
+    await group_chat.add_chat_message(ChatMessageContent(role=AuthorRole.USER, content="Create a null resource."))
+    taken = 0
+    async for _ in group_chat.invoke():
+        taken += 1
+        if on_turn is not None:
+            on_turn(taken)
+    return taken, sum(service.requests for service in services)
+
+
+async def bench_turns(turns: int, latency: float, selection: str) -> dict[str, Any]:
+    """Turns per second and orchestration overhead per turn of a single chat."""
+    with tempfile.TemporaryDirectory() as workspace:
+        # Warm up lazily built state (tool schemas, caches) so it is not billed to the first turns.
+        await run_chat(os.path.join(workspace, "warm-up"), 3, 0.0, selection)
+        start = time.perf_counter()
+        taken, requests = await run_chat(workspace, turns, latency, selection)
+        seconds = time.perf_counter() - start
+    overhead = seconds - requests * latency
+    return {
+        "turns": taken,
+        "model_requests": requests,
+        "seconds": round(seconds, 4),
+        "turns_per_second": round(taken / seconds, 2),
+        "overhead_per_turn_ms": round(overhead / taken * 1000, 3),
+    }
+
+
+async def bench_fan_out(iterations: int, latency: float) -> dict[str, Any]:
+    """Wall-clock per creation/review iteration, with the reviewers in turn and fanned out.
+
+    Round-robin selection is used, so every iteration is the creation agent's turn followed
+    by the review: two reviewer turns in sequence, or one panel turn running both at once.
+    """
+    seconds: dict[str, float] = {}
+    with tempfile.TemporaryDirectory() as workspace:
+        for review, turns_per_iteration in (("sequential", 3), ("fan-out", 2)):
+            start = time.perf_counter()
+            await run_chat(
+                os.path.join(workspace, review), iterations * turns_per_iteration, latency, "round-robin", review=review
+            )
+            seconds[review] = (time.perf_counter() - start) / iterations
+    return {
+        "iterations": iterations,
+        "sequential_iteration_ms": round(seconds["sequential"] * 1000, 1),
+        "fan_out_iteration_ms": round(seconds["fan-out"] * 1000, 1),
+        "speedup": round(seconds["sequential"] / seconds["fan-out"], 2),
+    }
+
+
+async def bench_candidates(count: int, latency: float) -> dict[str, Any]:
+    """Turns, model requests and wall-clock until convergence, with one creation agent and best-of-N.
+
+    The scripted creation model gets its first configuration wrong and needs a repair
+    round, except for the second of the candidates, so best-of-N skips the repair.
+    """
+    runs: dict[int, dict[str, Any]] = {}
+    with tempfile.TemporaryDirectory() as root:
+        for candidates in (1, count):
+            workspace = os.path.join(root, f"candidates-{candidates}")
+            services: list[ScriptedChatCompletion] = []
+
+            def scripted(script: Callable[[int], list[ToolCall]] | None, reply: str) -> ScriptedChatCompletion:
+                services.append(ScriptedChatCompletion(ai_model_id="scripted", latency=latency, script=script, reply=reply))
+                return services[-1]
+
+            def creation_agent(path: str) -> TerraformCreationAgent:
+                # Called once per candidate, in order.
+                broken_turns = 0 if len(services) == 1 else 1
+                return TerraformCreationAgent(base_path=path, service=scripted(repair_script(broken_turns), "Created."))
+
+            agents = [
+                CandidatePanel(workspace, candidates, agent_factory=creation_agent)
+                if candidates > 1
+                else creation_agent(workspace),
+                UserAgent(base_path=workspace, service=scripted(None, "Looks good, please continue.")),
+                TerraformValidationAgent(base_path=workspace, service=scripted(validation_script, "Valid.")),
+            ]
+            options = RunOptions(checkpoint=False, candidates=candidates)
+            start = time.perf_counter()
+            result = await run_task("Create a null resource.", workspace, verbose=False, options=options, agents=agents)
+            seconds = time.perf_counter() - start
+            runs[candidates] = {
+                "turns": result["turns"],
+                "model_requests": sum(service.requests for service in services),
+                "wall_clock_ms": round(seconds * 1000, 1),
+                "termination_reason": result["termination_reason"],
+            }
+            if candidates > 1:
+                runs[candidates]["scores"] = [
+                    [round(score["total"], 3) for score in turn] for turn in result["candidate_scores"]
+                ]
+    return {
+        "candidates": count,
+        "single": runs[1],
+        "best_of_n": runs[count],
+        "speedup": round(runs[1]["wall_clock_ms"] / runs[count]["wall_clock_ms"], 2),
+    }
+
+
+async def bench_memory(turns: int, selection: str) -> dict[str, Any]:
+    """Traced Python heap growth while the chat history grows."""
+    samples: list[tuple[int, int]] = []
+    gc.collect()
+    tracemalloc.start()
+    try:
+        with tempfile.TemporaryDirectory() as workspace:
+            await run_chat(
+                workspace,
+                turns,
+                0.0,
+                selection,
+                on_turn=lambda turn: samples.append((turn, tracemalloc.get_traced_memory()[0])),
+            )
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    if len(samples) < 2:
+        return {"turns": len(samples), "peak_bytes": peak}
+    xs, ys = zip(*samples)
+    slope = statistics.linear_regression(xs, ys).slope
+    return {
+        "turns": len(samples),
+        "start_bytes": ys[0],
+        "end_bytes": ys[-1],
+        "peak_bytes": peak,
+        "bytes_per_turn": round(slope),
+    }
+
+
+async def bench_plugins(iterations: int) -> dict[str, Any]:
+    """Latency of each kernel function, invoked through the kernel as the agents do."""
+    results: dict[str, Any] = {}
+    with tempfile.TemporaryDirectory() as workspace:
+        kernel = Kernel()
+        kernel.add_plugin(concurrent_plugin("terraform_file", TerraformFilePlugin(workspace)))
+        kernel.add_plugin(concurrent_plugin("terraform_execution", TerraformExecutionPlugin(workspace)))
+        # One variable and twenty resources, so reads and edits work on a realistic file.
+        content = creation_script(0)[0][1]["content"] + "".join(
+            creation_script(i)[0][1]["content"].split("\n\n", 1)[1] for i in range(1, 20)
+        )
+        await kernel.invoke(
+            plugin_name="terraform_file", function_name="create_file", filename="main.tf", content=content
+        )
+
+        toggle = ["bench", "bench2"]
+        calls: dict[str, Callable[[int], dict[str, Any]]] = {
+            "terraform_file-create_file": lambda i: {"filename": "scratch.tf", "content": f"# {i}\n"},
+            "terraform_file-read_file": lambda i: {"filename": "main.tf"},
+            "terraform_file-read_lines": lambda i: {"filename": "main.tf", "start_line": 1, "end_line": 40},
+            "terraform_file-replace_in_file": lambda i: {
+                "filename": "main.tf",
+                "search": f'default = "{toggle[i % 2]}"',
+                "replace": f'default = "{toggle[(i + 1) % 2]}"',
+            },
+            "terraform_file-list_files": lambda i: {},
+            "terraform_file-read_files": lambda i: {},
+            "terraform_file-write_files": lambda i: {
+                "files": {"scratch.tf": f"# {i}\n", "scratch2.tf": f"# {i}\n"}
+            },
+            "terraform_execution-check": lambda i: {},
+            "terraform_execution-validate": lambda i: {},
+        }
+        for name, arguments in calls.items():
+            plugin_name, function_name = name.split("-", 1)
+            timings: list[float] = []
+            for i in range(iterations):
+                start = time.perf_counter()
+                await kernel.invoke(plugin_name=plugin_name, function_name=function_name, **arguments(i))
+                timings.append(time.perf_counter() - start)
+            timings.sort()
+            results[name] = {
+                "mean_ms": round(statistics.fmean(timings) * 1000, 4),
+                "p50_ms": round(timings[len(timings) // 2] * 1000, 4),
+                "p95_ms": round(timings[int(len(timings) * 0.95)] * 1000, 4),
+            }
+    return results
+
+
+# Resource types the synthetic snippet library is written with.
+SNIPPET_RESOURCES = (
+    "aws_vpc", "aws_subnet", "aws_internet_gateway", "aws_nat_gateway", "aws_route_table", "aws_security_group",
+    "aws_lb", "aws_lb_listener", "aws_lb_target_group", "aws_autoscaling_group", "aws_launch_template",
+    "aws_instance", "aws_s3_bucket", "aws_iam_role", "aws_cloudwatch_metric_alarm", "aws_db_instance",
+)
+SNIPPET_QUERIES = (
+    "vpc public private subnets",
+    "security group http https ingress",
+    "application load balancer listener target group",
+    "auto scaling group launch template",
+    "s3 bucket versioning",
+    "rds database instance",
+)
+
+
+def write_snippet_library(root: str, files: int) -> None:
+    """Write a synthetic library of ``files`` files: modules of three files each."""
+    for i in range(files):
+        module = os.path.join(root, "modules", f"module_{i // 3}")
+        os.makedirs(module, exist_ok=True)
+        resource = SNIPPET_RESOURCES[i % len(SNIPPET_RESOURCES)]
+        other = SNIPPET_RESOURCES[(i * 7 + 3) % len(SNIPPET_RESOURCES)]
+        with open(os.path.join(module, f"file_{i % 3}.tf"), "w") as f:
+            f.write(
+                f"# Vetted {resource.removeprefix('aws_').replace('_', ' ')} for team {i % 17}\n"
+                f'variable "name_{i}" {{\n  type = string\n}}\n\n'
+                f'resource "{resource}" "this_{i}" {{\n  name = var.name_{i}\n  tags = {{\n    Team = "t{i % 17}"\n  }}\n}}\n\n'
+                f'resource "{other}" "extra_{i}" {{\n  depends_on = [{resource}.this_{i}]\n}}\n\n'
+                f'output "{resource}_id" {{\n  value = {resource}.this_{i}.id\n}}\n'
+            )
+
+
+def bench_snippets(files: int, queries: int) -> dict[str, Any]:
+    """Build, reload, incremental update and query latency of the snippet index over a synthetic library."""
+    with tempfile.TemporaryDirectory() as library:
+        write_snippet_library(library, files)
+
+        start = time.perf_counter()
+        build = SnippetIndex(library).refresh()
+        build_seconds = time.perf_counter() - start
+
+        index = SnippetIndex(library, max_age=float("inf"))
+        start = time.perf_counter()
+        reload = index.refresh()
+        reload_seconds = time.perf_counter() - start
+
+        # Change 1% of the files, add ten and remove ten.
+        changed = max(1, files // 100)
+        for i in range(changed):
+            path = os.path.join(library, "modules", f"module_{i}", f"file_{i % 3}.tf")
+            with open(path, "a") as f:
+                f.write(f'\n# revised {i}\nresource "aws_s3_bucket" "revised_{i}" {{}}\n')
+        write_snippet_library(os.path.join(library, "added"), 10)
+        for i in range(10):
+            removed = files - 1 - i
+            os.unlink(os.path.join(library, "modules", f"module_{removed // 3}", f"file_{removed % 3}.tf"))
+        incremental = index.refresh()
+
+        timings: list[float] = []
+        for i in range(queries):
+            query = SNIPPET_QUERIES[i % len(SNIPPET_QUERIES)]
+            start = time.perf_counter()
+            index.search(query, limit=5)
+            timings.append(time.perf_counter() - start)
+        timings.sort()
+        index_bytes = os.path.getsize(index.index_path)
+    return {
+        "files": files,
+        "index_bytes": index_bytes,
+        "build_ms": round(build_seconds * 1000, 1),
+        "reload_ms": round(reload_seconds * 1000, 1),
+        "incremental_update_ms": round(incremental.seconds * 1000, 1),
+        "incremental_files": incremental.added + incremental.updated + incremental.removed,
+        "query_mean_ms": round(statistics.fmean(timings) * 1000, 4),
+        "query_p50_ms": round(timings[len(timings) // 2] * 1000, 4),
+        "query_p95_ms": round(timings[int(len(timings) * 0.95)] * 1000, 4),
+        "unchanged_after_reload": reload.unchanged,
+    }
+
+
+async def bench_concurrency(chats: int, turns: int, latency: float, selection: str) -> dict[str, Any]:
+    """Throughput of several chats running at once with a non-zero model latency."""
+    with tempfile.TemporaryDirectory() as root:
+        start = time.perf_counter()
+        outcomes = await asyncio.gather(
+            *(run_chat(os.path.join(root, f"chat-{i}"), turns, latency, selection) for i in range(chats))
+        )
+        seconds = time.perf_counter() - start
+    total_turns = sum(taken for taken, _ in outcomes)
+    # With perfect overlap the chats take as long as the slowest chat's model time.
+    ideal = max(requests for _, requests in outcomes) * latency
+    return {
+        "chats": chats,
+        "turns": total_turns,
+        "seconds": round(seconds, 4),
+        "chats_per_minute": round(chats / seconds * 60, 2),
+        "turns_per_second": round(total_turns / seconds, 2),
+        "efficiency": round(ideal / seconds, 3) if seconds else 0.0,
+    }
+
+
+# (summary, detail, code) of the diagnostics in the validation output benchmark.
+VALIDATE_DIAGNOSTICS = [
+    ("Unsupported argument", 'An argument named "enable_classiclink" is not expected here.', "enable_classiclink = false"),
+    (
+        "Reference to undeclared input variable",
+        'An input variable with the name "environment" has not been declared. This variable can be declared '
+        'with a variable "environment" {} block.',
+        "Environment = var.environment",
+    ),
+    (
+        "Missing required argument",
+        'The argument "vpc_zone_identifier" is required, but no definition was found.',
+        'resource "aws_autoscaling_group" "web" {',
+    ),
+    ("Invalid reference", "A reference to a resource type must be followed by at least one attribute access, "
+     "specifying the resource name.", "subnet_id = aws_subnet"),
+]
+
+
+def validate_output(diagnostics: int) -> tuple[str, str]:
+    """The human-readable and the ``-json`` output of a ``terraform validate`` finding ``diagnostics`` errors."""
+    text, entries = [], []
+    for i in range(diagnostics):
+        summary, detail, code = VALIDATE_DIAGNOSTICS[i % len(VALIDATE_DIAGNOSTICS)]
+        filename, line = f"file_{i % 5}.tf", 10 + i
+        text.append(
+            f'╷\n│ Error: {summary}\n│\n│   on {filename} line {line}, in resource "aws_instance" "web_{i}":\n'
+            f"│   {line}:   {code}\n│\n│ {detail}\n╵\n"
+        )
+        entries.append(
+            {
+                "severity": "error",
+                "summary": summary,
+                "detail": detail,
+                "range": {
+                    "filename": filename,
+                    "start": {"line": line, "column": 3, "byte": 0},
+                    "end": {"line": line, "column": 3 + len(code), "byte": 0},
+                },
+                "snippet": {
+                    "context": f'resource "aws_instance" "web_{i}"',
+                    "code": f"  {code}",
+                    "start_line": line,
+                    "highlight_start_offset": 2,
+                    "highlight_end_offset": 2 + len(code),
+                    "values": [],
+                },
+            }
+        )
+    data = {"format_version": "1.0", "valid": False, "error_count": diagnostics, "warning_count": 0}
+    return "".join(text), json.dumps(dict(data, diagnostics=entries))
+
+
+def bench_diagnostics(diagnostics: int) -> dict[str, Any]:
+    """Tokens the model reads for a failed validation: the raw output against the compact summary."""
+    from agents import TokenCounter
+
+    counter = TokenCounter()
+    text, json_output = validate_output(diagnostics)
+    result = CommandResult(args=("validate", "-json"), returncode=1, stdout=json_output, stderr="", duration=0.0)
+    start = time.perf_counter()
+    summary = format_validation(parse_validate(result), "terraform/.diagnostics/validate.json")
+    seconds = time.perf_counter() - start
+    raw_tokens = counter.count_text(f"Error (exit code 1): {text}")
+    summary_tokens = counter.count_text(summary)
+    return {
+        "diagnostics": diagnostics,
+        "raw_tokens": raw_tokens,
+        "summary_tokens": summary_tokens,
+        "saved_fraction": round(1 - summary_tokens / raw_tokens, 3),
+        "summarize_ms": round(seconds * 1000, 3),
+    }
+
+
+def bench_tools() -> dict[str, Any]:
+    """Function definitions sent with each agent's requests, against every agent getting all of them."""
+    from agents import TokenCounter, kernel_tool_schemas
+    from plugins import get_plugin_registry
+
+    counter = TokenCounter()
+    with tempfile.TemporaryDirectory() as workspace:
+        agents, _ = create_agents(workspace, 0.0)
+        registry = get_plugin_registry(workspace)
+        kernel = Kernel()
+        kernel.add_plugins([registry.plugin(name) for name in registry.factories])
+        all_tokens = counter.count_tools(kernel_tool_schemas(kernel))
+        per_agent = {
+            agent.name: {"functions": len(agent.tool_schemas()), "schema_tokens": agent.tool_schema_tokens(counter)}
+            for agent in agents
+        }
+    scoped = sum(agent["schema_tokens"] for agent in per_agent.values())
+    return {
+        "agents": per_agent,
+        "schema_tokens_per_round": scoped,
+        "unscoped_schema_tokens_per_round": all_tokens * len(agents),
+        "saved_fraction": round(1 - scoped / (all_tokens * len(agents)), 3) if all_tokens else 0.0,
+    }
+
+
+class _FirstRequestServer(ThreadingHTTPServer):
+    """An HTTPS proxy that notes when the first model request reaches it and refuses it.
+
+    The Azure OpenAI connector only accepts ``https`` endpoints, so rather than serving the
+    API the benchmark points ``HTTPS_PROXY`` here and watches for the ``CONNECT``.
+    """
+
+    def __init__(self):
+        self.first_request = threading.Event()
+        self.first_request_at = 0.0
+
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_CONNECT(self) -> None:
+                if not server.first_request.is_set():
+                    server.first_request_at = time.perf_counter()
+                    server.first_request.set()
+                self.send_error(503)
+
+            def log_message(self, format: str, *args: Any) -> None:
+                pass
+
+        super().__init__(("127.0.0.1", 0), Handler)
+
+
+def _time_to_first_request(root: str, timeout: float, python_options: tuple[str, ...] = ()) -> tuple[float, str]:
+    """Start ``python main.py`` and stop it as soon as it sends its first model request.
+
+    Returns:
+        The seconds from starting the interpreter until the request, and its stderr.
+    """
+    with _FirstRequestServer() as server, tempfile.TemporaryDirectory() as workspace:
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        env = {
+            **os.environ,
+            "HTTPS_PROXY": f"http://127.0.0.1:{server.server_address[1]}",
+            "NO_PROXY": "",
+            "AZURE_OPENAI_ENDPOINT": "https://benchmark.openai.azure.com",
+            "AZURE_OPENAI_API_KEY": "benchmark",
+            "AZURE_OPENAI_DEPLOYMENT_NAME": "gpt-4o",
+            "AZURE_APP_INSIGHTS_CONNECTION_STRING": "",
+        }
+        with tempfile.TemporaryFile("w+") as stderr:
+            start = time.perf_counter()
+            child = subprocess.Popen(
+                [sys.executable, *python_options, "main.py", "--workspace-root", workspace],
+                cwd=root,
+                env=env,
+                stdout=subprocess.DEVNULL,
+                stderr=stderr,
+            )
+            try:
+                if not server.first_request.wait(timeout):
+                    raise RuntimeError(f"main.py sent no model request within {timeout} seconds.")
+            finally:
+                child.kill()
+                child.wait()
+                server.shutdown()
+            stderr.seek(0)
+            return server.first_request_at - start, stderr.read()
+
+
+def import_profile(importtime_output: str, top: int = 10) -> tuple[float, list[tuple[str, float]]]:
+    """Summarize ``python -X importtime`` output.
+
+    Returns:
+        The total import time in milliseconds, and the ``top`` top-level packages that took
+        the most of it, each charged the self time of all of its modules.
+    """
+    packages: dict[str, float] = defaultdict(float)
+    for line in importtime_output.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, _, name = (field.strip() for field in line[len("import time:") :].split("|"))
+        packages[name.split(".")[0]] += int(self_us) / 1000
+    ranked = sorted(packages.items(), key=lambda item: item[1], reverse=True)[:top]
+    return sum(packages.values()), [(name, round(ms, 1)) for name, ms in ranked]
+
+
+async def bench_startup(runs: int, timeout: float = 60.0) -> dict[str, Any]:
+    """Cold-start cost of the CLI: ``--help`` and the time until the first model request.
+
+    Every measurement starts a fresh interpreter. The model endpoint is reached through a
+    local proxy that records the first request and refuses it, so nothing leaves the
+    machine. A final run under ``-X importtime`` reports which packages the imports on the
+    way to that request are spent in.
+    """
+    root = os.path.dirname(os.path.abspath(__file__))
+
+    def help_seconds() -> float:
+        start = time.perf_counter()
+        subprocess.run([sys.executable, "main.py", "--help"], cwd=root, capture_output=True, check=True)
+        return time.perf_counter() - start
+
+    def first_request_seconds() -> float:
+        return _time_to_first_request(root, timeout)[0]
+
+    # One unmeasured run each, so the numbers do not include compiling bytecode.
+    help_seconds()
+    await asyncio.to_thread(first_request_seconds)
+    helps = [help_seconds() for _ in range(runs)]
+    first_requests = [await asyncio.to_thread(first_request_seconds) for _ in range(runs)]
+    _, stderr = await asyncio.to_thread(_time_to_first_request, root, timeout, ("-X", "importtime"))
+    import_ms, packages = import_profile(stderr)
+    return {
+        "help_ms": round(statistics.median(helps) * 1000, 1),
+        "time_to_first_request_ms": round(statistics.median(first_requests) * 1000, 1),
+        "imports_before_first_request_ms": round(import_ms, 1),
+        # A list, so --compare leaves these per-package figures out of the regression check.
+        "import_ms_by_package": packages,
+    }
+
+
+def _metadata(args: argparse.Namespace) -> dict[str, Any]:
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    from semantic_kernel import __version__ as sk_version
+
+    return {
+        "commit": commit,
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        "python": platform.python_version(),
+        "semantic_kernel": sk_version,
+        "platform": platform.platform(),
+        "settings": {k: v for k, v in vars(args).items() if k not in ("output", "compare")},
+    }
+
+
+def _flatten(results: dict[str, Any], prefix: str = "") -> dict[str, float]:
+    flat: dict[str, float] = {}
+    for key, value in results.items():
+        name = f"{prefix}.{key}" if prefix else key
+        if isinstance(value, dict):
+            flat.update(_flatten(value, name))
+        elif isinstance(value, (int, float)) and not isinstance(value, bool):
+            flat[name] = value
+    return flat
+
+
+def compare(baseline: dict[str, Any], current: dict[str, Any], threshold: float) -> list[str]:
+    """Compare two result documents.
+
+    Returns:
+        A description of every metric that got worse by more than ``threshold`` (a fraction).
+    """
+    old, new = _flatten(baseline["results"]), _flatten(current["results"])
+    regressions: list[str] = []
+    for name in sorted(old.keys() & new.keys()):
+        before, after = old[name], new[name]
+        if before == 0 or name.endswith((".turns", ".chats", ".model_requests")):
+            continue
+        change = (after - before) / abs(before)
+        worse = -change if name.endswith(HIGHER_IS_BETTER) else change
+        marker = "REGRESSION" if worse > threshold else ""
+        print(f"{name:60} {before:>14} -> {after:>14} {change:+8.1%} {marker}", file=sys.stderr)
+        if marker:
+            regressions.append(f"{name}: {before} -> {after} ({change:+.1%})")
+    return regressions
+
+
+async def run_benchmarks(args: argparse.Namespace) -> dict[str, Any]:
+    results: dict[str, Any] = {}
+    if "turns" in args.only:
+        results["turns"] = await bench_turns(args.turns, args.latency, args.selection)
+    if "memory" in args.only:
+        results["memory"] = await bench_memory(args.memory_turns, args.selection)
+    if "plugins" in args.only:
+        results["plugins"] = await bench_plugins(args.plugin_iterations)
+    if "concurrency" in args.only:
+        results["concurrency"] = await bench_concurrency(
+            args.chats, args.concurrent_turns, args.concurrent_latency, args.selection
+        )
+    if "startup" in args.only:
+        results["startup"] = await bench_startup(args.startup_runs)
+    if "fan-out" in args.only:
+        results["fan_out"] = await bench_fan_out(args.fan_out_iterations, args.fan_out_latency)
+    if "candidates" in args.only:
+        results["candidates"] = await bench_candidates(args.candidates, args.candidates_latency)
+    if "snippets" in args.only:
+        results["snippets"] = bench_snippets(args.snippet_files, args.snippet_queries)
+    if "diagnostics" in args.only:
+        results["diagnostics"] = bench_diagnostics(args.validate_diagnostics)
+    if "tools" in args.only:
+        results["tools"] = bench_tools()
+    return {"meta": _metadata(args), "results": results}
+
+
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    benchmarks = [
+        "turns", "memory", "plugins", "concurrency", "startup", "tools", "fan-out", "candidates", "snippets",
+        "diagnostics",
+    ]
+    parser = argparse.ArgumentParser(description="Benchmark the agent orchestration against a scripted model.")
+    parser.add_argument("--only", nargs="+", choices=benchmarks, default=benchmarks, help="Benchmarks to run.")
+    parser.add_argument("--turns", type=int, default=60, help="Turns for the single-chat benchmark.")
+    parser.add_argument("--latency", type=float, default=0.0, help="Model latency in seconds for the single chat.")
+    parser.add_argument("--memory-turns", type=int, default=200, help="Turns for the memory growth benchmark.")
+    parser.add_argument("--plugin-iterations", type=int, default=200, help="Calls per kernel function.")
+    parser.add_argument("--chats", type=int, default=8, help="Chats to run at once in the concurrency benchmark.")
+    parser.add_argument("--concurrent-turns", type=int, default=6, help="Turns per chat in the concurrency benchmark.")
+    parser.add_argument(
+        "--concurrent-latency", type=float, default=0.05, help="Model latency in seconds for the concurrent chats."
+    )
+    parser.add_argument("--fan-out-iterations", type=int, default=4, help="Review iterations per fan-out run.")
+    parser.add_argument(
+        "--fan-out-latency", type=float, default=0.2, help="Model latency in seconds for the fan-out benchmark."
+    )
+    parser.add_argument("--candidates", type=int, default=3, help="Candidates per turn in the best-of-N benchmark.")
+    parser.add_argument(
+        "--candidates-latency", type=float, default=0.2, help="Model latency in seconds for the best-of-N benchmark."
+    )
+    parser.add_argument("--snippet-files", type=int, default=3000, help="Files in the snippet library benchmark.")
+    parser.add_argument("--snippet-queries", type=int, default=300, help="Queries in the snippet library benchmark.")
+    parser.add_argument(
+        "--validate-diagnostics", type=int, default=40, help="Errors in the validation output benchmark."
+    )
+    parser.add_argument("--startup-runs", type=int, default=5, help="Fresh interpreters per startup measurement.")
+    parser.add_argument(
+        "--selection",
+        choices=["round-robin", "validation"],
+        default="round-robin",
+        help="Selection strategy; 'validation' also runs terraform when it is installed.",
+    )
+    parser.add_argument("--output", metavar="FILE", help="Write the results to this JSON file (default: stdout).")
+    parser.add_argument("--compare", metavar="FILE", help="Compare against a previous results file.")
+    parser.add_argument(
+        "--threshold", type=float, default=0.1, help="Relative change counted as a regression by --compare."
+    )
+    return parser.parse_args(argv)
+
+
+def main(argv: list[str] | None = None) -> int:
+    args = parse_args(argv)
+    logging.basicConfig(level=logging.WARNING)
+    results = asyncio.run(run_benchmarks(args))
+
+    document = json.dumps(results, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(document + "\n")
+    else:
+        print(document)
+
+    if args.compare:
+        with open(args.compare, "r") as f:
+            regressions = compare(json.load(f), results, args.threshold)
+        if regressions:
+            print(f"{len(regressions)} regression(s) over {args.threshold:.0%}.", file=sys.stderr)
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
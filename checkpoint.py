@@ -0,0 +1,180 @@
+import json
+import os
+import time
+import uuid
+from dataclasses import dataclass, field
+from typing import IO, Any
+
+from semantic_kernel.contents import ChatMessageContent
+
+from plugins.patching import atomic_write
+
+HEAD_FILE = "HEAD"
+
+
+@dataclass
+class Checkpoint:
+    """The state of a group chat run after its last recorded turn."""
+
+    run_id: str
+    task: str
+    messages: list[ChatMessageContent] = field(default_factory=list)
+    turns: int = 0
+    revision: str | None = None
+    strategies: dict[str, dict[str, Any]] = field(default_factory=dict)
+    termination_reason: str | None = None
+    finished: bool = False
+    # Byte length of the journal up to its last complete record.
+    size: int = 0
+
+
+class CheckpointStore:
+    """An append-only journal of group chat runs in a workspace.
+
+    Each run is a JSON Lines file under ``runs/`` and ``HEAD`` names the latest run. A
+    run starts with a ``start`` record holding the task; after every agent turn a
+    ``turn`` record is appended with the chat messages added since the previous turn,
+    the workspace revision (see ``RevisionStore``) and the state of the selection and
+    termination strategies; a ``finish`` record marks a run that ended normally. A turn
+    therefore costs one buffered append of what is new, whatever the length of the chat.
+
+    Records are flushed to the operating system, not synced to disk, so a crashed or
+    killed process loses nothing, while a power failure can lose the last turns. A
+    record left half-written by a crash is ignored when the journal is loaded, and
+    dropped before the journal is appended to again.
+
+    The store lives in ``<workspace>/.checkpoints`` unless ``path`` is given.
+    """
+
+    def __init__(self, workspace: str, path: str | None = None):
+        self.workspace = workspace
+        self.path = path or os.path.join(workspace, ".checkpoints")
+        os.makedirs(os.path.join(self.path, "runs"), exist_ok=True)
+        self.run_id: str | None = None
+        self._journal: IO[str] | None = None
+        self._saved_messages = 0
+        self._turns = 0
+
+    def start(self, task: str) -> str:
+        """Begin a new run, which becomes the one ``load`` returns.
+
+        Returns:
+            The id of the run.
+        """
+        self.close()
+        self.run_id = f"{time.strftime('%Y%m%dT%H%M%S')}-{uuid.uuid4().hex[:8]}"
+        self._journal = open(self._run_path(self.run_id), "a", encoding="utf-8")
+        self._saved_messages = 0
+        self._turns = 0
+        self._append({"type": "start", "run": self.run_id, "task": task, "time": time.time()})
+        atomic_write(os.path.join(self.path, HEAD_FILE), self.run_id)
+        return self.run_id
+
+    def resume(self, checkpoint: Checkpoint) -> None:
+        """Continue appending to the run of ``checkpoint``, as returned by ``load``."""
+        self.close()
+        self.run_id = checkpoint.run_id
+        path = self._run_path(checkpoint.run_id)
+        # Drop a record a crash left half-written, so the next one starts on its own line.
+        if os.path.getsize(path) > checkpoint.size:
+            os.truncate(path, checkpoint.size)
+        self._journal = open(path, "a", encoding="utf-8")
+        self._saved_messages = len(checkpoint.messages)
+        self._turns = checkpoint.turns
+
+    def record_turn(
+        self,
+        agent: str | None,
+        messages: list[ChatMessageContent],
+        revision: str | None = None,
+        strategies: dict[str, dict[str, Any]] | None = None,
+    ) -> None:
+        """Append a turn.
+
+        Args:
+            agent: Name of the agent that just responded.
+            messages: The whole chat history; only messages added since the previous
+                turn are written.
+            revision: The workspace revision after the turn.
+            strategies: The state of the strategies, by role (``selection``, ``termination``).
+        """
+        self._turns += 1
+        new_messages = messages[self._saved_messages:]
+        self._saved_messages = len(messages)
+        # Messages are embedded as already-serialized JSON rather than parsed again.
+        record = json.dumps(
+            {
+                "type": "turn",
+                "turn": self._turns,
+                "agent": agent,
+                "revision": revision,
+                "strategies": strategies or {},
+                "time": time.time(),
+            }
+        )
+        encoded = ",".join(message.model_dump_json(exclude_none=True) for message in new_messages)
+        self._write(f'{record[:-1]}, "messages": [{encoded}]}}')
+
+    def finish(self, termination_reason: str | None = None) -> None:
+        """Mark the run as ended; resuming it will not invoke any agent."""
+        self._append({"type": "finish", "termination_reason": termination_reason, "time": time.time()})
+        self.close()
+
+    def load(self, run_id: str | None = None) -> Checkpoint | None:
+        """Rebuild a run (the latest by default) from its journal.
+
+        Returns:
+            The checkpoint after the run's last complete turn, or None if there is no run.
+        """
+        if run_id is None:
+            head_path = os.path.join(self.path, HEAD_FILE)
+            if not os.path.exists(head_path):
+                return None
+            with open(head_path, "r") as f:
+                run_id = f.read().strip()
+        path = self._run_path(run_id)
+        if not os.path.exists(path):
+            return None
+
+        checkpoint: Checkpoint | None = None
+        size = 0
+        with open(path, "rb") as f:
+            for line in f:
+                if not line.endswith(b"\n"):
+                    break
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    break
+                size += len(line)
+                if record["type"] == "start":
+                    checkpoint = Checkpoint(run_id=record["run"], task=record["task"])
+                elif checkpoint is None:
+                    break
+                elif record["type"] == "turn":
+                    checkpoint.messages.extend(ChatMessageContent.model_validate(m) for m in record["messages"])
+                    checkpoint.turns = record["turn"]
+                    checkpoint.revision = record["revision"]
+                    checkpoint.strategies = record["strategies"]
+                elif record["type"] == "finish":
+                    checkpoint.finished = True
+                    checkpoint.termination_reason = record["termination_reason"]
+                checkpoint.size = size
+        return checkpoint
+
+    def close(self) -> None:
+        if self._journal is not None:
+            self._journal.close()
+            self._journal = None
+
+    def _append(self, record: dict[str, Any]) -> None:
+        self._write(json.dumps(record))
+
+    def _write(self, line: str) -> None:
+        if self._journal is None:
+            raise RuntimeError("No run has been started or resumed.")
+        self._journal.write(line + "\n")
+        self._journal.flush()
+
+    def _run_path(self, run_id: str) -> str:
+        return os.path.join(self.path, "runs", f"{run_id}.jsonl")
@@ -1,15 +1,28 @@
-from typing import List
+import logging
+from typing import Any, Awaitable, Callable, Dict, List, Tuple
 
 from semantic_kernel.agents import Agent
 from semantic_kernel.agents.strategies.selection.selection_strategy import SelectionStrategy
 from semantic_kernel.contents import ChatMessageContent
 
+from plugins import CommandResult, TerraformExecutionPlugin
+from plugins.terraform_diagnostics import diagnostics_report, format_validation, parse_validate
+from plugins.terraform_result_cache import workspace_digest
+
+logger = logging.getLogger(__name__)
+
+
 class CustomSelectionStrategy(SelectionStrategy):
     """Custom selection strategy for choosing the next agent to respond."""
 
     def __init__(self):
         """Initialize the custom selection strategy."""
         super().__init__()
+        self._agent_ids: Tuple[str, ...] = ()
+        self._index_by_name: Dict[str, int] = {}
+
+    async def select_agent(self, agents: List[Agent], history: List[ChatMessageContent]) -> Agent:
+        return await self.select_next_agent(agents, history)
 
     async def select_next_agent(
         self, agents: List[Agent], messages: List[ChatMessageContent]
@@ -26,10 +39,156 @@ class CustomSelectionStrategy(SelectionStrategy):
         # Simple round-robin selection
         if not messages:
             return agents[0]
-        
-        last_agent_name = messages[-1].name
-        current_index = next(
-            (i for i, agent in enumerate(agents) if agent.name == last_agent_name), 0
-        )
+
+        current_index = self._index_of(agents, messages[-1].name)
         next_index = (current_index + 1) % len(agents)
-        return agents[next_index] 
\ No newline at end of file
+        return agents[next_index]
+
+    def checkpoint_state(self) -> Dict[str, Any]:
+        """The state needed to continue selecting where a checkpointed chat left off."""
+        return {"has_selected": self.has_selected}
+
+    def restore_state(self, state: Dict[str, Any]) -> None:
+        """Restore the state returned by ``checkpoint_state``."""
+        self.has_selected = state.get("has_selected", self.has_selected)
+
+    def _index_of(self, agents: List[Agent], name: str | None) -> int:
+        """Look up an agent's position by name, rebuilding the map only when the agents change."""
+        agent_ids = tuple(agent.id for agent in agents)
+        if agent_ids != self._agent_ids:
+            self._agent_ids = agent_ids
+            self._index_by_name = {agent.name: i for i, agent in enumerate(agents)}
+        return self._index_by_name.get(name, 0)
+
+
+class ValidationDrivenSelectionStrategy(CustomSelectionStrategy):
+    """Selection strategy that checks the workspace locally before spending an LLM turn.
+
+    After the creation agent responds, ``terraform validate`` and ``terraform fmt -check``
+    are run on the workspace (both served from the result cache when the files are
+    unchanged):
+
+    - Validation errors are reported back to the chat through ``feedback_sink`` and the
+      creation agent is selected again to fix them.
+    - Warnings or unformatted files send the configuration to the validation agent.
+    - A clean configuration goes straight to the user agent, skipping the validation agent.
+
+    The user agent is only selected when the files changed since it last saw them; the
+    creation agent always answers the user agent's feedback. Agents missing from the chat
+    are skipped in favour of round-robin order.
+    """
+
+    def __init__(
+        self,
+        execution_plugin: TerraformExecutionPlugin,
+        feedback_sink: Callable[[str], Awaitable[None]] | None = None,
+        creation_agent_name: str = "TerraformCreationAgent",
+        validation_agent_name: str = "TerraformValidationAgent",
+        user_agent_name: str = "UserAgent",
+    ):
+        """Initialize the validation-driven selection strategy.
+
+        Args:
+            execution_plugin: Plugin bound to the workspace the agents write to
+            feedback_sink: Optional coroutine that posts validation errors to the chat, e.g.
+                ``group_chat.add_chat_message``, so the creation agent sees what to fix
+            creation_agent_name: Name of the agent that writes the configuration
+            validation_agent_name: Name of the agent that reviews the configuration
+            user_agent_name: Name of the agent that gathers user feedback
+        """
+        super().__init__()
+        self._execution_plugin = execution_plugin
+        self._feedback_sink = feedback_sink
+        self._creation = creation_agent_name
+        self._validation = validation_agent_name
+        self._user = user_agent_name
+        self._user_reviewed_digest: str | None = None
+        self._skipped_turns = 0
+
+    @property
+    def skipped_turns(self) -> int:
+        """Number of validation agent turns avoided by the local checks."""
+        return self._skipped_turns
+
+    async def select_next_agent(
+        self, agents: List[Agent], messages: List[ChatMessageContent]
+    ) -> Agent:
+        """Select the next agent to respond.
+
+        Args:
+            agents: List of available agents
+            messages: List of messages in the conversation
+
+        Returns:
+            The selected agent
+        """
+        last_name = messages[-1].name if messages else None
+        if last_name not in (self._creation, self._validation):
+            # The task, the user agent's feedback or a validation report: the creation agent acts on it.
+            return self._agent(agents, self._creation) or await super().select_next_agent(agents, messages)
+
+        digest = workspace_digest(self._execution_plugin.base_path)
+        errors, needs_review = await self._check_workspace()
+        if errors:
+            if self._feedback_sink is not None:
+                await self._feedback_sink(errors)
+            self._skipped_turns += last_name == self._creation
+            return self._agent(agents, self._creation) or await super().select_next_agent(agents, messages)
+
+        if needs_review and last_name == self._creation:
+            validation_agent = self._agent(agents, self._validation)
+            if validation_agent is not None:
+                return validation_agent
+        elif last_name == self._creation:
+            self._skipped_turns += 1
+
+        user_agent = self._agent(agents, self._user)
+        if user_agent is not None and digest != self._user_reviewed_digest:
+            self._user_reviewed_digest = digest
+            return user_agent
+
+        return self._agent(agents, self._creation) or await super().select_next_agent(agents, messages)
+
+    def checkpoint_state(self) -> Dict[str, Any]:
+        return {
+            **super().checkpoint_state(),
+            "user_reviewed_digest": self._user_reviewed_digest,
+            "skipped_turns": self._skipped_turns,
+        }
+
+    def restore_state(self, state: Dict[str, Any]) -> None:
+        super().restore_state(state)
+        self._user_reviewed_digest = state.get("user_reviewed_digest")
+        self._skipped_turns = state.get("skipped_turns", 0)
+
+    async def _check_workspace(self) -> Tuple[str | None, bool]:
+        """Run the local checks.
+
+        Returns:
+            The validation errors to report, if any, and whether the configuration would
+            benefit from a review by the validation agent.
+        """
+        if self._execution_plugin.use_fast_check:
+            # Syntax and reference errors are caught in-process, before paying for init.
+            errors = [d for d in self._execution_plugin.run_fast_check() if d.severity == "error"]
+            if errors:
+                return "Configuration check failed:\n" + format_validation(diagnostics_report(errors)), False
+
+        await self._execution_plugin.ensure_initialized()
+
+        validate = await self._execution_plugin.run_validate()
+        if isinstance(validate, str):
+            # Terraform itself could not be run; let the validation agent judge the files.
+            logger.warning(f"Local validation unavailable: {validate}")
+            return None, True
+        report = parse_validate(validate)
+        if not report.valid:
+            return "terraform validate failed:\n" + format_validation(report), False
+
+        fmt_check = await self._execution_plugin.run_fmt_check()
+        unformatted = isinstance(fmt_check, CommandResult) and not fmt_check.ok
+        return None, unformatted or report.warning_count > 0
+
+    def _agent(self, agents: List[Agent], name: str) -> Agent | None:
+        index = self._index_of(agents, name)
+        return agents[index] if agents[index].name == name else None
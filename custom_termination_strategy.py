@@ -1,28 +1,49 @@
-from typing import List
+import hashlib
+import logging
+import time
+from enum import Enum
+from typing import Any, Dict, List
 
 from semantic_kernel.agents import Agent
 from semantic_kernel.agents.strategies.termination.termination_strategy import TerminationStrategy
 from semantic_kernel.contents import ChatMessageContent
 
+from plugins import TerraformExecutionPlugin
+from plugins.terraform_result_cache import workspace_digest
+
+logger = logging.getLogger(__name__)
+
+# Digest of a workspace without any Terraform files, which never counts as converged.
+_EMPTY_WORKSPACE_DIGEST = hashlib.sha256().hexdigest()
+
 
 class CustomTerminationStrategy(TerminationStrategy):
-    """Custom termination strategy for determining when to end the conversation."""
+    """Custom termination strategy for determining when to end the conversation.
 
-    def __init__(self, agents: List[Agent]):
+    The conversation ends after one pass: as many agent turns as there are agents. Under
+    round-robin selection that is once every agent has spoken; a selection strategy that
+    skips an agent, such as skipping the validation agent on a clean configuration, still
+    ends after the same number of turns.
+    """
+
+    def __init__(self, agents: List[Agent], max_turns: int = 99):
         """Initialize the custom termination strategy.
 
         Args:
             agents: List of agents in the conversation
+            max_turns: Maximum number of agent responses, should a pass never complete
         """
-        super().__init__()
+        super().__init__(maximum_iterations=max(max_turns, 1))
         self._agents = agents
+        self._turns = 0
 
-    async def should_terminate(
-        self, messages: List[ChatMessageContent]
+    async def should_agent_terminate(
+        self, agent: Agent, messages: List[ChatMessageContent]
     ) -> bool:
         """Determine if the conversation should terminate.
 
         Args:
+            agent: The agent that just responded
             messages: List of messages in the conversation
 
         Returns:
@@ -31,10 +52,156 @@ class CustomTerminationStrategy(TerminationStrategy):
         if not messages:
             return False
 
-        # Terminate if we've gone through all agents at least once
-        if len(messages) >= len(self._agents):
-            last_message = messages[-1]
-            if last_message.name == self._agents[-1].name:
-                return True
+        # Terminate once a full pass worth of agents has responded
+        self._turns += 1
+        return self._turns >= len(self._agents)
+
+    def checkpoint_state(self) -> Dict[str, Any]:
+        """The state needed to continue a checkpointed chat."""
+        return {"turns": self._turns}
+
+    def restore_state(self, state: Dict[str, Any]) -> None:
+        """Restore the state returned by ``checkpoint_state``."""
+        self._turns = state.get("turns", 0)
+
+
+class TerminationReason(str, Enum):
+    """Why a conversation ended."""
+
+    CONVERGED = "converged"
+    MAX_TURNS = "max_turns"
+    MAX_TOKENS = "max_tokens"
+    MAX_WALL_CLOCK = "max_wall_clock"
+
+
+class ConvergenceTerminationStrategy(TerminationStrategy):
+    """Termination strategy that ends the conversation once the configuration has converged.
+
+    The configuration has converged when, after a turn of the creation agent, the
+    workspace passes ``terraform validate`` and its files are identical to what they were
+    after that agent's previous turn. Independently of convergence, the conversation is
+    cut off once any of the turn, token or wall-clock budgets is exhausted. The reason is
+    recorded in ``termination_reason``.
+    """
+
+    def __init__(
+        self,
+        execution_plugin: TerraformExecutionPlugin,
+        max_turns: int = 12,
+        max_tokens: int | None = None,
+        max_wall_clock: float | None = None,
+        creation_agent_name: str = "TerraformCreationAgent",
+    ):
+        """Initialize the convergence termination strategy.
+
+        Args:
+            execution_plugin: Plugin bound to the workspace the agents write to
+            max_turns: Maximum number of agent responses
+            max_tokens: Maximum prompt plus completion tokens, as reported by the model
+            max_wall_clock: Maximum seconds since the strategy was created
+            creation_agent_name: Name of the agent whose turns mark an iteration
+        """
+        super().__init__(maximum_iterations=max(max_turns, 1))
+        self._execution_plugin = execution_plugin
+        self._max_turns = max_turns
+        self._max_tokens = max_tokens
+        self._max_wall_clock = max_wall_clock
+        self._creation = creation_agent_name
+        self._started = time.perf_counter()
+        self._turns = 0
+        self._tokens = 0
+        self._seen_messages = 0
+        self._last_digest: str | None = None
+        self._reason: TerminationReason | None = None
+
+    @property
+    def termination_reason(self) -> TerminationReason | None:
+        return self._reason
+
+    @property
+    def turns(self) -> int:
+        return self._turns
+
+    @property
+    def tokens(self) -> int:
+        return self._tokens
+
+    async def should_agent_terminate(
+        self, agent: Agent, messages: List[ChatMessageContent]
+    ) -> bool:
+        """Determine if the conversation should terminate.
+
+        Args:
+            agent: The agent that just responded
+            messages: List of messages in the conversation
+
+        Returns:
+            True if the conversation should terminate, False otherwise
+        """
+        if self._reason is not None:
+            return True
+        if len(messages) <= self._seen_messages:
+            return False
+
+        new_messages = messages[self._seen_messages:]
+        self._seen_messages = len(messages)
+        self._turns += 1
+        self._tokens += sum(_usage_tokens(m) for m in new_messages)
+
+        if agent.name == self._creation and await self._has_converged():
+            return self._terminate(TerminationReason.CONVERGED)
+        if self._turns >= self._max_turns:
+            return self._terminate(TerminationReason.MAX_TURNS)
+        if self._max_tokens is not None and self._tokens >= self._max_tokens:
+            return self._terminate(TerminationReason.MAX_TOKENS)
+        if self._max_wall_clock is not None and time.perf_counter() - self._started >= self._max_wall_clock:
+            return self._terminate(TerminationReason.MAX_WALL_CLOCK)
+        return False
+
+    def checkpoint_state(self) -> Dict[str, Any]:
+        """The counters and budgets used so far, so a resumed chat keeps its limits."""
+        return {
+            "turns": self._turns,
+            "tokens": self._tokens,
+            "seen_messages": self._seen_messages,
+            "last_digest": self._last_digest,
+            "elapsed": time.perf_counter() - self._started,
+            "reason": self._reason.value if self._reason else None,
+        }
+
+    def restore_state(self, state: Dict[str, Any]) -> None:
+        """Restore the state returned by ``checkpoint_state``.
+
+        Wall-clock time spent before the checkpoint still counts against ``max_wall_clock``.
+        """
+        self._turns = state.get("turns", 0)
+        self._tokens = state.get("tokens", 0)
+        self._seen_messages = state.get("seen_messages", 0)
+        self._last_digest = state.get("last_digest")
+        self._started = time.perf_counter() - state.get("elapsed", 0.0)
+        self._reason = TerminationReason(state["reason"]) if state.get("reason") else None
+
+    async def _has_converged(self) -> bool:
+        digest = workspace_digest(self._execution_plugin.base_path)
+        previous, self._last_digest = self._last_digest, digest
+        if digest != previous or digest == _EMPTY_WORKSPACE_DIGEST:
+            return False
+        await self._execution_plugin.ensure_initialized()
+        result = await self._execution_plugin.run_validate()
+        return not isinstance(result, str) and result.ok
+
+    def _terminate(self, reason: TerminationReason) -> bool:
+        self._reason = reason
+        logger.info(f"Terminating after {self._turns} turns and {self._tokens} tokens: {reason.value}")
+        return True
+
 
-        return False 
\ No newline at end of file
+def _usage_tokens(message: ChatMessageContent) -> int:
+    usage = message.metadata.get("usage") if message.metadata else None
+    if usage is None:
+        return 0
+    prompt = getattr(usage, "prompt_tokens", None)
+    completion = getattr(usage, "completion_tokens", None)
+    if isinstance(usage, dict):
+        prompt, completion = usage.get("prompt_tokens"), usage.get("completion_tokens")
+    return (prompt or 0) + (completion or 0)
@@ -1,20 +1,28 @@
+from __future__ import annotations
+
+import argparse
 import asyncio
+import json
 import logging
 import os
+import sys
+import time
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any, Awaitable, Callable, TextIO
 
 from dotenv import load_dotenv
-from opentelemetry import trace
-from opentelemetry.sdk.resources import Resource
-from opentelemetry.semconv.resource import ResourceAttributes
-
-from agents import TerraformValidationAgent, TerraformCreationAgent, UserAgent
-from custom_selection_strategy import CustomSelectionStrategy
-from custom_termination_strategy import CustomTerminationStrategy
-from plugins import TerraformFilePlugin, TerraformExecutionPlugin, UserPlugin
-from semantic_kernel.agents import AgentGroupChat
-from semantic_kernel.contents import AuthorRole, ChatMessageContent
-from semantic_kernel.connectors.ai.open_ai import AzureChatCompletion
-from semantic_kernel.kernel import Kernel
+
+from telemetry import EXPORTERS, set_up_telemetry, shut_down_telemetry
+
+# Semantic Kernel, the agents and the OpenAI connector take about a second to import, so
+# they are imported where they are first used: ``--help`` and argument errors return at
+# once, and the connector is only loaded when the first agent calls the model.
+if TYPE_CHECKING:
+    from agents import ResponseCache
+    from plugins import ScoreWeights
+    from semantic_kernel.agents import Agent
+    from semantic_kernel.agents.strategies.selection.selection_strategy import SelectionStrategy
+    from semantic_kernel.agents.strategies.termination.termination_strategy import TerminationStrategy
 
 TASK = """
 Create a Terraform file to deploy a simple web application on AWS.
@@ -37,115 +45,686 @@ AZURE_OPENAI_ENDPOINT = os.getenv("AZURE_OPENAI_ENDPOINT")
 AZURE_OPENAI_API_KEY = os.getenv("AZURE_OPENAI_API_KEY")
 AZURE_OPENAI_DEPLOYMENT_NAME = os.getenv("AZURE_OPENAI_DEPLOYMENT_NAME")
 AZURE_APP_INSIGHTS_CONNECTION_STRING = os.getenv("AZURE_APP_INSIGHTS_CONNECTION_STRING")
+SERVICE_NAME = "Terraform Generator"
+REVIEW_PANEL_NAME = "ReviewPanel"
+
 
-resource = Resource.create({ResourceAttributes.SERVICE_NAME: "Terraform Generator"})
+def configure_chat_service(model: str = "azure_openai") -> None:
+    """Choose the chat service of every agent created without one.
 
+    ``azure_openai`` uses the ``AZURE_OPENAI_*`` settings. ``openai`` reads ``OPENAI_API_KEY``
+    and ``OPENAI_CHAT_MODEL_ID`` and honours ``OPENAI_BASE_URL``, so any OpenAI-compatible
+    endpoint, such as a local model server or stub, can stand in for the model. The
+    service is built, and its connector imported, on the first model request.
+    """
+    from agents import Services, get_service_registry
 
-def set_up_tracing():
-    if not AZURE_APP_INSIGHTS_CONNECTION_STRING:
+    if Services(model) == Services.OPENAI:
+        get_service_registry().configure_default(Services.OPENAI, service_id="openai")
         return
+    get_service_registry().configure_default(
+        Services.AZURE_OPENAI,
+        service_id="azure_openai",
+        deployment_name=AZURE_OPENAI_DEPLOYMENT_NAME,
+        endpoint=AZURE_OPENAI_ENDPOINT,
+        api_key=AZURE_OPENAI_API_KEY,
+    )
 
-    from azure.monitor.opentelemetry.exporter import AzureMonitorTraceExporter
-    from opentelemetry.sdk.trace import TracerProvider
-    from opentelemetry.sdk.trace.export import BatchSpanProcessor
-    from opentelemetry.trace import set_tracer_provider
 
-    tracer_provider = TracerProvider(resource=resource)
-    tracer_provider.add_span_processor(
-        BatchSpanProcessor(
-            AzureMonitorTraceExporter(
-                connection_string=AZURE_APP_INSIGHTS_CONNECTION_STRING
-            )
+def configure_feedback(args: argparse.Namespace) -> None:
+    """Choose where the user agent's feedback comes from, as set by ``add_run_arguments``.
+
+    ``terminal`` asks on the terminal without blocking the other chats, ``file`` replays the
+    feedback recorded in ``--feedback-file`` and ``auto`` approves unless the configuration
+    breaks a rule of ``--feedback-policy`` (or the built-in policy). With
+    ``--feedback-timeout`` a request not answered in time gets ``--feedback-default``.
+    Without ``--feedback``, batches default to ``auto`` and single runs to ``terminal``.
+    """
+    from plugins import (
+        DEFAULT_POLICY,
+        NO_FEEDBACK,
+        PolicyFeedbackChannel,
+        RecordedFeedbackChannel,
+        TerminalFeedbackChannel,
+        TimeoutFeedbackChannel,
+        load_policy,
+        set_feedback_channel_factory,
+    )
+
+    if args.feedback_timeout is not None and args.feedback_timeout <= 0:
+        raise SystemExit("--feedback-timeout must be positive.")
+    if args.feedback is None:
+        args.feedback = "auto" if getattr(args, "batch", None) else "terminal"
+    if args.feedback == "file":
+        if not args.feedback_file:
+            raise SystemExit("--feedback file requires --feedback-file.")
+        try:
+            RecordedFeedbackChannel(args.feedback_file)
+        except (OSError, ValueError) as e:
+            raise SystemExit(f"--feedback-file: {e}")
+        factory = lambda: RecordedFeedbackChannel(args.feedback_file)  # noqa: E731
+    elif args.feedback == "auto":
+        try:
+            rules = load_policy(args.feedback_policy) if args.feedback_policy else DEFAULT_POLICY
+        except (OSError, ValueError) as e:
+            raise SystemExit(f"--feedback-policy: {e}")
+        factory = lambda: PolicyFeedbackChannel(rules)  # noqa: E731
+    else:
+        factory = TerminalFeedbackChannel
+
+    if args.feedback_timeout is None:
+        set_feedback_channel_factory(factory)
+    else:
+        set_feedback_channel_factory(
+            lambda: TimeoutFeedbackChannel(factory(), args.feedback_timeout, args.feedback_default or NO_FEEDBACK)
         )
+
+
+@dataclass
+class RunOptions:
+    """Settings shared by every task of a run."""
+
+    stream: bool = False
+    response_cache: ResponseCache | None = None
+    history_token_budget: int | None = None
+    selection: str = "validation"
+    termination: str = "convergence"
+    max_turns: int = 12
+    max_tokens: int | None = None
+    max_wall_clock: float | None = None
+    checkpoint: bool = True
+    resume: bool = False
+    review: str = "sequential"
+    candidates: int = 1
+    candidate_concurrency: int | None = None
+    score_weights: ScoreWeights | None = None
+
+
+def create_selection_strategy(
+    options: RunOptions, workspace: str, feedback_sink: Callable[[str], Awaitable[None]]
+) -> SelectionStrategy:
+    from custom_selection_strategy import CustomSelectionStrategy, ValidationDrivenSelectionStrategy
+    from plugins import get_plugin_registry
+
+    if options.selection == "round-robin":
+        return CustomSelectionStrategy()
+    return ValidationDrivenSelectionStrategy(
+        get_plugin_registry(workspace).instance("terraform_execution"),
+        feedback_sink=feedback_sink,
+        # The panel is the only reviewer in the chat: it is selected whenever the files changed.
+        **({"user_agent_name": REVIEW_PANEL_NAME} if options.review == "fan-out" else {}),
     )
-    set_tracer_provider(tracer_provider)
 
 
-def set_up_logging():
-    if not AZURE_APP_INSIGHTS_CONNECTION_STRING:
-        return
+def create_termination_strategy(options: RunOptions, workspace: str, agents: list) -> TerminationStrategy:
+    from custom_termination_strategy import ConvergenceTerminationStrategy, CustomTerminationStrategy
+    from plugins import get_plugin_registry
+
+    if options.termination == "single-pass":
+        return CustomTerminationStrategy(agents=agents, max_turns=options.max_turns)
+    return ConvergenceTerminationStrategy(
+        get_plugin_registry(workspace).instance("terraform_execution"),
+        max_turns=options.max_turns,
+        max_tokens=options.max_tokens,
+        max_wall_clock=options.max_wall_clock,
+    )
 
-    from azure.monitor.opentelemetry.exporter import AzureMonitorLogExporter
-    from opentelemetry._logs import set_logger_provider
-    from opentelemetry.sdk._logs import LoggerProvider, LoggingHandler
-    from opentelemetry.sdk._logs.export import BatchLogRecordProcessor
 
-    logger_provider = LoggerProvider(resource=resource)
-    logger_provider.add_log_record_processor(
-        BatchLogRecordProcessor(
-            AzureMonitorLogExporter(
-                connection_string=AZURE_APP_INSIGHTS_CONNECTION_STRING
+def create_agents(workspace: str = "terraform", options: RunOptions | None = None) -> list[Agent]:
+    """Create the agents of a group chat working on ``workspace``.
+
+    The agents resolve the chat service chosen with ``configure_chat_service`` when they
+    first call the model. They keep no per-chat state, so one set can serve consecutive
+    tasks in the same workspace. With ``options.review`` set to ``fan-out`` the user and
+    validation agents are put on a ``ReviewPanel``, which runs them side by side. With
+    ``options.candidates`` above one the creation agent is a ``CandidatePanel``, which
+    generates that many configurations on each turn and keeps the best.
+    """
+    from agents import (
+        CandidatePanel,
+        ReviewPanel,
+        TerraformCreationAgent,
+        TerraformValidationAgent,
+        TokenBudgetReducer,
+        TokenCounter,
+        UserAgent,
+    )
+
+    options = options or RunOptions()
+
+    def configure(agent: Agent) -> Agent:
+        agent.response_cache = options.response_cache
+        if options.history_token_budget:
+            agent.history_reducer = TokenBudgetReducer(
+                max_tokens=options.history_token_budget, counter=TokenCounter(AZURE_OPENAI_DEPLOYMENT_NAME)
             )
+        return agent
+
+    if options.candidates > 1:
+        creation_agent = CandidatePanel(
+            workspace,
+            options.candidates,
+            agent_factory=lambda path: configure(TerraformCreationAgent(base_path=path)),
+            weights=options.score_weights,
+            concurrency=options.candidate_concurrency,
         )
-    )
-    set_logger_provider(logger_provider)
+    else:
+        creation_agent = configure(TerraformCreationAgent(base_path=workspace))
+    agents = [
+        creation_agent,
+        configure(UserAgent(base_path=workspace)),
+        configure(TerraformValidationAgent(base_path=workspace)),
+    ]
+    if options.review == "fan-out":
+        return [agents[0], ReviewPanel(agents[1:], name=REVIEW_PANEL_NAME)]
+    return agents
 
-    handler = LoggingHandler()
-    logger = logging.getLogger()
-    logger.addHandler(handler)
-    logger.setLevel(logging.INFO)
 
+async def run_task(
+    task: str,
+    workspace: str = "terraform",
+    verbose: bool = True,
+    options: RunOptions | None = None,
+    agents: list[Agent] | None = None,
+    on_turn: Callable[[str, int], None] | None = None,
+) -> dict[str, Any]:
+    """Run one generation task through its own group chat and workspace.
 
-async def main():
-    if AZURE_APP_INSIGHTS_CONNECTION_STRING:
-        set_up_tracing()
-        set_up_logging()
+    The workspace is recorded in a ``RevisionStore`` after every agent turn, and the
+    generated files are returned from its latest revision. Unless checkpointing is off,
+    each turn is also appended to a ``CheckpointStore``. With ``options.resume`` the chat
+    continues from the workspace's last checkpoint: its history, strategy state and files
+    are restored, and only the turns after it call the model.
 
-    # Initialize the kernel with Azure OpenAI
-    kernel = Kernel()
-    kernel.add_service(
-        AzureChatCompletion(
-            service_id="azure_openai",
-            deployment_name=AZURE_OPENAI_DEPLOYMENT_NAME,
-            endpoint=AZURE_OPENAI_ENDPOINT,
-            api_key=AZURE_OPENAI_API_KEY,
-        )
-    )
+    Args:
+        task: The generation task.
+        workspace: The directory the agents write to.
+        verbose: Print each agent turn.
+        options: Settings shared by every task of a run.
+        agents: Agents to reuse, bound to ``workspace``; created with ``create_agents`` if
+            omitted.
+        on_turn: Called after each agent turn with the agent's name and the revision
+            number the workspace is at.
 
-    # Add plugins
-    terraform_file_plugin = TerraformFilePlugin()
-    terraform_execution_plugin = TerraformExecutionPlugin()
-    user_plugin = UserPlugin()
+    Returns:
+        The generated files, the revision they were taken from, the number of agent turns,
+        the tokens each agent's function definitions add to its requests and the wall-clock
+        time. With a ``CandidatePanel``, also the scores of its candidates on each of its
+        turns.
 
-    kernel.add_plugin(terraform_file_plugin, "terraform_file")
-    kernel.add_plugin(terraform_execution_plugin, "terraform_execution")
-    kernel.add_plugin(user_plugin, "user")
+    Raises:
+        ValueError: If the checkpoint being resumed belongs to a different task.
+    """
+    from agents import CandidatePanel
+    from checkpoint import CheckpointStore
+    from plugins import RevisionStore, get_plugin_registry
+    from semantic_kernel.agents import AgentGroupChat
+    from semantic_kernel.contents import AuthorRole, ChatMessageContent
+    from streaming import StreamRenderer, stream_group_chat
 
-    tracer = trace.get_tracer(__name__)
-    with tracer.start_as_current_span("main"):
-        agents = [
-            TerraformCreationAgent(),
-            UserAgent(),
-            TerraformValidationAgent(),
-        ]
-
-        # Initialize agents with the kernel
-        for agent in agents:
-            agent._chat_completion_service = kernel.get_service("azure_openai")
-            agent._kernel = kernel  # Pass the kernel to agents
-
-        group_chat = AgentGroupChat(
-            agents=agents,
-            termination_strategy=CustomTerminationStrategy(agents=agents),
-            selection_strategy=CustomSelectionStrategy(),
+    options = options or RunOptions()
+    start = time.perf_counter()
+    revisions = RevisionStore(workspace)
+    agents = agents or create_agents(workspace, options)
+    registry = get_plugin_registry(workspace)
+    if "user" in registry.factories:
+        # Reused agents share the workspace's user plugin; every task starts its feedback over.
+        registry.instance("user").reset_channel()
+    checkpoints = CheckpointStore(workspace) if options.checkpoint else None
+    checkpoint = checkpoints.load() if checkpoints is not None and options.resume else None
+    if checkpoint is not None and checkpoint.task != task.strip():
+        raise ValueError(f"The checkpoint in {workspace} is for a different task; run without --resume to start over.")
+    panel = next((agent for agent in agents if isinstance(agent, CandidatePanel)), None)
+    candidate_scores: list[list[dict[str, Any]]] = []
+
+    def record_turn(agent_name: str) -> None:
+        revision = revisions.snapshot(agent=agent_name)
+        if panel is not None and agent_name == panel.name:
+            candidate_scores.append([score.to_dict() for score in panel.last_scores])
+        if checkpoints is not None:
+            checkpoints.record_turn(
+                agent_name,
+                group_chat.history.messages,
+                revision=revision.id,
+                strategies={
+                    "selection": group_chat.selection_strategy.checkpoint_state(),
+                    "termination": group_chat.termination_strategy.checkpoint_state(),
+                },
+            )
+        if on_turn is not None:
+            on_turn(agent_name, revision.number)
+
+    async def post_validation_errors(errors: str) -> None:
+        await group_chat.add_chat_message(
+            ChatMessageContent(role=AuthorRole.USER, name="TerraformValidator", content=errors)
         )
+
+    group_chat = AgentGroupChat(
+        agents=agents,
+        termination_strategy=create_termination_strategy(options, workspace, agents),
+        selection_strategy=create_selection_strategy(options, workspace, post_validation_errors),
+    )
+    turns = 0
+    if checkpoint is not None:
+        target = revisions.get(checkpoint.revision) if checkpoint.revision else None
+        if target is not None and (revisions.head is None or revisions.head.tree != target.tree):
+            # The process may have died mid-turn, after editing files it never checkpointed.
+            revisions.rollback(target.id, agent="resume")
+        await group_chat.add_chat_messages(checkpoint.messages)
+        group_chat.selection_strategy.restore_state(checkpoint.strategies.get("selection", {}))
+        group_chat.termination_strategy.restore_state(checkpoint.strategies.get("termination", {}))
+        group_chat.is_complete = checkpoint.finished
+        checkpoints.resume(checkpoint)
+        turns = checkpoint.turns
+    elif checkpoints is not None:
+        checkpoints.start(task.strip())
+    if not group_chat.history.messages:
         await group_chat.add_chat_message(
             ChatMessageContent(
                 role=AuthorRole.USER,
-                content=TASK.strip(),
+                content=task.strip(),
             )
         )
 
+    time_to_first_token: list[float | None] = []
+    if group_chat.is_complete:
+        # A run that had already finished was resumed: its result is in the workspace.
+        pass
+    elif options.stream:
+        turn_stats = await stream_group_chat(
+            group_chat, StreamRenderer(), on_turn_end=lambda agent: record_turn(agent.name)
+        )
+        turns += len(turn_stats)
+        time_to_first_token = [turn.time_to_first_token for turn in turn_stats]
+    else:
         async for response in group_chat.invoke():
-            print(f"==== {response.name} just responded ====")
+            turns += 1
+            record_turn(response.name)
+            if verbose:
+                print(f"==== {response.name} just responded ====")
+
+    termination_reason = _termination_reason(group_chat.termination_strategy, group_chat.is_complete)
+    if checkpoints is not None:
+        if not (checkpoint is not None and checkpoint.finished):
+            checkpoints.finish(termination_reason)
+        checkpoints.close()
+
+    head = revisions.head
+    return {
+        "workspace": workspace,
+        "files": revisions.files(),
+        "revision": head.id if head else None,
+        "revisions": head.number if head else 0,
+        "turns": turns,
+        "termination_reason": termination_reason,
+        "tool_schema_tokens": _tool_schema_tokens(agents),
+        **({"candidate_scores": candidate_scores} if panel is not None else {}),
+        **({"time_to_first_token_seconds": time_to_first_token} if options.stream else {}),
+        "wall_clock_seconds": round(time.perf_counter() - start, 3),
+    }
+
+
+def _tool_schema_tokens(agents: list[Agent]) -> dict[str, int]:
+    """Tokens the function definitions add to each model request, by agent."""
+    from agents import TokenCounter
+
+    counter = TokenCounter(AZURE_OPENAI_DEPLOYMENT_NAME)
+    # A panel makes no requests itself; its reviewers or candidates do.
+    members = [
+        member
+        for agent in agents
+        for member in getattr(agent, "reviewers", None) or getattr(agent, "candidates", None) or [agent]
+    ]
+    return {agent.name: agent.tool_schema_tokens(counter) for agent in members}
+
+
+def _termination_reason(strategy: TerminationStrategy, is_complete: bool) -> str:
+    from custom_termination_strategy import ConvergenceTerminationStrategy
+
+    if isinstance(strategy, ConvergenceTerminationStrategy) and strategy.termination_reason is not None:
+        return strategy.termination_reason.value
+    return "completed" if is_complete else "max_iterations"
+
+
+def read_tasks(source: str) -> list[dict[str, Any]]:
+    """Read tasks from a JSONL file, or stdin when ``source`` is ``-``.
+
+    Each line is either a JSON object with a ``task`` field (and an optional ``id``)
+    or a bare JSON string. Tasks without an id get ``task-<line number>``.
+
+    Raises:
+        ValueError: If a line is not a JSON object or string, has no task, or two tasks
+            would share a workspace.
+    """
+    stream = sys.stdin if source == "-" else open(source, "r")
+    tasks: list[dict[str, Any]] = []
+    # workspace name -> line of the task that uses it
+    workspaces: dict[str, int] = {}
+    try:
+        for line_number, line in enumerate(stream, start=1):
+            if not line.strip():
+                continue
+            try:
+                entry = json.loads(line)
+            except json.JSONDecodeError as error:
+                raise ValueError(f"Line {line_number} of {source} is not valid JSON: {error}") from error
+            if isinstance(entry, str):
+                entry = {"task": entry}
+            if not isinstance(entry, dict):
+                raise ValueError(f"Line {line_number} of {source} is neither a JSON object nor a string.")
+            if "task" not in entry:
+                raise ValueError(f"Line {line_number} of {source} has no 'task' field.")
+            entry.setdefault("id", f"task-{line_number}")
+            name = task_workspace_name(entry["id"])
+            if name in workspaces:
+                raise ValueError(
+                    f"Line {line_number} of {source} has id {entry['id']!r}, which uses the same workspace "
+                    f"as the task on line {workspaces[name]}; give every task a distinct id."
+                )
+            workspaces[name] = line_number
+            tasks.append(entry)
+    finally:
+        if stream is not sys.stdin:
+            stream.close()
+    return tasks
+
+
+def task_workspace_name(task_id: Any) -> str:
+    """The name of a task's workspace directory under the workspace root.
+
+    Path separators become underscores, so the workspace is always a direct child of the root.
+
+    Raises:
+        ValueError: If the id would name the root itself or its parent.
+    """
+    name = str(task_id)
+    for separator in filter(None, (os.sep, os.altsep)):
+        name = name.replace(separator, "_")
+    if name in ("", ".", ".."):
+        raise ValueError(f"Task id {task_id!r} cannot be used as a workspace name.")
+    return name
+
+
+async def run_batch(
+    tasks: list[dict[str, Any]],
+    concurrency: int,
+    workspace_root: str,
+    output: TextIO,
+    options: RunOptions | None = None,
+) -> dict[str, Any]:
+    """Run many tasks concurrently, at most ``concurrency`` group chats at a time.
+
+    Every task gets its own workspace under ``workspace_root`` so concurrent chats never
+    write to the same files. One JSON result line is written to ``output`` per task as it
+    finishes, and the aggregate throughput is returned.
+    """
+    semaphore = asyncio.Semaphore(concurrency)
+    start = time.perf_counter()
+
+    async def worker(entry: dict[str, Any]) -> dict[str, Any]:
+        async with semaphore:
+            workspace = os.path.join(workspace_root, task_workspace_name(entry["id"]))
+            try:
+                result = await run_task(entry["task"], workspace=workspace, verbose=False, options=options)
+                result["status"] = "succeeded"
+            except Exception as e:
+                logging.getLogger(__name__).exception("Task %s failed", entry["id"])
+                result = {"workspace": workspace, "status": "failed", "error": str(e)}
+            result["id"] = entry["id"]
+            output.write(json.dumps(result) + "\n")
+            output.flush()
+            return result
+
+    results = await asyncio.gather(*(worker(entry) for entry in tasks))
+    elapsed = time.perf_counter() - start
+    succeeded = [r for r in results if r["status"] == "succeeded"]
+    return {
+        "tasks": len(results),
+        "succeeded": len(succeeded),
+        "failed": len(results) - len(succeeded),
+        "concurrency": concurrency,
+        "wall_clock_seconds": round(elapsed, 3),
+        "tasks_per_minute": round(len(results) / elapsed * 60, 2) if elapsed else 0.0,
+        "mean_task_seconds": round(sum(r["wall_clock_seconds"] for r in succeeded) / len(succeeded), 3)
+        if succeeded
+        else 0.0,
+    }
+
+
+def add_run_arguments(parser: argparse.ArgumentParser) -> None:
+    """Add the options that shape how each task runs, shared with ``service.py``."""
+    parser.add_argument(
+        "--selection",
+        choices=["validation", "round-robin"],
+        default="validation",
+        help="How the next agent is chosen: from local validate/fmt results, or in fixed order.",
+    )
+    parser.add_argument(
+        "--termination",
+        choices=["convergence", "single-pass"],
+        default="convergence",
+        help="Stop once the files validate and stop changing, or after one pass through the agents.",
+    )
+    parser.add_argument(
+        "--review",
+        choices=["sequential", "fan-out"],
+        default="sequential",
+        help="Run the user and validation agents one turn each, or together on the same snapshot "
+        "with their findings merged into one message.",
+    )
+    parser.add_argument(
+        "--candidates",
+        type=int,
+        default=1,
+        metavar="N",
+        help="Generate N configurations on each creation turn, each in its own workspace with its own "
+        "temperature and seed, and keep the one that scores best on local checks.",
+    )
+    parser.add_argument(
+        "--candidate-concurrency",
+        type=int,
+        metavar="N",
+        help="Generate at most N candidates at once (default: all of them).",
+    )
+    parser.add_argument(
+        "--score-weights",
+        metavar="WEIGHTS",
+        help="Weights of the candidate checks as name=value pairs, e.g. 'check=1,validate=2,fmt=0.5,coverage=1' "
+        "(the defaults).",
+    )
+    parser.add_argument(
+        "--feedback",
+        choices=["terminal", "file", "auto"],
+        help="Where the user agent's feedback comes from: the terminal, the recorded feedback in "
+        "--feedback-file, or an approver that applies --feedback-policy (default: auto with --batch, "
+        "otherwise terminal).",
+    )
+    parser.add_argument(
+        "--feedback-file",
+        metavar="FILE",
+        help="JSON Lines file of recorded feedback, one JSON string per request, replayed in order for each task.",
+    )
+    parser.add_argument(
+        "--feedback-policy",
+        metavar="FILE",
+        help="JSON list of {\"pattern\": ..., \"response\": ...} rules for --feedback auto (default: flag "
+        "hard-coded credentials and TODOs).",
+    )
+    parser.add_argument(
+        "--feedback-timeout",
+        type=float,
+        metavar="SECONDS",
+        help="Answer a feedback request with --feedback-default if it is not answered within SECONDS.",
+    )
+    parser.add_argument(
+        "--feedback-default",
+        metavar="TEXT",
+        help="The answer to a feedback request that timed out (default: to continue without feedback).",
+    )
+    parser.add_argument("--max-turns", type=int, default=12, help="Maximum agent turns per task.")
+    parser.add_argument("--max-tokens", type=int, help="Maximum model tokens per task.")
+    parser.add_argument("--max-wall-clock", type=float, metavar="SECONDS", help="Maximum seconds per task.")
+    parser.add_argument(
+        "--history-token-budget",
+        type=int,
+        metavar="TOKENS",
+        help="Reduce the chat history sent to each agent to at most this many tokens.",
+    )
+    parser.add_argument(
+        "--response-cache", metavar="PATH", help="Cache model responses in this SQLite file and reuse them."
+    )
+    parser.add_argument(
+        "--replay",
+        action="store_true",
+        help="Only serve model responses recorded in --response-cache; fail instead of calling the model.",
+    )
+    parser.add_argument(
+        "--resume",
+        action="store_true",
+        help="Continue each task from the last checkpoint in its workspace instead of starting over.",
+    )
+    parser.add_argument(
+        "--no-checkpoint",
+        dest="checkpoint",
+        action="store_false",
+        help="Do not record a checkpoint after every agent turn.",
+    )
+    parser.add_argument(
+        "--model",
+        choices=["azure_openai", "openai"],
+        default="azure_openai",
+        help="The chat service: Azure OpenAI, or OpenAI and any OpenAI-compatible endpoint set in OPENAI_BASE_URL.",
+    )
+    parser.add_argument(
+        "--telemetry",
+        choices=EXPORTERS,
+        help="Where to send traces and metrics (default: Application Insights if configured, otherwise nowhere).",
+    )
+    parser.add_argument(
+        "--telemetry-file",
+        metavar="FILE",
+        default="telemetry.jsonl",
+        help="File that --telemetry file appends spans and metrics to, one JSON object per line.",
+    )
+
+
+def options_from_args(args: argparse.Namespace) -> RunOptions:
+    """Build the ``RunOptions`` described by the arguments added by ``add_run_arguments``."""
+    from agents import CacheMode, ResponseCache
+    from plugins import ScoreWeights
+
+    if args.replay and not args.response_cache:
+        raise SystemExit("--replay requires --response-cache.")
+    if args.resume and not args.checkpoint:
+        raise SystemExit("--resume cannot be combined with --no-checkpoint.")
+    if args.candidates < 1:
+        raise SystemExit("--candidates must be at least 1.")
+    if args.candidate_concurrency is not None and args.candidate_concurrency < 1:
+        raise SystemExit("--candidate-concurrency must be at least 1.")
+    try:
+        score_weights = ScoreWeights.parse(args.score_weights) if args.score_weights else None
+    except ValueError as e:
+        raise SystemExit(f"--score-weights: {e}")
+    return RunOptions(
+        stream=getattr(args, "stream", False),
+        response_cache=ResponseCache(
+            path=args.response_cache, mode=CacheMode.REPLAY if args.replay else CacheMode.READ_WRITE
+        )
+        if args.response_cache
+        else None,
+        history_token_budget=args.history_token_budget,
+        selection=args.selection,
+        termination=args.termination,
+        max_turns=args.max_turns,
+        max_tokens=args.max_tokens,
+        max_wall_clock=args.max_wall_clock,
+        checkpoint=args.checkpoint,
+        resume=args.resume,
+        review=args.review,
+        candidates=args.candidates,
+        candidate_concurrency=args.candidate_concurrency,
+        score_weights=score_weights,
+    )
+
+
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Generate Terraform configurations with AI agents.")
+    parser.add_argument(
+        "--batch", metavar="FILE", help="Run the tasks in a JSONL file ('-' for stdin) instead of the built-in task."
+    )
+    parser.add_argument("--concurrency", type=int, default=4, help="Group chats to run at once in batch mode.")
+    parser.add_argument(
+        "--workspace-root", default="terraform", help="Directory under which each batch task gets a workspace."
+    )
+    parser.add_argument("--output", metavar="FILE", help="Write batch results as JSONL to this file (default: stdout).")
+    parser.add_argument(
+        "--stream", action="store_true", help="Stream tokens and tool calls as they happen (single-task mode)."
+    )
+    parser.add_argument(
+        "--export", metavar="DIR", help="Copy the final revision of the workspace to this directory (single-task mode)."
+    )
+    add_run_arguments(parser)
+    args = parser.parse_args(argv)
+    if args.batch and args.stream:
+        # Streamed replies go to stdout, where batch mode writes its JSONL results.
+        parser.error("--stream is for single-task mode; it cannot be combined with --batch")
+    return args
+
+
+async def main(argv: list[str] | None = None):
+    args = parse_args(argv)
+
+    exporter = args.telemetry or ("azure" if AZURE_APP_INSIGHTS_CONNECTION_STRING else None)
+    if exporter:
+        set_up_telemetry(
+            exporter, SERVICE_NAME, connection_string=AZURE_APP_INSIGHTS_CONNECTION_STRING, path=args.telemetry_file
+        )
+
+    from agents import get_service_registry
+    from opentelemetry import trace
+
+    configure_feedback(args)
+    configure_chat_service(args.model)
+    tracer = trace.get_tracer(__name__)
+    try:
+        with tracer.start_as_current_span("main"):
+            await _run(args)
+    finally:
+        await get_service_registry().close()
+        if exporter:
+            shut_down_telemetry()
+
+
+async def _run(args: argparse.Namespace):
+    from plugins import RevisionStore
+
+    options = options_from_args(args)
+
+    if args.batch:
+        if args.concurrency < 1:
+            raise SystemExit("--concurrency must be at least 1.")
+        try:
+            tasks = read_tasks(args.batch)
+        except (OSError, ValueError) as error:
+            raise SystemExit(f"Cannot read the tasks: {error}") from error
+        output = open(args.output, "w") if args.output else sys.stdout
+        try:
+            summary = await run_batch(tasks, args.concurrency, args.workspace_root, output, options)
+        finally:
+            if output is not sys.stdout:
+                output.close()
+        print(json.dumps({"summary": summary}), file=sys.stderr)
+        return
 
-        content_history: list[ChatMessageContent] = []
-        async for message in group_chat.get_chat_messages(agent=agents[0]):
-            if message.name == agents[0].name:
-                content_history.append(message)
+    result = await run_task(TASK, workspace=args.workspace_root, options=options)
 
-        print("Final Terraform configuration:")
-        print(content_history[0].content)
+    print(f"Final Terraform configuration (revision {result['revisions']}):")
+    for filename, content in result["files"].items():
+        print(f"# ---- {filename} ----")
+        print(content)
+    if args.export:
+        for path in RevisionStore(args.workspace_root).export(args.export, result["revision"]):
+            print(f"Exported {path}")
 
 
 if __name__ == "__main__":
@@ -3,14 +3,99 @@ Plugins for Terraform Generation
 
 This package contains plugins that provide functionality for
 managing Terraform files and interacting with users.
+
+Exports are imported on first access, so a process only pays for the plugins it uses.
 """
 
-from .terraform_file_plugin import TerraformFilePlugin
-from .terraform_execution_plugin import TerraformExecutionPlugin
-from .user_plugin import UserPlugin
+from importlib import import_module
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    from .candidate_scoring import CandidateScore, ScoreWeights, score_workspace
+    from .concurrency import Access, WorkspaceLock, concurrent_plugin, function_access, tool_access
+    from .feedback import (
+        DEFAULT_POLICY,
+        NO_FEEDBACK,
+        FeedbackChannel,
+        FeedbackRule,
+        PolicyFeedbackChannel,
+        RecordedFeedbackChannel,
+        TerminalFeedbackChannel,
+        TimeoutFeedbackChannel,
+        load_policy,
+        set_feedback_channel_factory,
+    )
+    from .file_cache import FileCache, FileCacheStats
+    from .hcl_checker import Diagnostic
+    from .patching import PatchConflictError
+    from .registry import PluginRegistry, get_plugin_registry
+    from .revision_store import FileChange, Revision, RevisionStore
+    from .snippet_index import IndexUpdate, SnippetIndex, SnippetMatch, get_snippet_index
+    from .snippet_library_plugin import SnippetLibraryPlugin
+    from .terraform_diagnostics import TerraformDiagnostic, ValidationReport, format_validation, parse_validate
+    from .terraform_execution_plugin import TerraformExecutionPlugin
+    from .terraform_file_plugin import TerraformFilePlugin
+    from .terraform_result_cache import CacheStats, TerraformResultCache
+    from .terraform_runner import CommandResult, TerraformRunner
+    from .user_plugin import UserPlugin
+
+# Export name -> submodule that defines it.
+_EXPORTS = {
+    "TerraformFilePlugin": "terraform_file_plugin",
+    "PatchConflictError": "patching",
+    "FileCache": "file_cache",
+    "FileCacheStats": "file_cache",
+    "TerraformExecutionPlugin": "terraform_execution_plugin",
+    "Diagnostic": "hcl_checker",
+    "TerraformDiagnostic": "terraform_diagnostics",
+    "ValidationReport": "terraform_diagnostics",
+    "parse_validate": "terraform_diagnostics",
+    "format_validation": "terraform_diagnostics",
+    "TerraformRunner": "terraform_runner",
+    "CommandResult": "terraform_runner",
+    "TerraformResultCache": "terraform_result_cache",
+    "CacheStats": "terraform_result_cache",
+    "RevisionStore": "revision_store",
+    "Revision": "revision_store",
+    "FileChange": "revision_store",
+    "UserPlugin": "user_plugin",
+    "FeedbackChannel": "feedback",
+    "TerminalFeedbackChannel": "feedback",
+    "RecordedFeedbackChannel": "feedback",
+    "PolicyFeedbackChannel": "feedback",
+    "TimeoutFeedbackChannel": "feedback",
+    "FeedbackRule": "feedback",
+    "DEFAULT_POLICY": "feedback",
+    "NO_FEEDBACK": "feedback",
+    "load_policy": "feedback",
+    "set_feedback_channel_factory": "feedback",
+    "SnippetLibraryPlugin": "snippet_library_plugin",
+    "SnippetIndex": "snippet_index",
+    "SnippetMatch": "snippet_index",
+    "IndexUpdate": "snippet_index",
+    "get_snippet_index": "snippet_index",
+    "Access": "concurrency",
+    "WorkspaceLock": "concurrency",
+    "concurrent_plugin": "concurrency",
+    "function_access": "concurrency",
+    "tool_access": "concurrency",
+    "PluginRegistry": "registry",
+    "get_plugin_registry": "registry",
+    "CandidateScore": "candidate_scoring",
+    "ScoreWeights": "candidate_scoring",
+    "score_workspace": "candidate_scoring",
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name: str) -> Any:
+    if name not in _EXPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(import_module(f".{_EXPORTS[name]}", __name__), name)
+    globals()[name] = value
+    return value
+
 
-__all__ = [
-    "TerraformFilePlugin",
-    "TerraformExecutionPlugin",
-    "UserPlugin",
-] 
\ No newline at end of file
+def __dir__() -> list[str]:
+    return sorted(set(globals()) | set(__all__))
@@ -0,0 +1,161 @@
+# Copyright (c) Microsoft. All rights reserved.
+
+import os
+import re
+from dataclasses import asdict, dataclass, field, fields
+from functools import lru_cache
+from typing import TYPE_CHECKING, Any
+
+from .terraform_diagnostics import parse_fmt_diff, parse_validate
+from .terraform_result_cache import _tf_files
+from .terraform_runner import CommandResult
+
+if TYPE_CHECKING:
+    from .terraform_execution_plugin import TerraformExecutionPlugin
+
+# A numbered item of the task, e.g. "1. VPC with public and private subnets".
+_COMPONENT = re.compile(r"^\s*\d+[.)]\s+(.+?)\s*$", re.MULTILINE)
+_WORD = re.compile(r"[a-z0-9]+")
+_STOP_WORDS = {
+    "a", "an", "and", "the", "with", "for", "from", "into", "on", "of", "to", "in", "by", "or",
+    "allowing", "running", "based", "using",
+}
+# Changed lines in the fmt diff that halve the fmt score.
+_FMT_HALVING_LINES = 10
+
+
+@dataclass(frozen=True)
+class ScoreWeights:
+    """How much each local check counts towards a candidate's score."""
+
+    check: float = 1.0
+    validate: float = 2.0
+    fmt: float = 0.5
+    coverage: float = 1.0
+
+    @classmethod
+    def parse(cls, spec: str) -> "ScoreWeights":
+        """Parse weights written as ``name=value`` pairs, e.g. ``validate=3,fmt=0``.
+
+        Weights that are not named keep their default.
+
+        Raises:
+            ValueError: If a name is unknown or a value is not a number.
+        """
+        names = {f.name for f in fields(cls)}
+        values: dict[str, float] = {}
+        for pair in filter(None, (part.strip() for part in spec.split(","))):
+            name, _, value = pair.partition("=")
+            name = name.strip()
+            if name not in names:
+                raise ValueError(f"Unknown score weight {name!r}. Known weights: {', '.join(sorted(names))}.")
+            try:
+                values[name] = float(value)
+            except ValueError:
+                raise ValueError(f"Score weight {name!r} must be a number, not {value.strip()!r}.") from None
+        return cls(**values)
+
+
+@dataclass
+class CandidateScore:
+    """The local checks of one candidate configuration and the score they add up to."""
+
+    index: int
+    total: float = 0.0
+    files: int = 0
+    check_errors: int = 0
+    # None when Terraform could not be run.
+    validate_ok: bool | None = None
+    fmt_changed_lines: int | None = None
+    coverage: float = 0.0
+    missing_components: list[str] = field(default_factory=list)
+    # Set when the candidate's agent failed; such a candidate is never chosen.
+    error: str | None = None
+
+    def to_dict(self) -> dict[str, Any]:
+        return asdict(self)
+
+
+@lru_cache(maxsize=32)
+def task_components(task: str) -> tuple[tuple[str, tuple[str, ...]], ...]:
+    """The numbered components a task asks for, each with the keywords that identify it."""
+    components = []
+    for match in _COMPONENT.finditer(task):
+        description = match.group(1)
+        keywords = tuple(dict.fromkeys(w for w in _WORD.findall(description.lower()) if w not in _STOP_WORDS))
+        if keywords:
+            components.append((description, keywords))
+    return tuple(components)
+
+
+def component_coverage(task: str, files: dict[str, str]) -> tuple[float, list[str]]:
+    """How much of what the task asks for the files mention.
+
+    A component's coverage is the share of its keywords found in the files, names and
+    comments alike, so "Auto Scaling Group" is matched by ``aws_autoscaling_group``.
+
+    Returns:
+        The mean coverage of the components (1.0 if the task lists none) and the
+        components less than half covered.
+    """
+    components = task_components(task)
+    if not components:
+        return 1.0, []
+    text = "\n".join(files.values()).lower()
+    shares = []
+    missing = []
+    for description, keywords in components:
+        share = sum(keyword in text for keyword in keywords) / len(keywords)
+        shares.append(share)
+        if share < 0.5:
+            missing.append(description)
+    return sum(shares) / len(shares), missing
+
+
+async def score_workspace(
+    execution_plugin: "TerraformExecutionPlugin",
+    task: str,
+    weights: ScoreWeights | None = None,
+    index: int = 0,
+) -> CandidateScore:
+    """Score the configuration in a workspace with local checks only.
+
+    Each check contributes between 0 and its weight: the fast check by the number of
+    errors it finds, ``terraform validate`` if it passes, ``terraform fmt`` by the size of
+    the diff it would apply and the task's components by how many the files mention. An
+    empty workspace scores 0.
+    """
+    weights = weights or ScoreWeights()
+    base_path = execution_plugin.base_path
+    files = {}
+    for filename in _tf_files(base_path):
+        with open(os.path.join(base_path, filename), "r") as f:
+            files[filename] = f.read()
+    score = CandidateScore(index=index, files=len(files))
+    if not files:
+        return score
+
+    score.check_errors = sum(d.severity == "error" for d in execution_plugin.run_fast_check())
+    if not score.check_errors:
+        await execution_plugin.ensure_initialized()
+        validate = await execution_plugin.run_validate()
+        if isinstance(validate, CommandResult):
+            score.validate_ok = parse_validate(validate).valid
+        fmt = await execution_plugin.run_fmt_diff()
+        if isinstance(fmt, CommandResult) and fmt.returncode in (0, 3):
+            score.fmt_changed_lines = sum(parse_fmt_diff(fmt.stdout).values())
+    else:
+        # Terraform would only report the same errors.
+        score.validate_ok = False
+    score.coverage, score.missing_components = component_coverage(task, files)
+
+    formatted = 0.0
+    if score.fmt_changed_lines is not None:
+        formatted = 1 / (1 + score.fmt_changed_lines / _FMT_HALVING_LINES)
+    score.total = (
+        weights.check / (1 + score.check_errors)
+        + weights.validate * bool(score.validate_ok)
+        + weights.fmt * formatted
+        + weights.coverage * score.coverage
+    )
+    return score
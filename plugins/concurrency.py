@@ -0,0 +1,153 @@
+# Copyright (c) Microsoft. All rights reserved.
+
+import asyncio
+import functools
+import os
+import time
+import weakref
+from collections.abc import AsyncIterator, Callable
+from contextlib import asynccontextmanager
+from enum import Enum
+from inspect import iscoroutinefunction
+from typing import Any, TypeVar
+
+from opentelemetry import trace
+from semantic_kernel.functions import KernelFunctionFromMethod, KernelPlugin
+
+F = TypeVar("F", bound=Callable[..., Any])
+
+
+class Access(str, Enum):
+    """How a kernel function uses the workspace of its plugin."""
+
+    NONE = "none"  # does not touch the workspace
+    READ = "read"  # reads files or runs read-only commands
+    WRITE = "write"  # creates, edits or reformats files
+
+
+def tool_access(access: Access) -> Callable[[F], F]:
+    """Declare how a kernel function uses its plugin's workspace.
+
+    Functions without a declaration are treated as ``Access.WRITE``.
+    """
+
+    def decorator(func: F) -> F:
+        func.__tool_access__ = access  # type: ignore[attr-defined]
+        return func
+
+    return decorator
+
+
+def function_access(function: Any) -> Access:
+    """The workspace access of a kernel function, as ``concurrent_plugin`` enforces it.
+
+    Methods without a declaration count as ``Access.WRITE``; functions that are not
+    methods, such as prompt functions, do not touch the workspace.
+    """
+    method = getattr(function, "method", None)
+    if method is None:
+        return Access.NONE
+    return getattr(method, "__tool_access__", Access.WRITE)
+
+
+class WorkspaceLock:
+    """A readers-writer lock for one workspace.
+
+    Any number of readers may hold it at once; a writer holds it alone. Waiting writers
+    block new readers, so a stream of reads cannot starve an edit.
+    """
+
+    def __init__(self) -> None:
+        self._condition = asyncio.Condition()
+        self._readers = 0
+        self._writing = False
+        self._waiting_writers = 0
+
+    @asynccontextmanager
+    async def hold(self, access: Access) -> AsyncIterator[None]:
+        if access == Access.NONE:
+            yield
+            return
+        write = access == Access.WRITE
+        async with self._condition:
+            if write:
+                self._waiting_writers += 1
+                try:
+                    await self._condition.wait_for(lambda: not self._writing and self._readers == 0)
+                finally:
+                    self._waiting_writers -= 1
+                self._writing = True
+            else:
+                await self._condition.wait_for(lambda: not self._writing and self._waiting_writers == 0)
+                self._readers += 1
+        try:
+            yield
+        finally:
+            async with self._condition:
+                if write:
+                    self._writing = False
+                else:
+                    self._readers -= 1
+                self._condition.notify_all()
+
+
+# event loop -> workspace path -> lock; asyncio primitives cannot be shared across loops.
+_locks: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, dict[str, WorkspaceLock]]" = weakref.WeakKeyDictionary()
+
+
+def get_workspace_lock(base_path: str) -> WorkspaceLock:
+    """Return the lock shared by every plugin working on ``base_path`` in this event loop."""
+    locks = _locks.setdefault(asyncio.get_running_loop(), {})
+    key = os.path.abspath(base_path)
+    if key not in locks:
+        locks[key] = WorkspaceLock()
+    return locks[key]
+
+
+def concurrent_plugin(plugin_name: str, plugin: object, description: str | None = None) -> KernelPlugin:
+    """Create a kernel plugin whose functions can safely run concurrently.
+
+    Semantic Kernel runs the function calls of one model response concurrently, but a
+    synchronous kernel function blocks the event loop until it returns. Each function of
+    the returned plugin instead runs synchronous code on a worker thread, and holds its
+    plugin's workspace lock (from the plugin's ``base_path``) for the access declared
+    with ``tool_access``: reads and validations of a workspace overlap, while writes to it
+    run one at a time and never alongside a read.
+    """
+    kernel_plugin = KernelPlugin.from_object(plugin_name, plugin, description=description)
+    base_path = getattr(plugin, "base_path", None)
+    functions = [_guarded(function, base_path) for function in kernel_plugin.functions.values()]
+    return KernelPlugin(name=plugin_name, description=kernel_plugin.description, functions=functions)
+
+
+def _guarded(function: Any, base_path: str | None) -> Any:
+    if not isinstance(function, KernelFunctionFromMethod) or function.stream_method is not None:
+        return function
+    method = function.method
+    access = getattr(method, "__tool_access__", Access.WRITE) if base_path is not None else Access.NONE
+
+    @functools.wraps(method)
+    async def run(**kwargs: Any) -> Any:
+        if access == Access.NONE:
+            return await _call(method, kwargs)
+        queued = time.perf_counter()
+        async with get_workspace_lock(base_path).hold(access):
+            span = trace.get_current_span()
+            span.set_attribute("tool.access", access.value)
+            span.set_attribute("tool.lock_wait_seconds", time.perf_counter() - queued)
+            return await _call(method, kwargs)
+
+    run.__tool_access__ = access  # type: ignore[attr-defined]
+    return KernelFunctionFromMethod(
+        method=run,
+        plugin_name=function.plugin_name,
+        parameters=function.parameters,
+        return_parameter=function.return_parameter,
+        additional_metadata=function.metadata.additional_properties,
+    )
+
+
+async def _call(method: Callable[..., Any], kwargs: dict[str, Any]) -> Any:
+    if iscoroutinefunction(method):
+        return await method(**kwargs)
+    return await asyncio.to_thread(method, **kwargs)
@@ -0,0 +1,189 @@
+# Copyright (c) Microsoft. All rights reserved.
+
+import asyncio
+import json
+import logging
+import re
+import threading
+from abc import ABC, abstractmethod
+from collections.abc import Callable, Sequence
+from concurrent.futures import Future
+from dataclasses import dataclass
+
+logger = logging.getLogger(__name__)
+
+PROMPT = "Please provide feedback on the Terraform configuration:\n\n{content}\n\n> "
+# The answer when no feedback is available, e.g. after a timeout or when stdin is closed.
+NO_FEEDBACK = "The user gave no feedback. Continue with your best judgement."
+APPROVAL = "Approved. The configuration meets the requirements."
+
+# One prompt on the terminal at a time, whichever chat asks.
+_terminal_lock = threading.Lock()
+
+
+class FeedbackChannel(ABC):
+    """Where ``UserPlugin`` gets the user's feedback from."""
+
+    @abstractmethod
+    async def request(self, content: str) -> str:
+        """Present ``content`` and return the feedback on it."""
+
+
+class TerminalFeedbackChannel(FeedbackChannel):
+    """Asks on the terminal.
+
+    The prompt is read on a daemon thread, so the event loop keeps running the other chats
+    while the user types and an unanswered prompt does not hold up the process's exit.
+    Prompts of different chats are shown one at a time. A read abandoned by a timeout
+    stays on the terminal, and whatever the user types answers this channel's next request.
+    """
+
+    def __init__(self, prompt: str = PROMPT, input_func: Callable[[str], str] = input):
+        self.prompt = prompt
+        self.input_func = input_func
+        self._pending: Future[str] | None = None
+
+    async def request(self, content: str) -> str:
+        if self._pending is None:
+            self._pending = Future()
+            self._pending.set_running_or_notify_cancel()
+            threading.Thread(
+                target=self._read, args=(self.prompt.format(content=content), self._pending), daemon=True
+            ).start()
+        answer = await asyncio.wrap_future(self._pending)
+        self._pending = None
+        return answer
+
+    def _read(self, prompt: str, future: "Future[str]") -> None:
+        try:
+            with _terminal_lock:
+                answer = self.input_func(prompt)
+        except EOFError:
+            answer = NO_FEEDBACK
+        except BaseException as e:
+            future.set_exception(e)
+            return
+        future.set_result(answer)
+
+
+class RecordedFeedbackChannel(FeedbackChannel):
+    """Answers from feedback recorded in a file, for unattended runs.
+
+    The file is JSON Lines, one JSON string per request, answered in order. Once they are
+    used up every request gets ``fallback``.
+    """
+
+    def __init__(self, path: str, fallback: str = APPROVAL):
+        """Load the recorded feedback.
+
+        Raises:
+            OSError: If the file cannot be read.
+            ValueError: If a line is not a JSON string.
+        """
+        self.path = path
+        self.fallback = fallback
+        self.responses: list[str] = []
+        with open(path, "r", encoding="utf-8") as f:
+            for number, line in enumerate(f, start=1):
+                if not line.strip():
+                    continue
+                response = json.loads(line)
+                if not isinstance(response, str):
+                    raise ValueError(f"{path}:{number}: expected a JSON string, got {type(response).__name__}.")
+                self.responses.append(response)
+        self._next = 0
+
+    async def request(self, content: str) -> str:
+        if self._next >= len(self.responses):
+            return self.fallback
+        self._next += 1
+        return self.responses[self._next - 1]
+
+
+@dataclass(frozen=True)
+class FeedbackRule:
+    """Feedback given when a configuration matches ``pattern``, a case-insensitive regex."""
+
+    pattern: str
+    response: str
+
+    def matches(self, content: str) -> bool:
+        return re.search(self.pattern, content, re.IGNORECASE | re.MULTILINE) is not None
+
+
+DEFAULT_POLICY = (
+    FeedbackRule(
+        r'^\s*(password|secret|secret_key|access_key|token)\s*=\s*"[^"$]',
+        "Do not hard-code credentials; take them from variables marked sensitive.",
+    ),
+    FeedbackRule(r"\b(TODO|FIXME)\b", "Complete the TODO and FIXME placeholders."),
+)
+
+
+class PolicyFeedbackChannel(FeedbackChannel):
+    """Approves a configuration automatically unless it breaks one of ``rules``.
+
+    The responses of every rule the configuration matches are returned together, so one
+    round trip reports all of them.
+    """
+
+    def __init__(self, rules: Sequence[FeedbackRule] = DEFAULT_POLICY, approval: str = APPROVAL):
+        self.rules = list(rules)
+        self.approval = approval
+
+    async def request(self, content: str) -> str:
+        findings = [rule.response for rule in self.rules if rule.matches(content)]
+        return "\n".join(findings) if findings else self.approval
+
+
+def load_policy(path: str) -> list[FeedbackRule]:
+    """Read rules written as a JSON list of ``{"pattern": ..., "response": ...}`` objects.
+
+    Raises:
+        OSError: If the file cannot be read.
+        ValueError: If it is not such a list or a pattern is not a valid regex.
+    """
+    with open(path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    if not isinstance(data, list):
+        raise ValueError(f"{path}: expected a JSON list of rules.")
+    rules = []
+    for entry in data:
+        if not isinstance(entry, dict) or not {"pattern", "response"} <= entry.keys():
+            raise ValueError(f"{path}: each rule needs a pattern and a response.")
+        try:
+            re.compile(entry["pattern"])
+        except re.error as e:
+            raise ValueError(f"{path}: invalid pattern {entry['pattern']!r}: {e}") from e
+        rules.append(FeedbackRule(entry["pattern"], entry["response"]))
+    return rules
+
+
+class TimeoutFeedbackChannel(FeedbackChannel):
+    """Gives ``channel`` at most ``timeout`` seconds to answer, then answers ``default``."""
+
+    def __init__(self, channel: FeedbackChannel, timeout: float, default: str = NO_FEEDBACK):
+        self.channel = channel
+        self.timeout = timeout
+        self.default = default
+
+    async def request(self, content: str) -> str:
+        try:
+            return await asyncio.wait_for(self.channel.request(content), self.timeout)
+        except asyncio.TimeoutError:
+            logger.warning(f"No feedback within {self.timeout} seconds; answering with the default.")
+            return self.default
+
+
+_channel_factory: Callable[[], FeedbackChannel] = TerminalFeedbackChannel
+
+
+def set_feedback_channel_factory(factory: Callable[[], FeedbackChannel]) -> None:
+    """Choose how the user plugins created from now on get feedback; each gets its own channel."""
+    global _channel_factory
+    _channel_factory = factory
+
+
+def create_feedback_channel() -> FeedbackChannel:
+    """A channel from the configured factory; the terminal unless one was set."""
+    return _channel_factory()
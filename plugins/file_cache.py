@@ -0,0 +1,109 @@
+# Copyright (c) Microsoft. All rights reserved.
+
+import os
+from dataclasses import dataclass
+
+from .patching import atomic_write, atomic_write_many
+
+TERRAFORM_SUFFIXES = (".tf", ".tf.json", ".tfvars")
+
+
+@dataclass
+class FileCacheStats:
+    """How often file reads and directory listings were served from memory."""
+
+    hits: int = 0
+    misses: int = 0
+    index_hits: int = 0
+    index_misses: int = 0
+
+
+class FileCache:
+    """An in-memory copy of the Terraform files in a directory.
+
+    Each cached file is validated against its modification time and size before it is
+    returned, so edits made outside the cache (by Terraform, another process or a
+    rollback) are picked up, while repeated reads of an unchanged file only cost a
+    ``stat``. The directory index (the list of Terraform files) is validated against the
+    directory's modification time, which changes whenever a file is created, removed or
+    atomically replaced.
+
+    Writes go through the cache, so a file that was just written is served from memory.
+    """
+
+    def __init__(self, base_path: str, suffixes: tuple[str, ...] = TERRAFORM_SUFFIXES):
+        self.base_path = base_path
+        self.suffixes = suffixes
+        self.stats = FileCacheStats()
+        # filename -> (mtime_ns, size, content)
+        self._files: dict[str, tuple[int, int, str]] = {}
+        # (directory mtime_ns, sorted filenames)
+        self._index: tuple[int, list[str]] | None = None
+
+    def list(self) -> list[str]:
+        """The Terraform files in the directory, sorted by name."""
+        mtime = os.stat(self.base_path).st_mtime_ns
+        if self._index is not None and self._index[0] == mtime:
+            self.stats.index_hits += 1
+            return list(self._index[1])
+        self.stats.index_misses += 1
+        with os.scandir(self.base_path) as entries:
+            names = sorted(
+                entry.name
+                for entry in entries
+                # Dotfiles are hidden, such as the temporary files of an interrupted atomic write.
+                if not entry.name.startswith(".") and entry.name.endswith(self.suffixes) and entry.is_file()
+            )
+        self._index = (mtime, names)
+        # Forget files that no longer exist.
+        for filename in self._files.keys() - set(names):
+            self._files.pop(filename, None)
+        return list(names)
+
+    def read(self, filename: str) -> str:
+        """Return the content of a file, from memory if it has not changed on disk.
+
+        Raises:
+            FileNotFoundError: If the file does not exist.
+        """
+        file_path = self.path(filename)
+        try:
+            stat = os.stat(file_path)
+        except FileNotFoundError:
+            self._files.pop(filename, None)
+            raise FileNotFoundError(f"File {file_path} not found.") from None
+        cached = self._files.get(filename)
+        if cached is not None and cached[:2] == (stat.st_mtime_ns, stat.st_size):
+            self.stats.hits += 1
+            return cached[2]
+        self.stats.misses += 1
+        with open(file_path, "r") as f:
+            content = f.read()
+        self._files[filename] = (stat.st_mtime_ns, stat.st_size, content)
+        return content
+
+    def write(self, filename: str, content: str) -> None:
+        """Atomically replace a file and remember its new content."""
+        atomic_write(self.path(filename), content)
+        self._remember(filename, content)
+
+    def write_many(self, files: dict[str, str]) -> None:
+        """Replace several files so that either all of them are updated or none are."""
+        atomic_write_many({self.path(filename): content for filename, content in files.items()})
+        for filename, content in files.items():
+            self._remember(filename, content)
+
+    def invalidate(self, filename: str | None = None) -> None:
+        """Forget one cached file, or everything if ``filename`` is None."""
+        if filename is None:
+            self._files.clear()
+            self._index = None
+        else:
+            self._files.pop(filename, None)
+
+    def path(self, filename: str) -> str:
+        return os.path.join(self.base_path, filename)
+
+    def _remember(self, filename: str, content: str) -> None:
+        stat = os.stat(self.path(filename))
+        self._files[filename] = (stat.st_mtime_ns, stat.st_size, content)
@@ -0,0 +1,709 @@
+# Copyright (c) Microsoft. All rights reserved.
+
+import glob
+import json
+import os
+import re
+from dataclasses import dataclass, field
+from functools import lru_cache
+
+# Top-level block types and the number of labels each one takes.
+_TOP_LEVEL_LABELS = {
+    "terraform": 0,
+    "provider": 1,
+    "variable": 1,
+    "locals": 0,
+    "output": 1,
+    "module": 1,
+    "resource": 2,
+    "data": 2,
+    "ephemeral": 2,
+    "check": 1,
+    "moved": 0,
+    "import": 0,
+    "removed": 0,
+}
+
+# (parent block type or "*" for any, block type) -> (required attributes, required nested blocks)
+_REQUIRED = {
+    (None, "module"): ({"source"}, set()),
+    (None, "output"): ({"value"}, set()),
+    (None, "moved"): ({"from", "to"}, set()),
+    (None, "import"): ({"to"}, set()),
+    (None, "removed"): ({"from"}, set()),
+    ("variable", "validation"): ({"condition", "error_message"}, set()),
+    ("*", "precondition"): ({"condition", "error_message"}, set()),
+    ("*", "postcondition"): ({"condition", "error_message"}, set()),
+    ("*", "dynamic"): ({"for_each"}, {"content"}),
+}
+
+_PUNCTUATION = (
+    "...", "=>", "==", "!=", "<=", ">=", "&&", "||", "::",
+    "{", "}", "[", "]", "(", ")", ",", "=", ".", "?", ":",
+    "+", "-", "*", "/", "%", "<", ">", "!",
+)
+_BINARY_OPERATORS = {"==", "!=", "<=", ">=", "&&", "||", "+", "-", "*", "/", "%", "<", ">"}
+_IDENT = re.compile(r"[A-Za-z_][A-Za-z0-9_-]*")
+_NUMBER = re.compile(r"\d+(\.\d+)?([eE][+-]?\d+)?")
+_HEREDOC = re.compile(r"<<(-?)([A-Za-z_][A-Za-z0-9_-]*)[ \t]*\r?\n")
+
+
+@dataclass(frozen=True)
+class Diagnostic:
+    """A problem found in a Terraform file."""
+
+    severity: str
+    summary: str
+    filename: str
+    line: int
+    column: int
+
+    def __str__(self) -> str:
+        return f"{self.filename}:{self.line}:{self.column}: {self.severity}: {self.summary}"
+
+
+class HclSyntaxError(Exception):
+    """Raised by the lexer and parser; converted into a ``Diagnostic`` by the checker."""
+
+    def __init__(self, message: str, line: int, column: int):
+        super().__init__(message)
+        self.line = line
+        self.column = column
+
+
+@dataclass(frozen=True)
+class _Token:
+    kind: str  # ident, number, string, punct, newline, eof
+    value: object
+    line: int
+    column: int
+
+
+@dataclass
+class _Block:
+    type: str
+    labels: list[str]
+    line: int
+    column: int
+    attributes: dict[str, tuple[int, int]] = field(default_factory=dict)
+    blocks: list["_Block"] = field(default_factory=list)
+
+
+@dataclass
+class _ParsedFile:
+    blocks: list[_Block]
+    # (root, name, second name, line, column) for every var./local./module./data. traversal
+    references: list[tuple[str, str, str | None, int, int]]
+    diagnostics: list[Diagnostic]
+    # False when the file could not be parsed, so its declarations are unknown.
+    complete: bool = True
+
+
+class _Lexer:
+    """Tokenizer for the HCL native syntax.
+
+    Quoted strings and heredocs become a single ``string`` token whose value is a list of
+    template parts: literal text, or the token list of a ``${...}``/``%{...}`` sequence.
+    """
+
+    def __init__(self, text: str, line: int = 1, column: int = 1):
+        self.text = text
+        self.pos = 0
+        self.line = line
+        self.column = column
+
+    def _advance(self, count: int) -> str:
+        chunk = self.text[self.pos:self.pos + count]
+        for char in chunk:
+            if char == "\n":
+                self.line += 1
+                self.column = 1
+            else:
+                self.column += 1
+        self.pos += count
+        return chunk
+
+    def _error(self, message: str) -> HclSyntaxError:
+        return HclSyntaxError(message, self.line, self.column)
+
+    def tokenize(self, in_template: bool = False) -> list[_Token]:
+        """Tokenize until the end of input, or until the ``}`` closing a template sequence."""
+        tokens: list[_Token] = []
+        depth = 0
+        text = self.text
+        while self.pos < len(text):
+            char = text[self.pos]
+            line, column = self.line, self.column
+            if char in " \t\r":
+                self._advance(1)
+            elif char == "\n":
+                self._advance(1)
+                tokens.append(_Token("newline", "\n", line, column))
+            elif char == "#" or text.startswith("//", self.pos):
+                end = text.find("\n", self.pos)
+                self._advance((end if end >= 0 else len(text)) - self.pos)
+            elif text.startswith("/*", self.pos):
+                end = text.find("*/", self.pos + 2)
+                if end < 0:
+                    raise self._error("Unterminated block comment.")
+                self._advance(end + 2 - self.pos)
+            elif char == '"':
+                self._advance(1)
+                tokens.append(_Token("string", self._template('"'), line, column))
+            elif text.startswith("<<", self.pos) and (heredoc := _HEREDOC.match(text, self.pos)):
+                self._advance(heredoc.end() - self.pos)
+                tokens.append(_Token("string", self._heredoc(heredoc.group(2)), line, column))
+            elif match := _NUMBER.match(text, self.pos):
+                self._advance(match.end() - self.pos)
+                tokens.append(_Token("number", match.group(), line, column))
+            elif match := _IDENT.match(text, self.pos):
+                self._advance(match.end() - self.pos)
+                tokens.append(_Token("ident", match.group(), line, column))
+            elif in_template and depth == 0 and (char == "}" or text.startswith("~}", self.pos)):
+                self._advance(2 if char == "~" else 1)
+                return tokens
+            else:
+                punct = next((p for p in _PUNCTUATION if text.startswith(p, self.pos)), None)
+                if punct is None:
+                    raise self._error(f"Invalid character {char!r}.")
+                depth += {"{": 1, "}": -1}.get(punct, 0)
+                self._advance(len(punct))
+                tokens.append(_Token("punct", punct, line, column))
+        if in_template:
+            raise self._error("Unterminated template sequence; expected '}'.")
+        tokens.append(_Token("eof", None, self.line, self.column))
+        return tokens
+
+    def _template(self, terminator: str | None) -> list:
+        parts: list = []
+        literal: list[str] = []
+        text = self.text
+        while True:
+            if self.pos >= len(text):
+                if terminator is None:
+                    break
+                raise self._error("Unterminated string; expected '\"'.")
+            char = text[self.pos]
+            if terminator is not None and char == terminator:
+                self._advance(1)
+                break
+            if terminator is not None and char == "\n":
+                raise self._error("Unterminated string; quoted strings cannot span lines.")
+            if terminator is not None and char == "\\":
+                literal.append(self._advance(2))
+            elif text.startswith(("$${", "%%{"), self.pos):
+                literal.append(self._advance(3))
+            elif text.startswith(("${", "%{"), self.pos):
+                kind = "interpolation" if char == "$" else "directive"
+                self._advance(2)
+                if text.startswith("~", self.pos):
+                    self._advance(1)
+                if literal:
+                    parts.append("".join(literal))
+                    literal = []
+                parts.append((kind, self.tokenize(in_template=True)))
+            else:
+                literal.append(self._advance(1))
+        if literal:
+            parts.append("".join(literal))
+        return parts
+
+    def _heredoc(self, marker: str) -> list:
+        end = re.compile(rf"^[ \t]*{re.escape(marker)}[ \t]*\r?$", re.MULTILINE)
+        match = end.search(self.text, self.pos)
+        if match is None:
+            raise self._error(f"Unterminated heredoc; expected a line containing only {marker}.")
+        body = _Lexer(self.text[self.pos:match.start()], self.line, self.column)
+        parts = body._template(None)
+        self._advance(match.end() - self.pos)
+        return parts
+
+
+class _Parser:
+    """Recursive-descent parser that checks the structure of a token stream."""
+
+    def __init__(self, tokens: list[_Token]):
+        self.tokens = tokens
+        self.index = 0
+        self.references: list[tuple[str, str, str | None, int, int]] = []
+
+    def _peek(self, skip_newlines: bool = False) -> _Token:
+        if skip_newlines:
+            while self.tokens[self.index].kind == "newline":
+                self.index += 1
+        return self.tokens[self.index]
+
+    def _next(self, skip_newlines: bool = False) -> _Token:
+        token = self._peek(skip_newlines)
+        if token.kind != "eof":
+            self.index += 1
+        return token
+
+    def _is(self, token: _Token, value: str) -> bool:
+        return token.kind == "punct" and token.value == value
+
+    def _expect(self, value: str, skip_newlines: bool = False) -> _Token:
+        token = self._next(skip_newlines)
+        if not self._is(token, value):
+            raise HclSyntaxError(f"Expected '{value}' but found {_describe(token)}.", token.line, token.column)
+        return token
+
+    def parse_body(self, closing: str | None = None) -> _Block:
+        body = _Block("", [], 1, 1)
+        while True:
+            token = self._peek(skip_newlines=True)
+            if token.kind == "eof":
+                if closing is not None:
+                    raise HclSyntaxError(
+                        f"Unclosed block; expected '{closing}' before the end of the file.", token.line, token.column
+                    )
+                return body
+            if closing is not None and self._is(token, closing):
+                return body
+            if token.kind != "ident":
+                raise HclSyntaxError(
+                    f"Expected an attribute or block name but found {_describe(token)}.", token.line, token.column
+                )
+            self._next()
+            after = self._peek()
+            if self._is(after, "="):
+                self._next()
+                if token.value in body.attributes:
+                    line, _ = body.attributes[token.value]
+                    raise HclSyntaxError(
+                        f'Attribute "{token.value}" redefined; it was already set on line {line}.',
+                        token.line,
+                        token.column,
+                    )
+                body.attributes[token.value] = (token.line, token.column)
+                self.parse_expression()
+            else:
+                body.blocks.append(self._parse_block(token))
+            self._end_of_item(closing)
+
+    def _parse_block(self, name: _Token) -> _Block:
+        labels: list[str] = []
+        while True:
+            token = self._next()
+            if token.kind == "ident":
+                labels.append(token.value)
+            elif token.kind == "string":
+                if any(not isinstance(part, str) for part in token.value):
+                    raise HclSyntaxError("Block labels cannot contain template sequences.", token.line, token.column)
+                labels.append("".join(token.value))
+            elif self._is(token, "{"):
+                break
+            else:
+                raise HclSyntaxError(
+                    f"Expected '=' or '{{' after \"{name.value}\" but found {_describe(token)}.",
+                    token.line,
+                    token.column,
+                )
+        block = self.parse_body("}")
+        self._expect("}", skip_newlines=True)
+        return _Block(name.value, labels, name.line, name.column, block.attributes, block.blocks)
+
+    def _end_of_item(self, closing: str | None) -> None:
+        token = self._peek()
+        if token.kind in ("newline", "eof") or (closing is not None and self._is(token, closing)):
+            return
+        raise HclSyntaxError(
+            f"Expected a newline after the attribute or block but found {_describe(token)}.", token.line, token.column
+        )
+
+    def parse_expression(self, skip_newlines: bool = False) -> None:
+        self._parse_binary(skip_newlines)
+        if self._is(self._peek(skip_newlines), "?"):
+            self._next(skip_newlines)
+            self.parse_expression(skip_newlines)
+            self._expect(":", skip_newlines)
+            self.parse_expression(skip_newlines)
+
+    def _parse_binary(self, skip_newlines: bool) -> None:
+        self._parse_unary(skip_newlines)
+        while (token := self._peek(skip_newlines)).kind == "punct" and token.value in _BINARY_OPERATORS:
+            self._next(skip_newlines)
+            self._parse_unary(skip_newlines)
+
+    def _parse_unary(self, skip_newlines: bool) -> None:
+        token = self._peek(skip_newlines)
+        if token.kind == "punct" and token.value in ("!", "-"):
+            self._next(skip_newlines)
+            self._parse_unary(skip_newlines)
+            return
+        self._parse_postfix(skip_newlines)
+
+    def _parse_postfix(self, skip_newlines: bool) -> None:
+        root = self._peek(skip_newlines)
+        self._parse_primary(skip_newlines)
+        path: list[str] = []
+        while True:
+            token = self._peek()
+            if self._is(token, "."):
+                self._next()
+                attribute = self._next()
+                if attribute.kind in ("ident", "number") or self._is(attribute, "*"):
+                    path.append(str(attribute.value))
+                    continue
+                raise HclSyntaxError(
+                    f"Expected an attribute name after '.' but found {_describe(attribute)}.",
+                    attribute.line,
+                    attribute.column,
+                )
+            if self._is(token, "["):
+                self._next()
+                if self._is(self._peek(True), "*"):
+                    self._next(True)
+                else:
+                    self.parse_expression(skip_newlines=True)
+                self._expect("]", skip_newlines=True)
+                path.append("[]")
+                continue
+            break
+        if root.kind == "ident" and root.value in ("var", "local", "module", "data") and path:
+            second = path[1] if root.value == "data" and len(path) > 1 else None
+            self.references.append((root.value, path[0], second, root.line, root.column))
+
+    def _parse_primary(self, skip_newlines: bool) -> None:
+        token = self._next(skip_newlines)
+        if token.kind == "number":
+            return
+        if token.kind == "string":
+            self._parse_template(token)
+            return
+        if token.kind == "ident":
+            if self._is(self._peek(), "::"):
+                # Provider-defined function: provider::name::function(...)
+                while self._is(self._peek(), "::"):
+                    self._next()
+                    name = self._next()
+                    if name.kind != "ident":
+                        raise HclSyntaxError("Expected a function name after '::'.", name.line, name.column)
+                if not self._is(self._peek(), "("):
+                    raise HclSyntaxError("Expected '(' after a provider function name.", token.line, token.column)
+            if self._is(self._peek(), "("):
+                self._next()
+                self._parse_arguments()
+            return
+        if self._is(token, "("):
+            self.parse_expression(skip_newlines=True)
+            self._expect(")", skip_newlines=True)
+            return
+        if self._is(token, "["):
+            self._parse_tuple()
+            return
+        if self._is(token, "{"):
+            self._parse_object()
+            return
+        raise HclSyntaxError(f"Expected an expression but found {_describe(token)}.", token.line, token.column)
+
+    def _parse_arguments(self) -> None:
+        while not self._is(self._peek(True), ")"):
+            self.parse_expression(skip_newlines=True)
+            if self._is(self._peek(True), "..."):
+                self._next(True)
+            if not self._is(self._peek(True), ","):
+                break
+            self._next(True)
+        self._expect(")", skip_newlines=True)
+
+    def _parse_for_header(self) -> None:
+        self._next(True)  # for
+        for _ in range(2):
+            name = self._next(True)
+            if name.kind != "ident":
+                raise HclSyntaxError("Expected an iterator name after 'for'.", name.line, name.column)
+            if not self._is(self._peek(True), ","):
+                break
+            self._next(True)
+        keyword = self._next(True)
+        if keyword.kind != "ident" or keyword.value != "in":
+            raise HclSyntaxError(f"Expected 'in' but found {_describe(keyword)}.", keyword.line, keyword.column)
+        self.parse_expression(skip_newlines=True)
+        self._expect(":", skip_newlines=True)
+
+    def _parse_for_condition(self) -> None:
+        token = self._peek(True)
+        if token.kind == "ident" and token.value == "if":
+            self._next(True)
+            self.parse_expression(skip_newlines=True)
+
+    def _parse_tuple(self) -> None:
+        if self._is_for():
+            self._parse_for_header()
+            self.parse_expression(skip_newlines=True)
+            self._parse_for_condition()
+            self._expect("]", skip_newlines=True)
+            return
+        while not self._is(self._peek(True), "]"):
+            self.parse_expression(skip_newlines=True)
+            if not self._is(self._peek(True), ","):
+                break
+            self._next(True)
+        self._expect("]", skip_newlines=True)
+
+    def _parse_object(self) -> None:
+        if self._is_for():
+            self._parse_for_header()
+            self.parse_expression(skip_newlines=True)
+            self._expect("=>", skip_newlines=True)
+            self.parse_expression(skip_newlines=True)
+            if self._is(self._peek(True), "..."):
+                self._next(True)
+            self._parse_for_condition()
+            self._expect("}", skip_newlines=True)
+            return
+        while not self._is(self._peek(True), "}"):
+            self.parse_expression(skip_newlines=True)
+            separator = self._next(True)
+            if not (self._is(separator, "=") or self._is(separator, ":")):
+                raise HclSyntaxError(
+                    f"Expected '=' or ':' after an object key but found {_describe(separator)}.",
+                    separator.line,
+                    separator.column,
+                )
+            self.parse_expression()
+            token = self._peek()
+            if self._is(token, ","):
+                self._next()
+            elif token.kind != "newline" and not self._is(token, "}"):
+                raise HclSyntaxError(
+                    f"Expected ',', a newline or '}}' after an object item but found {_describe(token)}.",
+                    token.line,
+                    token.column,
+                )
+        self._expect("}", skip_newlines=True)
+
+    def _is_for(self) -> bool:
+        token = self._peek(True)
+        return token.kind == "ident" and token.value == "for"
+
+    def _parse_template(self, token: _Token) -> None:
+        for part in token.value:
+            if isinstance(part, str):
+                continue
+            kind, tokens = part
+            tokens = [*tokens, _Token("eof", None, token.line, token.column)]
+            parser = _Parser(tokens)
+            if kind == "interpolation":
+                parser.parse_expression(skip_newlines=True)
+                rest = parser._peek(True)
+                if rest.kind != "eof":
+                    raise HclSyntaxError(
+                        f"Unexpected {_describe(rest)} in template interpolation.", rest.line, rest.column
+                    )
+            else:
+                # Directives (%{ if ... }, %{ for ... }) are only scanned for references.
+                parser._scan_references()
+            self.references.extend(parser.references)
+
+    def _scan_references(self) -> None:
+        tokens = self.tokens
+        for i, token in enumerate(tokens[:-2]):
+            if (
+                token.kind == "ident"
+                and token.value in ("var", "local", "module", "data")
+                and self._is(tokens[i + 1], ".")
+                and tokens[i + 2].kind == "ident"
+                and not (i > 0 and self._is(tokens[i - 1], "."))
+            ):
+                second = None
+                if token.value == "data" and i + 4 < len(tokens) and self._is(tokens[i + 3], "."):
+                    second = tokens[i + 4].value
+                self.references.append((token.value, tokens[i + 2].value, second, token.line, token.column))
+
+
+def _describe(token: _Token) -> str:
+    if token.kind == "eof":
+        return "the end of the file"
+    if token.kind == "newline":
+        return "a newline"
+    if token.kind == "string":
+        return "a string"
+    return f"'{token.value}'"
+
+
+@lru_cache(maxsize=256)
+def _parse_file(filename: str, text: str) -> _ParsedFile:
+    """Parse one file; results are memoized by content so unchanged files are free to re-check."""
+    if filename.endswith(".json"):
+        return _parse_json_file(filename, text)
+    try:
+        parser = _Parser(_Lexer(text).tokenize())
+        body = parser.parse_body()
+    except HclSyntaxError as e:
+        return _ParsedFile([], [], [Diagnostic("error", str(e), filename, e.line, e.column)], complete=False)
+    diagnostics: list[Diagnostic] = []
+    for block in body.blocks:
+        _check_block(filename, block, None, diagnostics)
+    for name, (line, column) in body.attributes.items():
+        diagnostics.append(
+            Diagnostic("error", f'Unsupported argument "{name}" at the top level of a configuration.', filename, line, column)
+        )
+    return _ParsedFile(body.blocks, parser.references, diagnostics)
+
+
+def _parse_json_file(filename: str, text: str) -> _ParsedFile:
+    try:
+        document = json.loads(text)
+    except json.JSONDecodeError as e:
+        return _ParsedFile(
+            [], [], [Diagnostic("error", f"Invalid JSON: {e.msg}.", filename, e.lineno, e.colno)], complete=False
+        )
+    blocks: list[_Block] = []
+    if isinstance(document, dict):
+        for block_type, content in document.items():
+            depth = _TOP_LEVEL_LABELS.get(block_type, 0)
+            for labels, value in _json_blocks(content, depth):
+                attributes = {key: (1, 1) for key in value} if isinstance(value, dict) else {}
+                blocks.append(_Block(block_type, labels, 1, 1, attributes if block_type == "locals" else {}))
+    return _ParsedFile(blocks, [], [])
+
+
+def _json_blocks(content: object, depth: int, labels: tuple[str, ...] = ()):
+    if depth == 0:
+        for item in content if isinstance(content, list) else [content]:
+            yield list(labels), item
+    elif isinstance(content, dict):
+        for key, value in content.items():
+            yield from _json_blocks(value, depth - 1, (*labels, key))
+
+
+def _check_block(filename: str, block: _Block, parent: str | None, diagnostics: list[Diagnostic]) -> None:
+    if parent is None:
+        expected = _TOP_LEVEL_LABELS.get(block.type)
+        if expected is None:
+            diagnostics.append(
+                Diagnostic("error", f'Unsupported block type "{block.type}".', filename, block.line, block.column)
+            )
+        elif len(block.labels) != expected:
+            diagnostics.append(
+                Diagnostic(
+                    "error",
+                    f'A "{block.type}" block expects {expected} label(s) but has {len(block.labels)}.',
+                    filename,
+                    block.line,
+                    block.column,
+                )
+            )
+    elif block.type == "dynamic" and len(block.labels) != 1:
+        diagnostics.append(
+            Diagnostic("error", 'A "dynamic" block expects 1 label.', filename, block.line, block.column)
+        )
+
+    required = _REQUIRED.get((parent, block.type))
+    if required is None and parent is not None:
+        required = _REQUIRED.get(("*", block.type))
+    if required:
+        attributes, blocks = required
+        nested = {child.type for child in block.blocks}
+        for name in sorted(attributes - block.attributes.keys()):
+            diagnostics.append(
+                Diagnostic(
+                    "error",
+                    f'Missing required argument "{name}" in "{block.type}" block.',
+                    filename,
+                    block.line,
+                    block.column,
+                )
+            )
+        for name in sorted(blocks - nested):
+            diagnostics.append(
+                Diagnostic(
+                    "error",
+                    f'Missing required "{name}" block in "{block.type}" block.',
+                    filename,
+                    block.line,
+                    block.column,
+                )
+            )
+    for child in block.blocks:
+        _check_block(filename, child, block.type, diagnostics)
+
+
+def _address(block: _Block) -> str | None:
+    if block.type in ("resource", "ephemeral") and len(block.labels) == 2:
+        prefix = "" if block.type == "resource" else "ephemeral."
+        return f"{prefix}{block.labels[0]}.{block.labels[1]}"
+    if block.type == "data" and len(block.labels) == 2:
+        return f"data.{block.labels[0]}.{block.labels[1]}"
+    if block.type in ("module", "variable", "output", "check") and len(block.labels) == 1:
+        return f"{block.type}.{block.labels[0]}"
+    return None
+
+
+def check_files(files: dict[str, str]) -> list[Diagnostic]:
+    """Check a set of Terraform files that together form one module.
+
+    Args:
+        files: Mapping of file name to content. ``.tf.json`` files are checked for JSON
+            syntax and contribute their declarations.
+
+    Returns:
+        Diagnostics sorted by file and position; an empty list if no problems were found.
+    """
+    parsed = {name: _parse_file(name, text) for name, text in files.items()}
+    diagnostics = [d for result in parsed.values() for d in result.diagnostics]
+
+    declared: dict[str, tuple[str, int]] = {}
+    for name, result in parsed.items():
+        for block in result.blocks:
+            addresses = [_address(block)]
+            if block.type == "locals":
+                addresses = [f"local.{key}" for key in block.attributes]
+            for address in filter(None, addresses):
+                if address in declared:
+                    other, line = declared[address]
+                    diagnostics.append(
+                        Diagnostic(
+                            "error",
+                            f"Duplicate definition of {address}; it was already defined at {other}:{line}.",
+                            name,
+                            block.line,
+                            block.column,
+                        )
+                    )
+                else:
+                    declared[address] = (name, block.line)
+
+    if not all(result.complete for result in parsed.values()):
+        # Declarations in an unparsable file are unknown; reporting references would be noise.
+        return sorted(diagnostics, key=lambda d: (d.filename, d.line, d.column))
+    for name, result in parsed.items():
+        for root, first, second, line, column in result.references:
+            if root == "var":
+                address, kind = f"variable.{first}", "variable"
+            elif root == "data":
+                if second is None:
+                    continue
+                address, kind = f"data.{first}.{second}", "data source"
+            else:
+                address, kind = f"{root}.{first}", {"local": "local value", "module": "module"}[root]
+            if address not in declared:
+                reference = f"{root}.{first}" + (f".{second}" if second else "")
+                diagnostics.append(
+                    Diagnostic("error", f"Reference to undeclared {kind} {reference}.", name, line, column)
+                )
+    return sorted(diagnostics, key=lambda d: (d.filename, d.line, d.column))
+
+
+def check_workspace(base_path: str) -> list[Diagnostic]:
+    """Check the ``.tf`` and ``.tf.json`` files in ``base_path`` without running Terraform.
+
+    Catches syntax errors, duplicate definitions, references to undeclared variables,
+    locals, modules and data sources, and missing required arguments or blocks.
+
+    Returns:
+        The diagnostics found, with file names relative to ``base_path``.
+    """
+    files: dict[str, str] = {}
+    for pattern in ("*.tf", "*.tf.json"):
+        for path in sorted(glob.glob(os.path.join(base_path, pattern))):
+            with open(path, "r") as f:
+                files[os.path.basename(path)] = f.read()
+    return check_files(files)
+
+
+def format_diagnostics(diagnostics: list[Diagnostic]) -> str:
+    """Render diagnostics one per line, as ``file:line:column: severity: summary``."""
+    return "\n".join(str(d) for d in diagnostics)
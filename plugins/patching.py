@@ -0,0 +1,211 @@
+# Copyright (c) Microsoft. All rights reserved.
+
+import hashlib
+import os
+import re
+import stat
+import tempfile
+import threading
+from functools import lru_cache
+
+_HUNK_HEADER = re.compile(r"^@@ -(\d+)(?:,(\d+))? \+(\d+)(?:,(\d+))? @@")
+
+
+class PatchConflictError(Exception):
+    """Raised when an edit does not apply cleanly to the current file content."""
+
+
+def content_hash(content: str) -> str:
+    """Short content hash handed to the model so it can detect concurrent changes."""
+    return hashlib.sha256(content.encode()).hexdigest()[:12]
+
+
+_umask_lock = threading.Lock()
+
+
+@lru_cache(maxsize=1)
+def _umask() -> int:
+    # Linux reports the umask in /proc; elsewhere os.umask can only read it by setting it.
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("Umask:"):
+                    return int(line.split()[1], 8)
+    except (OSError, ValueError):
+        pass
+    # While it is set, files created by other threads get the temporary mask. The lock only
+    # keeps two first calls from reading each other's temporary value; the cache makes this
+    # happen once per process.
+    with _umask_lock:
+        mask = os.umask(0o022)
+        os.umask(mask)
+    return mask
+
+
+def _temp_file(file_path: str) -> tuple[int, str]:
+    """Create the temporary file that will replace ``file_path``, with the mode it should end up with.
+
+    ``mkstemp`` creates files readable by their owner only. The temporary file instead
+    gets the mode of the file it replaces, or the mode ``open`` would give a new file.
+    """
+    directory = os.path.dirname(file_path) or "."
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=f".{os.path.basename(file_path)}.", suffix=".tmp")
+    try:
+        mode = stat.S_IMODE(os.stat(file_path).st_mode)
+    except FileNotFoundError:
+        mode = 0o666 & ~_umask()
+    try:
+        os.fchmod(fd, mode)
+    except BaseException:
+        os.close(fd)
+        os.unlink(tmp_path)
+        raise
+    return fd, tmp_path
+
+
+def atomic_write(file_path: str, content: str) -> None:
+    """Write ``content`` to ``file_path`` so readers never observe a partially written file."""
+    fd, tmp_path = _temp_file(file_path)
+    try:
+        with os.fdopen(fd, "w") as f:
+            f.write(content)
+        os.replace(tmp_path, file_path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+        raise
+
+
+def atomic_write_many(files: dict[str, str]) -> None:
+    """Write several files so that either all of them are updated or none are.
+
+    Every new content is first written to a temporary file next to its target, so a
+    failure while writing (e.g. a full disk) leaves the targets untouched. The temporary
+    files are then renamed into place; if a rename fails, the files already replaced are
+    restored to their previous content (or removed if they did not exist).
+    """
+    staged: list[tuple[str, str]] = []
+    try:
+        for file_path, content in files.items():
+            fd, tmp_path = _temp_file(file_path)
+            staged.append((tmp_path, file_path))
+            with os.fdopen(fd, "w") as f:
+                f.write(content)
+    except BaseException:
+        for tmp_path, _ in staged:
+            if os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+        raise
+
+    # file path -> previous content, or None if the file did not exist.
+    replaced: list[tuple[str, bytes | None]] = []
+    try:
+        for tmp_path, file_path in staged:
+            previous = None
+            if os.path.exists(file_path):
+                with open(file_path, "rb") as f:
+                    previous = f.read()
+            os.replace(tmp_path, file_path)
+            replaced.append((file_path, previous))
+    except BaseException:
+        for file_path, previous in reversed(replaced):
+            if previous is None:
+                os.unlink(file_path)
+            else:
+                with open(file_path, "wb") as f:
+                    f.write(previous)
+        for tmp_path, _ in staged:
+            if os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+        raise
+
+
+def _parse_hunks(diff: str) -> list[tuple[int, list[str], list[str]]]:
+    """Parse a unified diff into ``(old_start, old_lines, new_lines)`` hunks."""
+    hunks: list[tuple[int, list[str], list[str]]] = []
+    current: tuple[int, list[str], list[str]] | None = None
+    for line in diff.splitlines():
+        header = _HUNK_HEADER.match(line)
+        if header:
+            current = (int(header.group(1)), [], [])
+            hunks.append(current)
+            continue
+        if current is None or line.startswith(("--- ", "+++ ")) and not current[1] and not current[2]:
+            continue
+        if line.startswith("\\"):
+            # "\ No newline at end of file"
+            continue
+        marker, text = (line[:1], line[1:]) if line else (" ", "")
+        if marker == " ":
+            current[1].append(text)
+            current[2].append(text)
+        elif marker == "-":
+            current[1].append(text)
+        elif marker == "+":
+            current[2].append(text)
+        else:
+            raise PatchConflictError(f"Malformed diff line: {line!r}")
+    if not hunks:
+        raise PatchConflictError("The diff contains no hunks (lines starting with '@@').")
+    return hunks
+
+
+def _find_block(lines: list[str], block: list[str], hint: int, start: int) -> int:
+    """Locate ``block`` in ``lines`` at or after ``start``, preferring the position closest to ``hint``."""
+    if not block:
+        return max(min(hint, len(lines)), start)
+    candidates = [
+        i for i in range(start, len(lines) - len(block) + 1)
+        if lines[i:i + len(block)] == block
+    ]
+    if not candidates:
+        return -1
+    return min(candidates, key=lambda i: abs(i - hint))
+
+
+def apply_unified_diff(original: str, diff: str) -> str:
+    """Apply a unified diff to ``original``.
+
+    Hunks are matched on their context and removed lines, first at the line number given
+    in the hunk header and otherwise at the nearest position where they match, so line
+    numbers the model got slightly wrong do not matter.
+
+    Raises:
+        PatchConflictError: If a hunk's context cannot be found in the file.
+    """
+    lines = original.splitlines()
+    trailing_newline = original.endswith("\n") or not original
+    result: list[str] = []
+    position = 0
+    for number, (old_start, old_lines, new_lines) in enumerate(_parse_hunks(diff), start=1):
+        # A hunk without old lines inserts after line old_start; any other starts at it.
+        hint = old_start if not old_lines else max(old_start - 1, 0)
+        index = _find_block(lines, old_lines, hint, position)
+        if index < 0:
+            preview = "\n".join(old_lines[:5])
+            raise PatchConflictError(
+                f"Hunk {number} does not apply: its context was not found in the file.\n"
+                f"Expected lines:\n{preview}"
+            )
+        result.extend(lines[position:index])
+        result.extend(new_lines)
+        position = index + len(old_lines)
+    result.extend(lines[position:])
+    return "\n".join(result) + ("\n" if trailing_newline and result else "")
+
+
+def replace_unique(original: str, search: str, replace: str, count: int = 1) -> str:
+    """Replace ``search`` with ``replace``, requiring exactly ``count`` occurrences.
+
+    Raises:
+        PatchConflictError: If ``search`` occurs a different number of times.
+    """
+    if not search:
+        raise PatchConflictError("The text to search for is empty.")
+    found = original.count(search)
+    if found != count:
+        raise PatchConflictError(
+            f"Expected {count} occurrence(s) of the search text but found {found}; "
+            "include more surrounding lines to make it unique or read the file again."
+        )
+    return original.replace(search, replace)
@@ -0,0 +1,96 @@
+# Copyright (c) Microsoft. All rights reserved.
+
+import os
+from collections.abc import Callable, Iterable, Mapping
+from typing import Any
+
+from semantic_kernel.functions import KernelPlugin
+
+from .concurrency import concurrent_plugin
+from .snippet_library_plugin import SnippetLibraryPlugin
+from .terraform_execution_plugin import TerraformExecutionPlugin
+from .terraform_file_plugin import TerraformFilePlugin
+from .user_plugin import UserPlugin
+
+# Plugin name -> factory taking the workspace path.
+PLUGIN_FACTORIES: dict[str, Callable[[str], object]] = {
+    "terraform_file": TerraformFilePlugin,
+    "terraform_execution": TerraformExecutionPlugin,
+    "user": lambda base_path: UserPlugin(),
+    "snippet_library": SnippetLibraryPlugin,
+}
+
+# Plugin name -> allowed function names; None allows every function of the plugin.
+ToolScope = Mapping[str, Iterable[str] | None]
+
+
+class PluginRegistry:
+    """The plugins of one workspace, shared by every agent working on it.
+
+    Each plugin is created once, so agents share its caches (such as the file cache of
+    ``TerraformFilePlugin``), and is wrapped once with ``concurrent_plugin``. Agents ask
+    for a scope: the plugins and functions they may call. Only those functions are
+    registered on the agent's kernel, so only their schemas are sent to the model.
+    """
+
+    def __init__(self, base_path: str = "terraform", factories: Mapping[str, Callable[[str], object]] | None = None):
+        self.base_path = base_path
+        self.factories = dict(factories or PLUGIN_FACTORIES)
+        self._instances: dict[str, object] = {}
+        self._plugins: dict[str, KernelPlugin] = {}
+        self._scoped: dict[tuple[str, frozenset[str]], KernelPlugin] = {}
+
+    def instance(self, name: str) -> Any:
+        """The shared plugin object registered as ``name``, created on first use.
+
+        Raises:
+            KeyError: If no plugin is registered under ``name``.
+        """
+        if name not in self._instances:
+            if name not in self.factories:
+                raise KeyError(f"Unknown plugin {name!r}. Known plugins: {', '.join(sorted(self.factories))}.")
+            self._instances[name] = self.factories[name](self.base_path)
+        return self._instances[name]
+
+    def plugin(self, name: str) -> KernelPlugin:
+        """The shared kernel plugin for ``name``, with every function."""
+        if name not in self._plugins:
+            self._plugins[name] = concurrent_plugin(name, self.instance(name))
+        return self._plugins[name]
+
+    def plugins(self, scope: ToolScope) -> list[KernelPlugin]:
+        """The kernel plugins of a scope, each restricted to its allowed functions.
+
+        Raises:
+            KeyError: If the scope names an unknown plugin or function.
+        """
+        plugins = []
+        for name, allowed in scope.items():
+            plugin = self.plugin(name)
+            if allowed is None:
+                plugins.append(plugin)
+                continue
+            allowed = frozenset(allowed)
+            unknown = allowed - plugin.functions.keys()
+            if unknown:
+                raise KeyError(f"Plugin {name!r} has no function(s) {', '.join(sorted(unknown))}.")
+            key = (name, allowed)
+            if key not in self._scoped:
+                self._scoped[key] = KernelPlugin(
+                    name=name,
+                    description=plugin.description,
+                    functions=[function for function in plugin.functions.values() if function.name in allowed],
+                )
+            plugins.append(self._scoped[key])
+        return plugins
+
+
+_registries: dict[str, PluginRegistry] = {}
+
+
+def get_plugin_registry(base_path: str = "terraform") -> PluginRegistry:
+    """Return the process-wide plugin registry of the workspace at ``base_path``."""
+    key = os.path.abspath(base_path)
+    if key not in _registries:
+        _registries[key] = PluginRegistry(base_path)
+    return _registries[key]
@@ -0,0 +1,230 @@
+# Copyright (c) Microsoft. All rights reserved.
+
+import difflib
+import hashlib
+import json
+import os
+import time
+from dataclasses import asdict, dataclass, field
+
+from .patching import atomic_write
+from .terraform_result_cache import _tf_files
+
+HEAD_FILE = "HEAD"
+
+
+@dataclass(frozen=True)
+class Revision:
+    """A snapshot of a workspace: a manifest mapping file names to blob hashes."""
+
+    id: str
+    number: int
+    parent: str | None
+    tree: str
+    files: dict[str, str] = field(default_factory=dict)
+    agent: str | None = None
+    created: float = 0.0
+
+
+@dataclass(frozen=True)
+class FileChange:
+    """How one file differs between two revisions."""
+
+    filename: str
+    status: str  # "added", "removed" or "modified"
+    diff: str
+
+
+class RevisionStore:
+    """A content-addressed history of a Terraform workspace.
+
+    File contents are stored once per distinct content under ``objects/`` and each
+    revision is a small JSON manifest under ``revisions/`` that maps file names to blob
+    hashes, so recording an unchanged workspace costs nothing and a revision that edits
+    one file stores one new blob. ``HEAD`` names the latest revision.
+
+    The store lives in ``<workspace>/.revisions`` unless ``path`` is given.
+    """
+
+    def __init__(self, workspace: str, path: str | None = None):
+        self.workspace = workspace
+        self.path = path or os.path.join(workspace, ".revisions")
+        os.makedirs(os.path.join(self.path, "objects"), exist_ok=True)
+        os.makedirs(os.path.join(self.path, "revisions"), exist_ok=True)
+        self._revisions: dict[str, Revision] = {}
+        # filename -> (mtime_ns, size, blob hash), so unchanged files are not re-hashed.
+        self._stat_cache: dict[str, tuple[int, int, str]] = {}
+        self._head: Revision | None = None
+        head_path = os.path.join(self.path, HEAD_FILE)
+        if os.path.exists(head_path):
+            with open(head_path, "r") as f:
+                self._head = self.get(f.read().strip())
+
+    @property
+    def head(self) -> Revision | None:
+        """The latest revision, or None if nothing has been recorded yet."""
+        return self._head
+
+    def snapshot(self, agent: str | None = None) -> Revision:
+        """Record the current workspace as a new revision.
+
+        Args:
+            agent: Name of the agent whose turn produced this state.
+
+        Returns:
+            The new revision, or the current head if the workspace has not changed since.
+        """
+        files = {filename: self._store_file(filename) for filename in _tf_files(self.workspace)}
+        tree = _hash(json.dumps(files, sort_keys=True).encode())
+        if self._head is not None and self._head.tree == tree:
+            return self._head
+
+        parent = self._head
+        created = time.time()
+        manifest = {
+            "number": parent.number + 1 if parent else 1,
+            "parent": parent.id if parent else None,
+            "tree": tree,
+            "files": files,
+            "agent": agent,
+            "created": created,
+        }
+        revision = Revision(id=_hash(json.dumps(manifest, sort_keys=True).encode()), **manifest)
+        atomic_write(self._revision_path(revision.id), json.dumps(asdict(revision), sort_keys=True))
+        atomic_write(os.path.join(self.path, HEAD_FILE), revision.id)
+        self._revisions[revision.id] = revision
+        self._head = revision
+        return revision
+
+    def get(self, revision_id: str) -> Revision:
+        """Load a revision by id.
+
+        Raises:
+            KeyError: If no such revision exists.
+        """
+        revision = self._revisions.get(revision_id)
+        if revision is None:
+            path = self._revision_path(revision_id)
+            if not os.path.exists(path):
+                raise KeyError(f"Unknown revision {revision_id}.")
+            with open(path, "r") as f:
+                revision = Revision(**json.load(f))
+            self._revisions[revision_id] = revision
+        return revision
+
+    def history(self, limit: int | None = None) -> list[Revision]:
+        """Revisions from the latest to the first, following parent links."""
+        revisions: list[Revision] = []
+        revision = self._head
+        while revision is not None and (limit is None or len(revisions) < limit):
+            revisions.append(revision)
+            revision = self.get(revision.parent) if revision.parent else None
+        return revisions
+
+    def read(self, filename: str, revision_id: str | None = None) -> str:
+        """Read one file as it was in a revision (the latest by default)."""
+        revision = self._resolve(revision_id)
+        if filename not in revision.files:
+            raise FileNotFoundError(f"{filename} is not part of revision {revision.id}.")
+        return self._read_blob(revision.files[filename])
+
+    def files(self, revision_id: str | None = None) -> dict[str, str]:
+        """All files of a revision (the latest by default), as name to content."""
+        if revision_id is None and self._head is None:
+            return {}
+        revision = self._resolve(revision_id)
+        return {filename: self._read_blob(blob) for filename, blob in sorted(revision.files.items())}
+
+    def diff(self, old_id: str | None, new_id: str | None = None) -> list[FileChange]:
+        """Compare two revisions.
+
+        Only files whose blob hashes differ are read and diffed.
+
+        Args:
+            old_id: The earlier revision, or None to compare against an empty workspace.
+            new_id: The later revision (the latest by default).
+        """
+        old = self.get(old_id).files if old_id else {}
+        new = self._resolve(new_id).files
+        changes: list[FileChange] = []
+        for filename in sorted(old.keys() | new.keys()):
+            before, after = old.get(filename), new.get(filename)
+            if before == after:
+                continue
+            status = "added" if before is None else "removed" if after is None else "modified"
+            lines = difflib.unified_diff(
+                self._read_blob(before).splitlines(keepends=True) if before else [],
+                self._read_blob(after).splitlines(keepends=True) if after else [],
+                fromfile=f"a/{filename}" if before else "/dev/null",
+                tofile=f"b/{filename}" if after else "/dev/null",
+            )
+            changes.append(FileChange(filename, status, "".join(lines)))
+        return changes
+
+    def rollback(self, revision_id: str, agent: str | None = "rollback") -> Revision:
+        """Restore the workspace to a revision and record that as a new revision.
+
+        Terraform files that are not part of the target revision are removed. History is
+        kept: the restored state becomes a new head whose parent is the previous head.
+        """
+        target = self.get(revision_id)
+        for filename in _tf_files(self.workspace):
+            if filename not in target.files:
+                os.unlink(os.path.join(self.workspace, filename))
+                self._stat_cache.pop(filename, None)
+        for filename, blob in target.files.items():
+            path = os.path.join(self.workspace, filename)
+            if not os.path.exists(path) or self._store_file(filename) != blob:
+                atomic_write(path, self._read_blob(blob))
+        return self.snapshot(agent=agent)
+
+    def export(self, destination: str, revision_id: str | None = None) -> list[str]:
+        """Write the files of a revision (the latest by default) to ``destination``.
+
+        Returns:
+            The paths written.
+        """
+        os.makedirs(destination, exist_ok=True)
+        paths: list[str] = []
+        for filename, content in self.files(revision_id).items():
+            path = os.path.join(destination, filename)
+            atomic_write(path, content)
+            paths.append(path)
+        return paths
+
+    def _resolve(self, revision_id: str | None) -> Revision:
+        if revision_id is not None:
+            return self.get(revision_id)
+        if self._head is None:
+            raise KeyError("No revisions have been recorded.")
+        return self._head
+
+    def _store_file(self, filename: str) -> str:
+        path = os.path.join(self.workspace, filename)
+        stat = os.stat(path)
+        cached = self._stat_cache.get(filename)
+        if cached is not None and cached[:2] == (stat.st_mtime_ns, stat.st_size):
+            return cached[2]
+        with open(path, "r", newline="") as f:
+            content = f.read()
+        blob = _hash(content.encode())
+        blob_path = self._blob_path(blob)
+        if not os.path.exists(blob_path):
+            os.makedirs(os.path.dirname(blob_path), exist_ok=True)
+            atomic_write(blob_path, content)
+        self._stat_cache[filename] = (stat.st_mtime_ns, stat.st_size, blob)
+        return blob
+
+    def _read_blob(self, blob: str) -> str:
+        with open(self._blob_path(blob), "r", newline="") as f:
+            return f.read()
+
+    def _blob_path(self, blob: str) -> str:
+        return os.path.join(self.path, "objects", blob[:2], blob[2:])
+
+    def _revision_path(self, revision_id: str) -> str:
+        return os.path.join(self.path, "revisions", f"{revision_id}.json")
+
+
+def _hash(content: bytes) -> str:
+    return hashlib.sha256(content).hexdigest()
@@ -0,0 +1,297 @@
+# Copyright (c) Microsoft. All rights reserved.
+
+import heapq
+import json
+import math
+import os
+import re
+import threading
+import time
+from collections import Counter, defaultdict
+from collections.abc import Iterator
+from dataclasses import dataclass, field
+
+from .patching import atomic_write
+
+INDEX_VERSION = 1
+SNIPPET_SUFFIXES = (".tf", ".tf.json", ".md")
+
+_TOKEN = re.compile(r"[a-z0-9][a-z0-9_]*")
+_BLOCK_HEADER = re.compile(r'^\s*(resource|data|module|variable|output)\s+"([^"]+)"(?:\s+"([^"]+)")?', re.MULTILINE)
+_COMMENT = re.compile(r"^\s*(?:#|//)\s*(\S.*?)\s*$", re.MULTILINE)
+# Block headers kept in a document's summary.
+_SUMMARY_BLOCKS = 12
+
+
+def tokenize(text: str) -> list[str]:
+    """Lower-case terms of ``text``; ``aws_security_group`` also yields ``aws``, ``security`` and ``group``."""
+    terms = []
+    for token in _TOKEN.findall(text.lower()):
+        terms.append(token)
+        if "_" in token:
+            terms.extend(part for part in token.split("_") if part)
+    return terms
+
+
+@dataclass
+class SnippetDocument:
+    """One indexed file of the library."""
+
+    path: str  # relative to the library, with "/" separators
+    mtime_ns: int
+    size: int
+    length: int
+    terms: dict[str, int]
+    summary: list[str] = field(default_factory=list)
+
+    @property
+    def module(self) -> str | None:
+        """The module directory the file belongs to, or None for a file at the library root."""
+        directory = os.path.dirname(self.path)
+        return directory or None
+
+
+@dataclass(frozen=True)
+class SnippetMatch:
+    """A search result."""
+
+    path: str
+    module: str | None
+    score: float
+    summary: list[str]
+
+
+@dataclass
+class IndexUpdate:
+    """What a refresh of the index changed."""
+
+    added: int = 0
+    updated: int = 0
+    removed: int = 0
+    unchanged: int = 0
+    seconds: float = 0.0
+
+    @property
+    def changed(self) -> bool:
+        return bool(self.added or self.updated or self.removed)
+
+
+class SnippetIndex:
+    """A BM25 index over a directory of approved Terraform modules and snippets.
+
+    Every ``.tf``, ``.tf.json`` and ``.md`` file under ``library`` is a document; its
+    terms are its words and identifiers, split at underscores, plus the words of its
+    path, so ``modules/alb/main.tf`` matches "alb". The term frequencies of each file are
+    persisted as JSON at ``index_path`` (``<library>/.snippet-index.json`` by default) with
+    the file's modification time and size. ``refresh`` re-reads only the files that were
+    added or changed since, and drops the ones removed, so keeping the index current
+    costs a directory walk.
+
+    The index is refreshed before a search when it is older than ``max_age`` seconds.
+    Searches and refreshes are serialized, since plugins on several workspaces share an
+    index and their functions run on worker threads.
+    """
+
+    def __init__(
+        self,
+        library: str,
+        index_path: str | None = None,
+        max_age: float = 30.0,
+        k1: float = 1.2,
+        b: float = 0.75,
+    ):
+        self.library = library
+        self.index_path = index_path or os.path.join(library, ".snippet-index.json")
+        self.max_age = max_age
+        self.k1 = k1
+        self.b = b
+        self._documents: dict[str, SnippetDocument] | None = None
+        # term -> {path: term frequency}
+        self._postings: dict[str, dict[str, int]] = defaultdict(dict)
+        self._total_length = 0
+        self._refreshed: float | None = None
+        self._lock = threading.RLock()
+
+    @property
+    def documents(self) -> int:
+        with self._lock:
+            return len(self._load())
+
+    def refresh(self) -> IndexUpdate:
+        """Bring the index in line with the library and persist it if anything changed."""
+        with self._lock:
+            return self._refresh()
+
+    def search(self, query: str, limit: int = 5) -> list[SnippetMatch]:
+        """The documents that best match ``query``, best first."""
+        with self._lock:
+            if self._refreshed is None or time.monotonic() - self._refreshed >= self.max_age:
+                self._refresh()
+            return self._search(query, limit)
+
+    def _refresh(self) -> IndexUpdate:
+        start = time.perf_counter()
+        documents = self._load()
+        update = IndexUpdate()
+        seen: set[str] = set()
+        for path, stat in self._walk():
+            seen.add(path)
+            current = documents.get(path)
+            if current is not None and (current.mtime_ns, current.size) == (stat.st_mtime_ns, stat.st_size):
+                update.unchanged += 1
+                continue
+            document = self._read_document(path, stat)
+            if current is not None:
+                self._remove(current)
+                update.updated += 1
+            else:
+                update.added += 1
+            self._add(document)
+        for path in [path for path in documents if path not in seen]:
+            self._remove(documents[path])
+            update.removed += 1
+        if update.changed:
+            self._save()
+        self._refreshed = time.monotonic()
+        update.seconds = time.perf_counter() - start
+        return update
+
+    def _search(self, query: str, limit: int) -> list[SnippetMatch]:
+        documents = self._load()
+        if not documents:
+            return []
+        average_length = self._total_length / len(documents) or 1.0
+        scores: dict[str, float] = defaultdict(float)
+        for term in set(tokenize(query)):
+            postings = self._postings.get(term)
+            if not postings:
+                continue
+            idf = math.log(1 + (len(documents) - len(postings) + 0.5) / (len(postings) + 0.5))
+            for path, frequency in postings.items():
+                length = documents[path].length
+                norm = self.k1 * (1 - self.b + self.b * length / average_length)
+                scores[path] += idf * frequency * (self.k1 + 1) / (frequency + norm)
+        best = heapq.nlargest(limit, scores.items(), key=lambda item: item[1])
+        return [
+            SnippetMatch(path=path, module=documents[path].module, score=score, summary=documents[path].summary)
+            for path, score in best
+        ]
+
+    def read(self, path: str) -> str:
+        """The content of a library file.
+
+        Raises:
+            ValueError: If ``path`` is outside the library.
+        """
+        root = os.path.realpath(self.library)
+        full_path = os.path.realpath(os.path.join(root, path))
+        if os.path.commonpath([root, full_path]) != root:
+            raise ValueError(f"{path} is outside the snippet library.")
+        with open(full_path, "r", encoding="utf-8", errors="replace") as f:
+            return f.read()
+
+    def _walk(self) -> Iterator[tuple[str, os.stat_result]]:
+        if not os.path.isdir(self.library):
+            return
+        index_path = os.path.abspath(self.index_path)
+        for directory, subdirectories, filenames in os.walk(self.library):
+            subdirectories[:] = sorted(d for d in subdirectories if not d.startswith("."))
+            for filename in filenames:
+                if not filename.endswith(SNIPPET_SUFFIXES):
+                    continue
+                full_path = os.path.join(directory, filename)
+                if os.path.abspath(full_path) == index_path:
+                    continue
+                path = os.path.relpath(full_path, self.library).replace(os.sep, "/")
+                yield path, os.stat(full_path)
+
+    def _read_document(self, path: str, stat: os.stat_result) -> SnippetDocument:
+        with open(os.path.join(self.library, path), "r", encoding="utf-8", errors="replace") as f:
+            text = f.read()
+        terms = Counter(tokenize(text))
+        terms.update(tokenize(path.replace("/", " ").replace(".", " ")))
+        return SnippetDocument(
+            path=path,
+            mtime_ns=stat.st_mtime_ns,
+            size=stat.st_size,
+            length=sum(terms.values()),
+            terms=dict(terms),
+            summary=_summarize(text),
+        )
+
+    def _add(self, document: SnippetDocument) -> None:
+        self._documents[document.path] = document
+        self._total_length += document.length
+        for term, frequency in document.terms.items():
+            self._postings[term][document.path] = frequency
+
+    def _remove(self, document: SnippetDocument) -> None:
+        del self._documents[document.path]
+        self._total_length -= document.length
+        for term in document.terms:
+            postings = self._postings[term]
+            postings.pop(document.path, None)
+            if not postings:
+                del self._postings[term]
+
+    def _load(self) -> dict[str, SnippetDocument]:
+        if self._documents is not None:
+            return self._documents
+        self._documents = {}
+        try:
+            with open(self.index_path, "r") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return self._documents
+        if data.get("version") != INDEX_VERSION:
+            return self._documents
+        for entry in data.get("documents", []):
+            self._add(SnippetDocument(**entry))
+        return self._documents
+
+    def _save(self) -> None:
+        data = {
+            "version": INDEX_VERSION,
+            "documents": [
+                {
+                    "path": d.path,
+                    "mtime_ns": d.mtime_ns,
+                    "size": d.size,
+                    "length": d.length,
+                    "terms": d.terms,
+                    "summary": d.summary,
+                }
+                for d in self._documents.values()
+            ],
+        }
+        try:
+            os.makedirs(os.path.dirname(os.path.abspath(self.index_path)), exist_ok=True)
+            atomic_write(self.index_path, json.dumps(data, separators=(",", ":")))
+        except OSError:
+            # A read-only library is still searchable; the index is rebuilt in memory.
+            pass
+
+
+def _summarize(text: str) -> list[str]:
+    """The first comment and the block headers of a file, as a short description of it."""
+    summary = []
+    comment = _COMMENT.search(text)
+    if comment:
+        summary.append(comment.group(1))
+    for match in _BLOCK_HEADER.finditer(text):
+        kind, first, second = match.groups()
+        summary.append(f'{kind} "{first}"' + (f' "{second}"' if second else ""))
+        if len(summary) > _SUMMARY_BLOCKS:
+            break
+    return summary
+
+
+_indexes: dict[str, SnippetIndex] = {}
+
+
+def get_snippet_index(library: str) -> SnippetIndex:
+    """Return the process-wide index of the library at ``library``."""
+    key = os.path.abspath(library)
+    if key not in _indexes:
+        _indexes[key] = SnippetIndex(library)
+    return _indexes[key]
@@ -0,0 +1,85 @@
+# Copyright (c) Microsoft. All rights reserved.
+
+import os
+from typing import Annotated
+
+from semantic_kernel.functions import kernel_function
+
+from .concurrency import Access, tool_access
+from .snippet_index import SnippetIndex, get_snippet_index
+
+# The directory of approved modules and snippets, unless a plugin is given its own.
+DEFAULT_LIBRARY = os.getenv("TERRAFORM_SNIPPET_LIBRARY", "snippets")
+
+
+class SnippetLibraryPlugin:
+    """A plugin that searches a library of approved Terraform modules and snippets.
+
+    The library is a directory: each subdirectory holding ``.tf`` files is a module the
+    configuration can reference with a ``module`` block, and files at its root are
+    snippets to copy from. Searches are answered from a ``SnippetIndex`` shared by every
+    plugin on the same library.
+    """
+
+    def __init__(
+        self,
+        base_path: str = "terraform",
+        library: str | None = None,
+        index: SnippetIndex | None = None,
+        absolute_sources: bool = False,
+    ):
+        """Initialize the plugin.
+
+        Args:
+            base_path: The workspace the plugin's agent writes to.
+            library: The library directory; ``TERRAFORM_SNIPPET_LIBRARY`` by default.
+            index: The index to search; the process-wide index of the library by default.
+            absolute_sources: Give module sources as absolute paths instead of paths relative
+                to ``base_path``, for files that are copied to another workspace, as those of
+                a ``CandidatePanel`` candidate are. They resolve in both workspaces.
+        """
+        self.base_path = base_path
+        self.library = library or DEFAULT_LIBRARY
+        self.index = index or get_snippet_index(self.library)
+        self.absolute_sources = absolute_sources
+
+    @kernel_function(
+        description="Search the library of approved Terraform modules and snippets. Use it before writing "
+        "common infrastructure (networks, security groups, load balancers, scaling groups) from scratch."
+    )
+    @tool_access(Access.NONE)
+    def search_snippets(
+        self,
+        query: Annotated[str, "What to look for, e.g. 'vpc public private subnets'."],
+        limit: Annotated[int, "The most results to return."] = 5,
+    ) -> Annotated[str, "Returns the matching files, best first, with the module source to reference."]:
+        """Search the snippet library."""
+        if not os.path.isdir(self.library):
+            return "No snippet library is configured."
+        matches = self.index.search(query, limit=max(1, min(limit, 20)))
+        if not matches:
+            return "No matching modules or snippets."
+        lines = []
+        for rank, match in enumerate(matches, start=1):
+            if match.module is not None:
+                source = os.path.join(self.library, match.module)
+                source = os.path.abspath(source) if self.absolute_sources else os.path.relpath(source, self.base_path)
+                where = f'module source "{source.replace(os.sep, "/")}"'
+            else:
+                where = "snippet"
+            lines.append(f"{rank}. {match.path} ({where}, score {match.score:.2f})")
+            if match.summary:
+                lines.append("   " + "; ".join(match.summary))
+        return "\n".join(lines)
+
+    @kernel_function(description="Read a file of the snippet library, by the path search_snippets returned.")
+    @tool_access(Access.NONE)
+    def read_snippet(
+        self,
+        path: Annotated[str, "The path of the file within the library."],
+    ) -> Annotated[str, "Returns the content of the file."]:
+        """Read a file of the snippet library."""
+        try:
+            return self.index.read(path)
+        except (OSError, ValueError) as e:
+            return f"Error: {e}"
@@ -0,0 +1,220 @@
+# Copyright (c) Microsoft. All rights reserved.
+
+import json
+import re
+from dataclasses import dataclass, field
+
+from .hcl_checker import Diagnostic
+from .terraform_runner import CommandResult
+
+# Distinct diagnostics listed in a summary; the rest are counted.
+MAX_DIAGNOSTICS = 10
+# Locations listed for a diagnostic reported in several places.
+MAX_LOCATIONS = 3
+MAX_DETAIL_CHARS = 200
+MAX_SNIPPET_CHARS = 100
+
+_WHITESPACE = re.compile(r"\s+")
+_DIFF_FILE = re.compile(r"^\+\+\+ (?:new/|b/)?(.+?)\s*$")
+
+
+@dataclass(frozen=True)
+class TerraformDiagnostic:
+    """One diagnostic of ``terraform validate -json``, or of the in-process check."""
+
+    severity: str
+    summary: str
+    detail: str = ""
+    filename: str | None = None
+    line: int | None = None
+    column: int | None = None
+    snippet: str | None = None
+
+    @property
+    def location(self) -> str | None:
+        if self.filename is None:
+            return None
+        return f"{self.filename}:{self.line}:{self.column}" if self.line is not None else self.filename
+
+
+@dataclass
+class ValidationReport:
+    """The outcome of ``terraform validate``, parsed from its JSON output."""
+
+    valid: bool
+    error_count: int = 0
+    warning_count: int = 0
+    diagnostics: list[TerraformDiagnostic] = field(default_factory=list)
+
+    def to_json(self) -> str:
+        """Render the report in the format of ``terraform validate -json``."""
+        return json.dumps(
+            {
+                "valid": self.valid,
+                "error_count": self.error_count,
+                "warning_count": self.warning_count,
+                "diagnostics": [
+                    {
+                        "severity": d.severity,
+                        "summary": d.summary,
+                        "detail": d.detail,
+                        "range": {"filename": d.filename, "start": {"line": d.line, "column": d.column}},
+                    }
+                    for d in self.diagnostics
+                ],
+            }
+        )
+
+
+def diagnostics_report(diagnostics: list[Diagnostic]) -> ValidationReport:
+    """A report of the diagnostics of the in-process check."""
+    errors = sum(d.severity == "error" for d in diagnostics)
+    return ValidationReport(
+        valid=errors == 0,
+        error_count=errors,
+        warning_count=len(diagnostics) - errors,
+        diagnostics=[
+            TerraformDiagnostic(d.severity, d.summary, filename=d.filename, line=d.line, column=d.column)
+            for d in diagnostics
+        ],
+    )
+
+
+def parse_validate(result: CommandResult) -> ValidationReport:
+    """Parse the result of ``terraform validate -json``.
+
+    Output that is not JSON, e.g. from a Terraform too old for ``-json``, becomes a single
+    diagnostic holding the start of the text, so nothing is silently lost.
+    """
+    try:
+        data = json.loads(result.stdout)
+    except ValueError:
+        data = None
+    if not isinstance(data, dict) or "valid" not in data:
+        text = (result.stderr or result.stdout).strip()
+        warnings = int("Warning" in result.stdout or "Warning" in result.stderr)
+        if result.ok:
+            return ValidationReport(valid=True, warning_count=warnings)
+        return ValidationReport(
+            valid=False,
+            error_count=1,
+            warning_count=warnings,
+            diagnostics=[TerraformDiagnostic("error", "terraform validate failed", _truncate(text, 1000))],
+        )
+
+    diagnostics = []
+    for entry in data.get("diagnostics") or []:
+        range_ = entry.get("range") or {}
+        start = range_.get("start") or {}
+        snippet = entry.get("snippet") or {}
+        code = snippet.get("code")
+        diagnostics.append(
+            TerraformDiagnostic(
+                severity=entry.get("severity", "error"),
+                summary=entry.get("summary", ""),
+                detail=entry.get("detail") or "",
+                filename=range_.get("filename"),
+                line=start.get("line"),
+                column=start.get("column"),
+                snippet=f"{snippet['start_line']}: {code.strip()}" if code and "start_line" in snippet else code,
+            )
+        )
+    return ValidationReport(
+        valid=bool(data["valid"]) and result.ok,
+        error_count=data.get("error_count", sum(d.severity == "error" for d in diagnostics)),
+        warning_count=data.get("warning_count", sum(d.severity == "warning" for d in diagnostics)),
+        diagnostics=diagnostics,
+    )
+
+
+def format_validation(report: ValidationReport, details_path: str | None = None) -> str:
+    """A compact summary of a validation for the model.
+
+    Diagnostics that differ only in location are listed once with their locations, details
+    and snippets are shortened, and at most ``MAX_DIAGNOSTICS`` are listed.
+    """
+    counts = f"{_plural(report.error_count, 'error')}, {_plural(report.warning_count, 'warning')}"
+    if report.valid and not report.diagnostics:
+        return "The configuration is valid." + (f" ({counts})" if report.warning_count else "")
+    lines = [f"The configuration is {'valid' if report.valid else 'invalid'}: {counts}."]
+
+    groups: dict[tuple[str, str, str], list[TerraformDiagnostic]] = {}
+    for diagnostic in report.diagnostics:
+        groups.setdefault((diagnostic.severity, diagnostic.summary, diagnostic.detail), []).append(diagnostic)
+    # Errors first, in the order Terraform reported them.
+    ordered = sorted(groups.values(), key=lambda group: group[0].severity != "error")
+    for group in ordered[:MAX_DIAGNOSTICS]:
+        first = group[0]
+        locations = [d.location for d in group if d.location]
+        where = ""
+        if locations:
+            shown = ", ".join(locations[:MAX_LOCATIONS])
+            more = len(locations) - MAX_LOCATIONS
+            where = f" at {shown}" + (f" and {more} more" if more > 0 else "")
+        line = f"- {first.severity}{where}: {first.summary}"
+        if first.detail:
+            line += f": {_truncate(first.detail, MAX_DETAIL_CHARS)}"
+        lines.append(line)
+        if first.snippet:
+            lines.append(f"    {_truncate(first.snippet, MAX_SNIPPET_CHARS)}")
+    hidden = len(ordered) - MAX_DIAGNOSTICS
+    if hidden > 0:
+        lines.append(f"- ... and {_plural(hidden, 'more diagnostic')}.")
+    if details_path:
+        lines.append(f"Full output: {details_path}")
+    return "\n".join(lines)
+
+
+def format_fmt(result: CommandResult, details_path: str | None = None) -> str:
+    """A compact summary of ``terraform fmt`` for the model: the files it rewrote."""
+    if not result.ok:
+        text = _truncate(result.stderr or result.stdout, 1000)
+        summary = f"terraform fmt failed (exit code {result.returncode}): {text}"
+    else:
+        files = [line.strip() for line in result.stdout.splitlines() if line.strip()]
+        if not files:
+            return "All files were already formatted."
+        summary = f"Formatted {_plural(len(files), 'file')}: {', '.join(files)}."
+    return summary + (f"\nFull output: {details_path}" if details_path else "")
+
+
+def format_fmt_diff(result: CommandResult, details_path: str | None = None) -> str:
+    """A compact summary of ``terraform fmt -check -diff`` for the model.
+
+    It names the files that are not formatted and how many lines formatting would change
+    in each; the diff itself is left in the full output.
+    """
+    # fmt -check exits with 3 when files need formatting.
+    if result.returncode not in (0, 3):
+        text = _truncate(result.stderr or result.stdout, 1000)
+        summary = f"terraform fmt -check failed (exit code {result.returncode}): {text}"
+    else:
+        changes = parse_fmt_diff(result.stdout)
+        if not changes:
+            return "All files are formatted."
+        files = ", ".join(f"{filename} ({_plural(lines, 'line')})" for filename, lines in changes.items())
+        summary = f"{_plural(len(changes), 'file')} not formatted: {files}. Call fmt to rewrite them."
+    return summary + (f"\nFull output: {details_path}" if details_path else "")
+
+
+def parse_fmt_diff(stdout: str) -> dict[str, int]:
+    """Changed lines per file in the output of ``terraform fmt -check -diff``."""
+    changes: dict[str, int] = {}
+    current: str | None = None
+    for line in stdout.splitlines():
+        match = _DIFF_FILE.match(line)
+        if match:
+            current = match.group(1)
+            changes.setdefault(current, 0)
+        elif current is not None and line[:1] in ("+", "-") and not line.startswith("---"):
+            changes[current] += 1
+    return changes
+
+
+def _truncate(text: str, limit: int) -> str:
+    text = _WHITESPACE.sub(" ", text).strip()
+    return text if len(text) <= limit else text[: limit - 3].rstrip() + "..."
+
+
+def _plural(count: int, noun: str) -> str:
+    return f"{count} {noun}{'' if count == 1 else 's'}"
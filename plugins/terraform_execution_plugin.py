@@ -1,61 +1,266 @@
 # Copyright (c) Microsoft. All rights reserved.
 
+import json
+import os
 import subprocess
+import time
 from typing import Annotated
 
 from semantic_kernel.functions import kernel_function
 
+from .concurrency import Access, tool_access
+from .hcl_checker import Diagnostic, check_workspace, format_diagnostics
+from .patching import atomic_write
+from .terraform_diagnostics import (
+    diagnostics_report,
+    format_fmt,
+    format_fmt_diff,
+    format_validation,
+    parse_validate,
+)
+from .terraform_result_cache import (
+    TerraformResultCache,
+    get_default_cache,
+    init_digest,
+    validation_digest,
+    workspace_digest,
+)
+from .terraform_runner import CommandResult, TerraformRunner, get_default_runner
+
+# Where the full output of the commands the model ran is kept, within the workspace.
+DIAGNOSTICS_DIR = ".diagnostics"
+
 
 class TerraformExecutionPlugin:
     """A plugin that executes Terraform commands."""
 
-    def __init__(self, base_path: str = "terraform"):
+    def __init__(
+        self,
+        base_path: str = "terraform",
+        runner: TerraformRunner | None = None,
+        timeout: float | None = None,
+        cache: TerraformResultCache | None = None,
+        use_cache: bool = True,
+        use_fast_check: bool = True,
+    ):
         self.base_path = base_path
+        self.runner = runner or get_default_runner()
+        self.timeout = timeout
+        self.cache = (cache or get_default_cache()) if use_cache else None
+        self.use_fast_check = use_fast_check
+        # The init_digest the workspace was last initialized with by this plugin.
+        self._init_digest: str | None = None
+
+    async def _execute(self, *args: str) -> CommandResult | str:
+        try:
+            return await self.runner.run(*args, cwd=self.base_path, timeout=self.timeout)
+        except subprocess.TimeoutExpired as e:
+            return f"Error: terraform {args[0]} timed out after {e.timeout} seconds."
+        except FileNotFoundError as e:
+            return f"Error: {e}"
+
+    @staticmethod
+    def _format(result: CommandResult | str) -> str:
+        if isinstance(result, str):
+            return result
+        if result.ok:
+            return result.stdout
+        return f"Error (exit code {result.returncode}): {result.stderr or result.stdout}"
+
+    def _save_output(self, command: str, result: CommandResult) -> str | None:
+        """Keep the full output of a command for debugging; the model is sent a summary.
+
+        Returns:
+            The path of the saved output, or None if it could not be written.
+        """
+        path = os.path.join(self.base_path, DIAGNOSTICS_DIR, f"{command}.json")
+        output = {
+            "args": list(result.args),
+            "returncode": result.returncode,
+            "duration": result.duration,
+            "stdout": result.stdout,
+            "stderr": result.stderr,
+        }
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            atomic_write(path, json.dumps(output, indent=2))
+        except OSError:
+            return None
+        return path
+
+    async def _cache_key(self, command: str, digest: str) -> str:
+        return TerraformResultCache.make_key(command, digest, await self.runner.version())
+
+    async def run_init(self) -> CommandResult | str:
+        """Run ``terraform init``, skipping it when nothing it depends on has changed.
+
+        Returns:
+            The command result, or an error message if the command could not be run.
+        """
+        args = ("init", "-input=false", "-no-color")
+        # init is only skipped when the workspace has already been initialized with the
+        # same lock file and provider/module declarations.
+        initialized = os.path.isdir(os.path.join(self.base_path, ".terraform"))
+        if self.cache is not None and initialized:
+            digest = init_digest(self.base_path)
+            cached = self.cache.get(await self._cache_key("init", digest))
+            if cached is not None:
+                self._init_digest = digest
+                return cached
+
+        result = await self._execute(*args)
+        if isinstance(result, CommandResult) and result.ok:
+            # Key on the post-run state: init may have created or updated the lock file.
+            self._init_digest = init_digest(self.base_path)
+            if self.cache is not None:
+                self.cache.put(await self._cache_key("init", self._init_digest), result)
+        return result
+
+    async def ensure_initialized(self) -> CommandResult | str | None:
+        """Run ``terraform init`` unless the workspace is initialized for its current declarations.
+
+        ``validate`` fails in a workspace that was never initialized, or that declares a
+        provider or module added since its last ``init``, so callers that validate on
+        their own, rather than at the model's request, call this first. ``run_init`` is
+        skipped only when ``init_digest`` matches the last successful ``init`` of this
+        plugin; otherwise it runs, answering from the cache when it can.
+
+        Returns:
+            The result of ``init``, or None if it was not needed.
+        """
+        initialized = os.path.isdir(os.path.join(self.base_path, ".terraform"))
+        if initialized and self._init_digest == init_digest(self.base_path):
+            return None
+        return await self.run_init()
+
+    def run_fast_check(self) -> list[Diagnostic]:
+        """Check the workspace in-process, without running Terraform.
+
+        Returns:
+            The diagnostics found; an empty list if the files look valid.
+        """
+        return check_workspace(self.base_path)
+
+    async def run_validate(self) -> CommandResult | str:
+        """Run ``terraform validate -json``, answering from the cache when the files are unchanged.
+
+        The in-process checker runs first; if it finds errors they are returned as a failed
+        result, with the same JSON on stdout, and Terraform is not invoked. Use
+        ``parse_validate`` to read the result.
+        """
+        if self.use_fast_check:
+            start = time.perf_counter()
+            errors = [d for d in self.run_fast_check() if d.severity == "error"]
+            if errors:
+                return CommandResult(
+                    args=("fast-check",),
+                    returncode=1,
+                    stdout=diagnostics_report(errors).to_json(),
+                    stderr=format_diagnostics(errors),
+                    duration=time.perf_counter() - start,
+                )
+        return await self._run_read_only("validate-json", "validate", "-json", "-no-color")
+
+    async def run_fmt_check(self) -> CommandResult | str:
+        """Run ``terraform fmt -check``, which lists unformatted files without rewriting them."""
+        return await self._run_read_only("fmt-check", "fmt", "-check", "-list=true", "-no-color")
+
+    async def run_fmt_diff(self) -> CommandResult | str:
+        """Run ``terraform fmt -check -diff``, which prints the changes fmt would make."""
+        return await self._run_read_only("fmt-diff", "fmt", "-check", "-diff", "-no-color")
+
+    async def run_fmt(self) -> CommandResult | str:
+        """Run ``terraform fmt``, which rewrites the files and lists the ones it changed."""
+        args = ("fmt", "-no-color")
+        if self.cache is None:
+            return await self._execute(*args)
+
+        before = workspace_digest(self.base_path)
+        cached = self.cache.get(await self._cache_key("fmt", before))
+        if cached is not None:
+            return cached
+
+        result = await self._execute(*args)
+        if isinstance(result, CommandResult) and result.ok:
+            after = workspace_digest(self.base_path)
+            # fmt rewrites files, so a result is only replayable for content it left
+            # untouched. The rewritten content is by definition already formatted.
+            if before == after:
+                self.cache.put(await self._cache_key("fmt", before), result)
+            else:
+                self.cache.put(
+                    await self._cache_key("fmt", after),
+                    CommandResult(args=result.args, returncode=0, stdout="", stderr="", duration=result.duration),
+                )
+        return result
+
+    async def _run_read_only(self, command: str, *args: str) -> CommandResult | str:
+        if self.cache is None:
+            return await self._execute(*args)
+
+        key = await self._cache_key(command, validation_digest(self.base_path))
+        cached = self.cache.get(key)
+        if cached is not None:
+            return cached
+
+        result = await self._execute(*args)
+        if isinstance(result, CommandResult):
+            self.cache.put(key, result)
+        return result
 
     @kernel_function(description="Initialize a Terraform working directory.")
-    def init(
+    @tool_access(Access.WRITE)
+    async def init(
         self
     ) -> Annotated[str, "Returns the output of the command."]:
         """Initialize a Terraform working directory."""
-        try:
-            result = subprocess.run(
-                ["terraform", "init"],
-                cwd=self.base_path,
-                capture_output=True,
-                text=True
-            )
-            return result.stdout
-        except subprocess.CalledProcessError as e:
-            return f"Error: {e.stderr}"
+        return self._format(await self.run_init())
+
+    @kernel_function(
+        description="Quickly check Terraform files for syntax errors, duplicate definitions, undeclared "
+        "variable/local references and missing required arguments, without running terraform."
+    )
+    @tool_access(Access.READ)
+    def check(
+        self
+    ) -> Annotated[str, "Returns one diagnostic per line as file:line:column, or a confirmation."]:
+        """Check Terraform files in-process."""
+        diagnostics = self.run_fast_check()
+        if not diagnostics:
+            return "No problems found."
+        return format_diagnostics(diagnostics)
 
     @kernel_function(description="Validate Terraform configuration files.")
-    def validate(
+    @tool_access(Access.READ)
+    async def validate(
         self
-    ) -> Annotated[str, "Returns the output of the command."]:
+    ) -> Annotated[str, "Returns the error and warning counts and each distinct diagnostic with its locations."]:
         """Validate Terraform configuration files."""
-        try:
-            result = subprocess.run(
-                ["terraform", "validate"],
-                cwd=self.base_path,
-                capture_output=True,
-                text=True
-            )
-            return result.stdout
-        except subprocess.CalledProcessError as e:
-            return f"Error: {e.stderr}"
+        result = await self.run_validate()
+        if isinstance(result, str):
+            return result
+        return format_validation(parse_validate(result), self._save_output("validate", result))
 
-    @kernel_function(description="Format Terraform configuration files.")
-    def fmt(
+    @kernel_function(
+        description="Check whether Terraform configuration files are formatted, without changing them."
+    )
+    @tool_access(Access.READ)
+    async def fmt_check(
         self
-    ) -> Annotated[str, "Returns the output of the command."]:
-        """Format Terraform configuration files."""
-        try:
-            result = subprocess.run(
-                ["terraform", "fmt"],
-                cwd=self.base_path,
-                capture_output=True,
-                text=True
-            )
-            return result.stdout
-        except subprocess.CalledProcessError as e:
-            return f"Error: {e.stderr}" 
\ No newline at end of file
+    ) -> Annotated[str, "Returns the files that are not formatted and the lines formatting would change."]:
+        """Check the formatting of Terraform configuration files with ``terraform fmt -check -diff``."""
+        result = await self.run_fmt_diff()
+        if isinstance(result, str):
+            return result
+        return format_fmt_diff(result, self._save_output("fmt-diff", result))
+
+    @kernel_function(description="Rewrite Terraform configuration files in the canonical format.")
+    @tool_access(Access.WRITE)
+    async def fmt(
+        self
+    ) -> Annotated[str, "Returns the files that were reformatted."]:
+        """Format Terraform configuration files, rewriting them."""
+        result = await self.run_fmt()
+        if isinstance(result, str):
+            return result
+        return format_fmt(result, self._save_output("fmt", result))
@@ -5,43 +5,154 @@ from typing import Annotated
 
 from semantic_kernel.functions import kernel_function
 
+from .concurrency import Access, tool_access
+from .file_cache import FileCache
+from .patching import PatchConflictError, apply_unified_diff, content_hash, replace_unique
+
 
 class TerraformFilePlugin:
-    """A plugin that manages Terraform files."""
+    """A plugin that manages Terraform files.
+
+    Reads and directory listings are served from a ``FileCache``, which checks each
+    file's modification time and size, so repeated reads of unchanged files do not
+    read them from disk again.
+    """
 
     def __init__(self, base_path: str = "terraform"):
         self.base_path = base_path
         if not os.path.exists(base_path):
             os.makedirs(base_path)
+        self.cache = FileCache(base_path)
 
     @kernel_function(description="Create a new Terraform file with the given content.")
+    @tool_access(Access.WRITE)
     def create_file(
         self, 
         filename: Annotated[str, "The name of the file to create."],
         content: Annotated[str, "The content of the file."]
     ) -> Annotated[str, "Returns the path of the created file."]:
         """Create a new Terraform file with the given content."""
-        file_path = os.path.join(self.base_path, filename)
-        with open(file_path, "w") as f:
-            f.write(content)
-        return f"Created Terraform file: {file_path}"
+        self.cache.write(filename, content)
+        return f"Created Terraform file: {self.cache.path(filename)}"
 
     @kernel_function(description="Read the content of a Terraform file.")
+    @tool_access(Access.READ)
     def read_file(
         self, 
         filename: Annotated[str, "The name of the file to read."]
     ) -> Annotated[str, "Returns the content of the file."]:
         """Read the content of a Terraform file."""
-        file_path = os.path.join(self.base_path, filename)
-        if not os.path.exists(file_path):
-            raise FileNotFoundError(f"File {file_path} not found.")
-        with open(file_path, "r") as f:
-            return f.read()
+        return self.cache.read(filename)
 
     @kernel_function(description="List all Terraform files in the directory.")
+    @tool_access(Access.READ)
     def list_files(
         self
     ) -> Annotated[str, "Returns a list of Terraform files."]:
         """List all Terraform files in the directory."""
-        files = [f for f in os.listdir(self.base_path) if f.endswith(".tf")]
-        return "\n".join(files) if files else "No Terraform files found." 
\ No newline at end of file
+        files = self.cache.list()
+        return "\n".join(files) if files else "No Terraform files found."
+
+    @kernel_function(
+        description="Read several Terraform files in one call, each with its version hash. "
+        "Leave filenames empty to read every Terraform file in the workspace."
+    )
+    @tool_access(Access.READ)
+    def read_files(
+        self,
+        filenames: Annotated[list[str] | None, "The names of the files to read; empty reads all files."] = None,
+    ) -> Annotated[str, "Returns each file's name, version hash and content."]:
+        """Read several Terraform files, or the whole workspace."""
+        names = filenames or self.cache.list()
+        if not names:
+            return "No Terraform files found."
+        sections = []
+        for filename in names:
+            try:
+                content = self.cache.read(filename)
+            except FileNotFoundError:
+                sections.append(f"# ---- {filename} (not found) ----")
+                continue
+            sections.append(f"# ---- {filename} (version {content_hash(content)}) ----\n{content}")
+        return "\n".join(sections)
+
+    @kernel_function(
+        description="Create or overwrite several Terraform files in one call. Either every file is "
+        "written or, if any write fails, none are."
+    )
+    @tool_access(Access.WRITE)
+    def write_files(
+        self,
+        files: Annotated[dict[str, str], "Map of file name to the file's complete new content."],
+    ) -> Annotated[str, "Returns the written files with their new version hashes."]:
+        """Write several Terraform files atomically."""
+        if not files:
+            return "No files to write."
+        self.cache.write_many(files)
+        written = ", ".join(f"{filename} (version {content_hash(content)})" for filename, content in files.items())
+        return f"Wrote {len(files)} Terraform file(s): {written}"
+
+    @kernel_function(
+        description="Read a range of lines from a Terraform file. Lines are numbered, and the file's "
+        "version hash is included so later edits can detect concurrent changes."
+    )
+    @tool_access(Access.READ)
+    def read_lines(
+        self,
+        filename: Annotated[str, "The name of the file to read."],
+        start_line: Annotated[int, "The first line to read, starting at 1."] = 1,
+        end_line: Annotated[int, "The last line to read (inclusive); 0 reads to the end of the file."] = 0,
+    ) -> Annotated[str, "Returns the numbered lines and the file's version hash."]:
+        """Read a range of lines from a Terraform file."""
+        content = self._read(filename)
+        lines = content.splitlines()
+        start = max(start_line, 1)
+        end = len(lines) if end_line <= 0 else min(end_line, len(lines))
+        width = len(str(end))
+        numbered = "\n".join(f"{i:>{width}}| {lines[i - 1]}" for i in range(start, end + 1))
+        return f"{filename} (version {content_hash(content)}, {len(lines)} lines)\n{numbered}"
+
+    @kernel_function(
+        description="Edit a Terraform file by replacing an exact snippet of text. Prefer this over "
+        "create_file for small changes; the search text must occur exactly once."
+    )
+    @tool_access(Access.WRITE)
+    def replace_in_file(
+        self,
+        filename: Annotated[str, "The name of the file to edit."],
+        search: Annotated[str, "The exact text to replace, including enough lines to be unique."],
+        replace: Annotated[str, "The replacement text."],
+        base_version: Annotated[str, "Optional version hash from read_lines; the edit is rejected if the file changed since."] = "",
+    ) -> Annotated[str, "Returns a confirmation with the file's new version hash."]:
+        """Replace a unique snippet of text in a Terraform file."""
+        content = self._read(filename, base_version)
+        updated = replace_unique(content, search, replace)
+        return self._commit(filename, updated)
+
+    @kernel_function(
+        description="Edit a Terraform file by applying a unified diff (hunks starting with '@@'). "
+        "Prefer this over create_file for changes to existing files."
+    )
+    @tool_access(Access.WRITE)
+    def apply_patch(
+        self,
+        filename: Annotated[str, "The name of the file to patch."],
+        diff: Annotated[str, "The unified diff to apply to the file."],
+        base_version: Annotated[str, "Optional version hash from read_lines; the patch is rejected if the file changed since."] = "",
+    ) -> Annotated[str, "Returns a confirmation with the file's new version hash."]:
+        """Apply a unified diff to a Terraform file."""
+        content = self._read(filename, base_version)
+        updated = apply_unified_diff(content, diff)
+        return self._commit(filename, updated)
+
+    def _read(self, filename: str, base_version: str = "") -> str:
+        content = self.cache.read(filename)
+        if base_version and content_hash(content) != base_version:
+            raise PatchConflictError(
+                f"{filename} changed since version {base_version} (now {content_hash(content)}); read it again."
+            )
+        return content
+
+    def _commit(self, filename: str, content: str) -> str:
+        self.cache.write(filename, content)
+        return f"Updated Terraform file: {self.cache.path(filename)} (version {content_hash(content)})"
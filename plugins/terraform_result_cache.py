@@ -0,0 +1,224 @@
+# Copyright (c) Microsoft. All rights reserved.
+
+import hashlib
+import json
+import os
+import re
+from collections import OrderedDict
+from dataclasses import asdict, dataclass
+
+from opentelemetry import metrics
+
+from .terraform_runner import CommandResult
+
+meter = metrics.get_meter(__name__)
+cache_lookups = meter.create_counter(
+    "terraform.cache.lookups", description="Terraform result cache lookups, by outcome (hit or miss)."
+)
+
+LOCK_FILE = ".terraform.lock.hcl"
+
+# Provider blocks, provider and module sources, version constraints and the providers that
+# resource and data blocks imply by the prefix of their type.
+_PROVIDER_PATTERN = re.compile(
+    r'^\s*(?:provider\s+"([^"]+)"|source\s*=\s*"([^"]+)"|version\s*=\s*"([^"]+)"'
+    r'|(?:resource|data)\s+"([^"_]+)[_"])',
+    re.M,
+)
+# Module sources that name a directory on disk rather than a registry or remote address.
+_LOCAL_SOURCE_PATTERN = re.compile(r'^\s*source\s*=\s*"((?:\.\.?/|/)[^"]*)"', re.M)
+
+
+@dataclass
+class CacheStats:
+    """Counters describing how much Terraform subprocess work the cache avoided."""
+
+    hits: int = 0
+    misses: int = 0
+    memory_hits: int = 0
+    disk_hits: int = 0
+    evictions: int = 0
+    saved_seconds: float = 0.0
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+
+def _tf_files(base_path: str) -> list[str]:
+    if not os.path.isdir(base_path):
+        return []
+    return sorted(
+        f for f in os.listdir(base_path)
+        if not f.startswith(".")
+        and f.endswith((".tf", ".tf.json", ".tfvars"))
+        and os.path.isfile(os.path.join(base_path, f))
+    )
+
+
+def workspace_digest(base_path: str) -> str:
+    """Hash the names and contents of the Terraform files in a workspace."""
+    digest = hashlib.sha256()
+    for filename in _tf_files(base_path):
+        digest.update(filename.encode())
+        digest.update(b"\0")
+        with open(os.path.join(base_path, filename), "rb") as f:
+            digest.update(f.read())
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+def local_module_dirs(base_path: str) -> list[str]:
+    """The directories of the local modules a configuration calls, directly or through other modules.
+
+    These are the ``./``, ``../`` and absolute ``source`` paths that name an existing
+    directory, resolved against the directory of the configuration that calls them.
+    """
+    found: list[str] = []
+    pending = [os.path.abspath(base_path)]
+    while pending:
+        directory = pending.pop()
+        for filename in _tf_files(directory):
+            with open(os.path.join(directory, filename), encoding="utf-8", errors="replace") as f:
+                sources = _LOCAL_SOURCE_PATTERN.findall(f.read())
+            for source in sources:
+                module_dir = os.path.normpath(os.path.join(directory, source))
+                if module_dir not in found and os.path.isdir(module_dir):
+                    found.append(module_dir)
+                    pending.append(module_dir)
+    return sorted(found)
+
+
+def init_digest(base_path: str) -> str:
+    """Hash the inputs that decide whether ``terraform init`` has anything to do.
+
+    These are the dependency lock file, the provider and module sources and version
+    constraints declared in the configuration, and the providers its resources and data
+    sources imply.
+    """
+    digest = hashlib.sha256(os.path.abspath(base_path).encode())
+    lock_path = os.path.join(base_path, LOCK_FILE)
+    if os.path.exists(lock_path):
+        with open(lock_path, "rb") as f:
+            digest.update(f.read())
+    declarations: set[str] = set()
+    for filename in _tf_files(base_path):
+        with open(os.path.join(base_path, filename), encoding="utf-8", errors="replace") as f:
+            for match in _PROVIDER_PATTERN.finditer(f.read()):
+                declarations.add(next(group for group in match.groups() if group))
+    for declaration in sorted(declarations):
+        digest.update(declaration.encode())
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+def validation_digest(base_path: str) -> str:
+    """Hash what the result of ``terraform validate`` or ``fmt -check`` depends on.
+
+    That is the Terraform files, those of the local modules they call, and the workspace's
+    initialization: whether it has been initialized and ``init_digest``, which also covers
+    the workspace's path. A failure recorded before ``init`` is therefore not replayed after
+    it, nor in another workspace, and editing a module invalidates the configurations that
+    call it.
+    """
+    initialized = os.path.isdir(os.path.join(base_path, ".terraform"))
+    digest = hashlib.sha256(workspace_digest(base_path).encode())
+    digest.update(b"\0initialized\0" if initialized else b"\0uninitialized\0")
+    digest.update(init_digest(base_path).encode())
+    for module_dir in local_module_dirs(base_path):
+        digest.update(f"\0{module_dir}\0{workspace_digest(module_dir)}".encode())
+    return digest.hexdigest()
+
+
+class TerraformResultCache:
+    """An LRU cache of Terraform command results keyed by workspace content.
+
+    Entries live in memory and, when ``cache_dir`` is given, are also written to disk as
+    JSON so they survive restarts and can be shared by several processes.
+    """
+
+    def __init__(self, max_entries: int = 256, cache_dir: str | None = None):
+        self.max_entries = max_entries
+        self.cache_dir = cache_dir
+        self.stats = CacheStats()
+        self._entries: OrderedDict[str, CommandResult] = OrderedDict()
+        if cache_dir and not os.path.exists(cache_dir):
+            os.makedirs(cache_dir)
+
+    @staticmethod
+    def make_key(command: str, digest: str, terraform_version: str) -> str:
+        return hashlib.sha256(f"{terraform_version}\0{command}\0{digest}".encode()).hexdigest()
+
+    def get(self, key: str) -> CommandResult | None:
+        """Return the cached result for ``key``, counting the lookup as a hit or miss."""
+        result = self._entries.get(key)
+        if result is not None:
+            self._entries.move_to_end(key)
+            self.stats.memory_hits += 1
+        else:
+            result = self._read_disk(key)
+            if result is not None:
+                self._remember(key, result)
+                self.stats.disk_hits += 1
+
+        if result is None:
+            self.stats.misses += 1
+        else:
+            self.stats.hits += 1
+            self.stats.saved_seconds += result.duration
+        cache_lookups.add(1, {"cache.outcome": "miss" if result is None else "hit"})
+        return result
+
+    def put(self, key: str, result: CommandResult) -> None:
+        self._remember(key, result)
+        self._write_disk(key, result)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def _remember(self, key: str, result: CommandResult) -> None:
+        if self.max_entries <= 0:
+            return
+        self._entries[key] = result
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.stats.evictions += 1
+
+    def _disk_path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, f"{key}.json")
+
+    def _read_disk(self, key: str) -> CommandResult | None:
+        if not self.cache_dir:
+            return None
+        try:
+            with open(self._disk_path(key), "r") as f:
+                data = json.load(f)
+            data["args"] = tuple(data["args"])
+            return CommandResult(**data)
+        except (OSError, ValueError, TypeError, KeyError):
+            return None
+
+    def _write_disk(self, key: str, result: CommandResult) -> None:
+        if not self.cache_dir:
+            return
+        path = self._disk_path(key)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        try:
+            with open(tmp_path, "w") as f:
+                json.dump(asdict(result), f)
+            os.replace(tmp_path, path)
+        except OSError:
+            pass
+
+
+_default_cache: TerraformResultCache | None = None
+
+
+def get_default_cache() -> TerraformResultCache:
+    """Return the process-wide in-memory cache shared by plugins that were not given their own."""
+    global _default_cache
+    if _default_cache is None:
+        _default_cache = TerraformResultCache()
+    return _default_cache
@@ -0,0 +1,170 @@
+# Copyright (c) Microsoft. All rights reserved.
+
+import asyncio
+import os
+import subprocess
+import time
+import weakref
+from dataclasses import dataclass
+
+from opentelemetry import metrics, trace
+from opentelemetry.trace import Status, StatusCode
+
+tracer = trace.get_tracer(__name__)
+meter = metrics.get_meter(__name__)
+command_duration = meter.create_histogram(
+    "terraform.command.duration", unit="s", description="Duration of a Terraform subprocess."
+)
+
+
+@dataclass(frozen=True)
+class CommandResult:
+    """The captured outcome of a single Terraform command."""
+
+    args: tuple[str, ...]
+    returncode: int
+    stdout: str
+    stderr: str
+    duration: float
+
+    @property
+    def ok(self) -> bool:
+        return self.returncode == 0
+
+
+class TerraformRunner:
+    """Runs Terraform commands as asyncio subprocesses without blocking the event loop.
+
+    At most ``max_concurrency`` commands run at the same time in each event loop;
+    additional callers wait for a free slot. A command that exceeds its timeout, or whose
+    awaiting task is cancelled, has its child process killed before control returns to the
+    caller.
+    """
+
+    def __init__(
+        self,
+        binary: str = "terraform",
+        max_concurrency: int = 4,
+        default_timeout: float = 120.0,
+    ):
+        if max_concurrency < 1:
+            raise ValueError("max_concurrency must be at least 1.")
+        self.binary = binary
+        self.max_concurrency = max_concurrency
+        self.default_timeout = default_timeout
+        # event loop -> slots; asyncio primitives cannot be shared across loops.
+        self._semaphores: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.Semaphore]" = (
+            weakref.WeakKeyDictionary()
+        )
+        self._version: str | None = None
+
+    async def version(self) -> str:
+        """Return the Terraform version string, querying the binary only once."""
+        if self._version is None:
+            try:
+                result = await self.run("version", cwd=os.getcwd(), timeout=30.0)
+                first_line = result.stdout.splitlines()[0] if result.stdout else ""
+                self._version = first_line.strip() or "unknown"
+            except (OSError, subprocess.TimeoutExpired):
+                self._version = "unknown"
+        return self._version
+
+    def _slots(self) -> asyncio.Semaphore:
+        loop = asyncio.get_running_loop()
+        if loop not in self._semaphores:
+            self._semaphores[loop] = asyncio.Semaphore(self.max_concurrency)
+        return self._semaphores[loop]
+
+    async def run(
+        self,
+        *args: str,
+        cwd: str,
+        timeout: float | None = None,
+        check: bool = False,
+    ) -> CommandResult:
+        """Run ``terraform <args>`` in ``cwd``.
+
+        Args:
+            args: The Terraform subcommand and its arguments.
+            cwd: The working directory to run the command in.
+            timeout: Seconds before the process is killed. Defaults to ``default_timeout``.
+            check: Raise ``subprocess.CalledProcessError`` on a non-zero exit code.
+
+        Returns:
+            CommandResult: The exit code, decoded stdout/stderr and wall-clock duration.
+
+        Raises:
+            subprocess.TimeoutExpired: If the command did not finish within the timeout.
+            subprocess.CalledProcessError: If ``check`` is set and the command failed.
+        """
+        timeout = self.default_timeout if timeout is None else timeout
+        cmd = (self.binary, *args)
+        subcommand = args[0] if args else ""
+
+        with tracer.start_as_current_span(
+            f"terraform {subcommand}", attributes={"process.command_args": list(cmd), "process.cwd": cwd}
+        ) as span:
+            queued = time.perf_counter()
+            async with self._slots():
+                start = time.perf_counter()
+                span.set_attribute("terraform.queue_seconds", start - queued)
+                process = await asyncio.create_subprocess_exec(
+                    *cmd,
+                    cwd=cwd,
+                    stdin=asyncio.subprocess.DEVNULL,
+                    stdout=asyncio.subprocess.PIPE,
+                    stderr=asyncio.subprocess.PIPE,
+                    env={**os.environ, "TF_IN_AUTOMATION": "1"},
+                )
+                try:
+                    stdout, stderr = await asyncio.wait_for(process.communicate(), timeout=timeout)
+                except asyncio.TimeoutError:
+                    await self._kill(process)
+                    span.set_status(Status(StatusCode.ERROR, f"timed out after {timeout} seconds"))
+                    _record(subcommand, time.perf_counter() - start, "timeout")
+                    raise subprocess.TimeoutExpired(list(cmd), timeout)
+                except asyncio.CancelledError:
+                    await self._kill(process)
+                    raise
+                duration = time.perf_counter() - start
+
+            span.set_attribute("process.exit_code", process.returncode)
+            _record(subcommand, duration, "ok" if process.returncode == 0 else "failed")
+
+        result = CommandResult(
+            args=cmd,
+            returncode=process.returncode,
+            stdout=stdout.decode(errors="replace"),
+            stderr=stderr.decode(errors="replace"),
+            duration=duration,
+        )
+        if check and not result.ok:
+            raise subprocess.CalledProcessError(
+                result.returncode, list(cmd), output=result.stdout, stderr=result.stderr
+            )
+        return result
+
+    @staticmethod
+    async def _kill(process: asyncio.subprocess.Process) -> None:
+        if process.returncode is None:
+            try:
+                process.kill()
+            except ProcessLookupError:
+                pass
+        # Shield the reap so a second cancellation cannot leave a zombie behind.
+        await asyncio.shield(process.wait())
+
+
+def _record(subcommand: str, duration: float, outcome: str) -> None:
+    command_duration.record(duration, {"terraform.command": subcommand, "terraform.outcome": outcome})
+
+
+_default_runner: TerraformRunner | None = None
+
+
+def get_default_runner() -> TerraformRunner:
+    """Return the process-wide runner shared by plugins that were not given their own."""
+    global _default_runner
+    if _default_runner is None:
+        _default_runner = TerraformRunner()
+    return _default_runner
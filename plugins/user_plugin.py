@@ -1,16 +1,47 @@
 # Copyright (c) Microsoft. All rights reserved.
 
+import time
 from typing import Annotated
 
+from opentelemetry import trace
 from semantic_kernel.functions import kernel_function
 
+from .concurrency import Access, tool_access
+from .feedback import FeedbackChannel, create_feedback_channel
+
 
 class UserPlugin:
-    """A plugin that interacts with the user."""
+    """A plugin that interacts with the user.
+
+    Feedback comes from a ``FeedbackChannel``: the terminal, a file of recorded feedback, an
+    automatic approver or any of them under a timeout. Requests are awaited without
+    blocking the event loop, so other chats keep running while one waits for the user.
+    """
+
+    def __init__(self, channel: FeedbackChannel | None = None):
+        """Initialize the plugin.
+
+        Args:
+            channel: Where feedback comes from; by default a channel from the factory set
+                with ``set_feedback_channel_factory``.
+        """
+        self.channel = channel or create_feedback_channel()
+
+    def reset_channel(self) -> None:
+        """Start a new task with a fresh channel from the factory.
+
+        A channel keeps state between requests, such as the position in recorded feedback,
+        so a workspace that runs one task after another must not carry it over.
+        """
+        self.channel = create_feedback_channel()
 
     @kernel_function(description="Present the Terraform configuration to user and request feedback.")
-    def request_user_feedback(
+    @tool_access(Access.NONE)
+    async def request_user_feedback(
         self, content: Annotated[str, "The Terraform configuration to present and request feedback on."]
     ) -> Annotated[str, "The feedback provided by the user."]:
         """Request user feedback on the Terraform configuration."""
-        return input(f"Please provide feedback on the Terraform configuration:\n\n{content}\n\n> ") 
\ No newline at end of file
+        start = time.perf_counter()
+        feedback = await self.channel.request(content)
+        trace.get_current_span().set_attribute("user.feedback_wait_seconds", time.perf_counter() - start)
+        return feedback
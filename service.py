@@ -0,0 +1,478 @@
+"""Run the Terraform generator as a long-lived local HTTP service.
+
+Jobs are queued and run by a fixed pool of workers. Each worker owns a workspace and a
+set of agents (with their kernels and plugins) that it reuses from job to job, and the
+chat service, HTTP connection pool, Terraform runner and result caches are shared by
+the whole process, so only the first job pays for warming them up::
+
+    python service.py --port 8080 --workers 2
+    curl -s localhost:8080/jobs -d '{"task": "Create an S3 bucket with versioning."}'
+    curl -sN localhost:8080/jobs/<id>/events
+    curl -s localhost:8080/stats
+
+Endpoints:
+
+- ``POST /jobs`` with ``{"task": ..., "id": optional}`` queues a job (202, or 503 when the
+  queue is full).
+- ``GET /jobs`` lists jobs; ``GET /jobs/{id}`` returns one, with its files once finished.
+- ``GET /jobs/{id}/events`` streams the job's progress as JSON lines until it finishes.
+- ``DELETE /jobs/{id}`` cancels a queued or running job.
+- ``GET /stats`` reports queue depth, running jobs and queue-wait and run latencies.
+- ``GET /health`` answers ``ok``.
+
+Pass ``--unix-socket PATH`` instead of ``--port`` to listen on a Unix socket. The model
+can be replaced by a local stub with ``--model openai`` and ``OPENAI_BASE_URL`` pointing at
+any OpenAI-compatible server, or by the benchmark's scripted model with
+``--scripted-model``, which needs no network at all.
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import shutil
+import statistics
+import time
+import uuid
+from collections import deque
+from collections.abc import AsyncIterator, Callable
+from dataclasses import dataclass, field
+from enum import Enum
+from typing import Any
+
+from aiohttp import web
+from opentelemetry import metrics, trace
+
+from main import (
+    AZURE_APP_INSIGHTS_CONNECTION_STRING,
+    SERVICE_NAME,
+    RunOptions,
+    add_run_arguments,
+    configure_chat_service,
+    configure_feedback,
+    create_agents,
+    options_from_args,
+    run_task,
+)
+from plugins.terraform_result_cache import LOCK_FILE
+from telemetry import set_up_telemetry, shut_down_telemetry
+
+logger = logging.getLogger(__name__)
+tracer = trace.get_tracer(__name__)
+meter = metrics.get_meter(__name__)
+
+job_queue_wait = meter.create_histogram("job.queue_wait", unit="s", description="Time a job spent queued.")
+job_duration = meter.create_histogram("job.duration", unit="s", description="Time a job spent running.")
+
+# Entries of a worker's workspace that survive between jobs. The installed providers, also
+# those of the candidates' workspaces, are kept with the lock file they were installed
+# for, so a job whose providers match the previous job's does not reinstall them. Checks
+# initialize through the digest-checked ``run_init``, which runs init again as soon as a
+# job declares providers or modules the kept ones do not match.
+_KEEP_BETWEEN_JOBS = frozenset({".terraform", LOCK_FILE, ".candidates"})
+
+
+class JobStatus(str, Enum):
+    QUEUED = "queued"
+    RUNNING = "running"
+    SUCCEEDED = "succeeded"
+    FAILED = "failed"
+    CANCELLED = "cancelled"
+
+    @property
+    def finished(self) -> bool:
+        return self in (JobStatus.SUCCEEDED, JobStatus.FAILED, JobStatus.CANCELLED)
+
+
+@dataclass
+class Job:
+    """A generation task submitted to the service, and everything it has reported."""
+
+    id: str
+    task: str
+    status: JobStatus = JobStatus.QUEUED
+    submitted: float = field(default_factory=time.time)
+    started: float | None = None
+    finished: float | None = None
+    result: dict[str, Any] | None = None
+    error: str | None = None
+    events: list[dict[str, Any]] = field(default_factory=list)
+    _changed: asyncio.Event = field(default_factory=asyncio.Event, repr=False)
+    _task: "asyncio.Task | None" = field(default=None, repr=False)
+
+    def publish(self, event: str, **data: Any) -> None:
+        """Append a progress event and wake up everyone following the job."""
+        self.events.append({"event": event, "job": self.id, "time": round(time.time(), 3), **data})
+        self._changed.set()
+
+    async def follow(self) -> AsyncIterator[dict[str, Any]]:
+        """Yield the job's events, past and future, until it has finished."""
+        position = 0
+        while True:
+            while position < len(self.events):
+                yield self.events[position]
+                position += 1
+            if self.status.finished:
+                return
+            self._changed.clear()
+            await self._changed.wait()
+
+    def to_dict(self, include_result: bool = True) -> dict[str, Any]:
+        data: dict[str, Any] = {
+            "id": self.id,
+            "status": self.status.value,
+            "submitted": self.submitted,
+            "started": self.started,
+            "finished": self.finished,
+            "queue_wait_seconds": _elapsed(self.submitted, self.started),
+            "run_seconds": _elapsed(self.started, self.finished),
+        }
+        if self.error is not None:
+            data["error"] = self.error
+        if include_result and self.result is not None:
+            data["result"] = self.result
+        return data
+
+
+class QueueFullError(Exception):
+    """Raised when a job is submitted while the queue is at its limit."""
+
+
+class GenerationService:
+    """A job queue served by workers that reuse their agents across jobs.
+
+    Args:
+        workspace_root: Directory that holds one workspace per worker.
+        workers: Jobs to run at once.
+        options: Settings applied to every job.
+        max_queue: Jobs that may wait at once; 0 for no limit.
+        agent_factory: Creates the agents of one worker for its workspace; defaults to
+            ``main.create_agents``.
+        history: Finished jobs to keep for lookups and latency statistics.
+    """
+
+    def __init__(
+        self,
+        workspace_root: str,
+        workers: int = 2,
+        options: RunOptions | None = None,
+        max_queue: int = 0,
+        agent_factory: Callable[[str], list] | None = None,
+        history: int = 1000,
+    ):
+        if workers < 1:
+            raise ValueError("workers must be at least 1.")
+        self.workspace_root = workspace_root
+        self.workers = workers
+        self.options = options or RunOptions()
+        self.agent_factory = agent_factory or (lambda workspace: create_agents(workspace, self.options))
+        self._queue: asyncio.Queue[Job] = asyncio.Queue(maxsize=max_queue)
+        self._jobs: dict[str, Job] = {}
+        self._finished: deque[str] = deque()
+        self._history = history
+        self._workers: list[asyncio.Task] = []
+        self._running = 0
+        self._counts = {status: 0 for status in JobStatus if status.finished}
+        self._queue_waits: deque[float] = deque(maxlen=history)
+        self._run_times: deque[float] = deque(maxlen=history)
+        self._started = time.time()
+
+    async def start(self) -> None:
+        """Create the workers, each with its workspace and agents."""
+        os.makedirs(self.workspace_root, exist_ok=True)
+        # Providers are downloaded once and shared by every workspace.
+        os.environ.setdefault("TF_PLUGIN_CACHE_DIR", os.path.abspath(os.path.join(self.workspace_root, ".plugin-cache")))
+        os.makedirs(os.environ["TF_PLUGIN_CACHE_DIR"], exist_ok=True)
+        for index in range(self.workers):
+            workspace = os.path.join(self.workspace_root, f"worker-{index}")
+            os.makedirs(workspace, exist_ok=True)
+            _clear_workspace(workspace)
+            agents = self.agent_factory(workspace)
+            self._workers.append(asyncio.create_task(self._work(workspace, agents), name=f"worker-{index}"))
+
+    async def stop(self) -> None:
+        """Cancel running jobs and stop the workers."""
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers.clear()
+
+    def submit(self, task: str, job_id: str | None = None) -> Job:
+        """Queue a job.
+
+        Raises:
+            QueueFullError: If ``max_queue`` jobs are already waiting.
+            ValueError: If a job with ``job_id`` already exists.
+        """
+        job_id = job_id or uuid.uuid4().hex[:12]
+        if job_id in self._jobs:
+            raise ValueError(f"Job {job_id} already exists.")
+        job = Job(id=job_id, task=task)
+        try:
+            self._queue.put_nowait(job)
+        except asyncio.QueueFull:
+            raise QueueFullError(f"The queue is full ({self._queue.maxsize} jobs waiting).") from None
+        self._jobs[job_id] = job
+        job.publish("queued", position=self._queue.qsize())
+        return job
+
+    def get(self, job_id: str) -> Job | None:
+        return self._jobs.get(job_id)
+
+    def jobs(self) -> list[Job]:
+        return list(self._jobs.values())
+
+    def cancel(self, job_id: str) -> Job | None:
+        """Cancel a job; a queued job is skipped and a running one is interrupted."""
+        job = self._jobs.get(job_id)
+        if job is None or job.status.finished:
+            return job
+        if job.status == JobStatus.QUEUED:
+            self._finish(job, JobStatus.CANCELLED)
+        elif job._task is not None:
+            job._task.cancel()
+        return job
+
+    def stats(self) -> dict[str, Any]:
+        """Queue depth, running jobs, finished jobs by status and latency percentiles."""
+        return {
+            "workers": self.workers,
+            "queue_depth": sum(1 for job in self._jobs.values() if job.status == JobStatus.QUEUED),
+            "running": self._running,
+            **{status.value: count for status, count in self._counts.items()},
+            "queue_wait_seconds": _percentiles(self._queue_waits),
+            "run_seconds": _percentiles(self._run_times),
+            "uptime_seconds": round(time.time() - self._started, 1),
+        }
+
+    async def _work(self, workspace: str, agents: list) -> None:
+        while True:
+            job = await self._queue.get()
+            try:
+                if job.status == JobStatus.QUEUED:
+                    job._task = asyncio.create_task(self._run(job, workspace, agents))
+                    try:
+                        await asyncio.shield(job._task)
+                    except asyncio.CancelledError:
+                        # The worker is stopping: a cancelled job ends normally, so only the
+                        # worker's own cancellation gets here, also right after a job finished.
+                        if not job._task.done():
+                            job._task.cancel()
+                            await asyncio.gather(job._task, return_exceptions=True)
+                        raise
+            finally:
+                self._queue.task_done()
+
+    async def _run(self, job: Job, workspace: str, agents: list) -> None:
+        job.status = JobStatus.RUNNING
+        job.started = time.time()
+        self._running += 1
+        self._queue_waits.append(job.started - job.submitted)
+        job_queue_wait.record(job.started - job.submitted)
+        job.publish("started", workspace=workspace)
+
+        def on_turn(agent: str, revision: int) -> None:
+            job.publish("turn", agent=agent, revision=revision)
+
+        try:
+            with tracer.start_as_current_span(f"job {job.id}", attributes={"job.id": job.id}):
+                _clear_workspace(workspace)
+                job.result = await run_task(
+                    job.task, workspace=workspace, verbose=False, options=self.options, agents=agents, on_turn=on_turn
+                )
+            self._finish(job, JobStatus.SUCCEEDED)
+        except asyncio.CancelledError:
+            self._finish(job, JobStatus.CANCELLED)
+        except Exception as e:
+            logger.exception("Job %s failed", job.id)
+            job.error = str(e)
+            self._finish(job, JobStatus.FAILED)
+        finally:
+            self._running -= 1
+
+    def _finish(self, job: Job, status: JobStatus) -> None:
+        job.status = status
+        job.finished = time.time()
+        if job.started is not None:
+            self._run_times.append(job.finished - job.started)
+            job_duration.record(job.finished - job.started, {"job.status": status.value})
+        self._counts[status] += 1
+        job.publish("finished", status=status.value, **({"error": job.error} if job.error else {}))
+        self._finished.append(job.id)
+        while len(self._finished) > self._history:
+            self._jobs.pop(self._finished.popleft(), None)
+
+
+def _clear_workspace(workspace: str) -> None:
+    """Remove everything a previous job left in a worker's workspace."""
+    for entry in os.scandir(workspace):
+        if entry.name in _KEEP_BETWEEN_JOBS:
+            continue
+        if entry.is_dir(follow_symlinks=False):
+            shutil.rmtree(entry.path)
+        else:
+            os.unlink(entry.path)
+
+
+def _elapsed(start: float | None, end: float | None) -> float | None:
+    return round(end - start, 3) if start is not None and end is not None else None
+
+
+def _percentiles(values: deque[float]) -> dict[str, float] | None:
+    if not values:
+        return None
+    ordered = sorted(values)
+    return {
+        "count": len(ordered),
+        "mean": round(statistics.fmean(ordered), 3),
+        "p50": round(ordered[len(ordered) // 2], 3),
+        "p95": round(ordered[min(int(len(ordered) * 0.95), len(ordered) - 1)], 3),
+        "max": round(ordered[-1], 3),
+    }
+
+
+def create_app(service: GenerationService) -> web.Application:
+    """The HTTP API in front of a ``GenerationService``."""
+    routes = web.RouteTableDef()
+
+    def find(request: web.Request) -> Job:
+        job = service.get(request.match_info["job_id"])
+        if job is None:
+            raise web.HTTPNotFound(text=json.dumps({"error": "No such job."}), content_type="application/json")
+        return job
+
+    @routes.post("/jobs")
+    async def submit(request: web.Request) -> web.Response:
+        try:
+            body = await request.json()
+        except json.JSONDecodeError:
+            return web.json_response({"error": "The body must be JSON."}, status=400)
+        if not isinstance(body, dict) or not isinstance(body.get("task"), str) or not body["task"].strip():
+            return web.json_response({"error": "A non-empty 'task' string is required."}, status=400)
+        try:
+            job = service.submit(body["task"], job_id=body.get("id"))
+        except QueueFullError as e:
+            return web.json_response({"error": str(e)}, status=503)
+        except ValueError as e:
+            return web.json_response({"error": str(e)}, status=409)
+        return web.json_response(job.to_dict(), status=202, headers={"Location": f"/jobs/{job.id}"})
+
+    @routes.get("/jobs")
+    async def list_jobs(request: web.Request) -> web.Response:
+        return web.json_response([job.to_dict(include_result=False) for job in service.jobs()])
+
+    @routes.get("/jobs/{job_id}")
+    async def get_job(request: web.Request) -> web.Response:
+        return web.json_response(find(request).to_dict())
+
+    @routes.get("/jobs/{job_id}/events")
+    async def job_events(request: web.Request) -> web.StreamResponse:
+        job = find(request)
+        response = web.StreamResponse(headers={"Content-Type": "application/x-ndjson"})
+        await response.prepare(request)
+        async for event in job.follow():
+            await response.write(json.dumps(event).encode() + b"\n")
+        await response.write_eof()
+        return response
+
+    @routes.delete("/jobs/{job_id}")
+    async def cancel_job(request: web.Request) -> web.Response:
+        job = find(request)
+        service.cancel(job.id)
+        return web.json_response(job.to_dict(include_result=False), status=202)
+
+    @routes.get("/stats")
+    async def stats(request: web.Request) -> web.Response:
+        return web.json_response(service.stats())
+
+    @routes.get("/health")
+    async def health(request: web.Request) -> web.Response:
+        return web.Response(text="ok")
+
+    app = web.Application()
+    app.add_routes(routes)
+
+    async def lifecycle(app: web.Application) -> AsyncIterator[None]:
+        await service.start()
+        yield
+        await service.stop()
+
+    app.cleanup_ctx.append(lifecycle)
+    return app
+
+
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Serve Terraform generation jobs over HTTP.")
+    parser.add_argument("--host", default="127.0.0.1", help="Address to listen on.")
+    parser.add_argument("--port", type=int, default=8080, help="Port to listen on.")
+    parser.add_argument("--unix-socket", metavar="PATH", help="Listen on this Unix socket instead of a TCP port.")
+    parser.add_argument("--workers", type=int, default=2, help="Jobs to run at once.")
+    parser.add_argument("--max-queue", type=int, default=0, help="Jobs that may wait at once (0: no limit).")
+    parser.add_argument(
+        "--workspace-root", default="terraform-service", help="Directory holding one workspace per worker."
+    )
+    parser.add_argument(
+        "--scripted-model",
+        action="store_true",
+        help="Answer every model request with the benchmark's scripted model instead of calling a model.",
+    )
+    add_run_arguments(parser)
+    # Nobody is at the terminal of a service.
+    parser.set_defaults(feedback="auto")
+    return parser.parse_args(argv)
+
+
+async def serve(args: argparse.Namespace) -> None:
+    options = options_from_args(args)
+    agent_factory = None
+    if args.scripted_model:
+        from benchmark import create_agents as create_scripted_agents
+
+        agent_factory = lambda workspace: create_scripted_agents(workspace, latency=0.0)[0]  # noqa: E731
+    else:
+        configure_chat_service(args.model)
+    configure_feedback(args)
+
+    service = GenerationService(
+        args.workspace_root, workers=args.workers, options=options, max_queue=args.max_queue, agent_factory=agent_factory
+    )
+    runner = web.AppRunner(create_app(service))
+    await runner.setup()
+    if args.unix_socket:
+        site: web.BaseSite = web.UnixSite(runner, args.unix_socket)
+        where = args.unix_socket
+    else:
+        site = web.TCPSite(runner, args.host, args.port)
+        where = f"http://{args.host}:{args.port}"
+    await site.start()
+    logger.warning("Serving generation jobs on %s with %d worker(s).", where, args.workers)
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await runner.cleanup()
+
+
+async def main(argv: list[str] | None = None) -> None:
+    args = parse_args(argv)
+    logging.basicConfig(level=logging.WARNING)
+    exporter = args.telemetry or ("azure" if AZURE_APP_INSIGHTS_CONNECTION_STRING else None)
+    if exporter:
+        set_up_telemetry(
+            exporter, SERVICE_NAME, connection_string=AZURE_APP_INSIGHTS_CONNECTION_STRING, path=args.telemetry_file
+        )
+    from agents import get_service_registry
+
+    try:
+        await serve(args)
+    finally:
+        await get_service_registry().close()
+        if exporter:
+            shut_down_telemetry()
+
+
+if __name__ == "__main__":
+    try:
+        asyncio.run(main())
+    except KeyboardInterrupt:
+        pass
@@ -0,0 +1,127 @@
+import sys
+import time
+from dataclasses import dataclass, field
+from typing import Awaitable, Callable, List, TextIO
+
+from semantic_kernel.agents import Agent, AgentGroupChat
+from semantic_kernel.contents import ChatMessageContent
+from semantic_kernel.filters import FilterTypes, FunctionInvocationContext
+
+
+@dataclass
+class TurnStats:
+    """Timing of a single streamed agent turn."""
+
+    agent: str
+    started: float
+    first_token_at: float | None = None
+    finished: float | None = None
+    characters: int = 0
+    tool_calls: List[str] = field(default_factory=list)
+
+    @property
+    def time_to_first_token(self) -> float | None:
+        return None if self.first_token_at is None else self.first_token_at - self.started
+
+    @property
+    def duration(self) -> float | None:
+        return None if self.finished is None else self.finished - self.started
+
+
+class StreamRenderer:
+    """Renders a streamed group chat to a terminal as tokens arrive.
+
+    Tool calls made by the agents (file writes, validate runs, ...) are announced when
+    they start and when they finish, so files show up in the workspace while the turn
+    that writes them is still streaming.
+    """
+
+    def __init__(self, out: TextIO = sys.stdout):
+        self.out = out
+        self.turns: List[TurnStats] = []
+        self._current: TurnStats | None = None
+
+    def attach(self, agents: List[Agent]) -> None:
+        """Register the tool-call filter on every agent's kernel."""
+        for agent in agents:
+            agent.kernel.add_filter(FilterTypes.FUNCTION_INVOCATION, self.function_invocation_filter)
+
+    def start_turn(self, agent_name: str) -> None:
+        self._current = TurnStats(agent=agent_name, started=time.perf_counter())
+        self.turns.append(self._current)
+        self._write(f"\n==== {agent_name} ====\n")
+
+    def on_chunk(self, chunk: ChatMessageContent) -> None:
+        if not chunk.content or self._current is None:
+            return
+        if self._current.first_token_at is None:
+            self._current.first_token_at = time.perf_counter()
+        self._current.characters += len(chunk.content)
+        self._write(chunk.content)
+
+    def end_turn(self) -> TurnStats | None:
+        turn = self._current
+        if turn is None:
+            return None
+        turn.finished = time.perf_counter()
+        ttft = turn.time_to_first_token
+        ttft_text = f"{ttft:.2f}s" if ttft is not None else "n/a"
+        self._write(f"\n---- {turn.agent}: time to first token {ttft_text}, turn {turn.duration:.2f}s ----\n")
+        self._current = None
+        return turn
+
+    async def function_invocation_filter(
+        self,
+        context: FunctionInvocationContext,
+        next: Callable[[FunctionInvocationContext], Awaitable[None]],
+    ) -> None:
+        name = context.function.fully_qualified_name
+        if self._current is not None:
+            self._current.tool_calls.append(name)
+        arguments = ", ".join(f"{k}={_preview(v)}" for k, v in (context.arguments or {}).items())
+        self._write(f"\n  -> {name}({arguments})\n")
+        start = time.perf_counter()
+        await next(context)
+        elapsed = time.perf_counter() - start
+        if context.function.name == "create_file":
+            self._write(f"  <- wrote {context.arguments.get('filename')} ({elapsed:.2f}s)\n")
+        else:
+            self._write(f"  <- {name} finished ({elapsed:.2f}s)\n")
+
+    def _write(self, text: str) -> None:
+        self.out.write(text)
+        self.out.flush()
+
+
+def _preview(value: object, limit: int = 40) -> str:
+    text = str(value).replace("\n", " ")
+    return repr(text if len(text) <= limit else text[:limit] + "...")
+
+
+async def stream_group_chat(
+    group_chat: AgentGroupChat,
+    renderer: StreamRenderer,
+    on_turn_end: Callable[[Agent], None] | None = None,
+) -> List[TurnStats]:
+    """Drive ``group_chat`` turn by turn in streaming mode.
+
+    This mirrors ``AgentGroupChat.invoke_stream`` but selects each agent itself so the
+    renderer knows exactly when a turn starts, which is what time-to-first-token is
+    measured from. ``on_turn_end`` is called with the agent after each of its turns, once
+    the termination strategy has seen it.
+    """
+    renderer.attach(group_chat.agents)
+    for _ in range(group_chat.termination_strategy.maximum_iterations):
+        agent = await group_chat.selection_strategy.next(group_chat.agents, group_chat.history.messages)
+        renderer.start_turn(agent.name)
+        async for chunk in group_chat.invoke_agent_stream(agent):
+            renderer.on_chunk(chunk)
+        renderer.end_turn()
+        group_chat.is_complete = await group_chat.termination_strategy.should_terminate(
+            agent, group_chat.history.messages
+        )
+        if on_turn_end is not None:
+            on_turn_end(agent)
+        if group_chat.is_complete:
+            break
+    return renderer.turns
@@ -0,0 +1,108 @@
+import logging
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from opentelemetry.sdk.resources import Resource
+
+EXPORTERS = ("azure", "console", "file", "otlp")
+
+
+def set_up_telemetry(
+    exporter: str,
+    service_name: str,
+    connection_string: str | None = None,
+    path: str = "telemetry.jsonl",
+    export_interval: float = 10.0,
+) -> None:
+    """Install tracer and meter providers that send to the given exporter.
+
+    Args:
+        exporter: ``azure`` (Application Insights, also exports logs), ``console``,
+            ``file`` (JSON lines written to ``path``) or ``otlp`` (configured through the
+            standard ``OTEL_EXPORTER_OTLP_*`` environment variables).
+        service_name: The ``service.name`` resource attribute of everything exported.
+        connection_string: The Application Insights connection string, for ``azure``.
+        path: The file to append to, for ``file``.
+        export_interval: Seconds between metric exports.
+    """
+    # The SDK and the exporters are only imported once telemetry is turned on.
+    from opentelemetry import metrics, trace
+    from opentelemetry.sdk.metrics import MeterProvider
+    from opentelemetry.sdk.metrics.export import PeriodicExportingMetricReader
+    from opentelemetry.sdk.resources import SERVICE_NAME, Resource
+    from opentelemetry.sdk.trace import TracerProvider
+    from opentelemetry.sdk.trace.export import BatchSpanProcessor
+
+    resource = Resource.create({SERVICE_NAME: service_name})
+    match exporter:
+        case "azure":
+            from azure.monitor.opentelemetry.exporter import (
+                AzureMonitorMetricExporter,
+                AzureMonitorTraceExporter,
+            )
+
+            span_exporter = AzureMonitorTraceExporter(connection_string=connection_string)
+            metric_exporter = AzureMonitorMetricExporter(connection_string=connection_string)
+        case "console":
+            from opentelemetry.sdk.metrics.export import ConsoleMetricExporter
+            from opentelemetry.sdk.trace.export import ConsoleSpanExporter
+
+            span_exporter = ConsoleSpanExporter()
+            metric_exporter = ConsoleMetricExporter()
+        case "file":
+            from telemetry_exporters import JsonLinesFile, JsonLinesMetricExporter, JsonLinesSpanExporter
+
+            output = JsonLinesFile(path)
+            span_exporter = JsonLinesSpanExporter(output)
+            metric_exporter = JsonLinesMetricExporter(output)
+        case "otlp":
+            from opentelemetry.exporter.otlp.proto.http.metric_exporter import OTLPMetricExporter
+            from opentelemetry.exporter.otlp.proto.http.trace_exporter import OTLPSpanExporter
+
+            span_exporter = OTLPSpanExporter()
+            metric_exporter = OTLPMetricExporter()
+        case _:
+            raise ValueError(f"Unsupported exporter: {exporter}. Supported exporters are: {', '.join(EXPORTERS)}")
+
+    tracer_provider = TracerProvider(resource=resource)
+    tracer_provider.add_span_processor(BatchSpanProcessor(span_exporter))
+    trace.set_tracer_provider(tracer_provider)
+
+    reader = PeriodicExportingMetricReader(metric_exporter, export_interval_millis=export_interval * 1000)
+    metrics.set_meter_provider(MeterProvider(resource=resource, metric_readers=[reader]))
+
+    if exporter == "azure":
+        _set_up_azure_logging(resource, connection_string)
+
+
+def _set_up_azure_logging(resource: "Resource", connection_string: str | None) -> None:
+    from azure.monitor.opentelemetry.exporter import AzureMonitorLogExporter
+    from opentelemetry._logs import set_logger_provider
+    from opentelemetry.sdk._logs import LoggerProvider, LoggingHandler
+    from opentelemetry.sdk._logs.export import BatchLogRecordProcessor
+
+    logger_provider = LoggerProvider(resource=resource)
+    logger_provider.add_log_record_processor(
+        BatchLogRecordProcessor(
+            AzureMonitorLogExporter(
+                connection_string=connection_string
+            )
+        )
+    )
+    set_logger_provider(logger_provider)
+
+    handler = LoggingHandler()
+    logger = logging.getLogger()
+    logger.addHandler(handler)
+    logger.setLevel(logging.INFO)
+
+
+def shut_down_telemetry() -> None:
+    """Flush pending spans and metrics and stop the exporters."""
+    from opentelemetry import metrics, trace
+    from opentelemetry._logs import get_logger_provider
+
+    for provider in (trace.get_tracer_provider(), metrics.get_meter_provider(), get_logger_provider()):
+        shutdown = getattr(provider, "shutdown", None)
+        if shutdown is not None:
+            shutdown()
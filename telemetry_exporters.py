@@ -0,0 +1,68 @@
+"""Exporters that append spans and metrics to a file as JSON lines, for ``--telemetry file``."""
+
+import threading
+from typing import Sequence
+
+from opentelemetry.sdk.metrics.export import MetricExporter, MetricExportResult, MetricsData
+from opentelemetry.sdk.trace import ReadableSpan
+from opentelemetry.sdk.trace.export import SpanExporter, SpanExportResult
+
+
+class JsonLinesFile:
+    """A file shared by the span and metric exporters, written one JSON object per line."""
+
+    def __init__(self, path: str):
+        self._file = open(path, "a")
+        self._lock = threading.Lock()
+        self._users = 0
+
+    def acquire(self) -> "JsonLinesFile":
+        with self._lock:
+            self._users += 1
+        return self
+
+    def write(self, kind: str, payload: str) -> None:
+        with self._lock:
+            if not self._file.closed:
+                self._file.write(f'{{"{kind}": {payload}}}\n')
+                self._file.flush()
+
+    def release(self) -> None:
+        """Close the file once every exporter using it has shut down."""
+        with self._lock:
+            self._users -= 1
+            if self._users <= 0 and not self._file.closed:
+                self._file.close()
+
+
+class JsonLinesSpanExporter(SpanExporter):
+    """Exports finished spans as ``{"span": {...}}`` lines."""
+
+    def __init__(self, output: JsonLinesFile):
+        self._output = output.acquire()
+
+    def export(self, spans: Sequence[ReadableSpan]) -> SpanExportResult:
+        for span in spans:
+            self._output.write("span", span.to_json(indent=None))
+        return SpanExportResult.SUCCESS
+
+    def shutdown(self) -> None:
+        self._output.release()
+
+
+class JsonLinesMetricExporter(MetricExporter):
+    """Exports each metrics collection as a ``{"metrics": {...}}`` line."""
+
+    def __init__(self, output: JsonLinesFile):
+        super().__init__()
+        self._output = output.acquire()
+
+    def export(self, metrics_data: MetricsData, timeout_millis: float = 10_000, **kwargs) -> MetricExportResult:
+        self._output.write("metrics", metrics_data.to_json(indent=None))
+        return MetricExportResult.SUCCESS
+
+    def force_flush(self, timeout_millis: float = 10_000) -> bool:
+        return True
+
+    def shutdown(self, timeout_millis: float = 30_000, **kwargs) -> None:
+        self._output.release()
@@ -0,0 +1,42 @@
+import os
+import stat
+import sys
+
+import pytest
+
+# The modules of the repository are imported from its root, as main.py does.
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# A stand-in for terraform: init installs the providers the resources use, and validate
+# fails until init has installed every one of them.
+STUB_TERRAFORM = """#!/bin/sh
+providers() { sed -n 's/^ *\\(resource\\|data\\) *"\\([a-z0-9]*\\).*/\\2/p' *.tf 2>/dev/null | sort -u; }
+case "$1" in
+version) echo "Terraform v1.9.0";;
+init) mkdir -p .terraform; providers > .terraform/providers; echo "Terraform has been successfully initialized!";;
+validate)
+  if [ ! -d .terraform ]; then echo "Error: Module not installed" >&2; exit 1; fi
+  missing=$(providers | comm -23 - .terraform/providers)
+  if [ -n "$missing" ]; then echo "Error: Missing required provider $missing; run terraform init" >&2; exit 1; fi
+  echo '{"valid":true,"error_count":0,"warning_count":0,"diagnostics":[]}';;
+fmt)
+  # Files marked "# unformatted" are what fmt -check reports, with a two-line diff for -diff.
+  unformatted=$(grep -l "# unformatted" *.tf 2>/dev/null)
+  if [ "$2" != "-check" ] || [ -z "$unformatted" ]; then exit 0; fi
+  for f in $unformatted; do
+    echo "$f"
+    if [ "$3" = "-diff" ]; then printf -- '--- old/%s\\n+++ new/%s\\n-a=1\\n+a = 1\\n' "$f" "$f"; fi
+  done
+  exit 3;;
+esac
+"""
+
+
+@pytest.fixture
+def stub_terraform(tmp_path):
+    """The path of a stub terraform binary."""
+    path = tmp_path / "bin" / "terraform"
+    path.parent.mkdir()
+    path.write_text(STUB_TERRAFORM)
+    path.chmod(path.stat().st_mode | stat.S_IXUSR)
+    return str(path)
@@ -0,0 +1,69 @@
+import asyncio
+
+import pytest
+
+from main import _run, parse_args, read_tasks, task_workspace_name
+
+
+def test_tasks_get_default_ids(tmp_path):
+    path = tmp_path / "tasks.jsonl"
+    path.write_text('"Create a VPC."\n\n{"id": "web", "task": "Create a web server."}\n')
+    assert read_tasks(str(path)) == [
+        {"task": "Create a VPC.", "id": "task-1"},
+        {"id": "web", "task": "Create a web server."},
+    ]
+
+
+@pytest.mark.parametrize(
+    "lines",
+    [
+        ['{"id": "web", "task": "a"}', '{"id": "web", "task": "b"}'],
+        ['{"id": "task-2", "task": "a"}', '"b"'],
+        ['{"id": "a/b", "task": "a"}', '{"id": "a_b", "task": "b"}'],
+    ],
+)
+def test_tasks_sharing_a_workspace_are_rejected(tmp_path, lines):
+    path = tmp_path / "tasks.jsonl"
+    path.write_text("\n".join(lines) + "\n")
+    with pytest.raises(ValueError, match="same workspace as the task on line 1"):
+        read_tasks(str(path))
+
+
+@pytest.mark.parametrize("task_id", ["", ".", ".."])
+def test_ids_naming_the_root_or_its_parent_are_rejected(tmp_path, task_id):
+    path = tmp_path / "tasks.jsonl"
+    path.write_text(f'{{"id": "{task_id}", "task": "a"}}\n')
+    with pytest.raises(ValueError, match="cannot be used as a workspace name"):
+        read_tasks(str(path))
+
+
+def test_workspace_names_stay_inside_the_root():
+    assert task_workspace_name("../etc") == ".._etc"
+    assert task_workspace_name("a/b/c") == "a_b_c"
+    assert task_workspace_name(7) == "7"
+
+
+@pytest.mark.parametrize(
+    "line, message",
+    [
+        ("42", "Line 2 of .* is neither a JSON object nor a string"),
+        ('["a", "b"]', "Line 2 of .* is neither a JSON object nor a string"),
+        ('{"id": "web"', "Line 2 of .* is not valid JSON"),
+        ('{"id": "web"}', "Line 2 of .* has no 'task' field"),
+    ],
+)
+def test_malformed_lines_are_rejected_with_their_line_number(tmp_path, line, message):
+    path = tmp_path / "tasks.jsonl"
+    path.write_text(f'"Create a VPC."\n{line}\n')
+    with pytest.raises(ValueError, match=message):
+        read_tasks(str(path))
+
+
+def test_batch_mode_exits_with_the_reason_a_task_file_is_rejected(tmp_path):
+    path = tmp_path / "tasks.jsonl"
+    path.write_text('{"id": "web", "task": "a"}\n{"id": "web", "task": "b"}\n')
+    args = parse_args(["--batch", str(path), "--workspace-root", str(tmp_path / "root")])
+    with pytest.raises(SystemExit, match="Cannot read the tasks: Line 2 of"):
+        asyncio.run(_run(args))
+    with pytest.raises(SystemExit, match="Cannot read the tasks: .*No such file"):
+        asyncio.run(_run(parse_args(["--batch", str(tmp_path / "missing.jsonl")])))
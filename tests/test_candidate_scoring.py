@@ -0,0 +1,118 @@
+import asyncio
+
+import pytest
+from semantic_kernel.contents import AuthorRole, ChatMessageContent
+
+import plugins.terraform_runner
+from agents import CandidatePanel, TerraformCreationAgent
+from agents.candidate_panel import candidate_workspace
+from benchmark import BROKEN_CONFIGURATION, VALID_CONFIGURATION, ScriptedChatCompletion
+from plugins import TerraformExecutionPlugin, TerraformResultCache, TerraformRunner
+from plugins.candidate_scoring import ScoreWeights, component_coverage, score_workspace
+
+TASK = """Create:
+1. VPC with public and private subnets
+2. Auto Scaling Group of web servers
+"""
+UNFORMATTED = VALID_CONFIGURATION + "# unformatted\n"
+
+
+@pytest.fixture
+def default_runner(stub_terraform, monkeypatch):
+    """Make plugins created by the registry run the stub terraform."""
+    monkeypatch.setattr(plugins.terraform_runner, "_default_runner", TerraformRunner(binary=stub_terraform))
+
+
+def test_score_weights_parse_named_values():
+    assert ScoreWeights.parse("validate=3, fmt=0") == ScoreWeights(validate=3.0, fmt=0.0)
+    assert ScoreWeights.parse("") == ScoreWeights()
+    with pytest.raises(ValueError, match="Unknown score weight 'speed'"):
+        ScoreWeights.parse("speed=1")
+    with pytest.raises(ValueError, match="must be a number, not 'high'"):
+        ScoreWeights.parse("validate=high")
+
+
+def test_component_coverage_matches_keywords_in_names_and_comments():
+    files = {
+        "network.tf": 'resource "aws_vpc" "main" {}\n# public subnets only\n',
+        "compute.tf": 'resource "aws_autoscaling_group" "web" {}\n',
+    }
+    coverage, missing = component_coverage(TASK, files)
+    # vpc, public, private, subnets: 3 of 4; auto, scaling, group, web, servers: 4 of 5.
+    assert coverage == pytest.approx((3 / 4 + 4 / 5) / 2)
+    assert missing == []
+    assert component_coverage(TASK, {"main.tf": 'resource "aws_vpc" "main" {}\n'})[1] == [
+        "VPC with public and private subnets",
+        "Auto Scaling Group of web servers",
+    ]
+    assert component_coverage("Create a bucket.", {}) == (1.0, [])
+
+
+@pytest.mark.parametrize(
+    "content, validate_ok, fmt_changed_lines, total",
+    [
+        (VALID_CONFIGURATION, True, 0, 1 + 2 + 0.5 + 1),
+        (UNFORMATTED, True, 2, 1 + 2 + 0.5 / 1.2 + 1),
+        (BROKEN_CONFIGURATION, False, None, 0.5 + 1),
+    ],
+)
+def test_score_workspace_adds_up_the_local_checks(
+    tmp_path, stub_terraform, content, validate_ok, fmt_changed_lines, total
+):
+    (tmp_path / "main.tf").write_text(content)
+    plugin = TerraformExecutionPlugin(
+        str(tmp_path), runner=TerraformRunner(binary=stub_terraform), cache=TerraformResultCache()
+    )
+    score = asyncio.run(score_workspace(plugin, "Create a null resource.", index=2))
+    assert (score.index, score.files, score.validate_ok, score.fmt_changed_lines) == (
+        2,
+        1,
+        validate_ok,
+        fmt_changed_lines,
+    )
+    assert score.check_errors == (content == BROKEN_CONFIGURATION)
+    assert score.total == pytest.approx(total)
+
+
+def test_an_empty_workspace_scores_zero(tmp_path, stub_terraform):
+    plugin = TerraformExecutionPlugin(str(tmp_path), runner=TerraformRunner(binary=stub_terraform))
+    score = asyncio.run(score_workspace(plugin, TASK))
+    assert (score.files, score.total) == (0, 0.0)
+
+
+def test_the_panel_keeps_the_best_candidate_and_mirrors_its_files(tmp_path, default_runner):
+    workspace = tmp_path / "workspace"
+    workspace.mkdir()
+    (workspace / "variables.tf").write_text('variable "name" {}\n')
+    contents = [BROKEN_CONFIGURATION, UNFORMATTED, VALID_CONFIGURATION]
+    replies = ["First.", "Second.", "Third."]
+    created: list[str] = []
+
+    def agent_factory(path: str) -> TerraformCreationAgent:
+        index = len(created)
+        created.append(path)
+        service = ScriptedChatCompletion(
+            ai_model_id="scripted",
+            script=lambda turn: [("terraform_file-create_file", {"filename": "main.tf", "content": contents[index]})],
+            reply=replies[index],
+        )
+        return TerraformCreationAgent(base_path=path, service=service)
+
+    panel = CandidatePanel(str(workspace), count=3, agent_factory=agent_factory)
+    # Left over from an earlier turn: the candidate starts from the chat's files instead.
+    stale = workspace / ".candidates" / "2" / "stale.tf"
+    stale.parent.mkdir(parents=True, exist_ok=True)
+    stale.write_text("# stale\n")
+
+    async def run():
+        task = ChatMessageContent(role=AuthorRole.USER, content="Create a null resource.")
+        return [response.message async for response in panel.invoke(messages=task)]
+
+    (message,) = asyncio.run(run())
+    assert created == [candidate_workspace(str(workspace), index) for index in range(3)]
+    assert [score.validate_ok for score in panel.last_scores] == [False, True, True]
+    assert max(panel.last_scores, key=lambda score: score.total).index == 2
+    assert (message.name, message.content) == ("TerraformCreationAgent", "Third.")
+    assert sorted(path.name for path in workspace.glob("*.tf")) == ["main.tf", "variables.tf"]
+    assert (workspace / "main.tf").read_text() == VALID_CONFIGURATION
+    assert not stale.exists()
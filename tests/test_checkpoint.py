@@ -0,0 +1,59 @@
+import os
+
+from semantic_kernel.contents import AuthorRole, ChatMessageContent
+
+from checkpoint import CheckpointStore
+
+
+def _message(text: str) -> ChatMessageContent:
+    return ChatMessageContent(role=AuthorRole.ASSISTANT, content=text, name="writer")
+
+
+def _journal(store: CheckpointStore) -> str:
+    return os.path.join(store.path, "runs", f"{store.run_id}.jsonl")
+
+
+def test_turns_are_rebuilt_from_the_journal(tmp_path):
+    store = CheckpointStore(str(tmp_path))
+    run_id = store.start("Create a VPC.")
+    history = [_message("one")]
+    store.record_turn("writer", history, revision="r1", strategies={"termination": {"turns": 1}})
+    history.append(_message("two"))
+    store.record_turn("writer", history, revision="r2")
+    store.close()
+
+    checkpoint = CheckpointStore(str(tmp_path)).load()
+    assert (checkpoint.run_id, checkpoint.task, checkpoint.turns) == (run_id, "Create a VPC.", 2)
+    assert [message.content for message in checkpoint.messages] == ["one", "two"]
+    assert (checkpoint.revision, checkpoint.finished) == ("r2", False)
+
+
+def test_a_half_written_record_is_ignored_and_truncated_on_resume(tmp_path):
+    store = CheckpointStore(str(tmp_path))
+    store.start("task")
+    history = [_message("one")]
+    store.record_turn("writer", history)
+    store.close()
+    journal = _journal(store)
+    complete = os.path.getsize(journal)
+    with open(journal, "a") as f:
+        f.write('{"type": "turn", "turn": 2, "mess')
+
+    checkpoint = store.load()
+    assert (checkpoint.turns, checkpoint.size) == (1, complete)
+
+    resumed = CheckpointStore(str(tmp_path))
+    resumed.resume(checkpoint)
+    history.append(_message("two"))
+    resumed.record_turn("writer", history)
+    resumed.finish("converged")
+
+    checkpoint = resumed.load()
+    assert [message.content for message in checkpoint.messages] == ["one", "two"]
+    assert (checkpoint.turns, checkpoint.finished, checkpoint.termination_reason) == (2, True, "converged")
+
+
+def test_load_without_a_run_returns_none(tmp_path):
+    store = CheckpointStore(str(tmp_path))
+    assert store.load() is None
+    assert store.load("missing") is None
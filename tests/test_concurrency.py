@@ -0,0 +1,59 @@
+import asyncio
+
+from plugins.concurrency import Access, WorkspaceLock, get_workspace_lock
+
+
+def test_readers_share_the_lock_and_a_writer_holds_it_alone():
+    async def run():
+        lock = WorkspaceLock()
+        events: list[str] = []
+
+        async def use(name: str, access: Access):
+            async with lock.hold(access):
+                events.append(f"{name} start")
+                await asyncio.sleep(0.01)
+                events.append(f"{name} end")
+
+        await asyncio.gather(use("read1", Access.READ), use("read2", Access.READ), use("write", Access.WRITE))
+        return events
+
+    events = asyncio.run(run())
+    assert events[:2] == ["read1 start", "read2 start"]
+    assert events[-2:] == ["write start", "write end"]
+
+
+def test_a_waiting_writer_blocks_new_readers():
+    async def run():
+        lock = WorkspaceLock()
+        order: list[str] = []
+        first_read = asyncio.Event()
+
+        async def read(name: str, wait: asyncio.Event | None = None):
+            if wait is not None:
+                await wait.wait()
+            async with lock.hold(Access.READ):
+                if wait is None:
+                    first_read.set()
+                    await asyncio.sleep(0.01)
+                order.append(name)
+
+        async def write():
+            await first_read.wait()
+            writer_waiting.set()
+            async with lock.hold(Access.WRITE):
+                order.append("write")
+
+        writer_waiting = asyncio.Event()
+        await asyncio.gather(read("read1"), write(), read("read2", writer_waiting))
+        return order
+
+    assert asyncio.run(run()) == ["read1", "write", "read2"]
+
+
+def test_locks_are_shared_per_workspace_and_event_loop(tmp_path):
+    async def locks():
+        return get_workspace_lock(str(tmp_path)), get_workspace_lock(f"{tmp_path}/."), get_workspace_lock("elsewhere")
+
+    same, normalized, other = asyncio.run(locks())
+    assert same is normalized and same is not other
+    assert asyncio.run(locks())[0] is not same
@@ -0,0 +1,93 @@
+import asyncio
+
+import pytest
+
+from plugins.feedback import (
+    APPROVAL,
+    NO_FEEDBACK,
+    FeedbackChannel,
+    FeedbackRule,
+    PolicyFeedbackChannel,
+    RecordedFeedbackChannel,
+    TerminalFeedbackChannel,
+    TimeoutFeedbackChannel,
+    load_policy,
+    set_feedback_channel_factory,
+)
+from main import configure_feedback, parse_args
+
+
+def test_recorded_feedback_is_answered_in_order_then_falls_back(tmp_path):
+    path = tmp_path / "feedback.jsonl"
+    path.write_text('"Add tags."\n\n"Use a variable for the region."\n')
+    channel = RecordedFeedbackChannel(str(path))
+
+    async def run():
+        return [await channel.request("config") for _ in range(3)]
+
+    assert asyncio.run(run()) == ["Add tags.", "Use a variable for the region.", APPROVAL]
+
+
+def test_recorded_feedback_must_be_json_strings(tmp_path):
+    path = tmp_path / "feedback.jsonl"
+    path.write_text('"ok"\n{"not": "a string"}\n')
+    with pytest.raises(ValueError, match=":2:"):
+        RecordedFeedbackChannel(str(path))
+
+
+def test_policy_reports_every_matching_rule_or_approves():
+    channel = PolicyFeedbackChannel()
+    findings = asyncio.run(channel.request('password = "hunter2"\n# TODO: tags\n'))
+    assert findings.splitlines() == [rule.response for rule in channel.rules]
+    assert asyncio.run(channel.request('password = var.password\n')) == APPROVAL
+
+
+def test_load_policy(tmp_path):
+    path = tmp_path / "policy.json"
+    path.write_text('[{"pattern": "0\\\\.0\\\\.0\\\\.0/0", "response": "Do not open to the world."}]')
+    assert load_policy(str(path)) == [FeedbackRule(r"0\.0\.0\.0/0", "Do not open to the world.")]
+    path.write_text('[{"pattern": "(", "response": "x"}]')
+    with pytest.raises(ValueError, match="invalid pattern"):
+        load_policy(str(path))
+
+
+def test_timeout_answers_the_default():
+    class Silent(FeedbackChannel):
+        async def request(self, content: str) -> str:
+            await asyncio.sleep(10)
+            return "late"
+
+    assert asyncio.run(TimeoutFeedbackChannel(Silent(), timeout=0.01).request("config")) == NO_FEEDBACK
+
+
+def test_terminal_reads_on_a_thread_and_treats_eof_as_no_feedback():
+    prompts: list[str] = []
+
+    def answer(prompt: str) -> str:
+        prompts.append(prompt)
+        return "Looks good."
+
+    def closed(prompt: str) -> str:
+        raise EOFError
+
+    assert asyncio.run(TerminalFeedbackChannel("{content}?", answer).request("config")) == "Looks good."
+    assert prompts == ["config?"]
+    assert asyncio.run(TerminalFeedbackChannel(input_func=closed).request("config")) == NO_FEEDBACK
+
+
+
+@pytest.mark.parametrize(
+    "argv, expected",
+    [
+        (["--batch", "tasks.jsonl"], "auto"),
+        ([], "terminal"),
+        (["--batch", "tasks.jsonl", "--feedback", "terminal"], "terminal"),
+    ],
+)
+def test_feedback_defaults_to_auto_in_batch_mode(argv, expected):
+    args = parse_args(argv)
+    try:
+        configure_feedback(args)
+    finally:
+        set_feedback_channel_factory(TerminalFeedbackChannel)
+    assert args.feedback == expected
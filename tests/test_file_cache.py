@@ -0,0 +1,75 @@
+import os
+
+import pytest
+
+from plugins.file_cache import FileCache
+
+
+def _touch(path, seconds: int = 1) -> None:
+    """Move a modification time forward, as a later write on a coarse clock would."""
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + seconds * 1_000_000_000))
+
+
+def test_unchanged_files_are_served_from_memory(tmp_path):
+    (tmp_path / "main.tf").write_text("a = 1\n")
+    cache = FileCache(str(tmp_path))
+    assert [cache.read("main.tf") for _ in range(2)] == ["a = 1\n"] * 2
+    assert (cache.stats.hits, cache.stats.misses) == (1, 1)
+
+
+def test_a_file_changed_on_disk_is_read_again(tmp_path):
+    path = tmp_path / "main.tf"
+    path.write_text("a = 1\n")
+    cache = FileCache(str(tmp_path))
+    cache.read("main.tf")
+
+    # Same size, later modification time.
+    path.write_text("a = 2\n")
+    _touch(path)
+    assert cache.read("main.tf") == "a = 2\n"
+
+    # Same modification time, different size.
+    mtime = os.stat(path).st_mtime_ns
+    path.write_text("a = 300\n")
+    os.utime(path, ns=(mtime, mtime))
+    assert cache.read("main.tf") == "a = 300\n"
+    assert (cache.stats.hits, cache.stats.misses) == (0, 3)
+
+
+def test_writes_are_served_from_memory(tmp_path):
+    cache = FileCache(str(tmp_path))
+    cache.write("main.tf", "a = 1\n")
+    cache.write_many({"main.tf": "a = 2\n", "outputs.tf": "b = 1\n"})
+    assert (cache.read("main.tf"), cache.read("outputs.tf")) == ("a = 2\n", "b = 1\n")
+    assert cache.stats.misses == 0
+
+
+def test_the_directory_index_is_rebuilt_when_the_directory_changes(tmp_path):
+    (tmp_path / "main.tf").write_text("a = 1\n")
+    (tmp_path / "notes.txt").write_text("not terraform\n")
+    cache = FileCache(str(tmp_path))
+    assert cache.list() == ["main.tf"]
+    assert cache.list() == ["main.tf"]
+    assert (cache.stats.index_hits, cache.stats.index_misses) == (1, 1)
+
+    cache.read("main.tf")
+    (tmp_path / "variables.tf.json").write_text("{}")
+    os.unlink(tmp_path / "main.tf")
+    _touch(tmp_path)
+    assert cache.list() == ["variables.tf.json"]
+    assert cache.stats.index_misses == 2
+    # The removed file is forgotten too.
+    with pytest.raises(FileNotFoundError):
+        cache.read("main.tf")
+
+
+def test_invalidate_forgets_everything(tmp_path):
+    (tmp_path / "main.tf").write_text("a = 1\n")
+    cache = FileCache(str(tmp_path))
+    cache.list()
+    cache.read("main.tf")
+    cache.invalidate()
+    cache.list()
+    cache.read("main.tf")
+    assert (cache.stats.index_misses, cache.stats.misses) == (2, 2)
@@ -0,0 +1,160 @@
+import pytest
+
+from plugins.hcl_checker import Diagnostic, check_files, check_workspace, format_diagnostics
+
+VALID_MAIN = '''
+variable "names" {
+  type    = list(string)
+  default = ["a", "b"]
+}
+
+locals {
+  upper   = [for n in var.names : upper(n) if n != ""]
+  by_name = { for i, n in var.names : n => i }
+  policy  = <<-EOT
+    {"Version": "2012-10-17", "Name": "${var.names[0]}"}
+  EOT
+}
+
+data "aws_ami" "ubuntu" {
+  most_recent = true
+}
+
+resource "aws_security_group" "web" {
+  name = "web-${local.upper[0]}"
+
+  dynamic "ingress" {
+    for_each = toset([80, 443])
+    content {
+      from_port = ingress.value
+      to_port   = ingress.value
+      protocol  = "tcp"
+    }
+  }
+}
+
+module "network" {
+  source = "./modules/network"
+  names  = var.names
+}
+
+resource "aws_instance" "web" {
+  count                  = length(var.names) > 1 ? 2 : 1
+  ami                    = data.aws_ami.ubuntu.id
+  vpc_security_group_ids = [aws_security_group.web.id]
+  subnet_id              = module.network.subnet_ids[0]
+  user_data              = <<USERDATA
+#!/bin/bash
+echo "${local.policy}" > /etc/policy.json
+USERDATA
+}
+
+output "group" {
+  value = aws_security_group.web.id
+}
+'''
+
+VALID_JSON = (
+    '{"variable": {"region": {"default": "us-east-1"}},'
+    ' "output": {"region": {"value": "${var.region}"}}}'
+)
+
+
+def _summaries(diagnostics: list[Diagnostic]) -> list[tuple[str, int, int, str]]:
+    return [(d.filename, d.line, d.column, d.summary) for d in diagnostics]
+
+
+def test_valid_configuration_has_no_diagnostics():
+    assert check_files({"main.tf": VALID_MAIN, "extra.tf.json": VALID_JSON}) == []
+
+
+def test_declarations_in_tf_json_satisfy_references_in_tf():
+    files = {"main.tf": 'output "region_name" {\n  value = var.region\n}\n', "variables.tf.json": VALID_JSON}
+    assert check_files(files) == []
+
+
+@pytest.mark.parametrize(
+    "reference, summary",
+    [
+        ("var.cidr", "Reference to undeclared variable var.cidr."),
+        ("local.name", "Reference to undeclared local value local.name."),
+        ("module.vpc.id", "Reference to undeclared module module.vpc."),
+        ("data.aws_ami.ubuntu.id", "Reference to undeclared data source data.aws_ami.ubuntu."),
+    ],
+)
+def test_undeclared_references_are_reported_at_their_position(reference, summary):
+    files = {"main.tf": f'resource "aws_vpc" "main" {{\n  cidr_block = {reference}\n}}\n'}
+    assert _summaries(check_files(files)) == [("main.tf", 2, 16, summary)]
+
+
+def test_references_inside_templates_are_checked():
+    files = {"main.tf": 'output "name" {\n  value = "app-${var.missing}"\n}\n'}
+    assert [d.summary for d in check_files(files)] == ["Reference to undeclared variable var.missing."]
+
+
+def test_duplicates_across_files_point_at_the_first_definition():
+    files = {
+        "a.tf": 'variable "region" {}\n',
+        "b.tf": '\nvariable "region" {}\n',
+    }
+    assert _summaries(check_files(files)) == [
+        ("b.tf", 2, 1, "Duplicate definition of variable.region; it was already defined at a.tf:1.")
+    ]
+
+
+def test_duplicate_locals_are_reported():
+    files = {"main.tf": "locals {\n  a = 1\n}\n\nlocals {\n  a = 2\n}\n"}
+    assert [d.summary for d in check_files(files)] == [
+        "Duplicate definition of local.a; it was already defined at main.tf:1."
+    ]
+
+
+def test_missing_required_argument():
+    files = {"main.tf": 'output "x" {\n}\n'}
+    assert _summaries(check_files(files)) == [
+        ("main.tf", 1, 1, 'Missing required argument "value" in "output" block.')
+    ]
+
+
+@pytest.mark.parametrize(
+    "text, position, summary",
+    [
+        ('resource "aws_s3_bucket" "b" {\n  acl = \n}\n', (2, 9), "Expected an expression but found a newline."),
+        ('locals {\n  a = "abc\n}\n', (2, 11), "Unterminated string; quoted strings cannot span lines."),
+    ],
+)
+def test_syntax_errors_have_positions(text, position, summary):
+    (diagnostic,) = check_files({"main.tf": text})
+    assert (diagnostic.severity, (diagnostic.line, diagnostic.column), diagnostic.summary) == (
+        "error",
+        position,
+        summary,
+    )
+
+
+def test_unclosed_block_is_a_syntax_error():
+    diagnostics = check_files({"main.tf": 'resource "aws_vpc" "main" {\n  cidr_block = "10.0.0.0/16"\n'})
+    assert [d.severity for d in diagnostics] == ["error"]
+
+
+def test_invalid_json_is_reported():
+    (diagnostic,) = check_files({"bad.tf.json": '{"variable": '})
+    assert diagnostic.filename == "bad.tf.json"
+    assert diagnostic.summary.startswith("Invalid JSON")
+
+
+def test_references_are_not_reported_while_a_file_does_not_parse():
+    files = {"main.tf": 'output "x" {\n  value = var.declared_in_broken_file\n}\n', "broken.tf": "variable {\n"}
+    assert {d.filename for d in check_files(files)} == {"broken.tf"}
+
+
+def test_check_workspace_reads_tf_and_tf_json_files(tmp_path):
+    (tmp_path / "main.tf").write_text('output "region_name" {\n  value = var.region\n}\n')
+    (tmp_path / "variables.tf.json").write_text(VALID_JSON)
+    (tmp_path / "notes.txt").write_text("var.ignored")
+    assert check_workspace(str(tmp_path)) == []
+
+
+def test_format_diagnostics():
+    diagnostics = [Diagnostic("error", "Bad.", "main.tf", 3, 5), Diagnostic("warning", "Odd.", "b.tf", 1, 1)]
+    assert format_diagnostics(diagnostics) == "main.tf:3:5: error: Bad.\nb.tf:1:1: warning: Odd."
@@ -0,0 +1,63 @@
+from semantic_kernel.contents import AuthorRole, ChatMessageContent, FunctionCallContent
+
+from agents import TokenBudgetReducer
+from agents.history_reducer import SUPERSEDED_CODE, SUPERSEDED_FILE
+
+
+def _call(call_id: str, function: str, arguments: dict) -> ChatMessageContent:
+    return ChatMessageContent(
+        role=AuthorRole.ASSISTANT,
+        items=[FunctionCallContent(id=call_id, plugin_name="terraform_file", function_name=function, arguments=arguments)],
+    )
+
+
+def _arguments(message: ChatMessageContent) -> dict:
+    return message.items[0].to_kernel_arguments()
+
+
+def test_later_write_files_supersedes_earlier_full_writes_of_the_same_file():
+    messages = [
+        ChatMessageContent(role=AuthorRole.USER, content="Create a VPC."),
+        _call("1", "create_file", {"filename": "main.tf", "content": "v1"}),
+        _call("2", "write_files", {"files": {"main.tf": "v2", "outputs.tf": "o1"}}),
+        _call("3", "write_files", {"files": {"main.tf": "v3"}}),
+    ]
+    reduced = TokenBudgetReducer(max_tokens=100_000).reduce(messages)
+
+    assert _arguments(reduced[1])["content"] == SUPERSEDED_FILE
+    assert _arguments(reduced[2])["files"] == {"main.tf": SUPERSEDED_FILE, "outputs.tf": "o1"}
+    assert _arguments(reduced[3])["files"] == {"main.tf": "v3"}
+
+
+def test_later_create_file_supersedes_earlier_write_files():
+    messages = [
+        _call("1", "write_files", {"files": {"main.tf": "v1"}}),
+        _call("2", "create_file", {"filename": "main.tf", "content": "v2"}),
+    ]
+    reduced = TokenBudgetReducer(max_tokens=100_000).reduce(messages)
+
+    assert _arguments(reduced[0])["files"] == {"main.tf": SUPERSEDED_FILE}
+    assert _arguments(reduced[1])["content"] == "v2"
+    # The input is not modified.
+    assert _arguments(messages[0])["files"] == {"main.tf": "v1"}
+
+
+def test_code_blocks_are_only_superseded_by_the_same_agent():
+    def reply(name: str, code: str) -> ChatMessageContent:
+        return ChatMessageContent(role=AuthorRole.ASSISTANT, name=name, content=f"Here:\n```hcl\n{code}\n```\n")
+
+    messages = [
+        ChatMessageContent(role=AuthorRole.USER, content="Create a VPC."),
+        reply("TerraformCreationAgent", "v1"),
+        reply("TerraformValidationAgent", "suggested fix"),
+        reply("TerraformCreationAgent", "v2"),
+        reply("UserAgent", "a snippet I like"),
+    ]
+    reduced = TokenBudgetReducer(max_tokens=100_000).reduce(messages)
+
+    assert [message.content for message in reduced[1:]] == [
+        f"Here:\n{SUPERSEDED_CODE}\n",
+        messages[2].content,
+        messages[3].content,
+        messages[4].content,
+    ]
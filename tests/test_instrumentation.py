@@ -0,0 +1,106 @@
+import asyncio
+import sys
+
+import pytest
+from opentelemetry import trace
+from opentelemetry.sdk.trace import TracerProvider
+from opentelemetry.sdk.trace.export import SimpleSpanProcessor
+from opentelemetry.sdk.trace.export.in_memory_span_exporter import InMemorySpanExporter
+from opentelemetry.trace import StatusCode
+from semantic_kernel.connectors.ai.prompt_execution_settings import PromptExecutionSettings
+from semantic_kernel.contents import ChatHistory
+from semantic_kernel.filters import FilterTypes
+from semantic_kernel.functions import kernel_function
+from semantic_kernel.kernel import Kernel
+
+import agents.instrumentation
+from agents.instrumentation import instrumented, tool_invocation_filter, trace_turn
+from benchmark import ScriptedChatCompletion
+
+
+@pytest.fixture
+def spans(monkeypatch) -> InMemorySpanExporter:
+    """Record the spans of the instrumentation module and of Semantic Kernel's function calls in memory."""
+    exporter = InMemorySpanExporter()
+    provider = TracerProvider()
+    provider.add_span_processor(SimpleSpanProcessor(exporter))
+    monkeypatch.setattr(agents.instrumentation, "tracer", provider.get_tracer("test"))
+    # The module, not the decorator of the same name its package exports.
+    monkeypatch.setattr(sys.modules["semantic_kernel.functions.kernel_function"], "tracer", provider.get_tracer("test"))
+    return exporter
+
+
+def test_a_turn_is_one_span_current_only_while_the_agent_runs(spans):
+    seen = []
+
+    async def responses():
+        for text in ("a", "b"):
+            seen.append(trace.get_current_span())
+            yield text
+
+    async def run():
+        consumed = []
+        async for response in trace_turn("TerraformCreationAgent", responses(), streaming=True):
+            consumed.append((response, trace.get_current_span()))
+        return consumed
+
+    consumed = asyncio.run(run())
+    (span,) = spans.get_finished_spans()
+    assert span.name == "agent_turn TerraformCreationAgent"
+    assert span.attributes["agent.turn.streaming"] is True
+    assert span.attributes["agent.turn.responses"] == 2
+    assert span.attributes["agent.turn.time_to_first_response"] >= 0
+    assert [s.get_span_context().span_id for s in seen] == [span.context.span_id] * 2
+    assert all(not current.get_span_context().is_valid for _, current in consumed)
+
+
+def test_a_failed_turn_records_the_error(spans):
+    async def responses():
+        yield "partial"
+        raise RuntimeError("model unavailable")
+
+    async def run():
+        async for _ in trace_turn("UserAgent", responses(), streaming=False):
+            pass
+
+    with pytest.raises(RuntimeError):
+        asyncio.run(run())
+    (span,) = spans.get_finished_spans()
+    assert span.status.status_code == StatusCode.ERROR
+    assert span.attributes["agent.turn.responses"] == 1
+    assert [event.name for event in span.events] == ["exception"]
+
+
+class FilePlugin:
+    @kernel_function
+    def create_file(self, filename: str, content: str) -> str:
+        return f"Created {filename}"
+
+
+def test_the_tool_filter_annotates_the_current_tool_span(spans):
+    kernel = Kernel()
+    kernel.add_plugin(FilePlugin(), "terraform_file")
+    kernel.add_filter(FilterTypes.FUNCTION_INVOCATION, tool_invocation_filter)
+
+    result = asyncio.run(
+        kernel.invoke(plugin_name="terraform_file", function_name="create_file", filename="main.tf", content="a = 1")
+    )
+
+    assert str(result) == "Created main.tf"
+    (span,) = spans.get_finished_spans()
+    assert span.name == "execute_tool terraform_file-create_file"
+    assert span.attributes["tool.arguments.filename"] == "main.tf"
+    assert span.attributes["tool.result.length"] == len("Created main.tf")
+
+
+def test_model_requests_record_their_token_usage(spans):
+    service = instrumented(ScriptedChatCompletion)(ai_model_id="scripted", reply="Created the configuration.")
+    history = ChatHistory()
+    history.add_user_message("Create a bucket.")
+    asyncio.run(service.get_chat_message_contents(history, PromptExecutionSettings()))
+
+    (span,) = spans.get_finished_spans()
+    assert span.name == "llm_request scripted"
+    assert (span.attributes["llm.streaming"], span.attributes["llm.request.tools"]) == (False, 0)
+    assert span.attributes["gen_ai.usage.input_tokens"] == len("Create a bucket.") // 4
+    assert span.attributes["gen_ai.usage.output_tokens"] == len("Created the configuration.") // 4
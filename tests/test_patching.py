@@ -0,0 +1,84 @@
+import os
+import stat
+
+import pytest
+
+from plugins.file_cache import FileCache
+from plugins.patching import (
+    PatchConflictError,
+    _temp_file,
+    apply_unified_diff,
+    atomic_write,
+    atomic_write_many,
+    replace_unique,
+)
+from plugins.terraform_result_cache import workspace_digest
+
+
+def test_zero_context_insertion_goes_after_the_given_line():
+    assert apply_unified_diff("a\nb\nc\n", "@@ -2,0 +3 @@\n+X\n") == "a\nb\nX\nc\n"
+
+
+def test_zero_context_insertion_at_the_start():
+    assert apply_unified_diff("a\nb\n", "@@ -0,0 +1 @@\n+X\n") == "X\na\nb\n"
+
+
+def test_hunk_with_context_replaces_a_line():
+    diff = "--- a/main.tf\n+++ b/main.tf\n@@ -1,3 +1,3 @@\n a\n-b\n+B\n c\n"
+    assert apply_unified_diff("a\nb\nc\n", diff) == "a\nB\nc\n"
+
+
+def test_hunk_is_found_when_the_line_number_is_off():
+    diff = "@@ -10,2 +10,2 @@\n x\n-y\n+Y\n"
+    assert apply_unified_diff("a\nx\ny\nz\n", diff) == "a\nx\nY\nz\n"
+
+
+def test_several_hunks_apply_in_order():
+    diff = "@@ -1,1 +1,1 @@\n-a\n+A\n@@ -3,1 +3,2 @@\n c\n+d\n"
+    assert apply_unified_diff("a\nb\nc\n", diff) == "A\nb\nc\nd\n"
+
+
+def test_missing_context_is_a_conflict():
+    with pytest.raises(PatchConflictError):
+        apply_unified_diff("a\nb\n", "@@ -1,1 +1,1 @@\n-q\n+Q\n")
+
+
+def test_diff_without_hunks_is_a_conflict():
+    with pytest.raises(PatchConflictError):
+        apply_unified_diff("a\n", "just text\n")
+
+
+def test_replace_unique_requires_exactly_one_occurrence():
+    assert replace_unique("a = 1\nb = 2\n", "b = 2", "b = 3") == "a = 1\nb = 3\n"
+    with pytest.raises(PatchConflictError):
+        replace_unique("x\nx\n", "x", "y")
+
+
+def test_new_files_follow_the_umask(tmp_path):
+    mask = os.umask(0o022)
+    os.umask(mask)
+    atomic_write(str(tmp_path / "main.tf"), "content")
+    atomic_write_many({str(tmp_path / "other.tf"): "content"})
+    for name in ("main.tf", "other.tf"):
+        assert stat.S_IMODE((tmp_path / name).stat().st_mode) == 0o666 & ~mask
+
+
+def test_rewritten_files_keep_their_mode(tmp_path):
+    path = tmp_path / "main.tf"
+    path.write_text("old")
+    path.chmod(0o640)
+    atomic_write(str(path), "new")
+    assert path.read_text() == "new"
+    assert stat.S_IMODE(path.stat().st_mode) == 0o640
+
+
+def test_leftover_temporary_files_are_not_terraform_files(tmp_path):
+    (tmp_path / "main.tf").write_text("a = 1\n")
+    digest = workspace_digest(str(tmp_path))
+    fd, tmp_path_name = _temp_file(str(tmp_path / "main.tf"))
+    os.close(fd)
+    assert os.path.basename(tmp_path_name).startswith(".main.tf.") and tmp_path_name.endswith(".tmp")
+    # Left behind by an older version, or by a process killed mid-write.
+    (tmp_path / ".tmp-abc123main.tf").write_text("a = 2\n")
+    assert FileCache(str(tmp_path)).list() == ["main.tf"]
+    assert workspace_digest(str(tmp_path)) == digest
@@ -0,0 +1,61 @@
+import os
+
+import pytest
+
+from agents import TerraformCreationAgent, TerraformValidationAgent
+from benchmark import ScriptedChatCompletion
+from plugins import PluginRegistry, get_plugin_registry
+
+
+def test_a_scope_registers_only_the_allowed_functions(tmp_path):
+    registry = PluginRegistry(str(tmp_path))
+    file_plugin, execution_plugin = registry.plugins(
+        {"terraform_file": ["read_file", "list_files"], "terraform_execution": None}
+    )
+    assert sorted(file_plugin.functions) == ["list_files", "read_file"]
+    assert execution_plugin is registry.plugin("terraform_execution")
+    # The same scope is the same kernel plugin, calling the shared instance.
+    (again,) = registry.plugins({"terraform_file": ("list_files", "read_file")})
+    assert again is file_plugin
+    assert file_plugin.functions["read_file"].method.__wrapped__.__self__ is registry.instance("terraform_file")
+
+
+def test_unknown_plugins_and_functions_are_rejected(tmp_path):
+    registry = PluginRegistry(str(tmp_path))
+    with pytest.raises(KeyError, match="Plugin 'terraform_file' has no function\\(s\\) delete_file, rename_file"):
+        registry.plugins({"terraform_file": ["read_file", "rename_file", "delete_file"]})
+    with pytest.raises(KeyError, match="Unknown plugin 'shell'. Known plugins: snippet_library, terraform_execution"):
+        registry.plugins({"shell": None})
+
+
+def test_plugins_are_created_once_per_workspace(tmp_path):
+    created = []
+
+    def factory(base_path):
+        created.append(base_path)
+        return object()
+
+    registry = PluginRegistry(str(tmp_path), factories={"custom": factory})
+    assert registry.instance("custom") is registry.instance("custom")
+    assert created == [str(tmp_path)]
+
+    workspace = tmp_path / "workspace"
+    assert get_plugin_registry(str(workspace)) is get_plugin_registry(os.path.join(str(tmp_path), ".", "workspace"))
+    assert get_plugin_registry(str(workspace)) is not get_plugin_registry(str(tmp_path / "other"))
+
+
+def test_agents_on_a_workspace_share_its_plugins(tmp_path):
+    workspace = str(tmp_path / "workspace")
+    service = ScriptedChatCompletion(ai_model_id="scripted")
+    creation = TerraformCreationAgent(base_path=workspace, service=service)
+    validation = TerraformValidationAgent(base_path=workspace, service=service)
+
+    def functions(agent, plugin):
+        return agent.kernel.plugins[plugin].functions
+
+    # Each agent sees only its own tools, backed by the same plugin object.
+    assert "create_file" in functions(creation, "terraform_file")
+    assert "create_file" not in functions(validation, "terraform_file")
+    read_file = functions(creation, "terraform_file")["read_file"].method
+    assert read_file is functions(validation, "terraform_file")["read_file"].method
+    assert read_file.__wrapped__.__self__ is get_plugin_registry(workspace).instance("terraform_file")
@@ -0,0 +1,34 @@
+import asyncio
+
+import pytest
+from semantic_kernel.agents import ChatHistoryAgentThread
+
+from agents import ResponseCache, TerraformCreationAgent
+from benchmark import ScriptedChatCompletion, repair_script
+
+
+def test_a_cache_hit_replays_create_file_and_recreates_the_files(tmp_path):
+    workspace = tmp_path / "workspace"
+    service = ScriptedChatCompletion(ai_model_id="scripted", script=repair_script(0))
+    agent = TerraformCreationAgent(base_path=str(workspace), service=service)
+    agent.response_cache = ResponseCache()
+
+    async def invoke() -> list[str]:
+        thread = ChatHistoryAgentThread()
+        responses = agent.invoke(messages="Create a bucket.", thread=thread)
+        return [str(response.message.content) async for response in responses]
+
+    first = asyncio.run(invoke())
+    written = (workspace / "main.tf").read_text()
+    (workspace / "main.tf").unlink()
+    requests = service.requests
+
+    assert asyncio.run(invoke()) == first
+    assert service.requests == requests
+    assert agent.response_cache.stats.hits == 1
+    assert (workspace / "main.tf").read_text() == written
+
+
+def test_replay_plugins_must_be_registered_plugin_names():
+    with pytest.raises(ValueError, match="TerraformFilePlugin"):
+        ResponseCache(replay_plugins=frozenset({"TerraformFilePlugin"}))
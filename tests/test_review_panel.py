@@ -0,0 +1,71 @@
+import asyncio
+import time
+
+import pytest
+
+from agents import ReviewPanel, TerraformCreationAgent, TerraformValidationAgent, UserAgent
+from benchmark import ScriptedChatCompletion
+from plugins import Access, function_access
+
+
+def _service(reply: str, latency: float = 0.0) -> ScriptedChatCompletion:
+    return ScriptedChatCompletion(ai_model_id="scripted", reply=reply, latency=latency)
+
+
+def test_reviewers_run_concurrently_and_their_findings_are_merged(tmp_path):
+    workspace = str(tmp_path)
+    panel = ReviewPanel(
+        [
+            TerraformValidationAgent(base_path=workspace, service=_service("Add a description to var.name.", 0.2)),
+            UserAgent(base_path=workspace, service=_service("Looks good.", 0.2)),
+        ]
+    )
+
+    async def review():
+        start = time.perf_counter()
+        responses = [response async for response in panel.invoke(messages="Review main.tf.")]
+        return responses, time.perf_counter() - start
+
+    responses, elapsed = asyncio.run(review())
+    (response,) = responses
+    assert response.message.name == "ReviewPanel"
+    assert response.message.content == (
+        "Findings of 2 reviewers:\n\n"
+        "### TerraformValidationAgent\nAdd a description to var.name.\n\n"
+        "### UserAgent\nLooks good."
+    )
+    # Two reviewers of 0.2 seconds each take about as long as one.
+    assert elapsed < 0.35
+
+
+def test_a_failing_reviewer_fails_the_review(tmp_path):
+    class Failing(ScriptedChatCompletion):
+        async def _inner_get_chat_message_contents(self, chat_history, settings):
+            raise RuntimeError("model unavailable")
+
+    panel = ReviewPanel(
+        [
+            TerraformValidationAgent(base_path=str(tmp_path), service=_service("Fine.")),
+            UserAgent(base_path=str(tmp_path), service=Failing(ai_model_id="scripted")),
+        ]
+    )
+
+    async def review():
+        return [response async for response in panel.invoke(messages="Review main.tf.")]
+
+    with pytest.raises(RuntimeError, match="model unavailable"):
+        asyncio.run(review())
+
+
+def test_the_validation_agent_only_reads_the_workspace(tmp_path):
+    agent = TerraformValidationAgent(base_path=str(tmp_path), service=_service("Fine."))
+    functions = [function for plugin in agent.kernel.plugins.values() for function in plugin.functions.values()]
+    assert functions and all(function_access(function) == Access.READ for function in functions)
+
+
+def test_reviewers_that_can_write_are_rejected(tmp_path):
+    writer = TerraformCreationAgent(base_path=str(tmp_path), service=_service("Done."))
+    with pytest.raises(ValueError, match=r"TerraformCreationAgent \(terraform_file-create_file\)"):
+        ReviewPanel([writer])
+    with pytest.raises(ValueError, match="at least one reviewer"):
+        ReviewPanel([])
@@ -0,0 +1,64 @@
+import pytest
+
+from plugins.revision_store import RevisionStore
+
+
+def test_snapshot_of_an_unchanged_workspace_returns_the_head(tmp_path):
+    (tmp_path / "main.tf").write_text("a = 1\n")
+    store = RevisionStore(str(tmp_path))
+    first = store.snapshot(agent="writer")
+    assert store.snapshot(agent="writer") == first
+    assert (first.number, first.parent, first.agent) == (1, None, "writer")
+
+
+def test_history_diff_and_read(tmp_path):
+    (tmp_path / "main.tf").write_text("a = 1\n")
+    store = RevisionStore(str(tmp_path))
+    first = store.snapshot()
+    (tmp_path / "main.tf").write_text("a = 2\n")
+    (tmp_path / "outputs.tf").write_text("b = 1\n")
+    second = store.snapshot()
+
+    assert [revision.id for revision in store.history()] == [second.id, first.id]
+    assert [(change.filename, change.status) for change in store.diff(first.id)] == [
+        ("main.tf", "modified"),
+        ("outputs.tf", "added"),
+    ]
+    assert store.read("main.tf", first.id) == "a = 1\n"
+    with pytest.raises(FileNotFoundError):
+        store.read("outputs.tf", first.id)
+
+
+def test_rollback_restores_files_and_keeps_history(tmp_path):
+    (tmp_path / "main.tf").write_text("a = 1\n")
+    store = RevisionStore(str(tmp_path))
+    first = store.snapshot()
+    (tmp_path / "main.tf").write_text("a = 2\n")
+    (tmp_path / "extra.tf").write_text("b = 1\n")
+    second = store.snapshot()
+
+    restored = store.rollback(first.id)
+    assert (tmp_path / "main.tf").read_text() == "a = 1\n"
+    assert not (tmp_path / "extra.tf").exists()
+    assert (restored.parent, restored.tree, restored.number) == (second.id, first.tree, 3)
+
+
+def test_a_new_store_picks_up_the_recorded_head(tmp_path):
+    (tmp_path / "main.tf").write_text("a = 1\n")
+    head = RevisionStore(str(tmp_path)).snapshot()
+    reopened = RevisionStore(str(tmp_path))
+    assert reopened.head == head
+    assert reopened.files() == {"main.tf": "a = 1\n"}
+    with pytest.raises(KeyError):
+        reopened.get("missing")
+
+
+def test_export_writes_the_files_of_a_revision(tmp_path):
+    workspace = tmp_path / "workspace"
+    workspace.mkdir()
+    (workspace / "main.tf").write_text("a = 1\n")
+    store = RevisionStore(str(workspace))
+    store.snapshot()
+    paths = store.export(str(tmp_path / "out"))
+    assert paths == [str(tmp_path / "out" / "main.tf")]
+    assert (tmp_path / "out" / "main.tf").read_text() == "a = 1\n"
@@ -0,0 +1,43 @@
+import asyncio
+
+from agents import TerraformCreationAgent, UserAgent
+from benchmark import ScriptedChatCompletion, repair_script
+from main import RunOptions, run_task
+from plugins import FeedbackChannel, get_plugin_registry, set_feedback_channel_factory
+from plugins.feedback import TerminalFeedbackChannel
+
+
+class CountingChannel(FeedbackChannel):
+    """Answers with the number of requests it has had."""
+
+    def __init__(self):
+        self.requests = 0
+
+    async def request(self, content: str) -> str:
+        self.requests += 1
+        return f"feedback {self.requests}"
+
+
+def test_every_task_in_a_reused_workspace_starts_with_a_fresh_feedback_channel(tmp_path):
+    workspace = str(tmp_path / "worker")
+    user_service = ScriptedChatCompletion(
+        ai_model_id="scripted",
+        script=lambda turn: [("user-request_user_feedback", {"content": "main.tf"})],
+        reply="Thanks.",
+    )
+    agents = [
+        TerraformCreationAgent(
+            base_path=workspace, service=ScriptedChatCompletion(ai_model_id="scripted", script=repair_script(0))
+        ),
+        UserAgent(base_path=workspace, service=user_service),
+    ]
+    options = RunOptions(selection="round-robin", termination="single-pass", checkpoint=False)
+    set_feedback_channel_factory(CountingChannel)
+    try:
+        requests = []
+        for task in ("Create a bucket.", "Create a queue."):
+            asyncio.run(run_task(task, workspace=workspace, verbose=False, options=options, agents=agents))
+            requests.append(get_plugin_registry(workspace).instance("user").channel.requests)
+    finally:
+        set_feedback_channel_factory(TerminalFeedbackChannel)
+    assert requests == [1, 1]
@@ -0,0 +1,98 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+from semantic_kernel.contents import AuthorRole, ChatMessageContent
+
+from custom_selection_strategy import ValidationDrivenSelectionStrategy
+from plugins import TerraformExecutionPlugin, TerraformResultCache, TerraformRunner
+
+CREATION, VALIDATION, USER = "TerraformCreationAgent", "TerraformValidationAgent", "UserAgent"
+AGENTS = [SimpleNamespace(id=name.lower(), name=name) for name in (CREATION, USER, VALIDATION)]
+CLEAN = 'resource "null_resource" "a" {}\n'
+
+
+def _message(name: str | None) -> ChatMessageContent:
+    role = AuthorRole.USER if name is None else AuthorRole.ASSISTANT
+    return ChatMessageContent(role=role, name=name, content="done")
+
+
+@pytest.fixture
+def workspace(tmp_path):
+    path = tmp_path / "workspace"
+    path.mkdir()
+    (path / "main.tf").write_text(CLEAN)
+    return path
+
+
+@pytest.fixture
+def make_strategy(workspace, stub_terraform):
+    def make(feedback: list[str] | None = None) -> ValidationDrivenSelectionStrategy:
+        plugin = TerraformExecutionPlugin(
+            str(workspace), runner=TerraformRunner(binary=stub_terraform), cache=TerraformResultCache()
+        )
+
+        async def sink(errors: str) -> None:
+            feedback.append(errors)
+
+        return ValidationDrivenSelectionStrategy(plugin, feedback_sink=sink if feedback is not None else None)
+
+    return make
+
+
+def _select(strategy: ValidationDrivenSelectionStrategy, *names: str | None) -> str:
+    history = [_message(None)] + [_message(name) for name in names]
+    return asyncio.run(strategy.select_next_agent(AGENTS, history)).name
+
+
+def test_the_task_and_feedback_go_to_the_creation_agent(make_strategy):
+    strategy = make_strategy()
+    assert _select(strategy) == CREATION
+    assert _select(strategy, CREATION, USER) == CREATION
+
+
+def test_errors_are_posted_and_the_creation_agent_fixes_them(make_strategy, workspace):
+    (workspace / "main.tf").write_text('output "name" {\n  value = var.missing\n}\n')
+    feedback: list[str] = []
+    strategy = make_strategy(feedback)
+    assert _select(strategy, CREATION) == CREATION
+    (errors,) = feedback
+    assert errors.startswith("Configuration check failed:")
+    assert "var.missing" in errors
+    assert strategy.skipped_turns == 1
+    # The local checks run before init: nothing was initialized for a broken configuration.
+    assert not (workspace / ".terraform").exists()
+
+
+def test_a_clean_formatted_configuration_skips_the_validation_agent(make_strategy, workspace):
+    strategy = make_strategy()
+    assert _select(strategy, CREATION) == USER
+    assert strategy.skipped_turns == 1
+    assert (workspace / ".terraform").is_dir()
+
+
+def test_unformatted_files_go_to_the_validation_agent(make_strategy, workspace):
+    (workspace / "main.tf").write_text(CLEAN + "# unformatted\n")
+    strategy = make_strategy()
+    assert _select(strategy, CREATION) == VALIDATION
+    assert strategy.skipped_turns == 0
+    # The validation agent's review then goes to the user agent.
+    assert _select(strategy, CREATION, VALIDATION) == USER
+
+
+def test_the_user_agent_only_reviews_files_it_has_not_seen(make_strategy, workspace):
+    strategy = make_strategy()
+    assert _select(strategy, CREATION) == USER
+    # The creation agent answered the feedback without changing the files.
+    assert _select(strategy, CREATION, USER, CREATION) == CREATION
+    (workspace / "main.tf").write_text(CLEAN + 'resource "null_resource" "b" {}\n')
+    assert _select(strategy, CREATION, USER, CREATION, CREATION) == USER
+
+
+def test_the_reviewed_digest_and_skipped_turns_survive_a_checkpoint(make_strategy):
+    strategy = make_strategy()
+    assert _select(strategy, CREATION) == USER
+    restored = make_strategy()
+    restored.restore_state(strategy.checkpoint_state())
+    assert restored.skipped_turns == 1
+    assert _select(restored, CREATION, USER, CREATION) == CREATION
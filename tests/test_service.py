@@ -0,0 +1,127 @@
+import asyncio
+import os
+
+import pytest
+
+import benchmark
+from main import RunOptions
+from plugins.terraform_result_cache import LOCK_FILE
+from service import GenerationService, JobStatus, QueueFullError
+
+OPTIONS = RunOptions(selection="round-robin", termination="single-pass", checkpoint=False)
+
+
+@pytest.fixture
+def make_service(tmp_path, monkeypatch):
+    monkeypatch.setenv("TF_PLUGIN_CACHE_DIR", str(tmp_path / "plugin-cache"))
+    created: list[str] = []
+
+    def make(latency: float = 0.0, **kwargs) -> GenerationService:
+        def agent_factory(workspace: str) -> list:
+            created.append(workspace)
+            return benchmark.create_agents(workspace, latency=latency)[0]
+
+        service = GenerationService(str(tmp_path / "root"), options=OPTIONS, agent_factory=agent_factory, **kwargs)
+        service.created = created
+        return service
+
+    return make
+
+
+async def _finished(job) -> list[str]:
+    return [event["event"] async for event in job.follow()]
+
+
+def test_a_submitted_job_runs_and_is_counted(make_service):
+    service = make_service(workers=1)
+
+    async def run():
+        await service.start()
+        try:
+            job = service.submit("Create a bucket.", job_id="bucket")
+            events = await _finished(job)
+            return job, events, service.stats()
+        finally:
+            await service.stop()
+
+    job, events, stats = asyncio.run(run())
+    assert job.status == JobStatus.SUCCEEDED
+    assert events[:2] == ["queued", "started"] and events[-1] == "finished"
+    assert "turn" in events
+    assert "main.tf" in job.result["files"]
+    assert (stats["succeeded"], stats["queue_depth"], stats["running"]) == (1, 0, 0)
+    assert stats["run_seconds"]["count"] == 1
+    assert job.to_dict()["queue_wait_seconds"] is not None
+
+
+def test_submit_rejects_duplicate_ids_and_a_full_queue(make_service):
+    service = make_service(max_queue=1)
+
+    async def run():
+        service.submit("a", job_id="a")
+        with pytest.raises(ValueError):
+            service.submit("b", job_id="a")
+        with pytest.raises(QueueFullError):
+            service.submit("b")
+
+    asyncio.run(run())
+    assert service.stats()["queue_depth"] == 1
+
+
+def test_cancel_skips_a_queued_job_and_interrupts_a_running_one(make_service):
+    service = make_service(latency=0.05, workers=1)
+
+    async def run():
+        await service.start()
+        try:
+            running = service.submit("Create a bucket.", job_id="running")
+            queued = service.submit("Create a queue.", job_id="queued")
+            while running.status != JobStatus.RUNNING:
+                await asyncio.sleep(0.01)
+            service.cancel("queued")
+            assert queued.status == JobStatus.CANCELLED
+            service.cancel("running")
+            await _finished(running)
+            # The worker is free again.
+            after = service.submit("Create a topic.", job_id="after")
+            await _finished(after)
+            return running, queued, after, service.stats()
+        finally:
+            await service.stop()
+
+    running, queued, after, stats = asyncio.run(run())
+    assert (running.status, queued.status, after.status) == (
+        JobStatus.CANCELLED,
+        JobStatus.CANCELLED,
+        JobStatus.SUCCEEDED,
+    )
+    assert queued.started is None
+    assert (stats["cancelled"], stats["succeeded"]) == (2, 1)
+
+
+def test_workers_reuse_their_agents_and_clear_the_previous_job(make_service):
+    service = make_service(workers=1)
+    workspace = os.path.join(service.workspace_root, "worker-0")
+
+    async def run():
+        await service.start()
+        try:
+            await _finished(service.submit("Create a bucket."))
+            os.makedirs(os.path.join(workspace, ".terraform"), exist_ok=True)
+            for name in ("leftover.tf", LOCK_FILE):
+                with open(os.path.join(workspace, name), "w") as f:
+                    f.write("# from the previous job\n")
+            second = service.submit("Create a queue.")
+            await _finished(second)
+            return second
+        finally:
+            await service.stop()
+
+    second = asyncio.run(run())
+    assert second.status == JobStatus.SUCCEEDED
+    assert "leftover.tf" not in second.result["files"]
+    assert not os.path.exists(os.path.join(workspace, "leftover.tf"))
+    # Installed providers are kept together with the lock file they were installed for.
+    assert os.path.isdir(os.path.join(workspace, ".terraform"))
+    assert os.path.exists(os.path.join(workspace, LOCK_FILE))
+    assert service.created == [workspace]
@@ -0,0 +1,65 @@
+import asyncio
+
+import agents.custom_agent_base
+from agents import TerraformCreationAgent, UserAgent
+from agents.custom_agent_base import ServiceRegistry, Services
+from benchmark import ScriptedChatCompletion
+
+SETTINGS = {"api_key": "sk-test", "ai_model_id": "gpt-4o"}
+
+
+def test_services_are_built_once_per_configuration():
+    registry = ServiceRegistry()
+    service = registry.get(Services.OPENAI, **SETTINGS)
+    assert registry.get(Services.OPENAI, **SETTINGS) is service
+    assert registry.get(Services.OPENAI, "developer", **SETTINGS) is not service
+    assert registry.get(Services.OPENAI, ai_model_id="gpt-4o-mini", api_key="sk-test") is not service
+    assert service.ai_model_id == "gpt-4o"
+
+
+def test_services_share_one_pooled_http_client():
+    registry = ServiceRegistry()
+    azure = registry.get(
+        Services.AZURE_OPENAI,
+        api_key="azure-key",
+        endpoint="https://example.openai.azure.com",
+        api_version="2024-10-21",
+        deployment_name="gpt-4o",
+    )
+    clients = {id(service.client._client) for service in (registry.get(Services.OPENAI, **SETTINGS), azure)}
+    assert clients == {id(registry.http_client)}
+
+
+def test_close_releases_the_pool_and_the_services():
+    registry = ServiceRegistry()
+    service = registry.get(Services.OPENAI, **SETTINGS)
+    client = registry.http_client
+    asyncio.run(registry.close())
+    assert client.is_closed
+    # Services built afterwards get a new pool.
+    assert registry.get(Services.OPENAI, **SETTINGS) is not service
+    assert registry.http_client is not client
+
+
+def test_the_default_service_is_built_when_an_agent_first_needs_it(tmp_path, monkeypatch):
+    registry = ServiceRegistry()
+    built = []
+
+    def build(service, instruction_role, settings):
+        built.append((service, instruction_role, settings))
+        return ScriptedChatCompletion(ai_model_id="scripted", reply="Hello.")
+
+    monkeypatch.setattr(registry, "_build", build)
+    monkeypatch.setattr(agents.custom_agent_base, "_service_registry", registry)
+    registry.configure_default(Services.AZURE_OPENAI, deployment_name="gpt-4o")
+    workspace = str(tmp_path / "workspace")
+    creation = TerraformCreationAgent(base_path=workspace)
+    user = UserAgent(base_path=workspace)
+    assert built == []
+
+    async def reply(agent) -> str:
+        return "".join([str(response.message.content) async for response in agent.invoke(messages="Hi.")])
+
+    assert asyncio.run(reply(creation)) == "Hello."
+    assert asyncio.run(reply(user)) == "Hello."
+    assert built == [(Services.AZURE_OPENAI, "system", {"deployment_name": "gpt-4o"})]
@@ -0,0 +1,46 @@
+import os
+
+import pytest
+
+from plugins import SnippetIndex, SnippetLibraryPlugin
+
+
+def _library(tmp_path):
+    library = tmp_path / "snippets"
+    (library / "modules" / "vpc").mkdir(parents=True)
+    (library / "modules" / "vpc" / "main.tf").write_text(
+        '# A VPC with public and private subnets\nresource "aws_vpc" "this" {}\n'
+    )
+    (library / "alb.tf").write_text('resource "aws_lb" "web" {\n  load_balancer_type = "application"\n}\n')
+    return library
+
+
+def test_search_ranks_matching_module_first(tmp_path):
+    index = SnippetIndex(str(_library(tmp_path)))
+    matches = index.search("vpc private subnets")
+    assert matches[0].path == "modules/vpc/main.tf"
+    assert matches[0].module == "modules/vpc"
+
+
+def test_module_source_is_relative_to_the_workspace(tmp_path):
+    library = _library(tmp_path)
+    workspace = tmp_path / "workspace"
+    plugin = SnippetLibraryPlugin(str(workspace), library=str(library), index=SnippetIndex(str(library)))
+    assert 'module source "../snippets/modules/vpc"' in plugin.search_snippets("vpc")
+
+
+def test_candidate_module_source_resolves_after_copy_to_the_chat_workspace(tmp_path):
+    library = _library(tmp_path)
+    candidate = tmp_path / "workspace" / ".candidates" / "0"
+    plugin = SnippetLibraryPlugin(
+        str(candidate), library=str(library), index=SnippetIndex(str(library)), absolute_sources=True
+    )
+    source = os.path.join(str(library), "modules", "vpc").replace(os.sep, "/")
+    assert f'module source "{source}"' in plugin.search_snippets("vpc")
+
+
+def test_read_rejects_paths_outside_the_library(tmp_path):
+    index = SnippetIndex(str(_library(tmp_path)))
+    assert "aws_lb" in index.read("alb.tf")
+    with pytest.raises(ValueError):
+        index.read("../outside.tf")
@@ -0,0 +1,86 @@
+import asyncio
+import io
+
+import pytest
+from semantic_kernel.agents import AgentGroupChat
+from semantic_kernel.contents import AuthorRole, ChatMessageContent
+
+from agents import TerraformCreationAgent, UserAgent
+from benchmark import ScriptedChatCompletion, repair_script
+from custom_selection_strategy import CustomSelectionStrategy
+from custom_termination_strategy import CustomTerminationStrategy
+from main import parse_args
+from streaming import StreamRenderer, stream_group_chat
+
+
+def _chunk(content: str) -> ChatMessageContent:
+    return ChatMessageContent(role=AuthorRole.ASSISTANT, content=content)
+
+
+def test_renderer_times_each_turn_and_counts_characters():
+    out = io.StringIO()
+    renderer = StreamRenderer(out)
+    renderer.start_turn("TerraformCreationAgent")
+    for content in ("", "Created ", "main.tf."):
+        renderer.on_chunk(_chunk(content))
+    turn = renderer.end_turn()
+
+    assert renderer.turns == [turn]
+    assert (turn.agent, turn.characters) == ("TerraformCreationAgent", 16)
+    assert 0 <= turn.time_to_first_token <= turn.duration
+    lines = out.getvalue().splitlines()
+    assert lines[:3] == ["", "==== TerraformCreationAgent ====", "Created main.tf."]
+    assert lines[3].startswith("---- TerraformCreationAgent: time to first token ")
+    assert renderer.end_turn() is None
+
+
+def test_a_turn_without_tokens_has_no_time_to_first_token():
+    out = io.StringIO()
+    renderer = StreamRenderer(out)
+    renderer.start_turn("UserAgent")
+    turn = renderer.end_turn()
+    assert turn.time_to_first_token is None
+    assert "time to first token n/a" in out.getvalue()
+
+
+def test_stream_group_chat_announces_tool_calls_while_the_turn_streams(tmp_path):
+    workspace = str(tmp_path / "workspace")
+    agents = [
+        TerraformCreationAgent(
+            base_path=workspace,
+            service=ScriptedChatCompletion(ai_model_id="scripted", script=repair_script(0), reply="Created main.tf."),
+        ),
+        UserAgent(base_path=workspace, service=ScriptedChatCompletion(ai_model_id="scripted", reply="Looks good.")),
+    ]
+    selection = CustomSelectionStrategy()
+    selection.initial_agent = agents[0]
+    group_chat = AgentGroupChat(
+        agents=agents,
+        selection_strategy=selection,
+        termination_strategy=CustomTerminationStrategy(agents, max_turns=6),
+    )
+    out = io.StringIO()
+    ended: list[str] = []
+
+    async def run():
+        await group_chat.add_chat_message(ChatMessageContent(role=AuthorRole.USER, content="Create a bucket."))
+        renderer = StreamRenderer(out)
+        return await stream_group_chat(group_chat, renderer, on_turn_end=lambda agent: ended.append(agent.name))
+
+    turns = asyncio.run(run())
+    assert [turn.agent for turn in turns] == ended == ["TerraformCreationAgent", "UserAgent"]
+    assert turns[0].tool_calls == ["terraform_file-create_file"]
+    assert all(turn.time_to_first_token is not None for turn in turns)
+    assert group_chat.is_complete
+    text = out.getvalue()
+    assert "  -> terraform_file-create_file(filename='main.tf', content=" in text
+    assert "  <- wrote main.tf (" in text
+    assert text.index("<- wrote main.tf") < text.index("Created main.tf.")
+    assert (tmp_path / "workspace" / "main.tf").exists()
+
+
+def test_stream_is_rejected_in_batch_mode(capsys):
+    with pytest.raises(SystemExit):
+        parse_args(["--batch", "tasks.jsonl", "--stream"])
+    assert "cannot be combined with --batch" in capsys.readouterr().err
+    assert parse_args(["--stream"]).stream
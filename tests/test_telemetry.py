@@ -0,0 +1,49 @@
+import json
+
+from opentelemetry.sdk.metrics import MeterProvider
+from opentelemetry.sdk.metrics.export import InMemoryMetricReader
+from opentelemetry.sdk.trace import TracerProvider
+from opentelemetry.sdk.trace.export import SimpleSpanProcessor
+
+from telemetry_exporters import JsonLinesFile, JsonLinesMetricExporter, JsonLinesSpanExporter
+
+
+def _lines(path) -> list[dict]:
+    return [json.loads(line) for line in path.read_text().splitlines()]
+
+
+def test_spans_and_metrics_share_one_file_until_both_shut_down(tmp_path):
+    path = tmp_path / "telemetry.jsonl"
+    output = JsonLinesFile(str(path))
+    span_exporter = JsonLinesSpanExporter(output)
+    metric_exporter = JsonLinesMetricExporter(output)
+
+    provider = TracerProvider()
+    provider.add_span_processor(SimpleSpanProcessor(span_exporter))
+    with provider.get_tracer("test").start_as_current_span("agent_turn TerraformCreationAgent"):
+        pass
+    reader = InMemoryMetricReader()
+    MeterProvider(metric_readers=[reader]).get_meter("test").create_counter("llm.tokens").add(3)
+    metric_exporter.export(reader.get_metrics_data())
+
+    # The span exporter shuts down first; the metric exporter can still write.
+    span_exporter.shutdown()
+    metric_exporter.export(reader.get_metrics_data())
+    metric_exporter.shutdown()
+    # Late exports after the file closed are dropped rather than raising.
+    metric_exporter.export(reader.get_metrics_data())
+
+    lines = _lines(path)
+    assert [next(iter(line)) for line in lines] == ["span", "metrics", "metrics"]
+    assert lines[0]["span"]["name"] == "agent_turn TerraformCreationAgent"
+    assert output._file.closed
+
+
+def test_the_file_is_appended_to(tmp_path):
+    path = tmp_path / "telemetry.jsonl"
+    path.write_text('{"span": {"name": "earlier run"}}\n')
+    output = JsonLinesFile(str(path))
+    exporter = JsonLinesSpanExporter(output)
+    output.write("span", '{"name": "this run"}')
+    exporter.shutdown()
+    assert [line["span"]["name"] for line in _lines(path)] == ["earlier run", "this run"]
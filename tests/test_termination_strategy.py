@@ -0,0 +1,54 @@
+import asyncio
+from types import SimpleNamespace
+
+from semantic_kernel.contents import AuthorRole, ChatMessageContent
+
+from custom_termination_strategy import ConvergenceTerminationStrategy, CustomTerminationStrategy, TerminationReason
+from plugins import TerraformExecutionPlugin, TerraformResultCache, TerraformRunner
+
+
+def _message(name: str) -> ChatMessageContent:
+    return ChatMessageContent(role=AuthorRole.ASSISTANT, name=name, content="done")
+
+
+def test_single_pass_ends_after_one_turn_per_agent_even_if_an_agent_is_skipped():
+    agents = ["TerraformCreationAgent", "UserAgent", "TerraformValidationAgent"]
+    strategy = CustomTerminationStrategy(agents=agents, max_turns=12)
+    # The validation agent is never selected.
+    turns = ["TerraformCreationAgent", "UserAgent", "TerraformCreationAgent"]
+    history = []
+    results = []
+    for name in turns:
+        history.append(_message(name))
+        results.append(asyncio.run(strategy.should_agent_terminate(None, history)))
+    assert results == [False, False, True]
+    assert strategy.maximum_iterations == 12
+
+
+def test_single_pass_turns_survive_a_checkpoint():
+    strategy = CustomTerminationStrategy(agents=["a", "b"])
+    asyncio.run(strategy.should_agent_terminate(None, [_message("a")]))
+    restored = CustomTerminationStrategy(agents=["a", "b"])
+    restored.restore_state(strategy.checkpoint_state())
+    assert asyncio.run(restored.should_agent_terminate(None, [_message("a"), _message("b")]))
+
+
+def test_convergence_initializes_a_workspace_nobody_initialized(tmp_path, stub_terraform):
+    workspace = tmp_path / "workspace"
+    workspace.mkdir()
+    (workspace / "main.tf").write_text('resource "null_resource" "a" {}\n')
+    plugin = TerraformExecutionPlugin(
+        str(workspace), runner=TerraformRunner(binary=stub_terraform), cache=TerraformResultCache()
+    )
+    strategy = ConvergenceTerminationStrategy(plugin, max_turns=12)
+    creation = SimpleNamespace(name="TerraformCreationAgent")
+
+    async def run():
+        history = [_message("TerraformCreationAgent")]
+        first = await strategy.should_agent_terminate(creation, history)
+        history.append(_message("TerraformCreationAgent"))
+        return first, await strategy.should_agent_terminate(creation, history)
+
+    assert asyncio.run(run()) == (False, True)
+    assert strategy.termination_reason == TerminationReason.CONVERGED
+    assert (workspace / ".terraform").is_dir()
@@ -0,0 +1,116 @@
+import json
+
+from plugins.terraform_diagnostics import (
+    MAX_DIAGNOSTICS,
+    TerraformDiagnostic,
+    ValidationReport,
+    format_fmt,
+    format_fmt_diff,
+    format_validation,
+    parse_fmt_diff,
+    parse_validate,
+)
+from plugins.terraform_runner import CommandResult
+
+
+def _result(returncode: int = 0, stdout: str = "", stderr: str = "") -> CommandResult:
+    return CommandResult(args=("terraform",), returncode=returncode, stdout=stdout, stderr=stderr, duration=0.1)
+
+
+def _diagnostic(summary: str, filename: str = "main.tf", line: int = 1, severity: str = "error") -> dict:
+    return {
+        "severity": severity,
+        "summary": summary,
+        "detail": "A longer explanation.",
+        "range": {"filename": filename, "start": {"line": line, "column": 3}},
+        "snippet": {"start_line": line, "code": "  bucket = var.missing  "},
+    }
+
+
+def test_parse_validate_reads_the_json_output():
+    output = {
+        "valid": False,
+        "error_count": 1,
+        "warning_count": 1,
+        "diagnostics": [
+            _diagnostic("Reference to undeclared input variable", line=4),
+            _diagnostic("Deprecated", severity="warning"),
+        ],
+    }
+    report = parse_validate(_result(1, json.dumps(output)))
+    assert (report.valid, report.error_count, report.warning_count) == (False, 1, 1)
+    assert report.diagnostics[0] == TerraformDiagnostic(
+        "error",
+        "Reference to undeclared input variable",
+        "A longer explanation.",
+        "main.tf",
+        4,
+        3,
+        "4: bucket = var.missing",
+    )
+
+
+def test_parse_validate_keeps_output_that_is_not_json():
+    report = parse_validate(_result(1, stderr="Error: something broke\n"))
+    assert (report.valid, report.error_count) == (False, 1)
+    assert report.diagnostics[0].detail == "Error: something broke"
+    assert parse_validate(_result(0, "Success! The configuration is valid.\n")) == ValidationReport(valid=True)
+
+
+def test_format_validation_groups_diagnostics_by_location():
+    diagnostics = [_diagnostic("Unsupported argument", line=line) for line in range(1, 6)]
+    diagnostics.append(_diagnostic("Deprecated", severity="warning"))
+    report = parse_validate(
+        _result(1, json.dumps({"valid": False, "error_count": 5, "warning_count": 1, "diagnostics": diagnostics}))
+    )
+    summary = format_validation(report, ".diagnostics/validate.json")
+    assert summary.splitlines() == [
+        "The configuration is invalid: 5 errors, 1 warning.",
+        "- error at main.tf:1:3, main.tf:2:3, main.tf:3:3 and 2 more: Unsupported argument: A longer explanation.",
+        "    1: bucket = var.missing",
+        "- warning at main.tf:1:3: Deprecated: A longer explanation.",
+        "    1: bucket = var.missing",
+        "Full output: .diagnostics/validate.json",
+    ]
+
+
+def test_format_validation_lists_at_most_max_diagnostics():
+    diagnostics = [_diagnostic(f"Error {index}") for index in range(MAX_DIAGNOSTICS + 2)]
+    report = parse_validate(_result(1, json.dumps({"valid": False, "diagnostics": diagnostics})))
+    lines = format_validation(report).splitlines()
+    assert lines[-1] == "- ... and 2 more diagnostics."
+    assert format_validation(ValidationReport(valid=True)) == "The configuration is valid."
+
+
+def test_format_fmt_lists_the_rewritten_files():
+    assert format_fmt(_result(0, "main.tf\noutputs.tf\n")) == "Formatted 2 files: main.tf, outputs.tf."
+    assert format_fmt(_result(0)) == "All files were already formatted."
+    assert format_fmt(_result(2, stderr="Error: Invalid character"), "out.json") == (
+        "terraform fmt failed (exit code 2): Error: Invalid character\nFull output: out.json"
+    )
+
+
+DIFF = """main.tf
+--- old/main.tf
++++ new/main.tf
+@@ -1,3 +1,3 @@
+ resource "null_resource" "a" {
+-  triggers = { a=1 }
++  triggers = { a = 1 }
+ }
+"""
+
+
+def test_parse_fmt_diff_counts_changed_lines_per_file():
+    assert parse_fmt_diff(DIFF) == {"main.tf": 2}
+    assert parse_fmt_diff("") == {}
+
+
+def test_format_fmt_diff_summarizes_without_the_diff():
+    assert format_fmt_diff(_result(3, DIFF), "fmt-diff.json") == (
+        "1 file not formatted: main.tf (2 lines). Call fmt to rewrite them.\nFull output: fmt-diff.json"
+    )
+    assert format_fmt_diff(_result(0)) == "All files are formatted."
+    assert format_fmt_diff(_result(2, stderr="Error: Invalid block definition")) == (
+        "terraform fmt -check failed (exit code 2): Error: Invalid block definition"
+    )
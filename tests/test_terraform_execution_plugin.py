@@ -0,0 +1,81 @@
+import asyncio
+
+from plugins import TerraformExecutionPlugin, TerraformResultCache, TerraformRunner
+
+
+def _plugin(workspace, stub_terraform, cache):
+    return TerraformExecutionPlugin(str(workspace), runner=TerraformRunner(binary=stub_terraform), cache=cache)
+
+
+def test_validate_failure_before_init_is_not_replayed_after_init(tmp_path, stub_terraform):
+    workspace = tmp_path / "workspace"
+    workspace.mkdir()
+    (workspace / "main.tf").write_text('resource "null_resource" "a" {}\n')
+    plugin = _plugin(workspace, stub_terraform, TerraformResultCache())
+
+    async def run():
+        before = await plugin.run_validate()
+        await plugin.run_init()
+        return before, await plugin.run_validate()
+
+    before, after = asyncio.run(run())
+    assert not before.ok
+    assert after.ok
+
+
+def test_validate_results_are_not_shared_between_workspaces(tmp_path, stub_terraform):
+    cache = TerraformResultCache()
+    uninitialized, initialized = tmp_path / "uninitialized", tmp_path / "initialized"
+    for workspace in (uninitialized, initialized):
+        workspace.mkdir()
+        (workspace / "main.tf").write_text('resource "null_resource" "a" {}\n')
+    (initialized / ".terraform").mkdir()
+
+    async def run():
+        failed = await _plugin(uninitialized, stub_terraform, cache).run_validate()
+        return failed, await _plugin(initialized, stub_terraform, cache).run_validate()
+
+    failed, other = asyncio.run(run())
+    assert not failed.ok
+    assert other.ok
+
+
+def test_a_provider_added_after_init_initializes_the_workspace_again(tmp_path, stub_terraform):
+    workspace = tmp_path / "workspace"
+    workspace.mkdir()
+    (workspace / "main.tf").write_text('resource "null_resource" "a" {}\n')
+    plugin = _plugin(workspace, stub_terraform, TerraformResultCache())
+
+    async def check():
+        await plugin.ensure_initialized()
+        return await plugin.run_validate()
+
+    assert asyncio.run(check()).ok
+    assert asyncio.run(plugin.ensure_initialized()) is None
+    (workspace / "main.tf").write_text('resource "null_resource" "a" {}\n\nresource "random_pet" "name" {}\n')
+    assert asyncio.run(check()).ok
+
+
+def test_a_new_plugin_checks_the_init_of_an_already_initialized_workspace(tmp_path, stub_terraform):
+    workspace = tmp_path / "workspace"
+    workspace.mkdir()
+    (workspace / "main.tf").write_text('resource "null_resource" "a" {}\n')
+    (workspace / ".terraform").mkdir()
+    (workspace / ".terraform" / "providers").write_text("aws\n")
+    plugin = _plugin(workspace, stub_terraform, None)
+
+    async def check():
+        await plugin.ensure_initialized()
+        return await plugin.run_validate()
+
+    assert asyncio.run(check()).ok
+
+
+def test_fmt_check_returns_a_summary_and_keeps_the_full_output(tmp_path, stub_terraform):
+    workspace = tmp_path / "workspace"
+    workspace.mkdir()
+    (workspace / "main.tf").write_text('resource "null_resource" "a" {}\n')
+    plugin = _plugin(workspace, stub_terraform, TerraformResultCache())
+
+    assert asyncio.run(plugin.fmt_check()).startswith("All files are formatted.")
+    assert (workspace / ".diagnostics" / "fmt-diff.json").exists()
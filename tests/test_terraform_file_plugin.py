@@ -0,0 +1,65 @@
+import os
+
+import pytest
+
+from plugins.patching import PatchConflictError, content_hash
+from plugins.terraform_file_plugin import TerraformFilePlugin
+
+
+@pytest.fixture
+def plugin(tmp_path):
+    (tmp_path / "main.tf").write_text('resource "null_resource" "a" {}\n')
+    (tmp_path / "outputs.tf").write_text('output "a" {\n  value = 1\n}\n')
+    return TerraformFilePlugin(str(tmp_path))
+
+
+def test_read_files_reads_the_whole_workspace_with_versions(plugin):
+    main = 'resource "null_resource" "a" {}\n'
+    assert plugin.read_files().startswith(f"# ---- main.tf (version {content_hash(main)}) ----\n{main}")
+    assert plugin.read_files(["missing.tf", "main.tf"]).splitlines()[:2] == [
+        "# ---- missing.tf (not found) ----",
+        f"# ---- main.tf (version {content_hash(main)}) ----",
+    ]
+
+
+def test_read_lines_numbers_the_requested_range(plugin):
+    content = 'output "a" {\n  value = 1\n}\n'
+    assert plugin.read_lines("outputs.tf", start_line=2, end_line=5) == (
+        f"outputs.tf (version {content_hash(content)}, 3 lines)\n2|   value = 1\n3| }}"
+    )
+
+
+def test_replace_in_file_checks_the_version_and_uniqueness(plugin, tmp_path):
+    version = content_hash((tmp_path / "outputs.tf").read_text())
+    assert plugin.replace_in_file("outputs.tf", "value = 1", "value = 2", base_version=version).startswith(
+        "Updated Terraform file:"
+    )
+    assert (tmp_path / "outputs.tf").read_text() == 'output "a" {\n  value = 2\n}\n'
+    with pytest.raises(PatchConflictError, match="changed since version"):
+        plugin.replace_in_file("outputs.tf", "value = 2", "value = 3", base_version=version)
+    with pytest.raises(PatchConflictError, match="found 0"):
+        plugin.replace_in_file("outputs.tf", "value = 1", "value = 3")
+
+
+def test_write_files_writes_every_file_or_none(plugin, tmp_path, monkeypatch):
+    before = plugin.read_files()
+    replace = os.replace
+    calls = []
+
+    def fail_on_second_rename(source, target):
+        calls.append(target)
+        if len(calls) == 2:
+            raise OSError("disk full")
+        replace(source, target)
+
+    monkeypatch.setattr(os, "replace", fail_on_second_rename)
+    with pytest.raises(OSError, match="disk full"):
+        plugin.write_files({"main.tf": "# rewritten\n", "new.tf": "# new\n"})
+    monkeypatch.undo()
+
+    assert sorted(os.listdir(tmp_path)) == ["main.tf", "outputs.tf"]
+    assert plugin.read_files() == before
+    assert plugin.write_files({"main.tf": "# rewritten\n", "new.tf": "# new\n"}).startswith(
+        "Wrote 2 Terraform file(s): main.tf (version"
+    )
+    assert plugin.read_file("new.tf") == "# new\n"
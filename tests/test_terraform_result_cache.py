@@ -0,0 +1,48 @@
+from plugins.terraform_result_cache import local_module_dirs, validation_digest
+
+MAIN = """module "network" {
+  source = "../modules/network"
+}
+
+module "vpc" {
+  source  = "terraform-aws-modules/vpc/aws"
+  version = "5.0.0"
+}
+
+resource "aws_s3_object" "readme" {
+  source = "./README.md"
+}
+"""
+
+
+def _workspace(tmp_path):
+    workspace = tmp_path / "workspace"
+    workspace.mkdir()
+    (workspace / "main.tf").write_text(MAIN)
+    (workspace / "README.md").write_text("readme\n")
+    network = tmp_path / "modules" / "network"
+    network.mkdir(parents=True)
+    (network / "main.tf").write_text(f'module "subnets" {{\n  source = "{tmp_path / "shared" / "subnets"}"\n}}\n')
+    subnets = tmp_path / "shared" / "subnets"
+    subnets.mkdir(parents=True)
+    (subnets / "main.tf").write_text('variable "cidr" {}\n')
+    return workspace, network, subnets
+
+
+def test_local_module_dirs_follows_relative_and_absolute_sources(tmp_path):
+    workspace, network, subnets = _workspace(tmp_path)
+    assert local_module_dirs(str(workspace)) == sorted([str(network), str(subnets)])
+
+
+def test_editing_a_local_module_changes_the_validation_digest(tmp_path):
+    workspace, network, subnets = _workspace(tmp_path)
+    digests = [validation_digest(str(workspace))]
+    (network / "variables.tf").write_text('variable "name" {}\n')
+    digests.append(validation_digest(str(workspace)))
+    (subnets / "main.tf").write_text('variable "cidr" {\n  type = string\n}\n')
+    digests.append(validation_digest(str(workspace)))
+    # Files of a module that are not Terraform files do not matter.
+    (subnets / "notes.txt").write_text("notes\n")
+    digests.append(validation_digest(str(workspace)))
+    assert len(set(digests[:3])) == 3
+    assert digests[3] == digests[2]
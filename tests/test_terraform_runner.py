@@ -0,0 +1,15 @@
+import asyncio
+
+from plugins.terraform_runner import TerraformRunner
+
+
+def test_a_runner_can_be_used_from_several_event_loops(stub_terraform, tmp_path):
+    runner = TerraformRunner(binary=stub_terraform, max_concurrency=1)
+
+    async def run_together():
+        # Two commands for one slot, so the second waits on the semaphore.
+        results = await asyncio.gather(*(runner.run("version", cwd=str(tmp_path)) for _ in range(2)))
+        return [result.stdout.strip() for result in results]
+
+    assert asyncio.run(run_together()) == ["Terraform v1.9.0"] * 2
+    assert asyncio.run(run_together()) == ["Terraform v1.9.0"] * 2